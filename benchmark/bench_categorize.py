@@ -279,6 +279,9 @@ async def main() -> None:
     ap.add_argument("--concurrency", type=int, default=5)  # Anthropic Max guidance: 3–5 parallel
     ap.add_argument("--dry-run", action="store_true",
                     help="Score cached predictions only; do not call the model")
+    ap.add_argument("--router-family", default=None,
+                    help="Record strict-match F1 as a ModelRouter bench score for this "
+                         "prompt family ('*' = all families)")
     args = ap.parse_args()
 
     fixture_path = FIXTURES_DIR / f"{args.fixture}.jsonl"
@@ -347,6 +350,12 @@ async def main() -> None:
     print()
     print(f"Full report: {out}")
 
+    if args.router_family:
+        from course_scout.infrastructure.model_router import ModelRouter
+
+        if ModelRouter().ingest_bench_report(out, prompt_family=args.router_family):
+            print(f"Router: recorded {args.model}/{args.effort} for {args.router_family}")
+
 
 if __name__ == "__main__":
     asyncio.run(main())
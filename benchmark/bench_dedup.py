@@ -0,0 +1,148 @@
+"""Dedup lookup bench: SQLite per query vs the preloaded in-memory seen-key cache.
+
+Fills a throwaway seen-links table with N synthetic normalized URLs, then
+times membership checks for a mix of seen and never-seen keys through:
+  - sqlite:  `SeenItemRepository.seen_links_many` (one IN query per batch)
+  - hashset: `HashedKeySet` (set of 64-bit key hashes)
+  - bloom:   `BloomFilter` sized for 2N keys at `--fp-rate`
+
+and reports preload time, memory held, lookups per second and the measured
+Bloom false-positive rate on never-seen keys.
+
+Usage:
+    uv run python benchmark/bench_dedup.py --keys 1000000
+    uv run python benchmark/bench_dedup.py --keys 100000 --lookups 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from course_scout.infrastructure.dedup import BloomFilter, HashedKeySet, SeenItemRepository
+
+BENCH_DIR = Path(__file__).parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def _url(i: int) -> str:
+    return f"https://pan.baidu.com/s/1{i:012d}?pwd=abcd"
+
+
+def fill(repo: SeenItemRepository, n_keys: int) -> None:
+    batch = 50_000
+    for start in range(0, n_keys, batch):
+        stop = min(start + batch, n_keys)
+        repo.mark_many(links=((_url(i), "bench", "t") for i in range(start, stop)))
+
+
+def _build(factory) -> tuple[object, float]:
+    started = time.perf_counter()
+    structure = factory()
+    return structure, time.perf_counter() - started
+
+
+def _held_bytes(factory) -> int:
+    """Bytes still allocated by `factory()`'s result once built (tracemalloc, untimed)."""
+    tracemalloc.start()
+    structure = factory()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return current
+
+
+def run(n_keys: int, n_lookups: int, fp_rate: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = SeenItemRepository(f"{tmp}/reports.db")
+        fill(repo, n_keys)
+
+        # Half seen, half never seen.
+        probes = [_url(i * 7919 % n_keys) for i in range(n_lookups // 2)]
+        probes += [_url(n_keys + i) for i in range(n_lookups - len(probes))]
+
+        started = time.perf_counter()
+        for i in range(0, len(probes), 200):  # a digest-sized batch per query
+            repo.seen_links_many(probes[i : i + 200])
+        sqlite_s = time.perf_counter() - started
+
+        hashed, hashed_load_s = _build(lambda: HashedKeySet(repo.iter_keys("links")))
+        hashed_bytes = _held_bytes(lambda: HashedKeySet(repo.iter_keys("links")))
+        strings_bytes = _held_bytes(lambda: set(repo.iter_keys("links")))
+
+        def _bloom() -> BloomFilter:
+            bloom = BloomFilter(2 * n_keys, fp_rate)
+            for key in repo.iter_keys("links"):
+                bloom.add(key)
+            return bloom
+
+        bloom, bloom_load_s = _build(_bloom)
+
+        started = time.perf_counter()
+        for key in probes:
+            _ = key in hashed
+        hashed_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        hits = [key in bloom for key in probes]
+        bloom_s = time.perf_counter() - started
+        unseen = probes[n_lookups // 2 :]
+        false_positives = sum(hits[n_lookups // 2 :])
+
+        db_bytes = Path(f"{tmp}/reports.db").stat().st_size
+
+    return {
+        "keys": n_keys,
+        "lookups": n_lookups,
+        "db_mb": round(db_bytes / 1e6, 1),
+        "sqlite_lookups_per_s": round(n_lookups / sqlite_s),
+        "hashset_load_s": round(hashed_load_s, 2),
+        "hashset_mb": round(hashed_bytes / 1e6, 1),
+        "string_set_mb": round(strings_bytes / 1e6, 1),
+        "hashset_lookups_per_s": round(n_lookups / hashed_s),
+        "bloom_load_s": round(bloom_load_s, 2),
+        "bloom_mb": round(bloom.nbytes / 1e6, 2),
+        "bloom_hashes": bloom.hashes,
+        "bloom_lookups_per_s": round(n_lookups / bloom_s),
+        "bloom_false_positive_rate": round(false_positives / max(len(unseen), 1), 4),
+    }
+
+
+def render(r: dict) -> str:
+    return "\n".join(
+        [
+            f"{r['keys']:,} seen keys ({r['db_mb']} MB on disk), {r['lookups']:,} lookups "
+            "(half never seen)",
+            f"  sqlite   {r['sqlite_lookups_per_s']:>12,}/s   (IN query per 200 keys)",
+            f"  hashset  {r['hashset_lookups_per_s']:>12,}/s   {r['hashset_mb']:>7} MB   "
+            f"load {r['hashset_load_s']}s   (set of the key strings: {r['string_set_mb']} MB)",
+            f"  bloom    {r['bloom_lookups_per_s']:>12,}/s   {r['bloom_mb']:>7} MB   "
+            f"load {r['bloom_load_s']}s   k={r['bloom_hashes']}   "
+            f"fp {r['bloom_false_positive_rate']:.2%}",
+        ]
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--keys", type=int, default=1_000_000)
+    ap.add_argument("--lookups", type=int, default=200_000)
+    ap.add_argument("--fp-rate", dest="fp_rate", type=float, default=0.01)
+    args = ap.parse_args()
+
+    result = run(args.keys, args.lookups, args.fp_rate)
+    print(render(result))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / "dedup.json"
+    out.write_text(json.dumps(result, indent=2))
+    print(f"\nWrote {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Parse-time bench: per-call schema + validation vs the cached `schema_for` entry.
+
+Replays the largest recorded parser outputs (`results/*_preds_*.json`, as
+cached by bench_categorize.py) through both ways a provider handles one
+structured call:
+  - uncached: `model_json_schema()` for the request, then `model_validate`
+              (dict output) or `model_validate_json` (text output)
+  - cached:   `schema_for(...).json_schema`, then `validate_python` /
+              `validate_json` on the prebuilt TypeAdapter
+
+and reports microseconds per call for each. `--synthetic N` builds N-item
+outputs instead, for trees without recorded predictions.
+
+Usage:
+    uv run python benchmark/bench_parse.py --top 5
+    uv run python benchmark/bench_parse.py --synthetic 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from course_scout.infrastructure.agents import SummarizerOutputSchema
+from course_scout.infrastructure.schema_cache import schema_for
+
+BENCH_DIR = Path(__file__).parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def load_recorded(top: int) -> list[dict]:
+    """Return the `top` largest recorded outputs across all prediction caches."""
+    outputs: list[dict] = []
+    for path in sorted(RESULTS_DIR.glob("*_preds_*.json")):
+        for trace in json.loads(path.read_text()).values():
+            items = trace["items"] if isinstance(trace, dict) else trace
+            outputs.append({"items": items, "key_links": []})
+    outputs.sort(key=lambda o: len(json.dumps(o)), reverse=True)
+    return outputs[:top]
+
+
+def synthetic(n_items: int) -> dict:
+    items = [
+        {
+            "title": f"Course {i}",
+            "description": "Full course, 12 lessons, download link in thread, mirror on Baidu.",
+            "category": "course",
+            "msg_ids": [i, i + 1, i + 2],
+            "links": [f"https://t.me/c/1/{i}", f"https://pan.baidu.com/s/{i}"],
+            "author": "poster",
+            "instructor": "artist",
+            "platform": "Coloso",
+            "status": "FULFILLED",
+            "priority": "HIGH",
+            "password": "abcd",
+        }
+        for i in range(n_items)
+    ]
+    return {"items": items, "key_links": [{"url": "https://example.com", "title": "x"}]}
+
+
+def _time(fn, payload, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(payload)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def _uncached_dict(data: dict) -> None:
+    SummarizerOutputSchema.model_json_schema()
+    SummarizerOutputSchema.model_validate(data)
+
+
+def _uncached_text(text: str) -> None:
+    SummarizerOutputSchema.model_json_schema()
+    SummarizerOutputSchema.model_validate_json(text)
+
+
+def _cached_dict(data: dict) -> None:
+    entry = schema_for(SummarizerOutputSchema)
+    _ = entry.json_schema
+    entry.validate_python(data)
+
+
+def _cached_text(text: str) -> None:
+    entry = schema_for(SummarizerOutputSchema)
+    _ = entry.json_schema
+    entry.validate_json(text)
+
+
+def run(outputs: list[dict], rounds: int) -> list[dict]:
+    schema_for(SummarizerOutputSchema)  # built once per process, outside the timing
+    results = []
+    for output in outputs:
+        text = json.dumps(output)
+        results.append(
+            {
+                "items": len(output["items"]),
+                "bytes": len(text),
+                "uncached_dict_us": round(_time(_uncached_dict, output, rounds), 1),
+                "cached_dict_us": round(_time(_cached_dict, output, rounds), 1),
+                "uncached_text_us": round(_time(_uncached_text, text, rounds), 1),
+                "cached_text_us": round(_time(_cached_text, text, rounds), 1),
+            }
+        )
+    return results
+
+
+def render(results: list[dict]) -> str:
+    lines = [
+        f"{'items':>6} {'bytes':>8} {'dict uncached':>14} {'dict cached':>12} "
+        f"{'text uncached':>14} {'text cached':>12}"
+    ]
+    for r in results:
+        lines.append(
+            f"{r['items']:>6} {r['bytes']:>8} {r['uncached_dict_us']:>11.0f} us "
+            f"{r['cached_dict_us']:>9.0f} us {r['uncached_text_us']:>11.0f} us "
+            f"{r['cached_text_us']:>9.0f} us"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top", type=int, default=5, help="Largest recorded outputs to replay")
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--synthetic", type=int, default=0,
+                    help="Use one synthetic output with this many items instead")
+    args = ap.parse_args()
+
+    outputs = [synthetic(args.synthetic)] if args.synthetic else load_recorded(args.top)
+    if not outputs:
+        raise SystemExit(f"No *_preds_*.json in {RESULTS_DIR}; run bench_categorize.py "
+                         "first or pass --synthetic N.")
+    results = run(outputs, args.rounds)
+    print(render(results))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / "parse.json"
+    out.write_text(json.dumps(results, indent=2))
+    print(f"\nWrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""SDK startup bench: a subprocess per `query()` vs a warm client pool.
+
+Sends the same short prompts through both paths of `sdk_messages`:
+  - query:   `claude_agent_sdk.query()` (one CLI subprocess per call)
+  - pooled:  `ClaudeClientPool` with `--pool-size` persistent clients,
+             prewarmed before timing starts (as the scan does during fetch)
+
+and reports time to first message and total call latency per path. The
+difference in time to first message is the per-call startup overhead the
+pool removes.
+
+Usage:
+    uv run python benchmark/bench_sdk_startup.py --calls 10
+    uv run python benchmark/bench_sdk_startup.py --calls 20 --pool-size 4 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+from claude_agent_sdk import ClaudeAgentOptions, query
+
+from course_scout.infrastructure import sdk_pool
+
+BENCH_DIR = Path(__file__).parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def _options(model: str) -> ClaudeAgentOptions:
+    return ClaudeAgentOptions(
+        model=model,
+        system_prompt="Answer with a single word.",
+        max_turns=1,
+        setting_sources=[],
+        allowed_tools=[],
+        thinking={"type": "disabled"},
+    )
+
+
+async def run_mode(mode: str, n: int, model: str, pool_size: int, concurrency: int) -> dict:
+    options = _options(model)
+    stats = sdk_pool.StartupStats()
+    pool = sdk_pool.ClaudeClientPool(pool_size, stats=stats) if mode == "pooled" else None
+    if pool is not None:
+        await pool.prewarm(options, n=pool_size)
+    sem = asyncio.Semaphore(concurrency)
+    totals: list[float] = []
+    firsts: list[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            started = time.perf_counter()
+            first = None
+            stream = (
+                pool.run(f"Say the number {i}.", options)
+                if pool is not None
+                else query(prompt=f"Say the number {i}.", options=options)
+            )
+            async for _msg in stream:
+                if first is None:
+                    first = time.perf_counter() - started
+            totals.append((time.perf_counter() - started) * 1000)
+            firsts.append((first or 0.0) * 1000)
+
+    try:
+        await asyncio.gather(*(one(i) for i in range(n)))
+    finally:
+        if pool is not None:
+            await pool.close()
+    return {
+        "mode": mode,
+        "calls": n,
+        "first_message_ms_p50": round(statistics.median(firsts), 1),
+        "total_ms_p50": round(statistics.median(totals), 1),
+        "connect_ms": [round(ms, 1) for ms in stats.connect_ms],
+        "discarded": stats.discarded,
+    }
+
+
+def render(results: list[dict]) -> str:
+    lines = [f"{'mode':<8} {'calls':>6} {'first msg p50':>14} {'total p50':>10}"]
+    for r in results:
+        lines.append(
+            f"{r['mode']:<8} {r['calls']:>6} {r['first_message_ms_p50']:>11.0f} ms "
+            f"{r['total_ms_p50']:>7.0f} ms"
+        )
+    by_mode = {r["mode"]: r for r in results}
+    if {"query", "pooled"} <= by_mode.keys():
+        saved = by_mode["query"]["first_message_ms_p50"] - by_mode["pooled"]["first_message_ms_p50"]
+        lines.append(f"startup overhead saved per call (p50): {saved:.0f} ms")
+    return "\n".join(lines)
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=10)
+    ap.add_argument("--model", default="claude-haiku-4-5")
+    ap.add_argument("--pool-size", type=int, default=2)
+    ap.add_argument("--concurrency", type=int, default=2)
+    args = ap.parse_args()
+
+    results = [
+        await run_mode("query", args.calls, args.model, args.pool_size, args.concurrency),
+        await run_mode("pooled", args.calls, args.model, args.pool_size, args.concurrency),
+    ]
+    print(render(results))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"sdk_startup_{args.calls}.json"
+    out.write_text(json.dumps(results, indent=2))
+    print(f"\nWrote {out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
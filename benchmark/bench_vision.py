@@ -0,0 +1,113 @@
+"""Vision captioning bench: per-image calls vs batched multi-image calls.
+
+Captions the same image set twice, bypassing the caption store and the
+perceptual-hash index:
+  - per-image:  one `caption_image` call per image (the old path)
+  - batched:    `caption_images` with `--batch-size` images per call
+
+and reports vision calls, fallbacks, wall latency and caption agreement.
+
+Usage:
+    uv run python benchmark/bench_vision.py --images media_cache --limit 24
+    uv run python benchmark/bench_vision.py --images media_cache --batch-size 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from course_scout.infrastructure import vision
+from course_scout.infrastructure.image_prep import SUPPORTED_EXTENSIONS
+
+BENCH_DIR = Path(__file__).parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+class _CallCounter:
+    """Wrap `vision._ask` to count vision round trips."""
+
+    def __init__(self):
+        self.calls = 0
+        self._inner = vision._ask
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return await self._inner(*args, **kwargs)
+
+
+async def run_mode(paths: list[str], batch_size: int, concurrency: int) -> dict:
+    counter = _CallCounter()
+    vision._ask = counter
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(batch: list[str]) -> list[str]:
+        async with sem:
+            if batch_size == 1:
+                return [await vision.caption_image(batch[0])]
+            return (await vision.caption_images(batch))[0]
+
+    batches = [paths[i : i + batch_size] for i in range(0, len(paths), batch_size)]
+    started = time.perf_counter()
+    try:
+        out = await asyncio.gather(*map(one, batches))
+    finally:
+        vision._ask = counter._inner
+    elapsed = time.perf_counter() - started
+    captions = [c for batch in out for c in batch]
+    return {
+        "batch_size": batch_size,
+        "calls": counter.calls,
+        "expected_calls": len(batches),
+        "seconds": round(elapsed, 2),
+        "captioned": sum(bool(c) for c in captions),
+        "captions": dict(zip(paths, captions, strict=True)),
+    }
+
+
+def render(per_image: dict, batched: dict, n: int) -> str:
+    lines = [
+        f"{n} image(s)",
+        f"{'mode':<12} {'calls':>6} {'seconds':>8} {'captioned':>10}",
+    ]
+    for name, r in (("per-image", per_image), (f"batch={batched['batch_size']}", batched)):
+        lines.append(f"{name:<12} {r['calls']:>6} {r['seconds']:>8.2f} {r['captioned']:>10}")
+    fallbacks = batched["calls"] - batched["expected_calls"]
+    lines.append(f"batched fallbacks (extra per-image calls): {fallbacks}")
+    if per_image["seconds"]:
+        ratio = batched["seconds"] / per_image["seconds"]
+        lines.append(f"latency ratio batched/per-image: {ratio:.2f}")
+    return "\n".join(lines)
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default="media_cache", help="Directory of images to caption")
+    ap.add_argument("--limit", type=int, default=24)
+    ap.add_argument("--batch-size", type=int, default=6)
+    ap.add_argument("--concurrency", type=int, default=5)
+    args = ap.parse_args()
+
+    if not Path(args.images).is_dir():
+        raise SystemExit(f"Not a directory: {args.images}")
+    paths = sorted(
+        str(p) for p in Path(args.images).iterdir() if p.suffix.lower() in SUPPORTED_EXTENSIONS
+    )[: args.limit]
+    if not paths:
+        raise SystemExit(f"No images found in {args.images}")
+
+    per_image = await run_mode(paths, 1, args.concurrency)
+    batched = await run_mode(paths, args.batch_size, args.concurrency)
+    print(render(per_image, batched, len(paths)))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"vision_batch{args.batch_size}_{len(paths)}.json"
+    out.write_text(json.dumps({"per_image": per_image, "batched": batched}, indent=2))
+    print(f"\nWrote {out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,11 @@
-"""Extract parser-input fixtures from course-scout logs.
+"""Extract parser-input fixtures from captured agent payloads.
 
-Each "input data" DEBUG log line is one chunk the parser saw. Two sampling modes:
+Each parse-stage record in the payload capture store (`runtime.capture_dir`,
+see `course_scout.infrastructure.payload_capture`) is one chunk the parser
+saw; records are read through the capture index, not by scanning logs. Two
+sampling modes:
 
-1. --days N        : last N calendar days from latest log entry (1/7/30 legacy)
+1. --days N        : last N calendar days from latest capture (1/7/30 legacy)
 2. --per-channel N : walks back per-channel until each channel has N non-empty
                      days (robust to quiet channels — some might need 30+ days
                      of calendar to reach 10 non-empty days)
@@ -13,39 +16,27 @@ Usage:
     uv run python benchmark/sample.py --days 30
     uv run python benchmark/sample.py --per-channel 10       # canonical fixture
     uv run python benchmark/sample.py --per-channel 10 --full-topic
+    uv run python benchmark/sample.py --days 7 --capture-dir /mnt/nas/captures
 """
 
 from __future__ import annotations
 
 import argparse
 import json
-import re
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
 BENCH_DIR = Path(__file__).parent
 FIXTURES_DIR = BENCH_DIR / "fixtures"
-LOG_FILE = BENCH_DIR.parent / "logs" / "course_scout.log"
+CAPTURE_DIR = BENCH_DIR.parent / "data" / "captures"
 
-INPUT_LINE = re.compile(
-    r"^(?P<ts>\d{2}:\d{2}:\d{2})\s-\s"
-    r"course_scout\.infrastructure\.agents\s-\sDEBUG\s-\s"
-    r"Agent\s(?P<model>\S+)\sinput data:\s(?P<payload>\{.*\})\s*$"
-)
 
+def iter_chunks(capture_dir: Path):
+    """Yield (model, payload) tuples for every captured parser input."""
+    from course_scout.infrastructure.payload_capture import PayloadCapture
 
-def iter_chunks(log_path: Path):
-    """Yield (model, payload_json) tuples for every parser-input line in the log."""
-    with log_path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            m = INPUT_LINE.match(line.rstrip("\n"))
-            if not m:
-                continue
-            try:
-                payload = json.loads(m.group("payload"))
-            except json.JSONDecodeError:
-                continue
-            yield m.group("model"), payload
+    for record in PayloadCapture(capture_dir).iter_records(stage="parse"):
+        yield record["model"], record["input"]
 
 
 def infer_scan_date(payload: dict) -> date | None:
@@ -62,13 +53,13 @@ def infer_scan_date(payload: dict) -> date | None:
         return None
 
 
-def build_fixture(days: int) -> list[dict]:
-    """Return chunks whose first-message date is within `days` of the latest log entry.
+def build_fixture(days: int, capture_dir: Path = CAPTURE_DIR) -> list[dict]:
+    """Return chunks whose first-message date is within `days` of the latest capture.
 
-    We anchor on the most recent message date in the log rather than today —
+    We anchor on the most recent message date captured rather than today —
     this lets you build a "1-day fixture" from a scan that ran last week.
     """
-    all_pairs = list(iter_chunks(LOG_FILE))
+    all_pairs = list(iter_chunks(capture_dir))
     dates = [d for _, p in all_pairs if (d := infer_scan_date(p)) is not None]
     if not dates:
         return []
@@ -101,17 +92,17 @@ def build_fixture(days: int) -> list[dict]:
     return chunks
 
 
-def build_per_channel_fixture(n_per_channel: int) -> list[dict]:
+def build_per_channel_fixture(n_per_channel: int, capture_dir: Path = CAPTURE_DIR) -> list[dict]:
     """Return ~N non-empty days PER channel. Canonical bench fixture.
 
-    For each topic_context, walks back through the log collecting distinct-date
+    For each topic_context, walks back through the captures collecting distinct-date
     chunks until the channel has `n_per_channel` non-empty days. Each chunk
     represents one topic's full day (merges same-topic-same-day chunks, dedup
     on msg_id). Total samples ≈ n_per_channel × 13 (less for quiet channels).
     """
     from collections import defaultdict
 
-    all_pairs = list(iter_chunks(LOG_FILE))
+    all_pairs = list(iter_chunks(capture_dir))
     by_topic_date: dict[tuple[str, date], dict] = {}
     for _model, payload in all_pairs:
         d = infer_scan_date(payload)
@@ -187,25 +178,27 @@ def merge_to_full_topic_day(chunks: list[dict]) -> list[dict]:
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--days", type=int, choices=[1, 7, 30],
-                    help="Calendar-day fixture: last N days from latest log entry")
+                    help="Calendar-day fixture: last N days from latest capture")
     ap.add_argument("--per-channel", type=int, dest="per_channel",
                     help="Per-channel fixture: N non-empty days PER channel. Canonical bench.")
     ap.add_argument("--full-topic", dest="full_topic", action="store_true",
                     help="Merge same-topic-same-day chunks so each sample is one topic's full day. "
                          "Output: {N}d_full.jsonl or canon{N}.jsonl")
+    ap.add_argument("--capture-dir", dest="capture_dir", type=Path, default=CAPTURE_DIR,
+                    help="Payload capture root (runtime.capture_dir)")
     args = ap.parse_args()
     if not args.days and not args.per_channel:
         ap.error("must specify --days OR --per-channel")
 
-    if not LOG_FILE.exists():
-        raise SystemExit(f"Log not found: {LOG_FILE}")
+    if not (args.capture_dir / "index.db").exists():
+        raise SystemExit(f"No payload captures under {args.capture_dir}")
 
     FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
     if args.per_channel:
-        chunks = build_per_channel_fixture(args.per_channel)
+        chunks = build_per_channel_fixture(args.per_channel, args.capture_dir)
         out = FIXTURES_DIR / f"canon{args.per_channel}.jsonl"
     else:
-        chunks = build_fixture(args.days)
+        chunks = build_fixture(args.days, args.capture_dir)
         if args.full_topic:
             chunks = merge_to_full_topic_day(chunks)
         suffix = "_full" if args.full_topic else ""
@@ -15,6 +15,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+from collections.abc import Callable, Coroutine
 from datetime import datetime, timedelta
 from typing import Any
 from zoneinfo import ZoneInfo
@@ -36,15 +37,31 @@ class BatchScanUseCase:
     output. Tasks with no messages are silently skipped (no row emitted).
     """
 
-    def __init__(self, scraper: Any, summarizer_factory: Any):
+    def __init__(
+        self,
+        scraper: Any,
+        summarizer_factory: Any,
+        batch_collector: Any = None,
+        warmup: Callable[[list[Any]], Coroutine[Any, Any, None]] | None = None,
+    ):
         """Initialize with scraper and a factory that builds OrchestratedSummarizer per task.
 
         summarizer_factory: callable (task) -> OrchestratedSummarizer.
         Injecting a factory keeps this use case independent of the
         infrastructure-layer summarizer class.
+
+        batch_collector: optional BatchCollector. When set, the summarization
+        phase runs inside `batch_collector.activate()` so every topic's parser
+        calls are submitted together as asynchronous batches.
+
+        warmup: optional coroutine function (tasks) -> None, run concurrently
+        with the fetch phase (e.g. connecting pooled SDK clients). Failures
+        are logged and never abort the scan.
         """
         self.scraper = scraper
         self.summarizer_factory = summarizer_factory
+        self.batch_collector = batch_collector
+        self.warmup = warmup
 
     async def execute(
         self,
@@ -57,19 +74,38 @@ class BatchScanUseCase:
     ) -> list[tuple[str, ChannelDigest, Any]]:
         """Run fetch + summarize across all tasks; return non-empty results."""
         start_date, end_date = self._compute_window(timezone, days, include_today)
+        if dedup:
+            from course_scout.infrastructure.dedup import reset_seen_caches
+
+            reset_seen_caches()  # reload keys marked since this process's last scan
         logger.info(f"Batch scan window: {start_date.isoformat()} → {end_date.isoformat()}")
 
+        # Phase 0: warm provider connections while the fetch phase runs
+        warming = asyncio.create_task(self.warmup(tasks)) if self.warmup else None
+
         # Phase 1: sequential fetch (per-channel rate limits make parallel risky)
         fetched = await self._fetch_all(tasks, start_date, end_date)
+        if warming is not None:
+            try:
+                await warming
+            except Exception as e:
+                logger.warning(f"Warmup failed: {e}")
         if not fetched:
             return []
 
+        # Phase 1b: run-wide image triage + budget (before any vision call)
+        await asyncio.to_thread(self._plan_images, fetched)
+
         # Phase 2: parallel summarization
         coros = [
             self._summarize_one(name, task, messages, dedup, run_dir)
             for name, (task, messages) in fetched.items()
         ]
-        raw = await asyncio.gather(*coros)
+        if self.batch_collector is not None:
+            async with self.batch_collector.activate():
+                raw = await asyncio.gather(*coros)
+        else:
+            raw = await asyncio.gather(*coros)
         return [r for r in raw if r is not None]
 
     @staticmethod
@@ -116,6 +152,41 @@ class BatchScanUseCase:
                 logger.error(f"   ❌ {name}: fetch error — {e}", exc_info=True)
         return fetched
 
+    @staticmethod
+    def _plan_images(fetched: dict[str, tuple[Any, list]]) -> None:
+        """Clear `local_media_path` on images the run-wide plan won't caption.
+
+        Scores every attachment of media-enabled topics locally, drops
+        uninformative ones and keeps the `image_run_budget` most engaged.
+        """
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        if not rt.image_triage:
+            return
+        from course_scout.infrastructure.image_triage import plan_image_budget
+
+        messages = [
+            m
+            for task, msgs in fetched.values()
+            if getattr(task, "include_media", False)
+            for m in msgs
+            if getattr(m, "local_media_path", None)
+        ]
+        if not messages:
+            return
+        plan = plan_image_budget(
+            messages, rt.image_run_budget, rt.image_triage_min_score, rt.image_triage_min_side
+        )
+        for m in messages:
+            if m.local_media_path not in plan.keep:
+                m.local_media_path = None
+        logger.info(
+            f"Image triage: captioning {len(plan.keep)} image(s); skipped "
+            f"{plan.low_score} low-score, {plan.over_budget} over budget, "
+            f"{plan.unreadable} unreadable"
+        )
+
     async def _summarize_one(
         self,
         name: str,
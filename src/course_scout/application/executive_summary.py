@@ -19,10 +19,14 @@ async def generate_executive_summary(
     from claude_agent_sdk import (
         AssistantMessage,
         ClaudeAgentOptions,
+        ResultMessage,
         TextBlock,
         query,
     )
 
+    from course_scout.infrastructure.sdk_pool import sdk_messages
+    from course_scout.infrastructure.telemetry import get_telemetry
+
     flat = [(item, name) for name, result in all_results for item in result.items]
 
     def _fmt(item: Any, topic: str) -> str:
@@ -91,11 +95,19 @@ if the content genuinely interests him (e.g., a requested Krenz course).
     )
 
     last_text = None
-    async for message in query(prompt=prompt, options=options):
+    async for message in sdk_messages(prompt, options, query):
         if isinstance(message, AssistantMessage):
             for block in message.content:
                 if isinstance(block, TextBlock):
                     last_text = block.text
+        elif isinstance(message, ResultMessage):
+            get_telemetry().record_usage(
+                options.model or "",
+                message.usage or {},
+                message.duration_ms or 0,
+                message.total_cost_usd or 0.0,
+                stage="exec_summary",
+            )
 
     if last_text:
         return f"## Executive Summary\n\n{last_text}"
@@ -223,3 +223,38 @@ class ChannelDigest(BaseModel):
                 for item in cat_items:
                     md += item.render()
         return md
+
+
+# ── Provider errors ──
+
+
+class RateLimitSignal(BaseModel):
+    """A provider error classified as rate limiting, with the server's retry hint."""
+
+    retry_after: float | None = None  # seconds, when the provider said how long to wait
+    source: str = ""  # what identified it: "status", "text", or a provider-specific tag
+
+
+# ── Batch execution ──
+
+
+class BatchRequest(BaseModel):
+    """One structured-output call submitted as part of an asynchronous batch."""
+
+    custom_id: str
+    model_id: str
+    system_prompt: str
+    input_data: str
+    output_schema: dict  # JSON schema of the expected output
+    media_paths: list[str] = Field(default_factory=list)
+
+
+class BatchResult(BaseModel):
+    """Provider-neutral outcome of one batched request."""
+
+    custom_id: str
+    ok: bool
+    output: dict | None = None  # structured payload (tool input / parsed JSON)
+    text: str | None = None  # fallback raw text, if the model answered in prose
+    usage: dict = Field(default_factory=dict)
+    error: str | None = None
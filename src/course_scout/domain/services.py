@@ -1,8 +1,15 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from datetime import datetime
 from typing import Any
 
-from course_scout.domain.models import ChannelDigest, TelegramMessage
+from course_scout.domain.models import (
+    BatchRequest,
+    BatchResult,
+    ChannelDigest,
+    RateLimitSignal,
+    TelegramMessage,
+)
 
 
 class ScraperInterface(ABC):
@@ -53,15 +60,59 @@ class AIProvider(ABC):
         input_data: str,
         output_schema: type,
         media_paths: list[str] | None = None,
+        on_item: Callable[[dict], None] | None = None,
     ) -> Any:
         """Generate structured output using the provider's SDK.
 
         `media_paths` (optional): list of local image paths to attach to the user
         message. Providers that support vision should include them; providers
         that don't should ignore the argument.
+
+        `on_item` (optional): callback receiving each raw `items[]` element as
+        soon as it is complete in the output stream. Providers that can't
+        stream should ignore the argument.
         """
         pass
 
+    def classify_rate_limit(self, exc: BaseException) -> RateLimitSignal | None:
+        """Return a `RateLimitSignal` if `exc` is this provider's rate-limit error.
+
+        The default defers to the generic classifier used by the caller
+        (HTTP 429, rate-limit exception types, known error texts).
+        """
+        return None
+
+    async def prewarm(
+        self, model_id: str, system_prompt: str, output_schema: type, stream: bool = True
+    ) -> None:
+        """Prepare for upcoming calls with these parameters (e.g. open a connection).
+
+        Best-effort and optional; the default does nothing.
+        """
+        return None
+
+    # ── Optional asynchronous batch interface ──
+    # Providers with a discounted batch endpoint set `supports_batch = True`
+    # and implement the four methods below; `BatchCollector` drives them.
+
+    supports_batch: bool = False
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        """Submit requests as one batch; return the provider's batch ID."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batches")
+
+    async def batch_done(self, batch_id: str) -> bool:
+        """Return True once the batch has finished processing."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batches")
+
+    async def fetch_batch_results(self, batch_id: str) -> dict[str, BatchResult]:
+        """Return results of a finished batch keyed by `custom_id`."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batches")
+
+    def parse_batch_result(self, model_id: str, result: BatchResult, output_schema: type) -> Any:
+        """Validate one result against `output_schema` and record its usage."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batches")
+
 
 class NotifierInterface(ABC):
     @abstractmethod
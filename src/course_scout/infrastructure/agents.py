@@ -6,9 +6,11 @@ Agents:
 """
 
 import asyncio
+import contextlib
 import json
 import logging
 import time
+from collections.abc import Callable
 from enum import Enum
 
 from pydantic import BaseModel, Field, model_validator
@@ -19,12 +21,40 @@ from course_scout.domain.models import (
     DiscussionItem,
     FileItem,
     LinkItem,
+    RateLimitSignal,
     RequestItem,
 )
 from course_scout.domain.services import AIProvider
+from course_scout.infrastructure.backoff import (
+    backoff_delay,
+    classify_rate_limit,
+    get_concurrency_controller,
+)
+from course_scout.infrastructure.batching import get_active_collector
+from course_scout.infrastructure.circuit_breaker import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_breaker,
+    is_breaker_failure,
+)
+from course_scout.infrastructure.payload_capture import get_payload_capture
+from course_scout.infrastructure.providers.anthropic_http import AnthropicHTTPProvider
 from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
 from course_scout.infrastructure.providers.openai_agents_provider import OpenAIAgentsProvider
 from course_scout.infrastructure.providers.openai_provider import OpenAIProvider
+from course_scout.infrastructure.rate_limiter import (
+    RateLimiter,
+    bind_reservation,
+    estimate_tokens,
+    get_rate_limiter,
+)
+from course_scout.infrastructure.schema_cache import (
+    OutputValidationError,
+    SchemaEntry,
+    schema_for,
+)
+from course_scout.infrastructure.telemetry import telemetry_labels
 
 logger = logging.getLogger(__name__)
 
@@ -146,41 +176,29 @@ class SummarizerOutputSchema(BaseModel):
         return [item.to_domain() for item in self.items]
 
 
-# --- Synchronous Rate Limiter ---
+# --- Generic AI Agent ---
 
 
-class RateLimiter:
-    """Async-aware rate limiter for AI API calls.
+class AgentRunError(Exception):
+    """All models in the chain failed.
 
-    Enforces a maximum RPM without blocking the event loop. Previously used
-    `time.sleep` which serialized all parallel topic tasks through one
-    synchronous sleep — measured ~2× slowdown on an 8-topic scan.
+    `partial` carries the items streamed by the most productive attempt before
+    it failed (empty when the provider doesn't stream or nothing completed), so
+    callers can salvage a timed-out call instead of discarding it.
     """
 
-    def __init__(self, rpm: int = 10):
-        """Initialize with RPM limit."""
-        self.rpm = rpm
-        self.interval = 60.0 / rpm
-        self.last_request_time = 0.0
-        self._lock = asyncio.Lock()
-
-    async def acquire(self):
-        """Wait (asynchronously) if necessary to comply with the rate limit."""
-        async with self._lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_request_time
-
-            if elapsed < self.interval:
-                wait_time = self.interval - elapsed
-                logger.debug(f"Rate limit: waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-
-            self.last_request_time = time.time()
+    def __init__(self, message: str, partial: list[BaseModel] | None = None):
+        """Initialize with the failure message and any salvaged items."""
+        super().__init__(message)
+        self.partial: list[BaseModel] = partial or []
 
-        self.last_request_time = time.time()
 
-
-# --- Generic AI Agent ---
+REPAIR_PROMPT = (
+    "You fix JSON that failed schema validation. You receive the invalid output and "
+    "the validation errors. Return the same data corrected to match the schema: keep "
+    "every valid item and value, fix types and missing required fields from what the "
+    "output already says, and drop only what cannot be fixed. Add no new information."
+)
 
 
 class AIAgent:
@@ -193,87 +211,412 @@ class AIAgent:
         system_prompt: str,
         output_schema: type[BaseModel],
         rate_limiter: RateLimiter,
+        provider_for: Callable[[str], AIProvider] | None = None,
+        breaker_for: Callable[[str], CircuitBreaker] | None = None,
+        failover_models: list[str] | None = None,
     ):
-        """Initialize with provider, models, prompt, and schema."""
+        """Initialize with provider, models, prompt, and schema.
+
+        `provider_for` resolves a provider per model (needed when the failover
+        chain crosses providers); `breaker_for` returns the shared circuit
+        breaker for a model. Both default to off: one provider, no breakers.
+        `failover_models` are tried after `models` are exhausted or open.
+        """
         self.provider = provider
         self.models = models
         self.system_prompt = system_prompt
         self.output_schema = output_schema
         self.rate_limiter = rate_limiter
+        self.provider_for = provider_for
+        self.breaker_for = breaker_for
+        self.failover_models = [m for m in failover_models or [] if m not in models]
 
-    async def run(self, input_data: BaseModel) -> BaseModel:
+    async def run(
+        self,
+        input_data: BaseModel,
+        on_item: Callable[[BaseModel], None] | None = None,
+    ) -> BaseModel:
         """Execute the agent using the injected provider with fallback support.
 
-        Timeouts, retry counts, and rate-limit retry sleep are read from the
+        Timeouts, retry counts, and rate-limit backoff are read from the
         runtime singleton — see `infrastructure/runtime.py` and the `runtime:`
         block in `config.yaml`.
+
+        Rate-limit errors are classified by the provider (falling back to
+        `backoff.classify_rate_limit`), retried after the server's retry-after
+        hint or a jittered exponential backoff, and shrink the process-wide
+        AIMD concurrency limit that gates every provider call.
+
+        `on_item` receives each validated `items[]` element as the provider
+        streams it. Items from failed attempts are kept so that, if every model
+        fails, the `AgentRunError` carries the best partial result.
+
+        Output that fails schema validation is first sent to
+        `runtime.repair_model` for correction (see `_repair_output`) before
+        the chain moves on.
         """
         from course_scout.infrastructure.runtime import get_runtime
 
         rt = get_runtime()
         last_error = None
+        item_schema = schema_for(self.output_schema) if on_item is not None else None
+        best_partial: list[BaseModel] = []
+
+        for model in [*self.models, *self.failover_models]:
+            breaker = self.breaker_for(model) if self.breaker_for else None
+            if breaker is not None and not breaker.allow():
+                last_error = CircuitOpenError(f"circuit open for {model}")
+                logger.warning(f"Agent {model}: circuit open, skipping to next model")
+                continue
+            result, last_error = await self._run_model(
+                rt, model, breaker, input_data, item_schema, on_item, best_partial
+            )
+            if result is not None:
+                return result
+            logger.warning(f"Model {model} failed. Trying next model in list if available...")
+
+        raise AgentRunError(f"All models failed. Last error: {last_error}", partial=best_partial)
 
-        for model in self.models:
-            retries = 0
-
-            while retries < rt.max_retries:
-                try:
-                    await self.rate_limiter.acquire()
-                    logger.info(f"Agent {model} starting request (Attempt {retries + 1})...")
-
-                    logger.debug(f"Agent {model} input data: {input_data.model_dump_json()}")
-
-                    # Extract image attachments from SummarizerInputSchema messages
-                    # (None for other input types).
-                    media_paths: list[str] = []
-                    msgs = getattr(input_data, "messages", None)
-                    if msgs:
-                        for m in msgs:
-                            mp = getattr(m, "media_path", None)
-                            if mp:
-                                media_paths.append(mp)
-
-                    result = await asyncio.wait_for(
-                        self.provider.generate_structured(
-                            model_id=model,
-                            system_prompt=self.system_prompt,
-                            input_data=input_data.model_dump_json(),
-                            output_schema=self.output_schema,
-                            media_paths=media_paths or None,
-                        ),
-                        timeout=rt.provider_call_timeout,
-                    )
-
-                    logger.debug(f"Agent {model} raw result: {result}")
-                    logger.info(f"Agent {model} request completed.")
-                    return result
-
-                except TimeoutError as e:
-                    last_error = e
-                    retries += 1
-                    logger.warning(
-                        f"Agent {model} exceeded {rt.provider_call_timeout}s timeout "
-                        f"(retry {retries}/{rt.max_retries}). Moving on."
-                    )
-                    # Don't retry-sleep on timeout — move to next model fast
+    async def _run_model(
+        self,
+        rt,
+        model: str,
+        breaker: CircuitBreaker | None,
+        input_data: BaseModel,
+        item_schema: SchemaEntry | None,
+        on_item: Callable[[BaseModel], None] | None,
+        best_partial: list[BaseModel],
+    ) -> tuple[BaseModel | None, BaseException | None]:
+        """Try one model up to `max_retries` times; return (result, last error).
+
+        `best_partial` is replaced in place by any failed attempt that streamed
+        more items than it holds.
+        """
+        provider = self.provider_for(model) if self.provider_for else self.provider
+        # Batch mode: no local RPM throttling and no interactive timeout —
+        # a batch can legitimately take hours.
+        batched = get_active_collector() is not None and provider.supports_batch
+        controller = None if batched else get_concurrency_controller()
+        last_error: BaseException | None = None
+        probing = False
+        retries = 0
+
+        while retries < rt.max_retries:
+            # Another topic may have tripped the breaker while this one backed off.
+            if retries and not (probing or breaker is None or breaker.allow()):
+                last_error = CircuitOpenError(f"circuit open for {model}")
+                logger.warning(f"Agent {model}: circuit opened mid-retry, moving on")
+                break
+            probing = probing or (breaker is not None and breaker.state == BreakerState.HALF_OPEN)
+            attempt_items: list[BaseModel] = []
+            stream_cb = self._stream_callback(item_schema, attempt_items, on_item)
+            try:
+                result = await self._attempt(
+                    rt, provider, model, input_data, batched, controller, stream_cb, retries
+                )
+            except TimeoutError as e:
+                last_error = e
+                self._on_timeout(rt, model, breaker, retries)
+                # Don't retry-sleep on timeout — move to next model fast
+                break
+            except OutputValidationError as e:
+                last_error = e
+                result = await self._repair_output(e, rt.repair_model)
+                if result is None:
+                    logger.error(f"Error in agent {model}: {e}")
                     break
-                except Exception as e:
-                    last_error = e
-                    error_str = str(e).upper()
-                    if "RATE" in error_str or "429" in error_str:
-                        retries += 1
-                        logger.warning(
-                            f"Rate limit hit for {model}. Sleeping {rt.rate_limit_retry_sleep}s "
-                            f"before retry {retries}/{rt.max_retries}..."
-                        )
-                        await asyncio.sleep(rt.rate_limit_retry_sleep)
-                    else:
-                        logger.error(f"Error in agent {model}: {e}")
-                        break
+            except Exception as e:
+                last_error = e
+                if not await self._back_off(rt, provider, model, e, retries, controller, breaker):
+                    break
+                retries += 1
+                continue
+            finally:
+                self._keep_longest(best_partial, attempt_items)
+            if breaker is not None:
+                breaker.record_success()
+            return result, None
+
+        if probing and breaker is not None:
+            breaker.release()
+        return None, last_error
+
+    async def _attempt(
+        self,
+        rt,
+        provider: AIProvider,
+        model: str,
+        input_data: BaseModel,
+        batched: bool,
+        controller,
+        stream_cb: Callable[[dict], None] | None,
+        retries: int,
+    ) -> BaseModel:
+        """Make one provider call under the rate limiter, AIMD gate and timeout."""
+        input_json = input_data.model_dump_json()
+
+        # Extract image attachments from SummarizerInputSchema messages
+        # (None for other input types).
+        media_paths: list[str] = []
+        msgs = getattr(input_data, "messages", None)
+        if msgs:
+            for m in msgs:
+                mp = getattr(m, "media_path", None)
+                if mp:
+                    media_paths.append(mp)
+
+        reservation = None
+        if not batched:
+            reservation = await self.rate_limiter.acquire(
+                model,
+                estimate_tokens(self.system_prompt, input_json, images=len(media_paths)),
+                rt.rate_limit_output_estimate,
+            )
+        logger.info(f"Agent {model} starting request (Attempt {retries + 1})...")
+
+        started = time.monotonic()
+        gate = controller.slot() if controller else contextlib.nullcontext()
+        async with gate:
+            with bind_reservation(reservation):
+                result = await asyncio.wait_for(
+                    self._call_provider(provider, model, input_json, media_paths, stream_cb),
+                    timeout=None if batched else rt.provider_call_timeout,
+                )
+        if controller is not None:
+            controller.on_success()
+
+        logger.info(f"Agent {model} request completed.")
+        capture = get_payload_capture()
+        if capture is not None and capture.should_sample():
+            capture.submit(
+                model, input_data, input_json, result, int((time.monotonic() - started) * 1000)
+            )
+        return result
+
+    @staticmethod
+    def _on_timeout(rt, model: str, breaker: CircuitBreaker | None, retries: int) -> None:
+        """Count a timed-out call against the breaker and log it."""
+        if breaker is not None:
+            breaker.record_failure()
+        logger.warning(
+            f"Agent {model} exceeded {rt.provider_call_timeout}s timeout "
+            f"(retry {retries + 1}/{rt.max_retries}). Moving on."
+        )
 
-            logger.warning(f"Model {model} failed. Trying next model in list if available...")
+    async def _back_off(
+        self,
+        rt,
+        provider: AIProvider,
+        model: str,
+        error: Exception,
+        retries: int,
+        controller,
+        breaker: CircuitBreaker | None,
+    ) -> bool:
+        """Sleep before retrying a rate-limited call; False = move to the next model.
+
+        Errors that aren't rate limits are logged (and counted against the
+        breaker if they are timeouts / 5xx) and never retried.
+        """
+        signal = provider.classify_rate_limit(error)
+        if not isinstance(signal, RateLimitSignal):
+            signal = classify_rate_limit(error)
+        if signal is None:
+            logger.error(f"Error in agent {model}: {error}")
+            if breaker is not None and is_breaker_failure(error):
+                breaker.record_failure()
+            return False
+        if controller is not None:
+            controller.on_throttle()
+        delay = backoff_delay(
+            retries, signal, rt.rate_limit_backoff_base, rt.rate_limit_backoff_max
+        )
+        if delay > rt.rate_limit_max_wait:
+            logger.warning(
+                f"Rate limit hit for {model}; backoff of {delay:.0f}s exceeds "
+                f"{rt.rate_limit_max_wait:.0f}s. Moving to next model."
+            )
+            return False
+        hint = (
+            f"server hint {signal.retry_after:.1f}s"
+            if signal.retry_after is not None
+            else "no server hint"
+        )
+        logger.warning(
+            f"Rate limit hit for {model} ({hint}). Sleeping {delay:.1f}s "
+            f"before retry {retries + 1}/{rt.max_retries}..."
+        )
+        await asyncio.sleep(delay)
+        return True
+
+    async def _repair_output(self, error: OutputValidationError, model: str) -> BaseModel | None:
+        """Ask `model` to correct an output that failed validation; None if off or it fails.
+
+        Only the invalid output and the validation errors are sent, so a bad
+        output costs one short call to a cheap model instead of the chunk's
+        whole input again on the next model in the chain.
+        """
+        from course_scout.infrastructure.runtime import get_runtime
+
+        if not model:
+            return None
+        rt = get_runtime()
+        provider = self.provider_for(model) if self.provider_for else self.provider
+        input_json = json.dumps(
+            {"validation_errors": error.errors, "invalid_output": error.raw}, ensure_ascii=False
+        )
+        try:
+            reservation = await self.rate_limiter.acquire(
+                model,
+                estimate_tokens(REPAIR_PROMPT, input_json),
+                estimate_tokens(error.raw),
+            )
+            with bind_reservation(reservation), telemetry_labels(stage="repair"):
+                result = await asyncio.wait_for(
+                    provider.generate_structured(
+                        model_id=model,
+                        system_prompt=REPAIR_PROMPT,
+                        input_data=input_json,
+                        output_schema=self.output_schema,
+                    ),
+                    timeout=rt.provider_call_timeout,
+                )
+        except Exception as e:
+            logger.warning(f"Output repair via {model} failed: {e}")
+            return None
+        logger.info(f"Output repaired via {model} ({len(error.raw)} chars)")
+        return result
+
+    async def prewarm(self) -> None:
+        """Let the primary model's provider prepare for this agent's calls."""
+        await self.provider.prewarm(self.models[0], self.system_prompt, self.output_schema)
+
+    async def _call_provider(
+        self,
+        provider: AIProvider,
+        model: str,
+        input_json: str,
+        media_paths: list[str],
+        stream_cb: Callable[[dict], None] | None,
+    ) -> BaseModel:
+        """Call the provider once, hedging if `runtime.hedge_requests` is on.
+
+        In batch mode (an active `BatchCollector`) the call is parked in the
+        next batch instead, for providers that support it.
+
+        The hedge fires after the tracked p95 latency for this input size (see
+        `infrastructure/hedging.py`); only the primary copy streams items and
+        feeds the latency history, and the duplicate waits for its own
+        rate-limiter reservation.
+        """
+        from course_scout.infrastructure.hedging import get_latency_tracker, hedged_call
+        from course_scout.infrastructure.runtime import get_runtime
+
+        collector = get_active_collector()
+        if collector is not None and provider.supports_batch:
+            return await collector.generate(
+                provider,
+                model,
+                self.system_prompt,
+                input_json,
+                self.output_schema,
+                media_paths=media_paths,
+            )
 
-        raise Exception(f"All models failed. Last error: {last_error}")
+        rt = get_runtime()
+        primary_finished: list[float] = []
+
+        async def _make(model_id: str, primary: bool) -> BaseModel:
+            target = provider
+            if model_id != model and self.provider_for is not None:
+                target = self.provider_for(model_id)
+            reservation = None
+            if not primary:
+                # The duplicate is a real request: it takes (and settles) its own tokens.
+                reservation = await self.rate_limiter.acquire(
+                    model_id,
+                    estimate_tokens(self.system_prompt, input_json, images=len(media_paths)),
+                    rt.rate_limit_output_estimate,
+                )
+            with contextlib.nullcontext() if primary else bind_reservation(reservation):
+                result = await target.generate_structured(
+                    model_id=model_id,
+                    system_prompt=self.system_prompt,
+                    input_data=input_json,
+                    output_schema=self.output_schema,
+                    media_paths=media_paths or None,
+                    on_item=stream_cb if primary else None,
+                )
+            if primary:
+                primary_finished.append(time.monotonic())
+            return result
+
+        if not rt.hedge_requests:
+            return await _make(model, True)
+
+        tracker = get_latency_tracker()
+        threshold = tracker.threshold(len(input_json), rt.hedge_quantile)
+        started = time.monotonic()
+        if threshold is None:
+            result = await _make(model, True)
+        else:
+            result, _ = await hedged_call(
+                _make,
+                model,
+                self._hedge_model(model, rt.hedge_to_fallback),
+                max(threshold, rt.hedge_min_delay),
+            )
+        # Only the primary's own latency is a sample: when a duplicate won, the
+        # primary was cancelled and its latency is unknown (only "> threshold"),
+        # and the winner's is capped near the threshold, which would drag p95 down.
+        if primary_finished:
+            await asyncio.to_thread(tracker.record, len(input_json), primary_finished[0] - started)
+        return result
+
+    def _hedge_model(self, model: str, to_fallback: bool) -> str:
+        """Model for the duplicate: the next in the chain if configured, else the same."""
+        if to_fallback and model in self.models:
+            idx = self.models.index(model)
+            if idx + 1 < len(self.models):
+                return self.models[idx + 1]
+        return model
+
+    @staticmethod
+    def _keep_longest(best: list[BaseModel], attempt: list[BaseModel]) -> None:
+        """Replace `best` in place with `attempt`'s items if it streamed more."""
+        if len(attempt) > len(best):
+            best[:] = attempt
+
+    @classmethod
+    def _stream_callback(
+        cls,
+        schema: SchemaEntry | None,
+        sink: list[BaseModel],
+        on_item: Callable[[BaseModel], None] | None,
+    ) -> Callable[[dict], None] | None:
+        """`_item_callback` when the caller wants items and the schema has a list of them."""
+        if schema is None or schema.item_adapter is None or on_item is None:
+            return None
+        return cls._item_callback(schema, sink, on_item)
+
+    @staticmethod
+    def _item_callback(
+        schema: SchemaEntry,
+        sink: list[BaseModel],
+        on_item: Callable[[BaseModel], None],
+    ) -> Callable[[dict], None]:
+        """Validate raw streamed items, record them for salvage, forward to `on_item`."""
+
+        def _cb(raw: dict) -> None:
+            try:
+                item = schema.validate_item(raw)
+            except Exception as e:
+                logger.debug(f"Dropping invalid streamed item: {e}")
+                return
+            sink.append(item)
+            on_item(item)
+
+        return _cb
 
 
 # --- Agent Orchestrator ---
@@ -379,9 +722,8 @@ RULES:
         else:
             self.summarizer_models = [str(m) for m in summarizer_model]
 
-        from course_scout.infrastructure.runtime import get_runtime
-
-        self.rate_limiter = RateLimiter(rpm=get_runtime().rate_limit_rpm)
+        # Process-wide: every orchestrator shares one set of per-model buckets.
+        self.rate_limiter = get_rate_limiter()
 
         # Cache providers — created lazily per model
         self._providers: dict[str, AIProvider] = {}
@@ -391,6 +733,8 @@ RULES:
         if model in self._providers:
             return self._providers[model]
 
+        from course_scout.infrastructure.runtime import get_runtime
+
         if model in self._OPENAI_PROVIDERS:
             import os
 
@@ -412,6 +756,9 @@ RULES:
                 api_key=os.environ.get("OPENAI_API_KEY"),
                 effort=self.effort,
             )
+        elif model in get_runtime().anthropic_http_models:
+            # Claude over the Messages API directly (no CLI subprocess)
+            provider = AnthropicHTTPProvider(thinking=self.thinking, effort=self.effort)
         else:
             # Default: Claude Agent SDK
             provider = ClaudeProvider(thinking=self.thinking, effort=self.effort)
@@ -423,6 +770,8 @@ RULES:
         self, models: list[str], system_prompt: str, output_schema: type[BaseModel]
     ) -> AIAgent:
         # Use the first model's provider
+        from course_scout.infrastructure.runtime import get_runtime
+
         provider = self._get_provider(models[0])
         return AIAgent(
             provider,
@@ -430,6 +779,9 @@ RULES:
             system_prompt,
             output_schema,
             self.rate_limiter,
+            provider_for=self._get_provider,
+            breaker_for=get_breaker,
+            failover_models=get_runtime().failover_models,
         )
 
     def get_summarizer_agent(self) -> AIAgent:
@@ -0,0 +1,238 @@
+"""Rate-limit handling: classification, retry-after aware backoff, AIMD concurrency.
+
+`AIAgent.run` used to spot a 429 by substring-matching "RATE"/"429" in the
+exception text (which also matched "GENERATE" and "ACCURATE") and then
+sleep a fixed `rate_limit_retry_sleep`. Every parallel topic throttled at
+the same moment slept the same 65 s and came back together, re-triggering
+the limit.
+
+Three pieces replace that:
+
+  - `classify_rate_limit(exc)` → `RateLimitSignal | None`. Checks HTTP
+    status 429 and rate-limit exception types first, then known error texts.
+    It reads the server's hint from `retry-after-ms` / `retry-after`
+    (seconds or HTTP date), Anthropic's `anthropic-ratelimit-*-reset`
+    timestamps, or OpenAI's `x-ratelimit-reset-*` durations ("6m0s").
+    Providers refine this via `AIProvider.classify_rate_limit`.
+  - `backoff_delay(attempt, signal)`: the server hint plus up to 20 %
+    jitter, else exponential backoff with "equal jitter" (half fixed, half
+    random), so retries from parallel topics spread out.
+  - `ConcurrencyController`: a process-wide AIMD gate on in-flight provider
+    calls. Each throttle halves the limit (at most once per
+    `aimd_decrease_cooldown`, so one burst of 429s counts once). Each success
+    adds 1/limit, so the limit regains one slot per window of successes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import re
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Mapping
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+from course_scout.domain.models import RateLimitSignal
+
+logger = logging.getLogger(__name__)
+
+_RATE_LIMIT_TEXT = re.compile(
+    r"\b429\b|rate[_ -]?limit|too many requests|usage limit reached", re.IGNORECASE
+)
+_RETRY_AFTER_TEXT = re.compile(r"retry[- ]after[:\s]+(\d+(?:\.\d+)?)\s*(ms|s)?", re.IGNORECASE)
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_rng = random.Random()  # jitter source when the caller passes none
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse OpenAI-style reset durations: "20ms", "1s", "6m0s", "1h2m3.5s"."""
+    parts = _DURATION.findall(value.strip())
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+
+def _seconds_until(when: datetime) -> float:
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+def _retry_after_header(h: Mapping[str, str]) -> float | None:
+    """`retry-after-ms`, else `retry-after` as seconds or an HTTP date."""
+    if "retry-after-ms" in h:
+        try:
+            return float(h["retry-after-ms"]) / 1000.0
+        except ValueError:
+            pass
+    if "retry-after" not in h:
+        return None
+    value = h["retry-after"].strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return _seconds_until(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_header(key: str, value: str) -> float | None:
+    """Seconds until an Anthropic or OpenAI rate-limit reset header, if `key` is one."""
+    if key.startswith("anthropic-ratelimit-") and key.endswith("-reset"):
+        try:
+            return _seconds_until(datetime.fromisoformat(value))
+        except ValueError:
+            return None
+    if key.startswith("x-ratelimit-reset-"):
+        return _parse_duration(value)
+    return None
+
+
+def parse_retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """Return the server's suggested wait in seconds, or None if it gave none."""
+    if not headers:
+        return None
+    h = {k.lower(): v for k, v in headers.items()}
+    retry_after = _retry_after_header(h)
+    if retry_after is not None:
+        return retry_after
+    resets = [s for k, v in h.items() if (s := _reset_header(k, v)) is not None]
+    return max(resets) if resets else None
+
+
+def classify_rate_limit(exc: BaseException) -> RateLimitSignal | None:
+    """Return a `RateLimitSignal` if `exc` is a rate-limit error, else None."""
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    text = str(exc)
+    if status == 429 or "RateLimit" in type(exc).__name__:
+        source = "status"
+    elif _RATE_LIMIT_TEXT.search(text):
+        source = "text"
+    else:
+        return None
+    retry_after = parse_retry_after(getattr(response, "headers", None))
+    if retry_after is None:
+        m = _RETRY_AFTER_TEXT.search(text)
+        if m:
+            retry_after = float(m.group(1)) / (1000.0 if m.group(2) == "ms" else 1.0)
+    return RateLimitSignal(retry_after=retry_after, source=source)
+
+
+def backoff_delay(
+    attempt: int,
+    signal: RateLimitSignal | None,
+    base: float,
+    cap: float,
+    rng: random.Random | None = None,
+) -> float:
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    rng = rng or _rng
+    if signal is not None and signal.retry_after is not None:
+        return signal.retry_after * (1.0 + rng.uniform(0.0, 0.2))
+    ceiling = min(cap, base * (2**attempt))
+    return ceiling / 2 + rng.uniform(0.0, ceiling / 2)
+
+
+class ConcurrencyController:
+    """AIMD limit on concurrent provider calls, shared by every agent."""
+
+    def __init__(
+        self,
+        max_limit: int = 16,
+        min_limit: int = 1,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Start wide open at `max_limit`."""
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.clock = clock
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.throttles = 0
+        self._last_decrease = float("-inf")
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @classmethod
+    def from_runtime(cls) -> ConcurrencyController:
+        """Build a controller from the `runtime:` block knobs."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        return cls(
+            max_limit=rt.aimd_max_concurrency,
+            min_limit=rt.aimd_min_concurrency,
+            decrease_factor=rt.aimd_decrease_factor,
+            decrease_cooldown=rt.aimd_decrease_cooldown,
+        )
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit."""
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+                raise
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_success(self) -> None:
+        """Additive increase: one more slot per `limit` successful calls."""
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_throttle(self) -> None:
+        """Multiplicative decrease, at most once per cooldown."""
+        self.throttles += 1
+        now = self.clock()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        logger.warning(f"Throttled: concurrency limit → {int(self.limit)}")
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+_controller: ConcurrencyController | None = None
+
+
+def get_concurrency_controller() -> ConcurrencyController:
+    """Return the process-wide AIMD controller."""
+    global _controller
+    if _controller is None:
+        _controller = ConcurrencyController.from_runtime()
+    return _controller
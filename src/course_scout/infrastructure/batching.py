@@ -0,0 +1,176 @@
+"""Batch-mode execution: coalesce parser calls from every topic into one batch.
+
+In `scan --batch-mode` the summarization pipeline runs unchanged — chunking,
+escalation, merging and grounding still happen per topic — but each
+`AIAgent` provider call is parked in a `BatchCollector` instead of hitting
+the interactive API. Once no new call has arrived for `collect_window`
+seconds (every topic has reached its parser call), all parked calls are
+submitted as a single batch per provider type, polled every
+`poll_interval` seconds, and each caller's future is resolved with its own
+result — so reassembly per topic falls out of the normal code path.
+
+Calls that arrive after a flush (e.g. a topic whose vision pre-pass ran long,
+or a retry) start a new collection window and form the next batch, submitted
+alongside any batch still in flight.
+
+The active collector is process-wide (`get_active_collector`), set for the
+duration of the summarization phase by `BatchCollector.activate()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from course_scout.domain.models import BatchRequest, BatchResult
+from course_scout.domain.services import AIProvider
+from course_scout.infrastructure.schema_cache import schema_for
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Parked:
+    provider: AIProvider
+    request: BatchRequest
+    future: asyncio.Future[BatchResult]
+
+
+class BatchCollector:
+    """Park provider calls and submit them as asynchronous batches."""
+
+    def __init__(
+        self,
+        collect_window: float = 5.0,
+        poll_interval: float = 30.0,
+        max_wait: float = 24 * 3600.0,
+    ):
+        """Flush after `collect_window`s of quiet; give up on a batch after `max_wait`s."""
+        self.collect_window = collect_window
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self._parked: list[_Parked] = []
+        self._last_park = 0.0
+        # Flushers own one collection window each; a new one starts whenever a
+        # call is parked and no flusher is still collecting.
+        self._collecting = False
+        self._flushers: set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        self.batches_submitted = 0
+        self.requests_submitted = 0
+
+    @classmethod
+    def from_runtime(cls) -> BatchCollector:
+        """Build a collector from the `runtime:` block knobs."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        return cls(
+            collect_window=rt.batch_collect_window,
+            poll_interval=rt.batch_poll_interval,
+            max_wait=rt.batch_max_wait,
+        )
+
+    @contextlib.asynccontextmanager
+    async def activate(self) -> AsyncIterator[BatchCollector]:
+        """Route eligible provider calls through this collector within the block."""
+        global _active
+        previous, _active = _active, self
+        try:
+            yield self
+        finally:
+            _active = previous
+            for flusher in list(self._flushers):
+                flusher.cancel()
+
+    async def generate(
+        self,
+        provider: AIProvider,
+        model_id: str,
+        system_prompt: str,
+        input_data: str,
+        output_schema: type,
+        media_paths: list[str] | None = None,
+    ) -> Any:
+        """Park one structured-output call; return its parsed result once its batch ends."""
+        request = BatchRequest(
+            custom_id=f"req-{next(self._ids)}",
+            model_id=model_id,
+            system_prompt=system_prompt,
+            input_data=input_data,
+            output_schema=schema_for(output_schema).json_schema,
+            media_paths=media_paths or [],
+        )
+        future: asyncio.Future[BatchResult] = asyncio.get_running_loop().create_future()
+        self._parked.append(_Parked(provider, request, future))
+        self._last_park = time.monotonic()
+        if not self._collecting:
+            self._collecting = True
+            flusher = asyncio.create_task(self._flush_when_quiet())
+            self._flushers.add(flusher)
+            flusher.add_done_callback(self._flushers.discard)
+        result = await future
+        return provider.parse_batch_result(model_id, result, output_schema)
+
+    async def _flush_when_quiet(self) -> None:
+        """Wait for quiet, take every parked call, and run it as this window's batch."""
+        try:
+            while True:
+                quiet_for = time.monotonic() - self._last_park
+                if quiet_for >= self.collect_window:
+                    break
+                await asyncio.sleep(self.collect_window - quiet_for)
+        finally:
+            self._collecting = False
+        parked, self._parked = self._parked, []
+        groups: dict[type, list[_Parked]] = {}
+        for p in parked:
+            groups.setdefault(type(p.provider), []).append(p)
+        await asyncio.gather(*(self._run_batch(group) for group in groups.values()))
+
+    async def _run_batch(self, group: list[_Parked]) -> None:
+        """Submit one group, poll until done, and resolve every parked future."""
+        provider = group[0].provider
+        try:
+            batch_id = await provider.submit_batch([p.request for p in group])
+            self.batches_submitted += 1
+            self.requests_submitted += len(group)
+            started = time.monotonic()
+            while not await provider.batch_done(batch_id):
+                if time.monotonic() - started > self.max_wait:
+                    raise TimeoutError(f"batch {batch_id} not done after {self.max_wait:.0f}s")
+                await asyncio.sleep(self.poll_interval)
+            logger.info(
+                f"Batch {batch_id} ended after {time.monotonic() - started:.0f}s "
+                f"({len(group)} request(s))"
+            )
+            results = await provider.fetch_batch_results(batch_id)
+        except Exception as e:
+            logger.error(f"Batch of {len(group)} request(s) failed: {e}")
+            for p in group:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+        for p in group:
+            if p.future.done():
+                continue
+            res = results.get(p.request.custom_id)
+            if res is None:
+                res = BatchResult(
+                    custom_id=p.request.custom_id, ok=False, error="missing from batch results"
+                )
+            p.future.set_result(res)
+
+
+_active: BatchCollector | None = None
+
+
+def get_active_collector() -> BatchCollector | None:
+    """Return the collector for the current batch-mode scan, if any."""
+    return _active
@@ -0,0 +1,276 @@
+"""SQLite caption store keyed by image content hash.
+
+The vision cache used to be `media_cache/captions.json`, keyed by filename and
+rewritten in full (indent=2, under a global lock) after every caption — O(n)
+per write, O(n²) per run, and a serialization point for every topic's vision
+pass. Filename keys also missed byte-identical reposts.
+
+`CaptionStore` keeps one row per SHA-256 of the image bytes:
+  - `get_many` is an indexed `IN (...)` lookup — nothing is loaded wholesale
+  - `put_many` upserts a whole `caption_paths` batch in one transaction
+  - `evict` drops rows unused for `max_age_days`, then the least recently
+    used rows beyond `max_entries`
+
+The same database holds the perceptual-hash index's rows (`image_hash.py`):
+`phash_captions` (dHash → caption) and `phash_files` (basename → dHash memo),
+written incrementally by `put_phash` and evicted by the same policy.
+
+WAL mode lets concurrent topics read while one writes. A legacy
+`captions.json` next to the database is imported once (entries whose image
+file is still on disk) and renamed to `captions.json.migrated`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_DB_PATH = Path("media_cache/captions.db")
+_SQL_BATCH = 500  # stay well under SQLite's bound-parameter limit
+# (table, primary key) pairs sharing the age/LRU eviction policy.
+_EVICTABLE = (
+    ("captions", "content_hash"),
+    ("phash_captions", "phash"),
+    ("phash_files", "basename"),
+)
+
+
+def content_hash(path: str) -> str | None:
+    """SHA-256 of the file's bytes (hex), or None if unreadable."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+class CaptionStore:
+    """Indexed content-hash → caption table with LRU/age eviction."""
+
+    def __init__(
+        self,
+        db_path: str | Path = _DB_PATH,
+        max_entries: int = 50_000,
+        max_age_days: int = 180,
+    ):
+        """Open (creating if needed) the store and import any legacy JSON cache."""
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+        self._import_legacy_json(self.db_path.with_name("captions.json"))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS captions (
+                    content_hash TEXT PRIMARY KEY,
+                    caption TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_captions_last_used ON captions (last_used_at)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS phash_captions (
+                    phash TEXT PRIMARY KEY,
+                    caption TEXT NOT NULL,
+                    last_used_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS phash_files (
+                    basename TEXT PRIMARY KEY,
+                    phash TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    last_used_at TEXT NOT NULL
+                )
+                """
+            )
+            for table in ("phash_captions", "phash_files"):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used_at)"
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_many(self, hashes: list[str]) -> dict[str, str]:
+        """Return {hash: caption} for the hashes present; bumps their last-used time."""
+        if not hashes:
+            return {}
+        now = datetime.now(UTC).isoformat()
+        found: dict[str, str] = {}
+        conn = self._connect()
+        try:
+            with conn:
+                for i in range(0, len(hashes), _SQL_BATCH):
+                    part = hashes[i : i + _SQL_BATCH]
+                    marks = ",".join("?" * len(part))
+                    # Only "?" placeholders are interpolated; values are bound.
+                    rows = conn.execute(
+                        f"SELECT content_hash, caption FROM captions "  # nosec B608
+                        f"WHERE content_hash IN ({marks})",
+                        part,
+                    ).fetchall()
+                    found.update(rows)
+                    if rows:
+                        conn.executemany(
+                            "UPDATE captions SET last_used_at = ? WHERE content_hash = ?",
+                            [(now, h) for h, _ in rows],
+                        )
+        finally:
+            conn.close()
+        return found
+
+    def put_many(self, captions: dict[str, str]) -> None:
+        """Upsert a batch of captions in one transaction, then apply eviction."""
+        if not captions:
+            return
+        now = datetime.now(UTC).isoformat()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO captions (content_hash, caption, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(content_hash) DO UPDATE SET "
+                    "caption = excluded.caption, last_used_at = excluded.last_used_at",
+                    [(h, c, now, now) for h, c in captions.items()],
+                )
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    def load_phash(self) -> tuple[dict[str, dict], dict[int, str]]:
+        """Return the perceptual-hash rows: ({basename: memo}, {dhash: caption})."""
+        conn = self._connect()
+        try:
+            files = {
+                name: {"hash": h, "size": size, "mtime": mtime}
+                for name, h, size, mtime in conn.execute(
+                    "SELECT basename, phash, size, mtime FROM phash_files"
+                )
+            }
+            captions = {
+                int(h, 16): c for h, c in conn.execute("SELECT phash, caption FROM phash_captions")
+            }
+        finally:
+            conn.close()
+        return files, captions
+
+    def put_phash(
+        self,
+        files: dict[str, dict],
+        captions: dict[int, str],
+        used: set[int] | frozenset[int] = frozenset(),
+    ) -> None:
+        """Upsert new memo and caption rows, bump `used` captions, then apply eviction."""
+        if not files and not captions and not used:
+            return
+        now = datetime.now(UTC).isoformat()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO phash_files (basename, phash, size, mtime, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(basename) DO UPDATE SET phash = excluded.phash, "
+                    "size = excluded.size, mtime = excluded.mtime, "
+                    "last_used_at = excluded.last_used_at",
+                    [(n, e["hash"], e["size"], e["mtime"], now) for n, e in files.items()],
+                )
+                conn.executemany(
+                    "INSERT INTO phash_captions (phash, caption, last_used_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(phash) DO UPDATE SET "
+                    "caption = excluded.caption, last_used_at = excluded.last_used_at",
+                    [(f"{h:016x}", c, now) for h, c in captions.items()],
+                )
+                conn.executemany(
+                    "UPDATE phash_captions SET last_used_at = ? WHERE phash = ?",
+                    [(now, f"{h:016x}") for h in used],
+                )
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    def evict(self) -> int:
+        """Apply the eviction policy now; return the number of rows removed."""
+        conn = self._connect()
+        try:
+            with conn:
+                return self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        cutoff = (datetime.now(UTC) - timedelta(days=self.max_age_days)).isoformat()
+        removed = 0
+        for table, key in _EVICTABLE:
+            # Table and key names come from _EVICTABLE; values are bound.
+            removed += conn.execute(
+                f"DELETE FROM {table} WHERE last_used_at < ?",  # nosec B608
+                (cutoff,),
+            ).rowcount
+            (count,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()  # nosec B608
+            if count > self.max_entries:
+                removed += conn.execute(
+                    f"DELETE FROM {table} WHERE {key} IN ("  # nosec B608
+                    f"SELECT {key} FROM {table} ORDER BY last_used_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+        if removed:
+            logger.info(f"Caption store: evicted {removed} row(s)")
+        return removed
+
+    def __len__(self) -> int:
+        """Return the number of stored captions."""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM captions").fetchone()[0]
+        finally:
+            conn.close()
+
+    def _import_legacy_json(self, json_path: Path) -> None:
+        """One-time import of the old filename-keyed `captions.json`."""
+        if not json_path.exists():
+            return
+        try:
+            legacy = json.loads(json_path.read_text())
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Caption store: skipping unreadable {json_path}: {e}")
+            return
+        media_dir = json_path.parent
+        rows: dict[str, str] = {}
+        for basename, caption in legacy.items():
+            path = media_dir / basename
+            digest = content_hash(str(path)) if path.exists() else None
+            if digest and caption:
+                rows[digest] = caption
+        self.put_many(rows)
+        os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+        logger.info(f"Caption store: imported {len(rows)}/{len(legacy)} legacy caption(s)")
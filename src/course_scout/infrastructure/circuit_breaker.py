@@ -0,0 +1,130 @@
+"""Per-model circuit breakers shared across all agents in the process.
+
+When Anthropic is degraded, every topic's `AIAgent.run` independently burns
+its retries (and timeouts) before giving up — ~15 topics in parallel each
+discovering the same outage. A breaker per model remembers the outage:
+
+  closed     → calls flow; `failure_threshold` consecutive timeouts / 5xx trip it
+  open       → calls are short-circuited (agent moves straight to the next
+               model / failover chain) until `cooldown` seconds have passed
+  half-open  → exactly one probe call is let through; success closes the
+               breaker, failure re-opens it for another cooldown
+
+Rate limits (429) are NOT breaker failures — they have their own retry path
+and mean the service is up.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from enum import StrEnum
+
+logger = logging.getLogger(__name__)
+
+# Provider error messages that indicate server-side failure. Status codes only
+# match as whole numbers, so "1500 tokens" or "req_5031" don't count.
+_SERVER_ERROR = re.compile(
+    r"(?<![\w.])(?:50[0234]|529)(?!\w|\.\d)"
+    r"|OVERLOADED|INTERNAL SERVER ERROR|SERVICE UNAVAILABLE|BAD GATEWAY"
+)
+_RATE_LIMITED = re.compile(r"(?<![\w.])429(?!\w|\.\d)|\bRATE[ _-]?LIMIT")
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Call short-circuited because the model's breaker is open."""
+
+
+def is_breaker_failure(exc: BaseException) -> bool:
+    """Return True for errors that indicate the model/provider is unhealthy."""
+    if isinstance(exc, TimeoutError):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:  # e.g. httpx.HTTPStatusError
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    msg = str(exc).upper()
+    if _RATE_LIMITED.search(msg):
+        return False
+    return _SERVER_ERROR.search(msg) is not None
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a timed half-open probe."""
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 120.0):
+        """Trip after `failure_threshold` consecutive failures; probe after `cooldown`s."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed (claims the probe slot when half-open)."""
+        if self.state == BreakerState.CLOSED:
+            return True
+        if self.state == BreakerState.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.state = BreakerState.HALF_OPEN
+            logger.info(f"Breaker[{self.name}]: half-open, probing")
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != BreakerState.CLOSED:
+            logger.info(f"Breaker[{self.name}]: probe succeeded, closing")
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if (
+            self.state == BreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != BreakerState.OPEN:
+                logger.warning(
+                    f"Breaker[{self.name}]: open after {self.consecutive_failures} "
+                    f"consecutive failure(s); short-circuiting for {self.cooldown:.0f}s"
+                )
+            self.state = BreakerState.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a claimed probe slot without a verdict (e.g. rate-limited probe)."""
+        self._probe_in_flight = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    """Return the process-wide breaker for `model`, creating it from runtime config."""
+    breaker = _breakers.get(model)
+    if breaker is None:
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        breaker = CircuitBreaker(
+            model,
+            failure_threshold=rt.breaker_failure_threshold,
+            cooldown=rt.breaker_cooldown,
+        )
+        _breakers[model] = breaker
+    return breaker
@@ -233,6 +233,7 @@ class TaskConfig(BaseModel):
     thinking: Literal["enabled", "disabled", "adaptive"] | None = None
     effort: Literal["low", "medium", "high", "max"] | None = None
     include_media: bool | None = None  # None = inherit default (False for request channels)
+    priority: Literal["high", "normal", "low"] = "normal"  # low = first deferred near quota
 
     def resolve(self, defaults: "AgentDefaults") -> "ResolvedTaskConfig":
         """Merge task-level overrides with global defaults."""
@@ -251,6 +252,7 @@ class TaskConfig(BaseModel):
             include_media=(
                 self.include_media if self.include_media is not None else defaults.include_media
             ),
+            priority=self.priority,
         )
 
 
@@ -269,6 +271,7 @@ class ResolvedTaskConfig(BaseModel):
     thinking: str = "adaptive"
     effort: str = "medium"
     include_media: bool = False  # set True to pass image attachments into the parser call
+    priority: str = "normal"  # "low" topics are skipped when the quota ledger says defer
 
 
 class AgentDefaults(BaseModel):
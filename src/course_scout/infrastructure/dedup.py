@@ -7,13 +7,31 @@ SQLite and filters items whose signals are all already seen.
 
 Conversational categories (discussion, request, announcement) are NOT
 deduped — a new thread about an old course is still useful information.
+
+`DigestDeduper.filter` normalizes every signal in the digest up front,
+looks them all up with one `seen_*_many` query per table and records the
+survivors with one `mark_many` transaction, so a 200-item day costs a few
+queries instead of a connection per URL.
+
+With `runtime.dedup_preload`, a `SeenKeyCache` holds every seen key in
+memory for the rest of the scan: an exact set of key hashes, or a Bloom
+filter once a table reaches `runtime.dedup_bloom_threshold` keys. Keys it
+has not seen are novel with no I/O; hits (possibly hash or Bloom false
+positives) are confirmed on disk. New marks are written through.
+`BatchScanUseCase` calls `reset_seen_caches()` when a scan starts, so a
+long-lived process reloads the keys on its next scan. Keys marked by another
+process during a scan read as novel until then, and `mark_many` still
+ignores the duplicate row.
 """
 
 import logging
+import math
 import os
 import re
 import sqlite3
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
@@ -39,7 +57,11 @@ _EXT_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Keys per `IN (...)` query — under SQLite's default bound-parameter limit.
+_IN_BATCH = 500
+
 
+@lru_cache(maxsize=8192)
 def normalize_url(url: str | None) -> str | None:
     """Canonicalize a URL for stable cross-run comparison.
 
@@ -77,6 +99,7 @@ def normalize_url(url: str | None) -> str | None:
         return None
 
 
+@lru_cache(maxsize=8192)
 def normalize_filename(name: str | None) -> str | None:
     """Canonicalize a filename for stable comparison.
 
@@ -109,6 +132,7 @@ class SeenItemRepository:
     def _init_db(self) -> None:
         conn = self._connect()
         try:
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS seen_links (
@@ -181,6 +205,75 @@ class SeenItemRepository:
         finally:
             conn.close()
 
+    def _seen_many(self, table: str, column: str, keys: Iterable[str]) -> set[str]:
+        unique = list(dict.fromkeys(keys))
+        seen: set[str] = set()
+        if not unique:
+            return seen
+        conn = self._connect()
+        try:
+            for i in range(0, len(unique), _IN_BATCH):
+                batch = unique[i : i + _IN_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT {column} FROM {table} WHERE {column} IN ({marks})", batch
+                ).fetchall()
+                seen.update(r[0] for r in rows)
+        finally:
+            conn.close()
+        return seen
+
+    def seen_links_many(self, normalized_urls: Iterable[str]) -> set[str]:
+        """Return the subset of `normalized_urls` already seen, in one connection."""
+        return self._seen_many("seen_links", "url", normalized_urls)
+
+    def seen_files_many(self, normalized_names: Iterable[str]) -> set[str]:
+        """Return the subset of `normalized_names` already seen, in one connection."""
+        return self._seen_many("seen_files", "file_key", normalized_names)
+
+    def mark_many(
+        self,
+        links: Iterable[tuple[str, str, str]] = (),
+        files: Iterable[tuple[str, str, str]] = (),
+    ) -> None:
+        """Record (key, channel, title) rows for links and files in one transaction.
+
+        First sighting wins, as with `mark_link_seen` / `mark_file_seen`.
+        """
+        ts = datetime.now(UTC).isoformat()
+        link_rows = [(key, ts, channel, title) for key, channel, title in links]
+        file_rows = [(key, ts, channel, title) for key, channel, title in files]
+        if not link_rows and not file_rows:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO seen_links "
+                    "(url, first_seen_at, first_channel, first_title) VALUES (?, ?, ?, ?)",
+                    link_rows,
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO seen_files "
+                    "(file_key, first_seen_at, first_channel, first_title) VALUES (?, ?, ?, ?)",
+                    file_rows,
+                )
+        finally:
+            conn.close()
+
+    def iter_keys(self, table: str) -> Iterator[str]:
+        """Stream every key in the "links" or "files" table."""
+        sql = {
+            "links": "SELECT url FROM seen_links",
+            "files": "SELECT file_key FROM seen_files",
+        }[table]
+        conn = self._connect()
+        try:
+            for (key,) in conn.execute(sql):
+                yield key
+        finally:
+            conn.close()
+
     def stats(self) -> dict[str, int]:
         conn = self._connect()
         try:
@@ -191,6 +284,141 @@ class SeenItemRepository:
             conn.close()
 
 
+class HashedKeySet:
+    """Set of 64-bit key hashes: about half the memory of a set of the key strings.
+
+    A hash collision reads as "maybe seen" and is settled on disk.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        """Hash and hold `keys`."""
+        self._hashes = {hash(k) for k in keys}
+
+    def add(self, key: str) -> None:
+        self._hashes.add(hash(key))
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if `key` (or a key with the same hash) was added."""
+        return hash(key) in self._hashes
+
+    def __len__(self) -> int:
+        """Return the number of distinct hashes held."""
+        return len(self._hashes)
+
+
+class BloomFilter:
+    """Fixed-size, in-process Bloom filter over str keys.
+
+    Positions come from double hashing two built-in string hashes: fast,
+    and salted per process, which is fine for a filter rebuilt every run.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01):
+        """Size the bit array for `capacity` keys at `fp_rate` false positives."""
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        h1 = hash(key)
+        h2 = hash(key + "\x00") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        bits = self._bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, key: str) -> bool:
+        """Return False if `key` was never added; True means probably added."""
+        bits = self._bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        """Return the number of keys added."""
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class SeenKeyCache:
+    """In-memory prefilter over the seen tables, loaded once per process."""
+
+    def __init__(self, links: HashedKeySet | BloomFilter, files: HashedKeySet | BloomFilter):
+        """Wrap one filter per table ("links", "files")."""
+        self._filters = {"links": links, "files": files}
+
+    @classmethod
+    def preload(
+        cls,
+        repo: SeenItemRepository,
+        bloom_threshold: int = 500_000,
+        fp_rate: float = 0.01,
+    ) -> "SeenKeyCache":
+        """Load every seen key; tables of `bloom_threshold`+ keys go into a Bloom filter.
+
+        Bloom filters are sized for twice the current count, leaving room
+        for the run's new marks before the false-positive rate climbs.
+        """
+        counts = repo.stats()
+        filters: dict[str, HashedKeySet | BloomFilter] = {}
+        for table in ("links", "files"):
+            if counts[table] >= bloom_threshold:
+                bloom = BloomFilter(2 * counts[table], fp_rate)
+                for key in repo.iter_keys(table):
+                    bloom.add(key)
+                filters[table] = bloom
+            else:
+                filters[table] = HashedKeySet(repo.iter_keys(table))
+        logger.info(
+            f"Dedup: preloaded {counts['links']} link(s), {counts['files']} file key(s) "
+            f"({type(filters['links']).__name__} / {type(filters['files']).__name__})"
+        )
+        return cls(filters["links"], filters["files"])
+
+    def maybe_seen(self, table: str, keys: Iterable[str]) -> list[str]:
+        """Return the keys that might be seen; all others are definitely novel."""
+        f = self._filters[table]
+        return [k for k in keys if k in f]
+
+    def add(self, table: str, keys: Iterable[str]) -> None:
+        """Write through keys just marked in the repository."""
+        f = self._filters[table]
+        for k in keys:
+            f.add(k)
+
+
+_seen_caches: dict[str, SeenKeyCache] = {}
+
+
+def get_seen_cache(repo: SeenItemRepository) -> SeenKeyCache | None:
+    """Return the scan's cache for `repo`'s database, or None when preload is off."""
+    from course_scout.infrastructure.runtime import get_runtime
+
+    rt = get_runtime()
+    if not rt.dedup_preload:
+        return None
+    cache = _seen_caches.get(repo.db_path)
+    if cache is None:
+        cache = SeenKeyCache.preload(repo, rt.dedup_bloom_threshold, rt.dedup_bloom_fp_rate)
+        _seen_caches[repo.db_path] = cache
+    return cache
+
+
+def reset_seen_caches() -> None:
+    """Drop every preloaded cache; the next `get_seen_cache` reloads from disk."""
+    _seen_caches.clear()
+
+
 _DEDUP_CATEGORIES = frozenset({"course", "file"})
 
 
@@ -205,21 +433,52 @@ class DigestDeduper:
     Surviving items have all their signals recorded so future runs see them.
     """
 
-    def __init__(self, channel_name: str, repo: SeenItemRepository | None = None):
-        """Initialize with channel context and an optional shared repository."""
+    def __init__(
+        self,
+        channel_name: str,
+        repo: SeenItemRepository | None = None,
+        seen_cache: SeenKeyCache | None = None,
+    ):
+        """Initialize with channel context, an optional shared repository and key cache.
+
+        Without a `seen_cache`, the process-wide one for the repository's
+        database is used when `runtime.dedup_preload` is on.
+        """
         self.channel_name = channel_name
         self.repo = repo or SeenItemRepository()
+        self.seen_cache = seen_cache or get_seen_cache(self.repo)
 
     def filter(self, digest: ChannelDigest) -> int:
+        candidates = [
+            (item, self._signals(item))
+            for item in digest.items
+            if item.category in _DEDUP_CATEGORIES
+        ]
+        seen_links = self._lookup("links", (u for _, (urls, _f) in candidates for u in urls))
+        seen_files = self._lookup("files", (f for _, (_u, f) in candidates if f))
+
         kept = []
         dropped = 0
+        new_links: list[tuple[str, str, str]] = []
+        new_files: list[tuple[str, str, str]] = []
+        signals = {id(item): sig for item, sig in candidates}
         for item in digest.items:
             if item.category not in _DEDUP_CATEGORIES:
                 kept.append(item)
                 continue
-            if self._is_novel(item):
+            urls, file_key = signals[id(item)]
+            if self._is_novel(urls, file_key, seen_links, seen_files):
                 kept.append(item)
-                self._mark_signals(item)
+                # Later items in this digest see the survivor's signals, as
+                # they would have when each one was marked as it was kept.
+                title = getattr(item, "title", "") or ""
+                for u in urls:
+                    if u not in seen_links:
+                        seen_links.add(u)
+                        new_links.append((u, self.channel_name, title))
+                if file_key and file_key not in seen_files:
+                    seen_files.add(file_key)
+                    new_files.append((file_key, self.channel_name, title))
             else:
                 dropped += 1
                 logger.debug(
@@ -227,33 +486,42 @@ class DigestDeduper:
                     item.category,
                     getattr(item, "title", None),
                 )
+        self.repo.mark_many(new_links, new_files)
+        if self.seen_cache is not None:
+            self.seen_cache.add("links", (k for k, _c, _t in new_links))
+            self.seen_cache.add("files", (k for k, _c, _t in new_files))
         digest.items = kept
         return dropped
 
+    def _lookup(self, table: str, keys: Iterable[str]) -> set[str]:
+        """Seen subset of `keys`; with a cache, only its possible hits touch disk."""
+        keys = list(dict.fromkeys(keys))
+        if self.seen_cache is not None:
+            keys = self.seen_cache.maybe_seen(table, keys)
+        if not keys:
+            return set()
+        if table == "links":
+            return self.repo.seen_links_many(keys)
+        return self.repo.seen_files_many(keys)
+
     @staticmethod
     def _external_urls(item: Any) -> list[str]:
         return [u for u in (getattr(item, "links", None) or []) if u and "t.me/" not in u]
 
-    def _is_novel(self, item: Any) -> bool:
-        normalized_urls = [n for u in self._external_urls(item) if (n := normalize_url(u))]
-        url_novel = any(not self.repo.is_link_seen(n) for n in normalized_urls)
-
-        file_key: str | None = None
+    def _signals(self, item: Any) -> tuple[list[str], str | None]:
+        """Return normalized external URLs and (FileItem only) the normalized title."""
+        urls = [n for u in self._external_urls(item) if (n := normalize_url(u))]
+        file_key = None
         if item.category == "file":
-            file_key = normalize_filename(getattr(item, "title", ""))
-        file_novel = bool(file_key) and not self.repo.is_file_seen(file_key)  # type: ignore[arg-type]
+            file_key = normalize_filename(getattr(item, "title", "") or "")
+        return urls, file_key
 
-        if not normalized_urls and not file_key:
+    @staticmethod
+    def _is_novel(
+        urls: list[str], file_key: str | None, seen_links: set[str], seen_files: set[str]
+    ) -> bool:
+        if not urls and not file_key:
             return True
+        url_novel = any(u not in seen_links for u in urls)
+        file_novel = bool(file_key) and file_key not in seen_files
         return url_novel or file_novel
-
-    def _mark_signals(self, item: Any) -> None:
-        title = getattr(item, "title", "") or ""
-        for u in self._external_urls(item):
-            n = normalize_url(u)
-            if n:
-                self.repo.mark_link_seen(n, self.channel_name, title)
-        if item.category == "file":
-            file_key = normalize_filename(title)
-            if file_key:
-                self.repo.mark_file_seen(file_key, self.channel_name, title)
@@ -0,0 +1,137 @@
+"""Per-topic grounding index for LLM-emitted links.
+
+The summarizer must not surface links the model invented. Grounding used to
+test `link in link_map.values()` (a linear scan) for every link of every item,
+re-split t.me URLs by hand, and compared raw strings — so a trailing slash or
+a `?utm_source=` suffix sent a perfectly good link to network repair.
+
+`GroundingIndex` is built once per topic from the structured input:
+  - a set of normalized URLs (message permalinks + URLs in message text),
+    canonicalized with `dedup.normalize_url` (fragments kept)
+  - the set of message IDs in the batch, plus id → permalink
+  - `parse_tme_link` for t.me permalinks (public, private `/c/`, forum-topic)
+
+All lookups are O(1). Hit/miss counters are kept on `stats` for logging.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from course_scout.infrastructure.dedup import normalize_url
+
+URL_PATTERN = re.compile(r"https?://\S+")
+_TRAILING_ID = re.compile(r"/(\d+)$")
+
+
+def _url_key(url: str) -> str | None:
+    """`normalize_url`, but keeping the fragment.
+
+    Fragments carry real data on share hosts (Mega decryption keys live after
+    `#`), so two URLs differing only there must not ground each other.
+    """
+    n = normalize_url(url)
+    if n is None:
+        return None
+    try:
+        frag = urlparse(url.strip()).fragment
+    except ValueError:
+        return n
+    return f"{n}#{frag}" if frag else n
+
+
+def parse_tme_link(url: str | None) -> tuple[str, int] | None:
+    """Parse a t.me message permalink into (chat, message_id).
+
+    Handles `t.me/<user>/<id>`, `t.me/c/<cid>/<id>` and the forum-topic form
+    `t.me/c/<cid>/<topic>/<id>`; query strings (`?single`, `?comment=`) and
+    trailing slashes are ignored. Returns None for anything else.
+    """
+    if not url or "t.me/" not in url:
+        return None
+    try:
+        p = urlparse(url if "://" in url else f"https://{url}")
+    except ValueError:
+        return None
+    host = p.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host != "t.me":
+        return None
+    parts = [s for s in p.path.split("/") if s]
+    if len(parts) < 2 or not parts[-1].isdigit():
+        return None
+    if parts[0] == "c":
+        if len(parts) < 3:
+            return None
+        chat = parts[1]
+    else:
+        chat = parts[0]
+    return chat, int(parts[-1])
+
+
+def extract_message_id(url: str) -> int | None:
+    """Message ID from a t.me permalink, or a trailing numeric path segment."""
+    parsed = parse_tme_link(url)
+    if parsed is not None:
+        return parsed[1]
+    m = _TRAILING_ID.search(url.rstrip("/"))
+    return int(m.group(1)) if m else None
+
+
+@dataclass
+class GroundingStats:
+    """Counters for one topic's grounding pass."""
+
+    hits: int = 0
+    """Links matched against the input (URL set or known message ID)."""
+    misses: int = 0
+    """Links dropped as hallucinated."""
+    trusted: int = 0
+    """External links kept without a match (LLM extraction is trusted)."""
+    rebuilt: int = 0
+    """Key links rebuilt from a known message ID without a network call."""
+    repaired: int = 0
+    """Key links recovered via scraper repair."""
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} hit / {self.misses} miss / {self.trusted} trusted / "
+            f"{self.rebuilt} rebuilt / {self.repaired} repaired"
+        )
+
+
+class GroundingIndex:
+    """O(1) membership tests for links and message IDs in one topic's input."""
+
+    def __init__(self, link_map: dict[int, str], raw_urls: set[str] | None = None):
+        """Build from message id → permalink and the URLs found in message text."""
+        self.link_map = link_map
+        self.msg_ids: set[int] = set(link_map)
+        self.urls: set[str] = set()
+        for url in (*link_map.values(), *(raw_urls or ())):
+            self.urls.add(url)
+            n = _url_key(url)
+            if n:
+                self.urls.add(n)
+        self.stats = GroundingStats()
+
+    @classmethod
+    def from_messages(cls, messages: list) -> GroundingIndex:
+        """Build from StructuredMessage-like objects (`id`, `link`, `content`)."""
+        link_map = {m.id: m.link for m in messages if m.link}
+        raw_urls = {u for m in messages for u in URL_PATTERN.findall(m.content or "")}
+        return cls(link_map, raw_urls)
+
+    def contains(self, url: str) -> bool:
+        """Return True if `url` (or its normalized form) appears in the input."""
+        if url in self.urls:
+            return True
+        n = _url_key(url)
+        return n is not None and n in self.urls
+
+    def permalink(self, msg_id: int) -> str | None:
+        """Return the batch permalink for a message ID, if the message is in the batch."""
+        return self.link_map.get(msg_id)
@@ -0,0 +1,247 @@
+"""Request hedging for provider calls.
+
+SDK calls occasionally hang with no error, which is why
+`provider_call_timeout` sits at 600s — one hung chunk can hold a scan for ten
+minutes. Hedging trades a little duplicate spend for a short tail: once a
+call has run longer than the p95 latency observed for inputs of its size, a
+duplicate is started (same model, or the next model in the chain) and
+whichever finishes first wins; the other is cancelled.
+
+`LatencyTracker` keeps recent successful latencies bucketed by input size
+(powers of two of the serialized input length), so a 200-message topic is
+not judged against the latency of a 5-message one. No threshold is reported
+until a bucket has `min_samples` observations. The history is kept in
+`runtime.hedge_history_db` (the last `window` rows per bucket) and loaded
+on first use, so a nightly scan judges its calls by earlier nights' latencies
+instead of starting cold every run. Only completed primary calls are
+recorded: a hedged call's winner is capped near the threshold, so its
+latency would pull the quantile down and make hedges ever more frequent.
+
+The duplicate takes its own rate-limiter reservation. `HedgeStats` counts
+hedges and wins, and estimates the cost overhead of each cancelled loser as
+the winner's cost — read from the winner's own usage records — prorated by
+how long the loser ran. Usage entries the loser did record are flagged
+`hedge_loser`, so per-call consumers (the model router) count one call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from course_scout.infrastructure.telemetry import collect_calls
+
+logger = logging.getLogger(__name__)
+
+
+def _size_bucket(input_chars: int) -> int:
+    return max(input_chars, 1).bit_length()
+
+
+class LatencyTracker:
+    """Rolling per-size-bucket latency history with a quantile threshold."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20, db_path: str | None = None):
+        """Keep the last `window` latencies per bucket; need `min_samples` to hedge.
+
+        With `db_path`, the history is loaded from and appended to SQLite.
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self.db_path = db_path
+        self._samples: dict[int, deque[float]] = {}
+        self._lock = threading.Lock()
+        if db_path:
+            parent = os.path.dirname(db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._load()
+
+    @classmethod
+    def from_runtime(cls) -> LatencyTracker:
+        """Build a tracker from the `runtime:` block knobs."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        return cls(min_samples=rt.hedge_min_samples, db_path=rt.hedge_history_db or None)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self.db_path:
+            raise RuntimeError("LatencyTracker has no database (in-process history only)")
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _load(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS hedge_latencies (
+                    ts REAL NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    seconds REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_hedge_latencies_bucket "
+                "ON hedge_latencies (bucket, ts)"
+            )
+            conn.commit()
+            rows = conn.execute(
+                "SELECT bucket, seconds FROM hedge_latencies ORDER BY ts"
+            ).fetchall()
+        finally:
+            conn.close()
+        for bucket, seconds in rows:
+            self._samples.setdefault(bucket, deque(maxlen=self.window)).append(seconds)
+
+    def record(self, input_chars: int, seconds: float) -> None:
+        """Add one latency; with a database, also persist it (blocking — call off the loop)."""
+        key = _size_bucket(input_chars)
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+        if not self.db_path:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO hedge_latencies VALUES (?, ?, ?)", (time.time(), key, seconds)
+                )
+                conn.execute(
+                    "DELETE FROM hedge_latencies WHERE bucket = ? AND ts < ("
+                    "SELECT ts FROM hedge_latencies WHERE bucket = ? "
+                    "ORDER BY ts DESC LIMIT 1 OFFSET ?)",
+                    (key, key, self.window - 1),
+                )
+        finally:
+            conn.close()
+
+    def threshold(self, input_chars: int, quantile: float = 0.95) -> float | None:
+        """Return the `quantile` latency for this input size, or None if too few samples."""
+        with self._lock:
+            ordered = sorted(self._samples.get(_size_bucket(input_chars), ()))
+        if len(ordered) < max(self.min_samples, 1):
+            return None
+        idx = min(len(ordered) - 1, int(quantile * len(ordered)))
+        return ordered[idx]
+
+
+@dataclass
+class HedgeStats:
+    """Process-wide hedging counters."""
+
+    calls: int = 0
+    """Calls eligible for hedging (a threshold was available)."""
+    hedged: int = 0
+    """Calls where the duplicate was launched."""
+    hedge_wins: int = 0
+    """Hedged calls won by the duplicate."""
+    overhead_cost_usd: float = 0.0
+    """Estimated spend on cancelled losers."""
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.calls if self.calls else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Hedging: {self.hedged}/{self.calls} calls hedged ({self.hedge_rate:.1%}), "
+            f"{self.hedge_wins} won by duplicate, ~${self.overhead_cost_usd:.4f} overhead"
+        )
+
+
+_tracker: LatencyTracker | None = None
+_stats = HedgeStats()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Return the process-wide tracker (built from runtime config on first use)."""
+    global _tracker
+    if _tracker is None:
+        _tracker = LatencyTracker.from_runtime()
+    return _tracker
+
+
+def get_hedge_stats() -> HedgeStats:
+    return _stats
+
+
+def _cost(calls: list[dict]) -> float:
+    return sum(float(c.get("cost_usd", 0.0) or 0.0) for c in calls)
+
+
+async def _collecting(call: Awaitable[Any], calls: list[dict]) -> Any:
+    """Await `call`, appending the usage entries it records to `calls`."""
+    with collect_calls(calls):
+        return await call
+
+
+async def hedged_call(
+    make_call: Callable[[str, bool], Awaitable[Any]],
+    primary_model: str,
+    hedge_model: str,
+    delay: float,
+    stats: HedgeStats | None = None,
+) -> tuple[Any, str]:
+    """Run `make_call(primary_model, True)`; hedge with `make_call(hedge_model, False)`.
+
+    The boolean tells the factory whether this copy is the primary (only the
+    primary should stream items). Returns (result, winning_model). If one copy
+    fails the other is awaited; if both fail, the primary's error is raised.
+    """
+    stats = stats if stats is not None else _stats
+    stats.calls += 1
+    start = time.monotonic()
+    usage: dict[str, list[dict]] = {"primary": [], "hedge": []}
+    primary = asyncio.ensure_future(_collecting(make_call(primary_model, True), usage["primary"]))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result(), primary_model
+
+    stats.hedged += 1
+    hedge_start = time.monotonic()
+    logger.info(f"Hedging {primary_model} after {delay:.1f}s with a duplicate on {hedge_model}")
+    hedge = asyncio.ensure_future(_collecting(make_call(hedge_model, False), usage["hedge"]))
+    tasks = {primary: primary_model, hedge: hedge_model}
+    pending = set(tasks)
+    errors: dict[asyncio.Future, BaseException] = {}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                exc = task.exception()
+                if exc is not None:
+                    errors[task] = exc
+                    continue
+                winner_model = tasks[task]
+                loser_started = start if task is hedge else hedge_start
+                winner_started = hedge_start if task is hedge else start
+                winner, loser = ("hedge", "primary") if task is hedge else ("primary", "hedge")
+                if task is hedge:
+                    stats.hedge_wins += 1
+                now = time.monotonic()
+                winner_elapsed = max(now - winner_started, 1e-6)
+                ratio = min(1.0, (now - loser_started) / winner_elapsed)
+                # A loser that already reported usage (e.g. a failed attempt) costs
+                # exactly that; a cancelled one is estimated from the winner.
+                loser_cost = _cost(usage[loser]) or _cost(usage[winner]) * ratio
+                stats.overhead_cost_usd += loser_cost
+                for entry in usage[loser]:
+                    # Same dicts as in enclosing `collect_calls` lists: one logical call.
+                    entry["hedge_loser"] = True
+                return task.result(), winner_model
+        raise errors.get(primary) or next(iter(errors.values()))
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
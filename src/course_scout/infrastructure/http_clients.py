@@ -0,0 +1,67 @@
+"""Process-wide pooled HTTP clients for the HTTP-based providers.
+
+Providers are cached per orchestrator, and the summarizer factory,
+escalation and executive-summary paths each build orchestrators — so a
+client built per provider meant a fresh connection pool (and TLS handshake)
+per topic. `shared_client(key, build)` returns one client per key instead,
+e.g. one `AsyncOpenAI` per (base_url, proxy, api key), all built with the
+same `http_max_connections` / `http_keepalive` limits.
+
+Connections belong to the event loop that opened them, so each entry
+remembers its loop and is rebuilt when a later `asyncio.run()` asks for it.
+`close_shared_clients()` closes the running loop's clients at shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[Hashable, tuple[asyncio.AbstractEventLoop, Any]] = {}
+
+
+def pooled_httpx_client(proxy: str | None = None, http2: bool = False) -> httpx.AsyncClient:
+    """Build an `httpx.AsyncClient` with the runtime's keep-alive limits and call timeout."""
+    from course_scout.infrastructure.runtime import get_runtime
+
+    rt = get_runtime()
+    return httpx.AsyncClient(
+        proxy=proxy,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=rt.http_max_connections,
+            max_keepalive_connections=rt.http_max_connections,
+            keepalive_expiry=rt.http_keepalive,
+        ),
+        timeout=httpx.Timeout(rt.provider_call_timeout, connect=10.0),
+    )
+
+
+def shared_client[T](key: Hashable, build: Callable[[], T]) -> T:
+    """Return the running loop's client for `key`, building it on first use."""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(key)
+    if entry is None or entry[0] is not loop:
+        entry = (loop, build())
+        _clients[key] = entry
+    return entry[1]
+
+
+async def close_shared_clients() -> None:
+    """Close every client opened on the running loop and forget all entries."""
+    loop = asyncio.get_running_loop()
+    entries = list(_clients.values())
+    _clients.clear()
+    for owner, client in entries:
+        if owner is not loop:
+            continue
+        close = getattr(client, "aclose", None) or client.close
+        with contextlib.suppress(Exception):
+            await close()
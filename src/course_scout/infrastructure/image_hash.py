@@ -0,0 +1,176 @@
+"""Perceptual-hash index for near-duplicate image detection.
+
+The same course cover or promo image is reposted across topics and days,
+each time under a new filename (`media_<msgid>.jpg`), so a filename-keyed
+caption cache misses every repost. A 64-bit difference hash (dHash) is
+stable under re-encoding, resizing and mild recompression; two images
+whose hashes differ in at most `max_distance` bits are treated as the same
+picture.
+
+`ImageHashIndex` persists to two tables of the caption store
+(`media_cache/captions.db`, see `caption_store.py`):
+  - `phash_files`:    basename → {hash, size, mtime}, so unchanged files
+                      aren't re-decoded on the next run
+  - `phash_captions`: hash → caption, so a caption fans out to every
+                      near-duplicate seen in this or any later run
+
+Both are loaded once into memory; `save()` upserts only the rows added or
+used since the last save and leaves eviction to the store's age/LRU policy.
+`hash_for` runs in worker threads, so every mutation and the snapshot taken
+by `save()` go through one lock. A legacy `phash_index.json` next to the
+database is imported once and renamed to `phash_index.json.migrated`.
+
+Near-duplicate lookup is a linear Hamming scan over the stored hashes —
+`int.bit_count` on a few thousand ints is microseconds, far below one vision
+call.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+
+from course_scout.infrastructure.caption_store import CaptionStore
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+
+
+def dhash(path: str, size: int = HASH_SIZE) -> int | None:
+    """Return the `size*size`-bit difference hash of an image, or None if unreadable.
+
+    Grayscale, resize to (size+1)×size, then one bit per horizontally adjacent
+    pixel pair: 1 if the left pixel is brighter.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as img:
+            small = img.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS)
+            pixels = small.tobytes()
+    except (OSError, UnidentifiedImageError, ValueError) as e:
+        logger.debug(f"dhash failed for {path}: {e}")
+        return None
+    value = 0
+    for row in range(size):
+        base = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[base + col] > pixels[base + col + 1])
+    return value
+
+
+def ahash(path: str, size: int = HASH_SIZE) -> int | None:
+    """Return the average hash (1 bit per pixel above the mean), or None if unreadable."""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as img:
+            pixels = img.convert("L").resize((size, size)).tobytes()
+    except (OSError, UnidentifiedImageError, ValueError):
+        return None
+    mean = sum(pixels) / len(pixels)
+    value = 0
+    for p in pixels:
+        value = (value << 1) | (p > mean)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class ImageHashIndex:
+    """Basename → hash memo and hash → caption map, persisted in a `CaptionStore`."""
+
+    def __init__(self, store: CaptionStore, max_distance: int = 6):
+        """Load the index rows from `store`, importing any legacy JSON index first."""
+        self.store = store
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self.files, self.captions = store.load_phash()
+        # Rows added or used since the last save.
+        self._dirty_files: dict[str, dict] = {}
+        self._dirty_captions: dict[int, str] = {}
+        self._used: set[int] = set()
+        self._import_legacy_json()
+
+    def hash_for(self, path: str) -> int | None:
+        """Return the file's dHash, reusing the memo when size and mtime are unchanged."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = os.path.basename(path)
+        with self._lock:
+            entry = self.files.get(key)
+        if entry and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+            with self._lock:
+                self._dirty_files[key] = entry
+            return int(entry["hash"], 16)
+        value = dhash(path)
+        if value is not None:
+            entry = {"hash": f"{value:016x}", "size": st.st_size, "mtime": st.st_mtime}
+            with self._lock:
+                self.files[key] = self._dirty_files[key] = entry
+        return value
+
+    def find_caption(self, value: int) -> str | None:
+        """Return the caption of the nearest stored hash within `max_distance`."""
+        with self._lock:
+            exact = self.captions.get(value)
+            candidates = list(self.captions.items()) if exact is None else [(value, exact)]
+        best: tuple[int, int, str] | None = None
+        for h, caption in candidates:
+            d = hamming(h, value)
+            if d <= self.max_distance and (best is None or d < best[0]):
+                best = (d, h, caption)
+        if best is None:
+            return None
+        with self._lock:
+            self._used.add(best[1])
+        return best[2]
+
+    def add_caption(self, value: int, caption: str) -> None:
+        with self._lock:
+            self.captions[value] = self._dirty_captions[value] = caption
+
+    def cluster(self, hashes: dict[str, int]) -> list[list[str]]:
+        """Group paths whose hashes are within `max_distance` of a cluster's first member."""
+        clusters: list[tuple[int, list[str]]] = []
+        for path, value in hashes.items():
+            for rep, members in clusters:
+                if hamming(rep, value) <= self.max_distance:
+                    members.append(path)
+                    break
+            else:
+                clusters.append((value, [path]))
+        return [members for _, members in clusters]
+
+    def save(self) -> None:
+        """Write the rows added or used since the last save to the store."""
+        with self._lock:
+            files, self._dirty_files = self._dirty_files, {}
+            captions, self._dirty_captions = self._dirty_captions, {}
+            used, self._used = self._used, set()
+        self.store.put_phash(files, captions, used - captions.keys())
+
+    def _import_legacy_json(self) -> None:
+        """One-time import of the old whole-file `phash_index.json`."""
+        json_path = self.store.db_path.with_name("phash_index.json")
+        if not json_path.exists():
+            return
+        try:
+            data = json.loads(json_path.read_text())
+            files = data.get("files", {})
+            captions = {int(h, 16): c for h, c in data.get("captions", {}).items()}
+        except (json.JSONDecodeError, OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable phash index {json_path}: {e}")
+            return
+        self.files.update(files)
+        self.captions.update(captions)
+        self.store.put_phash(files, captions)
+        os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+        logger.info(f"Phash index: imported {len(files)} memo and {len(captions)} caption row(s)")
@@ -0,0 +1,197 @@
+"""Image preparation before base64 upload: downscale, re-encode, strip metadata.
+
+Both upload paths (`ClaudeProvider._build_image_blocks` and the vision
+pre-pass) used to base64 the raw file and skip anything over 5 MB — so large
+PNG screenshots were dropped entirely, and phone photos were uploaded at full
+resolution only for the API to downscale them server-side.
+
+`prepare_image` decodes once with Pillow, applies the EXIF orientation,
+shrinks so the long edge is at most `image_max_edge` (the API's own
+resize threshold, so no detail the model would see is lost), and re-encodes
+to `image_format` at `image_quality`. Saving without `exif=`/`icc_profile=`
+drops all metadata. Prepared bytes are cached on disk under
+`media_cache/prepared/`, keyed by source path, size, mtime and the
+settings, so rescans and repeated captioning reuse them. A hit refreshes
+the file's mtime; the first preparation in a process prunes the directory
+with the caption store's policy (`caption_cache_max_age_days`, then the
+least recently used files beyond `caption_cache_max_entries`).
+
+`prepare_many` fans out over a small thread pool — decoding and encoding
+release the GIL in Pillow's C code.
+"""
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_CACHE_DIR = Path("media_cache/prepared")
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024  # API limit per image, after encoding
+SUPPORTED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+_MEDIA_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+_executor: ThreadPoolExecutor | None = None
+_prune_lock = threading.Lock()
+_pruned = False
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """Upload-ready image bytes."""
+
+    data: bytes
+    media_type: str
+    width: int
+    height: int
+    source_bytes: int
+
+    def content_block(self) -> dict:
+        """Return an Anthropic base64 image content block."""
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": self.media_type,
+                "data": base64.standard_b64encode(self.data).decode("ascii"),
+            },
+        }
+
+
+def _settings() -> tuple[int, str, int]:
+    from course_scout.infrastructure.runtime import get_runtime
+
+    rt = get_runtime()
+    fmt = rt.image_format.lower()
+    if fmt not in _MEDIA_TYPES:
+        logger.warning(f"Unsupported image_format {rt.image_format!r}; using jpeg")
+        fmt = "jpeg"
+    return rt.image_max_edge, fmt, rt.image_quality
+
+
+def _cache_path(path: str, st: os.stat_result, max_edge: int, fmt: str, quality: int) -> Path:
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{max_edge}|{fmt}|{quality}"
+    return _CACHE_DIR / f"{hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()}.{fmt}"
+
+
+def _encode(path: str, max_edge: int, fmt: str, quality: int) -> tuple[bytes, int, int]:
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as src:
+        img = ImageOps.exif_transpose(src)
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or (
+            img.mode == "P" and "transparency" in img.info
+        )
+        if has_alpha and fmt == "jpeg":
+            # JPEG has no alpha: flatten onto white (screenshots, stickers).
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, "white")
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        buf = io.BytesIO()
+        img.save(buf, format=fmt.upper(), quality=quality, optimize=fmt == "jpeg")
+        return buf.getvalue(), img.width, img.height
+
+
+def prepare_image(path: str) -> PreparedImage | None:
+    """Return the downscaled, re-encoded image at `path`, or None if unusable.
+
+    Unusable means missing, not an image Pillow can decode, or still over
+    the API's 5 MB limit after re-encoding.
+    """
+    if not path or os.path.splitext(path)[1].lower() not in SUPPORTED_EXTENSIONS:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    from PIL import Image
+
+    _prune_once()
+    max_edge, fmt, quality = _settings()
+    cached = _cache_path(path, st, max_edge, fmt, quality)
+    try:
+        data = cached.read_bytes()
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+        os.utime(cached)  # last use, for pruning
+    except (OSError, ValueError):
+        try:
+            data, width, height = _encode(path, max_edge, fmt, quality)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning(f"Skipping {path}: cannot prepare image: {e}")
+            return None
+        if len(data) <= MAX_UPLOAD_BYTES:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            tmp.replace(cached)
+    if len(data) > MAX_UPLOAD_BYTES:
+        logger.warning(f"Skipping {path}: {len(data) // 1024} KB after re-encoding")
+        return None
+    return PreparedImage(data, _MEDIA_TYPES[fmt], width, height, st.st_size)
+
+
+def prune_cache(max_entries: int, max_age_days: int) -> int:
+    """Delete cached files by age, then by LRU; return the number removed.
+
+    Files unused for `max_age_days` go first, then the least recently used
+    beyond `max_entries`, mirroring `CaptionStore.evict`.
+    """
+    try:
+        entries = [(e.stat().st_mtime, e.path) for e in os.scandir(_CACHE_DIR) if e.is_file()]
+    except OSError:
+        return 0
+    entries.sort(reverse=True)
+    cutoff = time.time() - max_age_days * 86400
+    stale = [p for i, (mtime, p) in enumerate(entries) if mtime < cutoff or i >= max_entries]
+    removed = 0
+    for p in stale:
+        with contextlib.suppress(OSError):
+            os.remove(p)
+            removed += 1
+    if removed:
+        logger.info(f"Image prep: pruned {removed} cached file(s)")
+    return removed
+
+
+def _prune_once() -> None:
+    global _pruned
+    with _prune_lock:
+        if _pruned:
+            return
+        _pruned = True
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        prune_cache(rt.caption_cache_max_entries, rt.caption_cache_max_age_days)
+
+
+def map_in_pool[T](fn: Callable[[str], T], paths: list[str]) -> list[T]:
+    """Apply `fn` to each path on the shared image thread pool, preserving order."""
+    global _executor
+    if len(paths) <= 1:
+        return [fn(p) for p in paths]
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 4), thread_name_prefix="image-prep"
+        )
+    return list(_executor.map(fn, paths))
+
+
+def prepare_many(paths: list[str]) -> list[PreparedImage | None]:
+    """Prepare several images in parallel on the shared thread pool."""
+    return map_in_pool(prepare_image, paths)
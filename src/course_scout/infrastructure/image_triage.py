@@ -0,0 +1,134 @@
+"""Local image triage: skip uninformative images before any vision call.
+
+A large share of attachments are memes, stickers, avatars and near-blank
+crops — each of which used to cost a vision call, with `max_images_per_call`
+keeping simply the newest images per chunk. Captions only matter when an
+image carries readable text or a cover (titles, instructor names, platform
+logos), and those share cheap, local signatures:
+
+  - dimensions:   avatars and sticker thumbnails are tiny
+  - aspect ratio: extreme strips are separators and cropped banners
+  - colour entropy (`Image.entropy`, bits): near-blank crops are low
+  - edge density: text and cover typography produce many sharp edges;
+                  photos and flat memes far fewer
+
+`score_image` folds these into a 0–1 score on a 128-px thumbnail (a few ms
+per image). `plan_image_budget` then allocates the run's caption budget
+across every topic at once: images scoring below `image_triage_min_score`
+are dropped, and the rest are ranked by the engagement of the message they
+came with (`reaction_count`, `reply_count`), triage score breaking ties.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any
+
+from course_scout.infrastructure.image_prep import map_in_pool
+
+logger = logging.getLogger(__name__)
+
+_THUMB = 128
+_EDGE_THRESHOLD = 40  # FIND_EDGES response (0–255) that counts as an edge pixel
+
+
+@dataclass(frozen=True)
+class TriageScore:
+    """Per-image triage signals and their combined 0–1 score."""
+
+    score: float
+    width: int
+    height: int
+    entropy: float
+    edge_density: float
+    reason: str = ""
+
+
+def score_image(path: str, min_side: int = 100, max_aspect: float = 4.0) -> TriageScore | None:
+    """Score how likely an image carries readable text or a cover; None if unreadable."""
+    from PIL import Image, ImageFilter, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            if min(width, height) < min_side:
+                return TriageScore(0.0, width, height, 0.0, 0.0, "tiny")
+            img.draft("RGB", (_THUMB * 2, _THUMB * 2))  # JPEG: decode at reduced scale
+            thumb = img.convert("RGB")
+            thumb.thumbnail((_THUMB, _THUMB))
+    except (OSError, UnidentifiedImageError, ValueError, Image.DecompressionBombError) as e:
+        logger.debug(f"Triage could not read {path}: {e}")
+        return None
+
+    entropy = thumb.entropy()
+    edges = thumb.convert("L").filter(ImageFilter.FIND_EDGES)
+    edges = edges.crop((1, 1, edges.width - 1, edges.height - 1))  # drop border artifacts
+    hist = edges.histogram()
+    edge_density = sum(hist[_EDGE_THRESHOLD:]) / max(1, edges.width * edges.height)
+
+    aspect = max(width, height) / min(width, height)
+    if entropy < 2.0:
+        return TriageScore(0.0, width, height, entropy, edge_density, "blank")
+    score = 0.25 * min(1.0, entropy / 7.0) + 0.75 * min(1.0, edge_density / 0.15)
+    reason = ""
+    if aspect > max_aspect:
+        score *= 0.3
+        reason = "aspect"
+    return TriageScore(round(score, 3), width, height, entropy, edge_density, reason)
+
+
+def engagement(message: Any) -> int:
+    """Engagement weight of a message: reactions plus replies (replies count double)."""
+    return (getattr(message, "reaction_count", 0) or 0) + 2 * (
+        getattr(message, "reply_count", 0) or 0
+    )
+
+
+@dataclass
+class ImagePlan:
+    """Outcome of `plan_image_budget`: which image paths may be captioned."""
+
+    keep: set[str]
+    low_score: int = 0
+    over_budget: int = 0
+    unreadable: int = 0
+
+
+def plan_image_budget(
+    messages: list[Any], budget: int, min_score: float, min_side: int = 100
+) -> ImagePlan:
+    """Select the image paths worth captioning across a whole run.
+
+    `messages` are TelegramMessage-like objects from every topic (anything
+    with `local_media_path`, `reaction_count`, `reply_count`, `id`).
+    `budget` <= 0 means no run-wide cap — only the triage score applies.
+    """
+    by_path: dict[str, Any] = {}
+    for m in messages:
+        path = getattr(m, "local_media_path", None)
+        if path and os.path.exists(path):
+            prev = by_path.get(path)
+            if prev is None or engagement(m) > engagement(prev):
+                by_path[path] = m
+    paths = list(by_path)
+    scores = map_in_pool(lambda p: score_image(p, min_side=min_side), paths)
+
+    plan = ImagePlan(keep=set())
+    ranked: list[tuple[int, float, int, str]] = []
+    for path, s in zip(paths, scores, strict=True):
+        if s is None:
+            plan.unreadable += 1
+        elif s.score < min_score:
+            plan.low_score += 1
+            logger.debug(f"Triage skip {os.path.basename(path)}: {s}")
+        else:
+            m = by_path[path]
+            ranked.append((engagement(m), s.score, getattr(m, "id", 0), path))
+    ranked.sort(reverse=True)
+    if budget > 0 and len(ranked) > budget:
+        plan.over_budget = len(ranked) - budget
+        ranked = ranked[:budget]
+    plan.keep = {path for *_, path in ranked}
+    return plan
@@ -0,0 +1,139 @@
+"""Cross-chunk item merging for topics split into several parser calls.
+
+When a topic doesn't fit one call, each chunk is parsed independently and the
+same course / request regularly shows up in two chunks (the ask in one, the
+download reply in the next). Plain concatenation lets both copies flow into
+dedup, rendering and the executive-summary prompt.
+
+`merge_chunk_items` links pairs of items from DIFFERENT chunks (same-chunk pairs
+are never compared — the parser already grouped those deliberately) when any
+of these hold:
+  - they share a source message ID
+  - they share an external (non-t.me) link, compared via `normalize_url`
+  - same category and fuzzy title similarity ≥ `TITLE_SIMILARITY`
+
+Each cluster is collapsed into one item: union of msg_ids and links, first
+non-empty scalar fields, distinct descriptions joined, and the most-resolved
+status (a request fulfilled in a later chunk is FULFILLED).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from difflib import SequenceMatcher
+
+from course_scout.infrastructure.agents import RawDigestItem
+from course_scout.infrastructure.dedup import normalize_url
+
+logger = logging.getLogger(__name__)
+
+TITLE_SIMILARITY = 0.88
+
+# Higher rank wins when merged copies disagree on status.
+_STATUS_RANK = {"FULFILLED": 3, "DISCUSSING": 2, "UNFULFILLED": 1}
+_SCALAR_FIELDS = ("author", "instructor", "platform", "priority", "password")
+
+
+def _title_key(title: str) -> str:
+    return " ".join(re.findall(r"\w+", title.lower()))
+
+
+def _titles_match(a: str, b: str) -> bool:
+    ka, kb = _title_key(a), _title_key(b)
+    if not ka or not kb:
+        return False
+    if ka == kb:
+        return True
+    # Token-set check first: "Krenz Color Course" vs "Color Course Krenz".
+    ta, tb = set(ka.split()), set(kb.split())
+    if ta == tb:
+        return True
+    return SequenceMatcher(None, ka, kb).ratio() >= TITLE_SIMILARITY
+
+
+def _external_keys(item: RawDigestItem) -> set[str]:
+    return {n for u in item.links if "t.me/" not in u and (n := normalize_url(u))}
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _combine(cluster: list[RawDigestItem]) -> RawDigestItem:
+    base = cluster[0]
+    msg_ids = sorted({mid for it in cluster for mid in it.msg_ids})
+    links = list(dict.fromkeys(u for it in cluster for u in it.links))
+    descriptions = list(dict.fromkeys(it.description.strip() for it in cluster if it.description))
+    statuses = [it.status for it in cluster if it.status]
+    status = max(statuses, key=lambda s: _STATUS_RANK.get(s, 0)) if statuses else None
+    scalars = {
+        f: next((getattr(it, f) for it in cluster if getattr(it, f)), None) for f in _SCALAR_FIELDS
+    }
+    return RawDigestItem(
+        title=max((it.title for it in cluster), key=len),
+        description=" ".join(descriptions),
+        category=base.category,
+        msg_ids=msg_ids,
+        links=links,
+        status=status,
+        **scalars,
+    )
+
+
+def _link_by_signals(flat: list[tuple[int, RawDigestItem]], uf: _UnionFind) -> None:
+    """Union cross-chunk items sharing a message ID or a normalized external link."""
+    first_by_key: dict[object, int] = {}
+    for idx, (chunk_idx, item) in enumerate(flat):
+        keys: list[object] = [("msg", mid) for mid in item.msg_ids]
+        keys += [("url", k) for k in _external_keys(item)]
+        for key in keys:
+            other = first_by_key.setdefault(key, idx)
+            if flat[other][0] != chunk_idx:
+                uf.union(idx, other)
+
+
+def _link_by_titles(flat: list[tuple[int, RawDigestItem]], uf: _UnionFind) -> None:
+    """Union cross-chunk items of the same category with near-identical titles.
+
+    Pairwise, but items per topic are in the tens — negligible next to an LLM call.
+    """
+    for i, (ci, a) in enumerate(flat):
+        for j in range(i + 1, len(flat)):
+            cj, b = flat[j]
+            if ci != cj and a.category == b.category and _titles_match(a.title, b.title):
+                uf.union(i, j)
+
+
+def merge_chunk_items(chunks: list[list[RawDigestItem]]) -> list[RawDigestItem]:
+    """Collapse duplicate items across chunk outputs, preserving first-seen order."""
+    flat: list[tuple[int, RawDigestItem]] = [
+        (ci, it) for ci, items in enumerate(chunks) for it in items
+    ]
+    if len(chunks) < 2 or len(flat) < 2:
+        return [it for _, it in flat]
+
+    uf = _UnionFind(len(flat))
+    _link_by_signals(flat, uf)
+    _link_by_titles(flat, uf)
+
+    clusters: dict[int, list[RawDigestItem]] = {}
+    for idx, (_, item) in enumerate(flat):
+        clusters.setdefault(uf.find(idx), []).append(item)
+
+    merged = [_combine(c) if len(c) > 1 else c[0] for c in clusters.values()]
+    if len(merged) < len(flat):
+        logger.info(f"Cross-chunk merge: {len(flat)} items → {len(merged)}")
+    return merged
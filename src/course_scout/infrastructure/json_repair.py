@@ -0,0 +1,130 @@
+"""Linear-time repair of truncated or junk-trailed JSON from model output.
+
+Structured outputs occasionally arrive as string-encoded JSON that is cut
+off mid-item (`'[{"title": "a", ...}, {"title": "b", "descr'`) or followed
+by stray text. The old repair re-ran `json.loads` on every prefix from the
+longest down, which is O(n²) on multi-kilobyte item lists — seconds of CPU
+on the event loop for one bad output.
+
+`repair_json(text)` makes at most three linear passes:
+
+  1. `JSONDecoder.raw_decode` — a complete value followed by junk parses
+     as-is, the junk is ignored.
+  2. A bracket/quote state machine finds the last point where every open
+     container can be closed cleanly — right after a `}` / `]` / `[`, or
+     right before a `,` — and records the closers needed there. String
+     bodies are skipped with a regex, so the scan walks only structural
+     characters.
+  3. `json.loads` on that prefix plus its closers.
+
+Cuts are only taken where no object is open apart from a top-level one, so
+a truncated item — including one cut inside its own nested list or object —
+is dropped whole rather than kept with missing or emptied fields: an items
+array keeps exactly its complete items, and an array of scalars keeps its
+complete scalars (`[1,2,3` → `[1, 2]`; the last one may be cut short).
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+_DECODER = json.JSONDecoder()
+_STRUCTURAL = re.compile(r'[\[\]{}",]')
+# Remainder of a string body after its opening quote, through the closing quote.
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_CLOSER = {"[": "]", "{": "}"}
+
+
+class _Containers:
+    """Open-container stack that tracks where the text may be cut and closed."""
+
+    def __init__(self) -> None:
+        self.stack: list[str] = []
+        # Objects open below the top level: items, whose members must not be cut.
+        self.nested_objects = 0
+
+    def closers(self) -> str | None:
+        """Closers for a cut here, or None when the cut would land inside an item."""
+        if not self.stack or self.nested_objects:
+            return None
+        return "".join(reversed(self.stack))
+
+    def open(self, ch: str) -> None:
+        if ch == "{" and self.stack:
+            self.nested_objects += 1
+        self.stack.append(_CLOSER[ch])
+
+    def close(self, ch: str) -> bool:
+        """Pop the container `ch` closes; False when the brackets don't match."""
+        if not self.stack or self.stack.pop() != ch:
+            return False
+        if ch == "}" and self.stack:
+            self.nested_objects -= 1
+        return True
+
+
+def closable_prefix(text: str) -> str | None:
+    """Return the longest prefix of `text` that closes into valid JSON, closers appended.
+
+    Assumes `text` is well-formed up to where it stops; returns None when the
+    brackets are mismatched or no container was ever opened.
+    """
+    containers = _Containers()
+    cut: tuple[int, str] | None = None
+    pos = 0
+    while (match := _STRUCTURAL.search(text, pos)) is not None:
+        ch, i = match.group(), match.start()
+        pos = end = i + 1
+        if ch == '"':
+            tail = _STRING_TAIL.match(text, pos)
+            if tail is None:
+                break  # truncated inside a string
+            pos = tail.end()
+            continue
+        if ch == ",":
+            end = i  # everything before a separator is complete
+        elif ch in _CLOSER:
+            containers.open(ch)
+        elif not containers.close(ch):
+            return None
+        elif not containers.stack:
+            return text[:end]
+        # An empty array is a valid value; an empty object only at the top.
+        if (closers := containers.closers()) is not None:
+            cut = (end, closers)
+    if cut is None:
+        return None
+    end, closers = cut
+    return text[:end] + closers
+
+
+def repair_json(text: str) -> Any | None:
+    """Parse `text`, recovering the longest valid prefix; None if nothing is salvageable."""
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return _DECODER.raw_decode(text)[0]
+    except json.JSONDecodeError:
+        pass
+    prefix = closable_prefix(text)
+    if prefix is None:
+        return None
+    try:
+        return json.loads(prefix)
+    except json.JSONDecodeError:
+        return None
+
+
+def repair_string_json_fields(data: dict) -> dict:
+    """Replace string-encoded list/object field values with their (repaired) parse."""
+    repaired = {}
+    for key, value in data.items():
+        if isinstance(value, str) and value.lstrip().startswith(("[", "{")):
+            parsed = repair_json(value)
+            if parsed is not None:
+                value = parsed
+        repaired[key] = value
+    return repaired
@@ -0,0 +1,338 @@
+"""Adaptive per-topic model router.
+
+`OrchestratedSummarizer._pick_model` only escalates on token budget: every topic
+runs on its configured model even when a cheaper one would do. Quiet topics
+with a handful of simple messages don't need Sonnet.
+
+`ModelRouter` keeps a history of parser calls per topic (latency, cost,
+success — ingested from `UsageStats.calls`) and of benchmark scores per
+prompt family (ingested from `benchmark/results/*.json`). For each topic it
+considers the arms listed below the configured one in `ARMS` that:
+
+  1. have a bench score ≥ `quality_bar` for the topic's prompt family
+     (family-specific score preferred; `*` = scored across all families), and
+  2. have a failure rate ≤ `max_failure_rate` on THIS topic, once they have
+     at least `min_samples` recorded calls there.
+
+Among those, arms without `min_samples` successful calls on the topic are
+tried first, in `ARMS` order; once every candidate is measured, the one with
+the lowest measured cost per call (then latency) wins — and only if it
+measured cheaper than the configured arm, when that is measured too.
+
+The configured (model, effort) is always the fallback. With probability
+`exploration_rate` a random cheaper arm is tried instead, so arms keep
+accumulating per-topic history — one with no failures on the topic that
+either qualifies or has no samples there yet (and no bench score below the
+bar).
+
+State lives in two tables of the shared `data/reports.db`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import sqlite3
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Candidate arms, cheapest first by list price. Order is the prior for arms
+# with no measured cost on a topic yet.
+ARMS: list[tuple[str, str]] = [
+    ("claude-haiku-4-5", "low"),
+    ("claude-haiku-4-5", "medium"),
+    ("claude-sonnet-4-6", "low"),
+    ("claude-sonnet-4-6", "medium"),
+    ("claude-sonnet-4-6", "high"),
+    ("claude-opus-4-7", "medium"),
+    ("claude-opus-4-7", "high"),
+]
+
+ALL_FAMILIES = "*"
+
+
+@dataclass
+class ArmStats:
+    """Aggregated history for one (model, effort) arm on one topic.
+
+    Latency and cost are averaged over successful calls only.
+    """
+
+    calls: int = 0
+    failures: int = 0
+    avg_latency_ms: float = 0.0
+    avg_cost_usd: float = 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.calls if self.calls else 0.0
+
+    @property
+    def successes(self) -> int:
+        return self.calls - self.failures
+
+
+class ModelRouter:
+    """Choose the cheapest historically-adequate (model, effort) per topic."""
+
+    def __init__(
+        self,
+        db_path: str = "data/reports.db",
+        exploration_rate: float = 0.1,
+        quality_bar: float = 0.8,
+        max_failure_rate: float = 0.2,
+        min_samples: int = 3,
+        rng: random.Random | None = None,
+    ):
+        """Initialize the router and its tables in `db_path`."""
+        self.db_path = db_path
+        self.exploration_rate = exploration_rate
+        self.quality_bar = quality_bar
+        self.max_failure_rate = max_failure_rate
+        self.min_samples = min_samples
+        self._rng = rng or random.Random()
+        parent = os.path.dirname(self.db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._init_db()
+
+    @classmethod
+    def from_runtime(cls) -> ModelRouter:
+        """Build a router from the `runtime:` block knobs."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        return cls(
+            exploration_rate=rt.router_exploration_rate,
+            quality_bar=rt.router_quality_bar,
+            max_failure_rate=rt.router_max_failure_rate,
+            min_samples=rt.router_min_samples,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS router_calls (
+                    ts TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    prompt_family TEXT,
+                    model TEXT NOT NULL,
+                    effort TEXT NOT NULL,
+                    latency_ms INTEGER NOT NULL,
+                    cost_usd REAL NOT NULL,
+                    ok INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_router_calls_topic ON router_calls (topic)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS router_bench (
+                    prompt_family TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    effort TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    ts TEXT NOT NULL,
+                    PRIMARY KEY (prompt_family, model, effort)
+                )
+                """
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ── recording ──
+
+    def record_calls(
+        self,
+        topic: str,
+        prompt_family: str | None,
+        effort: str,
+        calls: list[dict],
+        ok: bool = True,
+    ) -> None:
+        """Record `UsageStats.calls` entries for a topic run."""
+        ts = datetime.now(UTC).isoformat()
+        rows = [
+            (
+                ts,
+                topic,
+                prompt_family,
+                c.get("model", ""),
+                effort,
+                int(c.get("duration_ms", 0) or 0),
+                float(c.get("cost_usd", 0.0) or 0.0),
+                int(ok),
+            )
+            for c in calls
+        ]
+        if not rows:
+            return
+        conn = self._connect()
+        try:
+            conn.executemany("INSERT INTO router_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def record_failure(self, topic: str, prompt_family: str | None, model: str, effort: str):
+        """Record a topic run that produced no usable output."""
+        self.record_calls(topic, prompt_family, effort, [{"model": model}], ok=False)
+
+    def record_bench_score(self, prompt_family: str, model: str, effort: str, score: float):
+        """Upsert the latest bench score for (family, model, effort)."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO router_bench VALUES (?, ?, ?, ?, ?)",
+                (prompt_family, model, effort, score, datetime.now(UTC).isoformat()),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def ingest_bench_report(self, path: str | Path, prompt_family: str = ALL_FAMILIES) -> bool:
+        """Load a `bench_categorize.py` report; record its strict-match F1.
+
+        Returns False if the file lacks the expected `meta` / `strict_match` keys.
+        """
+        try:
+            report = json.loads(Path(path).read_text())
+            meta = report["meta"]
+            score = float(report["strict_match"]["f1"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Router: skipping bench report {path}: {e}")
+            return False
+        self.record_bench_score(prompt_family, meta["model"], meta["effort"], score)
+        return True
+
+    # ── querying ──
+
+    def arm_stats(self, topic: str) -> dict[tuple[str, str], ArmStats]:
+        """Return per-arm call/failure/latency/cost aggregates for `topic`."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT model, effort, COUNT(*), SUM(1 - ok), "
+                "AVG(CASE WHEN ok THEN latency_ms END), AVG(CASE WHEN ok THEN cost_usd END) "
+                "FROM router_calls WHERE topic = ? GROUP BY model, effort",
+                (topic,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return {
+            (m, e): ArmStats(n, f or 0, lat or 0.0, cost or 0.0) for m, e, n, f, lat, cost in rows
+        }
+
+    def bench_score(self, prompt_family: str | None, model: str, effort: str) -> float | None:
+        """Return the family's bench score for an arm, falling back to `*`."""
+        conn = self._connect()
+        try:
+            for family in (prompt_family, ALL_FAMILIES):
+                if family is None:
+                    continue
+                row = conn.execute(
+                    "SELECT score FROM router_bench "
+                    "WHERE prompt_family = ? AND model = ? AND effort = ?",
+                    (family, model, effort),
+                ).fetchone()
+                if row is not None:
+                    return row[0]
+            return None
+        finally:
+            conn.close()
+
+    def _qualifies(
+        self,
+        arm: tuple[str, str],
+        prompt_family: str | None,
+        stats: dict[tuple[str, str], ArmStats],
+    ) -> bool:
+        score = self.bench_score(prompt_family, *arm)
+        if score is None or score < self.quality_bar:
+            return False
+        s = stats.get(arm)
+        if s is not None and s.calls >= self.min_samples:
+            return s.failure_rate <= self.max_failure_rate
+        return True
+
+    def _explorable(
+        self,
+        arm: tuple[str, str],
+        prompt_family: str | None,
+        stats: dict[tuple[str, str], ArmStats],
+    ) -> bool:
+        """Whether exploration may try `arm` on this topic.
+
+        It must have no recorded failures there, and either qualify or have no
+        samples there yet (and no bench score below the bar).
+        """
+        s = stats.get(arm)
+        if s is not None and s.failures:
+            return False
+        if s is None or not s.calls:
+            score = self.bench_score(prompt_family, *arm)
+            return score is None or score >= self.quality_bar
+        return self._qualifies(arm, prompt_family, stats)
+
+    def _measured(self, stats: ArmStats | None) -> bool:
+        return stats is not None and stats.successes >= self.min_samples
+
+    def _rank(
+        self,
+        arms: list[tuple[str, str]],
+        default: tuple[str, str],
+        stats: dict[tuple[str, str], ArmStats],
+    ) -> tuple[str, str] | None:
+        """Pick among qualifying arms: unmeasured first, else the cheapest measured."""
+        unmeasured = [arm for arm in arms if not self._measured(stats.get(arm))]
+        if unmeasured:
+            return unmeasured[0]
+        if not arms:
+            return None
+        best = min(arms, key=lambda a: (stats[a].avg_cost_usd, stats[a].avg_latency_ms))
+        if self._measured(stats.get(default)) and (
+            stats[best].avg_cost_usd >= stats[default].avg_cost_usd
+        ):
+            return None
+        return best
+
+    def choose(
+        self,
+        topic: str,
+        prompt_family: str | None,
+        default: tuple[str, str],
+    ) -> tuple[str, str]:
+        """Return the (model, effort) to use for `topic`.
+
+        Only arms listed below `default` are considered — the router moves
+        topics down, never up (token-budget escalation still handles "up").
+        """
+        cheaper = ARMS[: ARMS.index(default)] if default in ARMS else []
+        if not cheaper:
+            return default
+        stats = self.arm_stats(topic)
+        if self._rng.random() < self.exploration_rate:
+            explorable = [arm for arm in cheaper if self._explorable(arm, prompt_family, stats)]
+            if explorable:
+                arm = self._rng.choice(explorable)
+                logger.info(f"Router[{topic}]: exploring {arm[0]}/{arm[1]}")
+                return arm
+        qualifying = [arm for arm in cheaper if self._qualifies(arm, prompt_family, stats)]
+        arm = self._rank(qualifying, default, stats)
+        if arm is None:
+            return default
+        logger.info(f"Router[{topic}]: {default[0]}/{default[1]} → {arm[0]}/{arm[1]}")
+        return arm
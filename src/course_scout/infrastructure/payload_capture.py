@@ -0,0 +1,289 @@
+"""Sampled capture of agent call payloads, for rebuilding benchmark fixtures.
+
+`AIAgent.run` used to log every call's full `input_data.model_dump_json()`
+at DEBUG, and `benchmark/sample.py` regex-parsed `course_scout.log` to get
+the payloads back. That serialized each payload into a log line on every
+call, and fixtures broke whenever the 10 MB × 5 rotation dropped the lines.
+
+`PayloadCapture` writes one JSON record per sampled call, with model,
+stage, topic, timing, and the request and output JSON embedded verbatim
+(no second serialization of the input):
+
+    <capture_dir>/<YYYY-MM-DD>/captures-<pid>.jsonl.gz   one gzip member per record
+    <capture_dir>/index.db                               one row per record
+
+Each index row holds the record's file and byte offset, plus the fields
+fixtures filter on (topic, first message date, message count). Readers
+seek straight to a record instead of scanning. Files are per process, so
+concurrent scans never interleave bytes.
+
+`runtime.capture_sample_rate` sets the fraction of calls kept; it is 0 (off)
+unless fixtures are being collected. `submit` only builds the record on the
+caller's side; a daemon writer thread compresses, appends and indexes it
+(`flush()` waits for it, and runs at exit). When the writer starts it drops
+day partitions older than `runtime.capture_max_age_days`, index rows included.
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+_DAY_DIR = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class PayloadCapture:
+    """Append-only, date-partitioned store of sampled call payloads."""
+
+    def __init__(
+        self,
+        root: str | Path = "data/captures",
+        sample_rate: float = 0.0,
+        max_age_days: int = 30,
+        rng: Callable[[], float] = random.random,
+    ):
+        """Create `root` and its index if missing."""
+        self.root = Path(root)
+        self.sample_rate = sample_rate
+        self.max_age_days = max_age_days
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(self.root / "index.db")
+        self._init_db()
+
+    @classmethod
+    def from_runtime(cls) -> PayloadCapture:
+        """Build a capture store from the `runtime:` block knobs."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        return cls(rt.capture_dir, rt.capture_sample_rate, rt.capture_max_age_days)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS captures (
+                    ts REAL NOT NULL,
+                    day TEXT NOT NULL,
+                    file TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    model TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    topic_context TEXT,
+                    scan_date TEXT,
+                    n_messages INTEGER NOT NULL,
+                    duration_ms INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_captures_scan_date ON captures (scan_date)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_captures_day ON captures (day)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def should_sample(self) -> bool:
+        """Decide, per call, whether to capture it."""
+        return self.sample_rate > 0 and self._rng() < self.sample_rate
+
+    def submit(
+        self,
+        model: str,
+        input_data: BaseModel,
+        input_json: str,
+        output: BaseModel,
+        duration_ms: int,
+    ) -> None:
+        """Queue one record for the background writer; never blocks or raises."""
+        try:
+            record = self._record(model, input_data, input_json, output, duration_ms)
+        except Exception as e:
+            logger.warning(f"Payload capture failed: {e}")
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_queued, name="payload-capture", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.flush)
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        """Block until every submitted record has been written."""
+        self._queue.join()
+
+    def write(
+        self,
+        model: str,
+        input_data: BaseModel,
+        input_json: str,
+        output: BaseModel,
+        duration_ms: int,
+    ) -> None:
+        """Append one record and index it now. Errors are logged, never raised."""
+        try:
+            self._append(self._record(model, input_data, input_json, output, duration_ms))
+        except Exception as e:
+            logger.warning(f"Payload capture failed: {e}")
+
+    def _write_queued(self) -> None:
+        if self.max_age_days > 0:
+            try:
+                self.prune(self.max_age_days)
+            except Exception as e:  # a failed prune must not kill the writer
+                logger.warning(f"Payload capture prune failed: {e}")
+        while True:
+            record = self._queue.get()
+            try:
+                self._append(record)
+            except Exception as e:
+                logger.warning(f"Payload capture failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _record(
+        model: str,
+        input_data: BaseModel,
+        input_json: str,
+        output: BaseModel,
+        duration_ms: int,
+    ) -> tuple:
+        """Build the JSON line and index fields; labels are read from the caller's context."""
+        from course_scout.infrastructure.telemetry import current_labels
+
+        stage, topic = current_labels()
+        now = time.time()
+        msgs = getattr(input_data, "messages", None) or []
+        meta = {
+            "ts": now,
+            "model": model,
+            "stage": stage,
+            "topic": topic,
+            "duration_ms": duration_ms,
+        }
+        line = (
+            f'{json.dumps(meta)[:-1]}, "input": {input_json}, '
+            f'"output": {output.model_dump_json()}}}\n'
+        )
+        return (
+            now,
+            line,
+            model,
+            stage,
+            getattr(input_data, "topic_context", None),
+            msgs[0].timestamp[:10] if msgs else None,
+            len(msgs),
+            duration_ms,
+        )
+
+    def _append(self, record: tuple) -> None:
+        now, line, *fields = record
+        day = datetime.fromtimestamp(now, UTC).strftime("%Y-%m-%d")
+        rel = f"{day}/captures-{os.getpid()}.jsonl.gz"
+        path = self.root / rel
+        with self._lock:
+            path.parent.mkdir(exist_ok=True)
+            with path.open("ab") as f:
+                offset = f.tell()
+                f.write(gzip.compress(line.encode()))
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO captures VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (now, day, rel, offset, *fields),
+                    )
+            finally:
+                conn.close()
+
+    def prune(self, max_age_days: int) -> int:
+        """Delete capture days older than `max_age_days`; return the index rows removed."""
+        cutoff = (datetime.now(UTC) - timedelta(days=max_age_days)).strftime("%Y-%m-%d")
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    removed = conn.execute("DELETE FROM captures WHERE day < ?", (cutoff,)).rowcount
+            finally:
+                conn.close()
+            for day_dir in self.root.iterdir():
+                if day_dir.is_dir() and _DAY_DIR.fullmatch(day_dir.name) and day_dir.name < cutoff:
+                    shutil.rmtree(day_dir, ignore_errors=True)
+        if removed:
+            logger.info(f"Payload capture: pruned {removed} record(s) before {cutoff}")
+        return removed
+
+    def iter_records(
+        self, stage: str | None = None, since: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Yield captured records in write order, optionally filtered.
+
+        `since` is an ISO date compared against the first message's date.
+        """
+        query = "SELECT file, offset FROM captures WHERE 1=1"
+        params: list[Any] = []
+        if stage is not None:
+            query += " AND stage = ?"
+            params.append(stage)
+        if since is not None:
+            query += " AND scan_date >= ?"
+            params.append(since)
+        conn = self._connect()
+        try:
+            rows = conn.execute(query + " ORDER BY ts", params).fetchall()
+        finally:
+            conn.close()
+        for rel, offset in rows:
+            try:
+                with (self.root / rel).open("rb") as f:
+                    f.seek(offset)
+                    with gzip.GzipFile(fileobj=f) as member:
+                        yield json.loads(member.readline())
+            except (OSError, EOFError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping unreadable capture {rel}@{offset}: {e}")
+
+
+_capture: PayloadCapture | None = None
+
+
+def get_payload_capture() -> PayloadCapture | None:
+    """Return the process-wide capture store, or None when sampling is off."""
+    global _capture
+    if _capture is None:
+        from course_scout.infrastructure.runtime import get_runtime
+
+        if get_runtime().capture_sample_rate <= 0:
+            return None
+        _capture = PayloadCapture.from_runtime()
+    return _capture
@@ -0,0 +1,172 @@
+"""Anthropic Message Batches API client.
+
+The Claude Agent SDK has no batch endpoint, so batch mode talks to the
+Messages Batches HTTP API directly (`/v1/messages/batches`). Batched calls
+are billed at half the interactive price and don't count against the
+per-minute request limit — a good fit for the nightly scan, which has no
+latency requirement.
+
+Structured output is requested the same way the SDK does it: a single
+`StructuredOutput` tool whose `input_schema` is the output schema, forced via
+`tool_choice`. Extended thinking is incompatible with a forced tool choice,
+so batched calls run without it.
+
+Auth uses `ANTHROPIC_API_KEY` (a Max-plan SDK login is not enough);
+`ANTHROPIC_BASE_URL` overrides the endpoint (the test suite points it at a
+local stand-in server).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any
+
+import httpx
+
+from course_scout.domain.models import BatchRequest, BatchResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+STRUCTURED_TOOL = "StructuredOutput"
+
+# List prices, USD per million tokens. Batch calls are billed at BATCH_DISCOUNT.
+_PRICING: dict[str, dict[str, float]] = {
+    "claude-haiku-4-5": {"input": 1.0, "output": 5.0},
+    "claude-sonnet-4-6": {"input": 3.0, "output": 15.0},
+    "claude-opus-4-7": {"input": 5.0, "output": 25.0},
+}
+BATCH_DISCOUNT = 0.5
+
+
+def estimate_cost(model: str, usage: dict) -> float:
+    """List-price cost of one call (0.0 for models not in the table)."""
+    prices = _PRICING.get(model)
+    if not prices:
+        return 0.0
+    return (
+        usage.get("input_tokens", 0) * prices["input"]
+        + usage.get("cache_read_input_tokens", 0) * prices["input"] * 0.1
+        + usage.get("output_tokens", 0) * prices["output"]
+    ) / 1_000_000
+
+
+def estimate_batch_cost(model: str, usage: dict) -> float:
+    """Discounted cost of one batched call (0.0 for models not in the table)."""
+    return estimate_cost(model, usage) * BATCH_DISCOUNT
+
+
+def build_params(request: BatchRequest, max_tokens: int) -> dict:
+    """Messages API params for one batched structured-output call."""
+    content: Any = request.input_data
+    if request.media_paths:
+        from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
+
+        blocks = ClaudeProvider._build_image_blocks(request.media_paths)
+        if blocks:
+            content = [{"type": "text", "text": request.input_data}, *blocks]
+    return {
+        "model": request.model_id,
+        "max_tokens": max_tokens,
+        "system": request.system_prompt,
+        "messages": [{"role": "user", "content": content}],
+        "tools": [
+            {
+                "name": STRUCTURED_TOOL,
+                "description": "Return the final structured output.",
+                "input_schema": request.output_schema,
+            }
+        ],
+        "tool_choice": {"type": "tool", "name": STRUCTURED_TOOL},
+    }
+
+
+def parse_result_line(line: dict) -> BatchResult:
+    """Convert one line of the batch results JSONL into a BatchResult."""
+    custom_id = line.get("custom_id", "")
+    result = line.get("result") or {}
+    rtype = result.get("type")
+    if rtype != "succeeded":
+        err = (result.get("error") or {}).get("error") or result.get("error") or {}
+        message = err.get("message") if isinstance(err, dict) else str(err)
+        return BatchResult(custom_id=custom_id, ok=False, error=f"{rtype}: {message or rtype}")
+    message = result.get("message") or {}
+    output = None
+    text = None
+    for block in message.get("content") or []:
+        if block.get("type") == "tool_use" and block.get("name") == STRUCTURED_TOOL:
+            output = block.get("input")
+        elif block.get("type") == "text":
+            text = block.get("text")
+    return BatchResult(
+        custom_id=custom_id, ok=True, output=output, text=text, usage=message.get("usage") or {}
+    )
+
+
+class AnthropicBatchClient:
+    """Thin async client for create / retrieve / results of message batches."""
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = 60.0,
+    ):
+        """Initialize from arguments or `ANTHROPIC_API_KEY` / `ANTHROPIC_BASE_URL`."""
+        self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY", "")
+        self.base_url = (
+            base_url or os.environ.get("ANTHROPIC_BASE_URL") or DEFAULT_BASE_URL
+        ).rstrip("/")
+        self.timeout = timeout
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "x-api-key": self.api_key,
+            "anthropic-version": ANTHROPIC_VERSION,
+            "content-type": "application/json",
+        }
+
+    async def create(self, requests: list[BatchRequest], max_tokens: int) -> str:
+        payload = {
+            "requests": [
+                {"custom_id": r.custom_id, "params": build_params(r, max_tokens)} for r in requests
+            ]
+        }
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            resp = await client.post(
+                f"{self.base_url}/v1/messages/batches", headers=self._headers(), json=payload
+            )
+            resp.raise_for_status()
+            batch = resp.json()
+        logger.info(f"Submitted batch {batch['id']} with {len(requests)} request(s)")
+        return batch["id"]
+
+    async def retrieve(self, batch_id: str) -> dict:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            resp = await client.get(
+                f"{self.base_url}/v1/messages/batches/{batch_id}", headers=self._headers()
+            )
+            resp.raise_for_status()
+            return resp.json()
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        batch = await self.retrieve(batch_id)
+        url = batch.get("results_url") or f"{self.base_url}/v1/messages/batches/{batch_id}/results"
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            resp = await client.get(url, headers=self._headers())
+            resp.raise_for_status()
+            body = resp.text
+        out: dict[str, BatchResult] = {}
+        for raw in body.splitlines():
+            if not raw.strip():
+                continue
+            try:
+                res = parse_result_line(json.loads(raw))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Batch {batch_id}: unparseable result line skipped ({e})")
+                continue
+            out[res.custom_id] = res
+        return out
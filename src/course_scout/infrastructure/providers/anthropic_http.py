@@ -0,0 +1,205 @@
+"""Direct Messages API provider over one shared, pooled HTTP client.
+
+`ClaudeProvider` goes through the Claude Agent SDK, which spawns (or, with
+`sdk_client_pool_size`, reuses) a `claude` CLI subprocess per call. For
+models listed in `runtime.anthropic_http_models`, `AnthropicHTTPProvider`
+instead POSTs to `/v1/messages` itself:
+
+  - One process-wide `httpx.AsyncClient` (see `http_clients.py`) with
+    keep-alive, so TLS handshakes are paid once per connection, not per call.
+    It speaks HTTP/2 (`httpx[http2]` is a declared dependency), so concurrent
+    calls multiplex over one connection; an install without `h2` falls back
+    to HTTP/1.1 keep-alive.
+  - Structured output the same way batch mode requests it: a forced
+    `StructuredOutput` tool whose `input_schema` is the output schema (see
+    `anthropic_batch.build_params`). Forced tool choice rules out extended
+    thinking, so these calls run without it.
+  - Always streamed (SSE), so `on_item` receives items as their JSON closes
+    and time to first byte is recorded alongside the SDK paths in
+    `sdk_pool.StartupStats` (path "http").
+  - Usage from `message_start` / `message_delta` lands in the same
+    `UsageStats` fields, priced at list price.
+
+Auth uses `ANTHROPIC_API_KEY`; `ANTHROPIC_BASE_URL` overrides the endpoint
+(the test suite points it at a local stand-in server). Batch mode and
+output parsing are inherited from `ClaudeProvider`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+
+from course_scout.domain.models import BatchRequest
+from course_scout.infrastructure.http_clients import pooled_httpx_client, shared_client
+from course_scout.infrastructure.providers.anthropic_batch import (
+    ANTHROPIC_VERSION,
+    DEFAULT_BASE_URL,
+    STRUCTURED_TOOL,
+    build_params,
+    estimate_cost,
+)
+from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
+from course_scout.infrastructure.schema_cache import schema_for
+from course_scout.infrastructure.sdk_pool import get_startup_stats
+from course_scout.infrastructure.streaming import IncrementalItemParser
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared Messages API client for the running event loop."""
+    return shared_client(("anthropic",), lambda: pooled_httpx_client(http2=HTTP2_AVAILABLE))
+
+
+class _StreamState:
+    """Accumulates one streamed message: blocks, usage, stop reason."""
+
+    def __init__(self) -> None:
+        """Start with no blocks and zero usage."""
+        self.usage: dict[str, int] = {}
+        self.blocks: dict[int, dict] = {}
+        self.tool_output: dict | None = None
+        self.last_text: str | None = None
+        self.stop_reason: str | None = None
+        self.item_parser = IncrementalItemParser()
+
+    def feed(self, event: dict, on_item: Callable[[dict], None] | None) -> None:
+        etype = event.get("type")
+        if etype == "message_start":
+            self.usage.update((event.get("message") or {}).get("usage") or {})
+        elif etype == "content_block_start":
+            block = dict(event.get("content_block") or {})
+            block["buffer"] = ""
+            self.blocks[event.get("index", 0)] = block
+        elif etype == "content_block_delta":
+            delta = event.get("delta") or {}
+            block = self.blocks.get(event.get("index", 0))
+            if block is not None:
+                block["buffer"] += delta.get("partial_json") or delta.get("text") or ""
+        elif etype == "content_block_stop":
+            self._close_block(self.blocks.get(event.get("index", 0)))
+        elif etype == "message_delta":
+            self.usage.update(event.get("usage") or {})
+            self.stop_reason = (event.get("delta") or {}).get("stop_reason") or self.stop_reason
+        elif etype == "error":
+            err = event.get("error") or {}
+            raise RuntimeError(
+                f"Messages API stream error ({err.get('type')}): {err.get('message')}"
+            )
+        if on_item is not None:
+            self.item_parser = ClaudeProvider._feed_stream_event(event, self.item_parser, on_item)
+
+    def _close_block(self, block: dict | None) -> None:
+        if block is None:
+            return
+        if block.get("type") == "tool_use" and block.get("name") == STRUCTURED_TOOL:
+            try:
+                self.tool_output = json.loads(block["buffer"]) if block["buffer"] else {}
+            except json.JSONDecodeError as e:
+                logger.warning(f"StructuredOutput input is not valid JSON: {e}")
+        elif block.get("type") == "text":
+            self.last_text = block["buffer"]
+
+
+class AnthropicHTTPProvider(ClaudeProvider):
+    """`ClaudeProvider` that calls the Messages API directly instead of the SDK."""
+
+    def __init__(
+        self,
+        thinking: str = "adaptive",
+        effort: str = "medium",
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ):
+        """Initialize from arguments or `ANTHROPIC_API_KEY` / `ANTHROPIC_BASE_URL`."""
+        super().__init__(thinking=thinking, effort=effort)
+        self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY", "")
+        self.base_url = (
+            base_url or os.environ.get("ANTHROPIC_BASE_URL") or DEFAULT_BASE_URL
+        ).rstrip("/")
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "x-api-key": self.api_key,
+            "anthropic-version": ANTHROPIC_VERSION,
+            "content-type": "application/json",
+            "accept": "text/event-stream",
+        }
+
+    async def prewarm(
+        self, model_id: str, system_prompt: str, output_schema: type, stream: bool = True
+    ) -> None:
+        """No-op: connections open on first use and stay alive in the shared client."""
+        return None
+
+    async def generate_structured(
+        self,
+        model_id: str,
+        system_prompt: str,
+        input_data: str,
+        output_schema: type,
+        media_paths: list[str] | None = None,
+        on_item: Callable[[dict], None] | None = None,
+    ) -> Any:
+        """Generate structured output with one streamed Messages API call."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        request = BatchRequest(
+            custom_id="",
+            model_id=model_id,
+            system_prompt=system_prompt,
+            input_data=input_data,
+            output_schema=schema_for(output_schema).json_schema,
+            media_paths=media_paths or [],
+        )
+        max_tokens = get_runtime().anthropic_http_max_tokens
+        if media_paths:
+            params = await asyncio.to_thread(build_params, request, max_tokens)
+        else:
+            params = build_params(request, max_tokens)
+        params["stream"] = True
+
+        state = _StreamState()
+        started = time.monotonic()
+        first = True
+        client = get_http_client()
+        async with client.stream(
+            "POST", f"{self.base_url}/v1/messages", headers=self._headers(), json=params
+        ) as resp:
+            if resp.is_error:
+                await resp.aread()
+                resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if first:
+                    get_startup_stats().record("http", (time.monotonic() - started) * 1000)
+                    first = False
+                if line.startswith("data:"):
+                    state.feed(json.loads(line[5:]), on_item)
+        duration_ms = int((time.monotonic() - started) * 1000)
+
+        self.usage.record_usage(
+            model_id, state.usage, duration_ms, cost_usd=estimate_cost(model_id, state.usage)
+        )
+        logger.info(
+            f"[{model_id}] {state.usage.get('input_tokens', 0)} in / "
+            f"{state.usage.get('output_tokens', 0)} out / "
+            f"{state.usage.get('cache_read_input_tokens', 0)} cache / "
+            f"{duration_ms}ms / http"
+        )
+        if state.stop_reason == "max_tokens":
+            logger.warning(f"[{model_id}] output truncated at max_tokens={max_tokens}")
+        self.last_thinking = ""
+        return await self._parse_output_off_loop(
+            output_schema, None, state.tool_output, state.last_text
+        )
@@ -1,22 +1,38 @@
+import asyncio
 import logging
-from collections.abc import AsyncIterator
-from dataclasses import dataclass, field
+import re
+import time
+from collections.abc import AsyncIterator, Callable
 from typing import Any, Literal, cast
 
 from claude_agent_sdk import (
     AssistantMessage,
     ClaudeAgentOptions,
     ResultMessage,
+    StreamEvent,
     TextBlock,
     ThinkingBlock,
     ToolUseBlock,
     query,
 )
 
+from course_scout.domain.models import BatchRequest, BatchResult, RateLimitSignal
 from course_scout.domain.services import AIProvider
+from course_scout.infrastructure.backoff import classify_rate_limit
+from course_scout.infrastructure.json_repair import repair_json, repair_string_json_fields
+from course_scout.infrastructure.providers.anthropic_batch import (
+    AnthropicBatchClient,
+    estimate_batch_cost,
+)
+from course_scout.infrastructure.schema_cache import OutputValidationError, schema_for
+from course_scout.infrastructure.sdk_pool import get_client_pool, sdk_messages
+from course_scout.infrastructure.streaming import IncrementalItemParser
+from course_scout.infrastructure.telemetry import UsageStats
 
 logger = logging.getLogger(__name__)
 
+_USAGE_LIMIT = re.compile(r"usage limit reached\|(\d{9,})", re.IGNORECASE)
+
 
 async def _stream_user_turn(content: str | list[dict]) -> AsyncIterator[dict]:
     """Wrap content in the stream-json user-turn envelope expected by
@@ -36,69 +52,9 @@ async def _stream_user_turn(content: str | list[dict]) -> AsyncIterator[dict]:
     }
 
 
-@dataclass
-class UsageStats:
-    """Tracks cumulative usage across calls."""
-
-    total_input_tokens: int = 0
-    total_output_tokens: int = 0
-    total_cache_read_tokens: int = 0
-    total_cache_creation_tokens: int = 0
-    total_cost_usd: float = 0.0
-    total_duration_ms: int = 0
-    call_count: int = 0
-    calls: list[dict] = field(default_factory=list)
-
-    def record(self, result: ResultMessage, model: str):
-        """Record usage from a ResultMessage."""
-        self.call_count += 1
-        self.total_duration_ms += result.duration_ms or 0
-        self.total_cost_usd += result.total_cost_usd or 0.0
-
-        usage = result.usage or {}
-        input_tok = usage.get("input_tokens", 0)
-        output_tok = usage.get("output_tokens", 0)
-        cache_read = usage.get("cache_read_input_tokens", 0)
-        cache_create = usage.get("cache_creation_input_tokens", 0)
-
-        self.total_input_tokens += input_tok
-        self.total_output_tokens += output_tok
-        self.total_cache_read_tokens += cache_read
-        self.total_cache_creation_tokens += cache_create
-
-        self.calls.append(
-            {
-                "model": model,
-                "input_tokens": input_tok,
-                "output_tokens": output_tok,
-                "cache_read": cache_read,
-                "duration_ms": result.duration_ms or 0,
-                "cost_usd": result.total_cost_usd or 0.0,
-            }
-        )
-
-    def summary(self) -> str:
-        """Return a formatted usage summary with Max plan budget estimate."""
-        daily_budget = 5_000_000
-        five_hour_budget = daily_budget * (5 / 24)
-        daily_pct = (self.total_output_tokens / daily_budget * 100) if daily_budget else 0
-        window_pct = (self.total_output_tokens / five_hour_budget * 100) if five_hour_budget else 0
-
-        lines = [
-            f"━━━ Usage Summary ({self.call_count} API calls) ━━━",
-            f"  Input tokens:  {self.total_input_tokens:,}",
-            f"  Output tokens: {self.total_output_tokens:,}",
-            f"  Cache read:    {self.total_cache_read_tokens:,}",
-            f"  Total time:    {self.total_duration_ms / 1000:.1f}s",
-            f"  Est. cost:     ${self.total_cost_usd:.4f}",
-            "  ── Max Plan Budget (approx) ──",
-            f"  5h window:     ~{window_pct:.1f}% used",
-            f"  Daily:         ~{daily_pct:.1f}% used",
-        ]
-        return "\n".join(lines)
-
-
 class ClaudeProvider(AIProvider):
+    supports_batch = True
+
     def __init__(self, thinking: str = "adaptive", effort: str = "medium"):
         """Initialize with thinking/effort config. Auth handled by Claude Agent SDK."""
         self.usage = UsageStats()
@@ -116,25 +72,13 @@ class ClaudeProvider(AIProvider):
             return {"type": "disabled"}
         return {"type": "adaptive"}
 
-    async def generate_structured(
-        self,
-        model_id: str,
-        system_prompt: str,
-        input_data: str,
-        output_schema: type,
-        media_paths: list[str] | None = None,
-    ) -> Any:
-        """Generate structured output using Claude Agent SDK.
-
-        If `media_paths` is provided, each path is attached to the user message
-        as a base64-encoded image block (native Claude vision). Files >5MB or
-        non-image paths are skipped silently.
-        """
-        schema = output_schema.model_json_schema()
-
+    def _options(
+        self, model_id: str, system_prompt: str, output_schema: type, stream: bool
+    ) -> ClaudeAgentOptions:
+        """Build the SDK options for one structured call (also the client-pool key)."""
         from course_scout.infrastructure.runtime import get_runtime
 
-        options = ClaudeAgentOptions(
+        return ClaudeAgentOptions(
             model=model_id,
             system_prompt=system_prompt,
             # max_turns is read from runtime config (default 5). With structured
@@ -145,15 +89,45 @@ class ClaudeProvider(AIProvider):
             allowed_tools=[],
             thinking=cast(Any, self._thinking_config()),
             effort=cast(Literal["low", "medium", "high", "max"], self.effort),
-            output_format={"type": "json_schema", "schema": schema},
+            output_format={"type": "json_schema", "schema": schema_for(output_schema).json_schema},
+            include_partial_messages=stream,
         )
 
+    async def prewarm(
+        self, model_id: str, system_prompt: str, output_schema: type, stream: bool = True
+    ) -> None:
+        """Connect a pooled SDK client for these call options (no-op when pooling is off)."""
+        pool = get_client_pool()
+        if pool is not None:
+            await pool.prewarm(self._options(model_id, system_prompt, output_schema, stream))
+
+    async def generate_structured(
+        self,
+        model_id: str,
+        system_prompt: str,
+        input_data: str,
+        output_schema: type,
+        media_paths: list[str] | None = None,
+        on_item: Callable[[dict], None] | None = None,
+    ) -> Any:
+        """Generate structured output using Claude Agent SDK.
+
+        If `media_paths` is provided, each path is attached to the user message
+        as a base64-encoded image block (native Claude vision), downscaled and
+        re-encoded off the event loop. Undecodable or non-image paths are skipped.
+
+        If `on_item` is provided, partial-message streaming is enabled and each
+        element of the output's `items` array is passed to it as soon as its
+        JSON object closes — before the final ResultMessage arrives.
+        """
+        options = self._options(model_id, system_prompt, output_schema, stream=on_item is not None)
+
         # Build prompt: plain string for text-only, AsyncIterable envelope for
         # multi-modal. The SDK treats a bare list as neither str nor
         # AsyncIterable and hangs stdin — always wrap multi-block content.
         prompt: str | AsyncIterator[dict] = input_data
         if media_paths:
-            content_blocks = self._build_image_blocks(media_paths)
+            content_blocks = await asyncio.to_thread(self._build_image_blocks, media_paths)
             if content_blocks:
                 combined = [{"type": "text", "text": input_data}, *content_blocks]
                 prompt = _stream_user_turn(combined)
@@ -163,80 +137,137 @@ class ClaudeProvider(AIProvider):
                     f"(~{total_bytes // 1024} KB)"
                 )
 
-        structured, tool_output, last_text = await self._collect_messages(prompt, options, model_id)
-        return self._parse_output(output_schema, structured, tool_output, last_text)
+        structured, tool_output, last_text = await self._collect_messages(
+            prompt, options, model_id, on_item=on_item
+        )
+        return await self._parse_output_off_loop(output_schema, structured, tool_output, last_text)
+
+    def classify_rate_limit(self, exc: BaseException) -> RateLimitSignal | None:
+        """Classify SDK/CLI rate-limit errors, including subscription usage limits.
+
+        The bundled CLI reports a Max-plan usage cap as
+        "Claude AI usage limit reached|<reset epoch>"; the epoch becomes the
+        retry-after hint (usually far beyond `rate_limit_max_wait`, so the
+        agent fails over instead of sleeping).
+        """
+        signal = classify_rate_limit(exc)
+        if signal is None:
+            return None
+        m = _USAGE_LIMIT.search(str(exc))
+        if m:
+            retry_after = max(0.0, int(m.group(1)) - time.time())
+            return RateLimitSignal(retry_after=retry_after, source="usage_limit")
+        return signal
+
+    # ── Batch interface (Messages Batches API over HTTP; see anthropic_batch.py) ──
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        from course_scout.infrastructure.runtime import get_runtime
+
+        return await AnthropicBatchClient().create(requests, get_runtime().batch_max_tokens)
+
+    async def batch_done(self, batch_id: str) -> bool:
+        batch = await AnthropicBatchClient().retrieve(batch_id)
+        return batch.get("processing_status") == "ended"
+
+    async def fetch_batch_results(self, batch_id: str) -> dict[str, BatchResult]:
+        return await AnthropicBatchClient().results(batch_id)
+
+    def parse_batch_result(self, model_id: str, result: BatchResult, output_schema: type) -> Any:
+        if not result.ok:
+            raise RuntimeError(f"Batch request {result.custom_id} failed: {result.error}")
+        self.usage.record_usage(
+            model_id, result.usage, cost_usd=estimate_batch_cost(model_id, result.usage)
+        )
+        return self._parse_output(output_schema, None, result.output, result.text)
 
     @staticmethod
     def _build_image_blocks(media_paths: list[str]) -> list[dict]:
-        """Convert local image paths to base64 content blocks. Skips missing,
-        oversized, or non-image files.
+        """Convert local image paths to base64 content blocks via `image_prep`
+        (downscaled, re-encoded, cached). Skips missing or undecodable files.
         """  # noqa: D205
-        import base64
-        import os
-
-        MAX_BYTES = 5 * 1024 * 1024
-        SUPPORTED = {
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".png": "image/png",
-            ".webp": "image/webp",
-            ".gif": "image/gif",
-        }
-        blocks: list[dict] = []
-        for path in media_paths:
-            if not path or not os.path.exists(path):
-                continue
-            ext = os.path.splitext(path)[1].lower()
-            media_type = SUPPORTED.get(ext)
-            if media_type is None:
-                continue
-            try:
-                if os.path.getsize(path) > MAX_BYTES:
-                    logger.warning(f"Skipping {path}: >5MB")
-                    continue
-                with open(path, "rb") as f:
-                    data = base64.standard_b64encode(f.read()).decode("ascii")
-                blocks.append(
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": data,
-                        },
-                    }
-                )
-            except OSError as e:
-                logger.warning(f"Skipping {path}: {e}")
-        return blocks
+        from course_scout.infrastructure.image_prep import prepare_many
+
+        return [p.content_block() for p in prepare_many(media_paths) if p is not None]
 
-    async def _collect_messages(self, input_data, options, model_id):
-        """Iterate SDK messages and extract structured output, tool output, text, thinking."""
+    async def _collect_messages(self, input_data, options, model_id, on_item=None):
+        """Iterate SDK messages and extract structured output, tool output, text, thinking.
+
+        With `on_item`, StreamEvent deltas are fed through an IncrementalItemParser
+        (one per content block) and completed items are forwarded immediately.
+        """
         structured = None
         tool_output = None
         last_text = None
         thinking_chunks: list[str] = []
-
-        async for message in query(prompt=input_data, options=options):
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, ToolUseBlock) and block.name == "StructuredOutput":
-                        tool_output = block.input
-                    elif isinstance(block, TextBlock):
-                        last_text = block.text
-                    elif isinstance(block, ThinkingBlock):
-                        thinking_chunks.append(block.thinking)
+        item_parser = IncrementalItemParser()
+
+        async for message in sdk_messages(input_data, options, query):
+            if isinstance(message, StreamEvent):
+                if on_item is not None:
+                    item_parser = self._feed_stream_event(message.event, item_parser, on_item)
+            elif isinstance(message, AssistantMessage):
+                tool_output, last_text = self._read_assistant_blocks(
+                    message, tool_output, last_text, thinking_chunks
+                )
             elif isinstance(message, ResultMessage):
-                if message.is_error:
-                    logger.warning(f"ResultMessage error: {message.subtype}")
-                self.usage.record(message, model_id)
-                self._log_usage(message, model_id)
+                self._record_result(message, model_id)
                 if message.structured_output is not None:
                     structured = message.structured_output
 
         self.last_thinking = "\n\n".join(thinking_chunks)
         return structured, tool_output, last_text
 
+    @staticmethod
+    def _read_assistant_blocks(message, tool_output, last_text, thinking_chunks: list[str]):
+        """Pick the StructuredOutput tool input and last text out of one message.
+
+        Thinking blocks are appended to `thinking_chunks`.
+        """
+        for block in message.content:
+            if isinstance(block, ToolUseBlock) and block.name == "StructuredOutput":
+                tool_output = block.input
+            elif isinstance(block, TextBlock):
+                last_text = block.text
+            elif isinstance(block, ThinkingBlock):
+                thinking_chunks.append(block.thinking)
+        return tool_output, last_text
+
+    def _record_result(self, message, model_id):
+        """Record a ResultMessage's usage; raise on a rate-limit error result."""
+        if message.is_error:
+            logger.warning(f"ResultMessage error: {message.subtype}")
+        self.usage.record_usage(
+            model_id,
+            message.usage or {},
+            message.duration_ms or 0,
+            message.total_cost_usd or 0.0,
+        )
+        self._log_usage(message, model_id)
+        if message.is_error and classify_rate_limit(RuntimeError(message.result or "")):
+            # Surface the CLI's error text so the agent can back off on it.
+            raise RuntimeError(f"Claude SDK error ({message.subtype}): {message.result}")
+
+    @staticmethod
+    def _feed_stream_event(
+        event: dict, item_parser: IncrementalItemParser, on_item: Callable[[dict], None]
+    ) -> IncrementalItemParser:
+        """Route one raw API stream event into the item parser.
+
+        A new content block starts a fresh parser — the StructuredOutput tool
+        input and any preceding text block are independent JSON documents.
+        """
+        etype = event.get("type")
+        if etype == "content_block_start":
+            return IncrementalItemParser()
+        if etype != "content_block_delta":
+            return item_parser
+        delta = event.get("delta") or {}
+        chunk = delta.get("partial_json") or delta.get("text") or ""
+        for item in item_parser.feed(chunk):
+            on_item(item)
+        return item_parser
+
     @staticmethod
     def _log_usage(message, model_id):
         """Log per-call usage stats."""
@@ -249,64 +280,112 @@ class ClaudeProvider(AIProvider):
             f"${message.total_cost_usd or 0:.4f}"
         )
 
+    async def _parse_output_off_loop(self, output_schema, structured, tool_output, last_text):
+        """`_parse_output`, with any repair work moved off the event loop.
+
+        Well-formed output validates inline; only when that fails does the
+        full parse (with JSON repair) run in a worker thread.
+        """
+        try:
+            return self._parse_output(output_schema, structured, tool_output, last_text, False)
+        except Exception:
+            return await asyncio.to_thread(
+                self._parse_output, output_schema, structured, tool_output, last_text
+            )
+
     @staticmethod
-    def _parse_output(output_schema, structured, tool_output, last_text):
+    def _parse_output(output_schema, structured, tool_output, last_text, repair=True):
         """Parse output in priority order: structured > tool > text.
 
         Defends against the model returning string-encoded JSON for nested fields
         (e.g. `{"items": "[...]"}` instead of `{"items": [...]}`) and against
-        trailing garbage / whitespace in JSON outputs.
+        trailing garbage / whitespace or truncation in JSON outputs. With
+        `repair=False` the first validation error is raised instead.
+
+        Output that fails validation even after repair raises
+        `OutputValidationError` with the first failing candidate.
         """
+        entry = schema_for(output_schema)
+        failure: tuple[Any, Exception] | None = None
         for candidate in (structured, tool_output):
             if candidate is None:
                 continue
             try:
-                return output_schema.model_validate(candidate)
-            except Exception as primary_err:
-                # Attempt repair: parse any string-encoded JSON fields manually
-                if isinstance(candidate, dict):
-                    repaired = ClaudeProvider._repair_string_json_fields(candidate)
-                    try:
-                        return output_schema.model_validate(repaired)
-                    except Exception:
-                        logger.warning(
-                            f"Validation failed even after JSON-string repair: {primary_err}"
-                        )
-                        continue
+                return ClaudeProvider._validate_candidate(entry, candidate, repair)
+            except Exception as e:
+                if not repair:
+                    raise
+                failure = failure or (candidate, e)
 
         if last_text:
-            text = last_text.strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-                text = text.rsplit("```", 1)[0]
-            return output_schema.model_validate_json(text.strip())
-
+            text = ClaudeProvider._strip_code_fence(last_text)
+            try:
+                return ClaudeProvider._validate_text(entry, text, repair)
+            except Exception as e:
+                if not repair:
+                    raise
+                failure = failure or (text, e)
+
+        if failure is not None:
+            raise OutputValidationError(*failure) from failure[1]
         raise RuntimeError("No output received from Claude Agent SDK")
 
+    @staticmethod
+    def _validate_candidate(entry, candidate, repair):
+        """Validate a structured/tool candidate; raise the first validation error.
+
+        A dict that fails is retried once with its string-encoded JSON fields parsed.
+        """
+        try:
+            return entry.validate_python(candidate)
+        except Exception as e:
+            if not repair or not isinstance(candidate, dict):
+                raise
+            error = e
+        try:
+            return entry.validate_python(ClaudeProvider._repair_string_json_fields(candidate))
+        except Exception:
+            logger.warning(f"Validation failed even after JSON-string repair: {error}")
+            raise error from None
+
+    @staticmethod
+    def _strip_code_fence(text: str) -> str:
+        """Drop a surrounding ``` fence (with optional language tag) from model text."""
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+            text = text.rsplit("```", 1)[0]
+        return text.strip()
+
+    @staticmethod
+    def _validate_text(entry, text, repair):
+        """Validate JSON text, falling back to the longest repairable prefix.
+
+        Raises the original validation error when repair doesn't help.
+        """
+        try:
+            return entry.validate_json(text)
+        except Exception as e:
+            if not repair:
+                raise
+            error = e
+        recovered = repair_json(text)
+        if recovered is not None:
+            try:
+                result = entry.validate_python(recovered)
+            except Exception:
+                pass
+            else:
+                logger.warning("Recovered text output via JSON repair")
+                return result
+        raise error
+
     @staticmethod
     def _repair_string_json_fields(data: dict) -> dict:
         r"""If any field value is a JSON-string (list/object), parse it.
 
-        Trims trailing whitespace/junk before parsing — the model occasionally
-        emits `"[...]\n  "` which fails strict JSON parse.
+        Tolerates trailing whitespace/junk (`"[...]\n  "`) and truncation — see
+        `json_repair.repair_json`, which keeps the longest valid prefix in
+        linear time.
         """
-        import json
-
-        repaired = {}
-        for k, v in data.items():
-            if isinstance(v, str):
-                stripped = v.strip()
-                if stripped.startswith(("[", "{")):
-                    # Try strict parse; if fails, try truncating to last balanced bracket
-                    try:
-                        v = json.loads(stripped)
-                    except json.JSONDecodeError:
-                        # Find last matching bracket and try again
-                        for end in range(len(stripped), 0, -1):
-                            try:
-                                v = json.loads(stripped[:end])
-                                break
-                            except json.JSONDecodeError:
-                                continue
-            repaired[k] = v
-        return repaired
+        return repair_string_json_fields(data)
@@ -1,13 +1,15 @@
 import logging
 import os
 import time
-from dataclasses import dataclass, field
+from collections.abc import Callable
 from importlib import import_module
 from typing import Any, Literal, cast
 
 from pydantic import BaseModel
 
 from course_scout.domain.services import AIProvider
+from course_scout.infrastructure.schema_cache import schema_for
+from course_scout.infrastructure.telemetry import UsageStats
 
 logger = logging.getLogger(__name__)
 
@@ -52,79 +54,37 @@ def _estimate_cost(
     return input_cost + output_cost
 
 
-@dataclass
-class OpenAIAgentsUsageStats:
-    """Tracks cumulative usage across calls.
-
-    Field names match ClaudeProvider.UsageStats for CLI merge compatibility.
-    """
-
-    total_input_tokens: int = 0
-    total_output_tokens: int = 0
-    total_cache_read_tokens: int = 0
-    total_cache_creation_tokens: int = 0
-    total_cost_usd: float = 0.0
-    total_duration_ms: int = 0
-    call_count: int = 0
-    calls: list[dict] = field(default_factory=list)
-
-    def record(self, usage: Any, model: str, duration_ms: int):
-        self.call_count += 1
-        self.total_duration_ms += duration_ms
-
-        input_tok = getattr(usage, "input_tokens", 0) if usage else 0
-        output_tok = getattr(usage, "output_tokens", 0) if usage else 0
-
-        input_details = getattr(usage, "input_tokens_details", None) if usage else None
-        cache_read = getattr(input_details, "cached_tokens", 0) or 0
-
-        self.total_input_tokens += input_tok
-        self.total_output_tokens += output_tok
-        self.total_cache_read_tokens += cache_read
-
-        request_entries = getattr(usage, "request_usage_entries", None) if usage else None
-        if request_entries:
-            cost = sum(
-                _estimate_cost(
-                    model=model,
-                    input_tokens=getattr(entry, "input_tokens", 0),
-                    output_tokens=getattr(entry, "output_tokens", 0),
-                    cached_input_tokens=(
-                        getattr(getattr(entry, "input_tokens_details", None), "cached_tokens", 0)
-                        or 0
-                    ),
-                )
-                for entry in request_entries
+def _record_usage(stats: UsageStats, usage: Any, model: str, duration_ms: int) -> None:
+    """Record an Agents SDK `Usage`, pricing each underlying request when available."""
+    input_tok = getattr(usage, "input_tokens", 0) if usage else 0
+    output_tok = getattr(usage, "output_tokens", 0) if usage else 0
+
+    input_details = getattr(usage, "input_tokens_details", None) if usage else None
+    cache_read = getattr(input_details, "cached_tokens", 0) or 0
+
+    request_entries = getattr(usage, "request_usage_entries", None) if usage else None
+    if request_entries:
+        cost = sum(
+            _estimate_cost(
+                model=model,
+                input_tokens=getattr(entry, "input_tokens", 0),
+                output_tokens=getattr(entry, "output_tokens", 0),
+                cached_input_tokens=(
+                    getattr(getattr(entry, "input_tokens_details", None), "cached_tokens", 0) or 0
+                ),
             )
-        else:
-            cost = _estimate_cost(model, input_tok, output_tok, cache_read)
-
-        self.total_cost_usd += cost
-        self.calls.append(
-            {
-                "model": model,
-                "input_tokens": input_tok,
-                "output_tokens": output_tok,
-                "cache_read": cache_read,
-                "duration_ms": duration_ms,
-                "cost_usd": cost,
-            }
-        )
-        logger.info(
-            f"[{model}] {input_tok} in / {output_tok} out / "
-            f"{cache_read} cache / {duration_ms}ms / ${cost:.4f}"
+            for entry in request_entries
         )
+    else:
+        cost = _estimate_cost(model, input_tok, output_tok, cache_read)
 
-    def summary(self) -> str:
-        lines = [
-            f"━━━ Usage Summary ({self.call_count} API calls) ━━━",
-            f"  Input tokens:  {self.total_input_tokens:,}",
-            f"  Output tokens: {self.total_output_tokens:,}",
-            f"  Cache read:    {self.total_cache_read_tokens:,}",
-            f"  Total time:    {self.total_duration_ms / 1000:.1f}s",
-            f"  Est. cost:     ${self.total_cost_usd:.4f}",
-        ]
-        return "\n".join(lines)
+    stats.record_call(
+        model, input_tok, output_tok, cache_read=cache_read, duration_ms=duration_ms, cost_usd=cost
+    )
+    logger.info(
+        f"[{model}] {input_tok} in / {output_tok} out / "
+        f"{cache_read} cache / {duration_ms}ms / ${cost:.4f}"
+    )
 
 
 class OpenAIAgentsProvider(AIProvider):
@@ -134,7 +94,7 @@ class OpenAIAgentsProvider(AIProvider):
         """Initialize without importing or authenticating the SDK eagerly."""
         self.api_key = api_key
         self.effort = effort
-        self.usage = OpenAIAgentsUsageStats()
+        self.usage = UsageStats()
         self.last_thinking: str = ""
 
     @staticmethod
@@ -176,8 +136,14 @@ class OpenAIAgentsProvider(AIProvider):
         input_data: str,
         output_schema: type,
         media_paths: list[str] | None = None,
+        on_item: Callable[[dict], None] | None = None,
     ) -> BaseModel:
-        """Generate structured output using the OpenAI Agents SDK."""
+        """Generate structured output using the OpenAI Agents SDK.
+
+        `media_paths` and `on_item` are accepted for interface compatibility but
+        ignored.
+        """
+        del media_paths, on_item  # explicitly unused
         self.last_thinking = ""
 
         agents_sdk = self._load_agents_sdk()
@@ -207,12 +173,10 @@ class OpenAIAgentsProvider(AIProvider):
         duration_ms = int((time.monotonic() - start) * 1000)
 
         usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
-        self.usage.record(usage, normalized_model, duration_ms)
+        _record_usage(self.usage, usage, normalized_model, duration_ms)
 
         final_output = getattr(result, "final_output", None)
         if final_output is None:
             raise RuntimeError("No output received from OpenAI Agents SDK")
 
-        if isinstance(final_output, str):
-            return output_schema.model_validate_json(final_output)
-        return output_schema.model_validate(final_output)
+        return schema_for(output_schema).validate_output(final_output)
@@ -1,20 +1,35 @@
 """OpenAI-compatible provider for structured output generation.
 
 Works with any OpenAI-compatible API: OpenAI, DeepSeek, Together, etc.
-Uses JSON mode + schema-in-prompt for structured output.
+
+Structured output uses the native `json_schema` response format where the
+endpoint supports it (the schema then travels as a parameter instead of
+input tokens in every system prompt). Endpoints without it (DeepSeek) get
+JSON mode plus the schema in the system prompt; an endpoint that rejects
+`json_schema` is remembered and downgraded for the rest of the process.
+
+Clients are shared: one pooled `AsyncOpenAI` per (base_url, proxy, key)
+via `http_clients.shared_client`, and each output type's schema is
+serialized once (`_schema_spec`).
 """
 
+import functools
 import json
 import logging
 import time
-from dataclasses import dataclass, field
-from typing import Any
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, cast
+from urllib.parse import urlparse
 
-import httpx
+import openai
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 
 from course_scout.domain.services import AIProvider
+from course_scout.infrastructure.http_clients import pooled_httpx_client, shared_client
+from course_scout.infrastructure.schema_cache import schema_for
+from course_scout.infrastructure.telemetry import UsageStats
 
 logger = logging.getLogger(__name__)
 
@@ -58,89 +73,93 @@ def _estimate_cost(
     return input_cost + output_cost
 
 
-@dataclass
-class OpenAIUsageStats:
-    """Tracks cumulative usage across calls.
-
-    Field names match ClaudeProvider.UsageStats for CLI merge compatibility.
-    """
-
-    total_input_tokens: int = 0
-    total_output_tokens: int = 0
-    total_cache_read_tokens: int = 0
-    total_cache_creation_tokens: int = 0
-    total_cost_usd: float = 0.0
-    total_duration_ms: int = 0
-    call_count: int = 0
-    calls: list[dict] = field(default_factory=list)
-
-    def record(self, usage, model: str, duration_ms: int):
-        self.call_count += 1
-        self.total_duration_ms += duration_ms
-
-        input_tok = getattr(usage, "prompt_tokens", 0) if usage else 0
-        output_tok = getattr(usage, "completion_tokens", 0) if usage else 0
-
-        # DeepSeek cache fields via model_extra
-        extra = getattr(usage, "model_extra", {}) or {}
-        cache_hit = extra.get("prompt_cache_hit_tokens", 0)
-        cache_miss = extra.get("prompt_cache_miss_tokens", 0)
-
-        self.total_input_tokens += input_tok
-        self.total_output_tokens += output_tok
-        self.total_cache_read_tokens += cache_hit
-
-        cost = _estimate_cost(model, input_tok, output_tok, cache_hit, cache_miss)
-        self.total_cost_usd += cost
-
-        self.calls.append(
-            {
-                "model": model,
-                "input_tokens": input_tok,
-                "output_tokens": output_tok,
-                "cache_read": cache_hit,
-                "duration_ms": duration_ms,
-                "cost_usd": cost,
-            }
-        )
-        logger.info(
-            f"[{model}] {input_tok} in / {output_tok} out / "
-            f"{cache_hit} cache_hit / {duration_ms}ms / ${cost:.4f}"
-        )
+def _record_usage(stats: UsageStats, usage, model: str, duration_ms: int) -> None:
+    """Record a chat-completions `usage` block (DeepSeek cache fields via model_extra)."""
+    input_tok = getattr(usage, "prompt_tokens", 0) if usage else 0
+    output_tok = getattr(usage, "completion_tokens", 0) if usage else 0
+
+    extra = getattr(usage, "model_extra", {}) or {}
+    cache_hit = extra.get("prompt_cache_hit_tokens", 0)
+    cache_miss = extra.get("prompt_cache_miss_tokens", 0)
+
+    cost = _estimate_cost(model, input_tok, output_tok, cache_hit, cache_miss)
+    stats.record_call(
+        model, input_tok, output_tok, cache_read=cache_hit, duration_ms=duration_ms, cost_usd=cost
+    )
+    logger.info(
+        f"[{model}] {input_tok} in / {output_tok} out / "
+        f"{cache_hit} cache_hit / {duration_ms}ms / ${cost:.4f}"
+    )
+
+
+# Hosts known to accept `response_format={"type": "json_schema", ...}`.
+_JSON_SCHEMA_HOSTS = {"api.openai.com"}
+# base_urls that rejected json_schema at runtime (downgraded to JSON mode).
+_json_schema_rejected: set[str] = set()
+
+
+@dataclass(frozen=True)
+class _SchemaSpec:
+    """Per-output-type serialized schema, built once."""
+
+    response_format: dict
+    prompt_instruction: str
+
 
-    def summary(self) -> str:
-        lines = [
-            f"━━━ Usage Summary ({self.call_count} API calls) ━━━",
-            f"  Input tokens:  {self.total_input_tokens:,}",
-            f"  Output tokens: {self.total_output_tokens:,}",
-            f"  Cache hits:    {self.total_cache_read_tokens:,}",
-            f"  Total time:    {self.total_duration_ms / 1000:.1f}s",
-            f"  Est. cost:     ${self.total_cost_usd:.4f}",
-        ]
-        return "\n".join(lines)
+@functools.lru_cache(maxsize=64)
+def _schema_spec(output_schema: type[BaseModel]) -> _SchemaSpec:
+    schema = schema_for(output_schema).json_schema
+    return _SchemaSpec(
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": output_schema.__name__, "schema": schema, "strict": False},
+        },
+        prompt_instruction=(
+            f"\n\nRESPOND WITH VALID JSON matching this schema:\n"
+            f"```json\n{json.dumps(schema, indent=2)}\n```"
+        ),
+    )
 
 
 class OpenAIProvider(AIProvider):
     """Provider for OpenAI-compatible APIs (DeepSeek, OpenAI, Together, etc.)."""
 
-    def __init__(  # noqa: D107
+    def __init__(
         self,
         api_key: str,
         base_url: str = "https://api.deepseek.com",
         default_model: str = "deepseek-chat",
         proxy: str | None = None,
+        json_schema: bool | None = None,
     ):
-        http_client = None
-        if proxy:
-            http_client = httpx.AsyncClient(proxy=proxy)
-
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            http_client=http_client,
-        )
+        """Configure the endpoint; the pooled client itself is shared and built lazily.
+
+        `json_schema`: use the native json_schema response format. None
+        (default) decides by host — on for api.openai.com, off elsewhere.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.proxy = proxy
         self.default_model = default_model
-        self.usage = OpenAIUsageStats()
+        if json_schema is None:
+            json_schema = urlparse(base_url).hostname in _JSON_SCHEMA_HOSTS
+        self.json_schema = json_schema
+        self.usage = UsageStats()
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The shared `AsyncOpenAI` for this endpoint on the running event loop."""
+        return shared_client(
+            ("openai", self.base_url, self.proxy, self.api_key),
+            lambda: AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=pooled_httpx_client(proxy=self.proxy),
+            ),
+        )
+
+    def _uses_json_schema(self) -> bool:
+        return self.json_schema and self.base_url not in _json_schema_rejected
 
     async def generate_structured(
         self,
@@ -149,35 +168,49 @@ class OpenAIProvider(AIProvider):
         input_data: str,
         output_schema: type,
         media_paths: list[str] | None = None,
+        on_item: Callable[[dict], None] | None = None,
     ) -> BaseModel:
         """Generate structured output using OpenAI chat completions.
 
-        `media_paths` is accepted for interface compatibility but ignored —
-        this provider is text-only. Use ClaudeProvider for multi-modal input.
+        `media_paths` and `on_item` are accepted for interface compatibility but
+        ignored — this provider is text-only and non-streaming. Use
+        ClaudeProvider for multi-modal input or incremental items.
         """
-        del media_paths  # explicitly unused
+        del media_paths, on_item  # explicitly unused
         model = model_id or self.default_model
-        schema = output_schema.model_json_schema()
-
-        schema_instruction = (
-            f"\n\nRESPOND WITH VALID JSON matching this schema:\n"
-            f"```json\n{json.dumps(schema, indent=2)}\n```"
-        )
-        messages: list[Any] = [
-            {"role": "system", "content": system_prompt + schema_instruction},
-            {"role": "user", "content": input_data},
-        ]
+        spec = _schema_spec(output_schema)
 
         start = time.monotonic()
-        response = await self.client.chat.completions.create(
-            model=model,
-            messages=messages,
-            response_format={"type": "json_object"},
-            temperature=0.3,
-        )
+        response = None
+        if self._uses_json_schema():
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": input_data},
+                    ],
+                    response_format=cast(Any, spec.response_format),
+                    temperature=0.3,
+                )
+            except openai.BadRequestError as e:
+                if "response_format" not in str(e) and "json_schema" not in str(e):
+                    raise
+                logger.warning(f"{self.base_url} rejected json_schema; falling back to JSON mode")
+                _json_schema_rejected.add(self.base_url)
+        if response is None:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt + spec.prompt_instruction},
+                    {"role": "user", "content": input_data},
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.3,
+            )
         duration_ms = int((time.monotonic() - start) * 1000)
 
-        self.usage.record(response.usage, model, duration_ms)
+        _record_usage(self.usage, response.usage, model, duration_ms)
 
         # Parse response
         content = response.choices[0].message.content
@@ -190,4 +223,4 @@ class OpenAIProvider(AIProvider):
             text = text.split("\n", 1)[1] if "\n" in text else text[3:]
             text = text.rsplit("```", 1)[0]
 
-        return output_schema.model_validate_json(text.strip())
+        return schema_for(output_schema).validate_output(text.strip())
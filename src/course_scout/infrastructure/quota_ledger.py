@@ -0,0 +1,251 @@
+"""Persistent cross-run token ledger for the shared Max plan quota.
+
+The worker, CLI scans, SSE jobs and benchmarks all draw from one Max plan,
+but each process only knew its own usage, and only after the fact
+(`UsageStats.summary()` compared one run against a hard-coded 5M/day). A
+scan started late in a busy window ran at full effort until the 429s came.
+
+`QuotaLedger` keeps one row per LLM call in the shared `data/reports.db`:
+every call recorded through `telemetry` is debited here, whichever process
+made it. `status()` sums output tokens over rolling 5-hour and 24-hour
+windows against `runtime.quota_window_output_tokens` /
+`quota_daily_output_tokens` and maps the fuller window to a `QuotaLevel`:
+
+  - LOWER_EFFORT  (≥ `quota_lower_effort_at`): topics run one effort step lower
+  - CHEAPER_MODEL (≥ `quota_cheaper_model_at`): and on `quota_fallback_model`
+  - DEFER         (≥ `quota_defer_at`): and low-priority topics are skipped
+
+`OrchestratedSummarizer` applies the level per topic before its calls, so
+a scan degrades as the windows fill instead of failing mid-run. Rows older
+than a day are pruned on write.
+
+The telemetry sink (`debit_call`) runs wherever a call is recorded — often
+on the event loop — so it only queues the row; a daemon writer thread
+inserts queued rows in batches (`flush()` waits for it, and runs at exit).
+`status()` is cached for `status_ttl` seconds, so per-topic checks don't
+each run two SUM queries.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 5 * 3600
+DAY_SECONDS = 24 * 3600
+
+
+class QuotaLevel(IntEnum):
+    """How hard to degrade, in increasing order."""
+
+    OK = 0
+    LOWER_EFFORT = 1
+    CHEAPER_MODEL = 2
+    DEFER = 3
+
+
+@dataclass(frozen=True)
+class QuotaStatus:
+    """Output tokens used in each rolling window, and the resulting level."""
+
+    window_tokens: int
+    daily_tokens: int
+    window_fraction: float
+    daily_fraction: float
+    level: QuotaLevel
+
+    def summary(self) -> str:
+        return (
+            f"Quota (all runs): 5h {self.window_tokens:,} out (~{self.window_fraction:.0%}), "
+            f"24h {self.daily_tokens:,} out (~{self.daily_fraction:.0%}) — "
+            f"{self.level.name.lower()}"
+        )
+
+
+class QuotaLedger:
+    """SQLite debit log of LLM calls with rolling-window quota status."""
+
+    def __init__(
+        self,
+        db_path: str = "data/reports.db",
+        window_output_tokens: int = 1_040_000,
+        daily_output_tokens: int = 5_000_000,
+        lower_effort_at: float = 0.7,
+        cheaper_model_at: float = 0.85,
+        defer_at: float = 0.95,
+        status_ttl: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the ledger table in `db_path`; cache `status()` for `status_ttl`s."""
+        self.db_path = db_path
+        self.window_output_tokens = window_output_tokens
+        self.daily_output_tokens = daily_output_tokens
+        self.thresholds = (
+            (QuotaLevel.DEFER, defer_at),
+            (QuotaLevel.CHEAPER_MODEL, cheaper_model_at),
+            (QuotaLevel.LOWER_EFFORT, lower_effort_at),
+        )
+        self.status_ttl = status_ttl
+        self._clock = clock
+        self._status: tuple[float, QuotaStatus] | None = None
+        self._queue: queue.Queue[tuple] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+        parent = os.path.dirname(self.db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._init_db()
+
+    @classmethod
+    def from_runtime(cls) -> QuotaLedger:
+        """Build a ledger from the `runtime:` block knobs."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        return cls(
+            window_output_tokens=rt.quota_window_output_tokens,
+            daily_output_tokens=rt.quota_daily_output_tokens,
+            lower_effort_at=rt.quota_lower_effort_at,
+            cheaper_model_at=rt.quota_cheaper_model_at,
+            defer_at=rt.quota_defer_at,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quota_debits (
+                    ts REAL NOT NULL,
+                    model TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    input_tokens INTEGER NOT NULL,
+                    output_tokens INTEGER NOT NULL,
+                    cost_usd REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_quota_debits_ts ON quota_debits (ts)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def debit(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cost_usd: float = 0.0,
+        stage: str = "",
+    ) -> None:
+        """Record one call now and prune rows that have left the daily window."""
+        self._insert([(self._clock(), model, stage, input_tokens, output_tokens, cost_usd)])
+
+    def debit_call(self, call: Any) -> None:
+        """Telemetry sink: queue a `telemetry.CallRecord` for the background writer."""
+        row = (
+            self._clock(),
+            call.model,
+            call.stage,
+            call.input_tokens + call.cache_creation,
+            call.output_tokens,
+            call.cost_usd,
+        )
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_queued, name="quota-ledger", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.flush)
+        self._queue.put(row)
+
+    def flush(self) -> None:
+        """Block until every queued debit has been written."""
+        self._queue.join()
+
+    def _write_queued(self) -> None:
+        while True:
+            rows = [self._queue.get()]
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._insert(rows)
+            except Exception as e:  # a locked ledger must not kill the writer
+                logger.warning(f"Quota ledger: dropped {len(rows)} debit(s): {e}")
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def _insert(self, rows: list[tuple]) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT INTO quota_debits VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.execute(
+                    "DELETE FROM quota_debits WHERE ts < ?", (self._clock() - DAY_SECONDS,)
+                )
+        finally:
+            conn.close()
+        self._status = None
+
+    def output_tokens(self, seconds: float) -> int:
+        """Output tokens debited in the last `seconds`, across all processes."""
+        conn = self._connect()
+        try:
+            (total,) = conn.execute(
+                "SELECT COALESCE(SUM(output_tokens), 0) FROM quota_debits WHERE ts >= ?",
+                (self._clock() - seconds,),
+            ).fetchone()
+        finally:
+            conn.close()
+        return int(total)
+
+    def status(self) -> QuotaStatus:
+        """Return usage of both windows and the level it implies, cached for `status_ttl`s."""
+        now = self._clock()
+        cached = self._status
+        if cached is not None and now - cached[0] < self.status_ttl:
+            return cached[1]
+        window = self.output_tokens(WINDOW_SECONDS)
+        daily = self.output_tokens(DAY_SECONDS)
+        window_fraction = window / self.window_output_tokens if self.window_output_tokens else 0.0
+        daily_fraction = daily / self.daily_output_tokens if self.daily_output_tokens else 0.0
+        fullest = max(window_fraction, daily_fraction)
+        level = next((lvl for lvl, at in self.thresholds if fullest >= at), QuotaLevel.OK)
+        status = QuotaStatus(window, daily, window_fraction, daily_fraction, level)
+        self._status = (now, status)
+        return status
+
+
+_ledger: QuotaLedger | None = None
+
+
+def get_quota_ledger() -> QuotaLedger | None:
+    """Return the process-wide ledger, or None when `runtime.quota_ledger` is off."""
+    global _ledger
+    if _ledger is None:
+        from course_scout.infrastructure.runtime import get_runtime
+
+        if not get_runtime().quota_ledger:
+            return None
+        _ledger = QuotaLedger.from_runtime()
+    return _ledger
@@ -1,30 +1,256 @@
+"""Process-wide token-bucket rate limiter: requests, input and output tokens per model.
+
+Every `AgentOrchestrator` used to build its own `RateLimiter`, and the
+summarizer factory, escalation and executive-summary paths each build
+orchestrators — so `rate_limit_rpm` was enforced per orchestrator, not per
+process. There were also two copies of the class (here and in `agents.py`).
+
+`get_rate_limiter()` returns one limiter for the whole process. Per model it
+keeps three token buckets, each refilled continuously at its per-minute
+limit and holding at most one minute's worth (so idle time banks a burst of
+up to the full limit):
+
+  - requests        (`rate_limit_rpm`)
+  - input tokens    (`rate_limit_input_tpm`)
+  - output tokens   (`rate_limit_output_tpm`)
+
+`acquire(model, input_tokens, output_tokens)` waits until all three buckets
+cover the call's *estimate*, then deducts it and returns a `Reservation`.
+The estimate is reconciled when the provider reports real usage: the caller
+runs the provider call inside `bind_reservation(...)`, and providers' usage
+trackers call `note_usage()`, which finds that reservation via a context
+variable, refunds the estimate and charges the actual counts.
+Buckets may go negative after reconciliation; that debt simply delays the
+next caller. `rate_limits` in the runtime config overrides limits per model.
+"""
+
+from __future__ import annotations
+
 import asyncio
+import contextlib
+import logging
 import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TOKEN_ESTIMATE = 1600  # ~1568px long edge after image_prep, ~750 px² per token
+CHARS_PER_TOKEN = 3.0  # conservative: messages mix English, Russian and CJK
+
+
+def estimate_tokens(*texts: str, images: int = 0) -> int:
+    """Rough input-token estimate for a call, used until real usage arrives."""
+    chars = sum(len(t) for t in texts)
+    return int(chars / CHARS_PER_TOKEN) + images * IMAGE_TOKEN_ESTIMATE
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding at most `capacity` tokens."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Start full; refill at `per_minute` / 60 tokens per second."""
+        self.clock = clock
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute if capacity is None else capacity
+        self.tokens = self.capacity
+        self._updated = self.clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, n: float) -> float:
+        """Seconds until `n` tokens are available (0 if now).
+
+        Requests larger than the whole bucket only need a full bucket, so an
+        oversized call is delayed, never starved.
+        """
+        self._refill()
+        need = min(n, self.capacity)
+        if self.tokens >= need:
+            return 0.0
+        return (need - self.tokens) / self.rate
+
+    def take(self, n: float) -> None:
+        self._refill()
+        self.tokens -= n
+
+    def give(self, n: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + n)
+
+
+@dataclass
+class ModelLimits:
+    """Per-minute limits for one model; 0 disables that dimension."""
+
+    rpm: int = 50
+    input_tpm: int = 0
+    output_tpm: int = 0
+
+
+@dataclass
+class Reservation:
+    """What `acquire` deducted for one call, until reconciled with real usage."""
+
+    model: str
+    input_tokens: int
+    output_tokens: int
+    limiter: RateLimiter | None = field(default=None, repr=False)
+    settled: bool = False
+
+
+@dataclass
+class _ModelBuckets:
+    requests: TokenBucket | None
+    input: TokenBucket | None
+    output: TokenBucket | None
+    waited_s: float = 0.0
+    calls: int = 0
+
+
+_reservation: ContextVar[Reservation | None] = ContextVar("rate_limit_reservation", default=None)
 
 
 class RateLimiter:
-    """Async-aware rate limiter for API calls.
+    """Async token-bucket limiter with per-model RPM and input/output TPM.
 
-    Enforces a maximum number of requests per minute (RPM) WITHOUT blocking the
-    event loop. The previous implementation used `time.sleep` inside a threading
-    lock, which froze all parallel tasks during throttle waits.
+    Never blocks the event loop, and needs no lock: checking and deducting
+    the buckets happens without an `await` in between.
     """
 
-    def __init__(self, rpm: int = 15):
-        """Initialize with requests per minute limit."""
+    def __init__(
+        self,
+        rpm: int = 50,
+        input_tpm: int = 0,
+        output_tpm: int = 0,
+        per_model: dict[str, ModelLimits] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Default limits apply to every model not listed in `per_model`."""
         self.rpm = rpm
-        self.interval = 60.0 / rpm
-        self.last_request_time = 0.0
-        self._lock = asyncio.Lock()
+        self.default_limits = ModelLimits(rpm, input_tpm, output_tpm)
+        self.per_model = per_model or {}
+        self.clock = clock
+        self._buckets: dict[str, _ModelBuckets] = {}
+
+    @classmethod
+    def from_runtime(cls) -> RateLimiter:
+        """Build a limiter from the `runtime:` block knobs."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        return cls(
+            rpm=rt.rate_limit_rpm,
+            input_tpm=rt.rate_limit_input_tpm,
+            output_tpm=rt.rate_limit_output_tpm,
+            per_model={m: ModelLimits(**limits) for m, limits in rt.rate_limits.items()},
+        )
+
+    def limits_for(self, model: str) -> ModelLimits:
+        return self.per_model.get(model, self.default_limits)
+
+    def _for(self, model: str) -> _ModelBuckets:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            lim = self.limits_for(model)
+
+            def make(per_minute: int) -> TokenBucket | None:
+                return TokenBucket(per_minute, clock=self.clock) if per_minute > 0 else None
+
+            buckets = _ModelBuckets(make(lim.rpm), make(lim.input_tpm), make(lim.output_tpm))
+            self._buckets[model] = buckets
+        return buckets
+
+    async def acquire(
+        self, model: str = "default", input_tokens: int = 0, output_tokens: int = 0
+    ) -> Reservation:
+        """Wait until `model` has budget for one call of the estimated size, then take it.
 
-    async def acquire(self):
-        """Wait (asynchronously) if necessary to comply with the rate limit."""
-        async with self._lock:
-            current_time = time.time()
-            elapsed = current_time - self.last_request_time
+        Run the provider call inside `bind_reservation(...)` so that its
+        reported usage reconciles the estimate.
+        """
+        b = self._for(model)
+        plan = [(b.requests, 1), (b.input, input_tokens), (b.output, output_tokens)]
+        started = self.clock()
+        while True:
+            wait = max((bucket.wait_time(n) for bucket, n in plan if bucket), default=0.0)
+            if wait <= 0:
+                break
+            logger.debug(f"Rate limit ({model}): waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+        for bucket, n in plan:
+            if bucket:
+                bucket.take(n)
+        b.calls += 1
+        b.waited_s += self.clock() - started
+        return Reservation(model, input_tokens, output_tokens, limiter=self)
 
-            if elapsed < self.interval:
-                wait_time = self.interval - elapsed
-                await asyncio.sleep(wait_time)
+    def reconcile(
+        self, reservation: Reservation, input_tokens: int, output_tokens: int, model: str = ""
+    ) -> None:
+        """Replace a reservation's estimate with the actual token counts.
 
-            self.last_request_time = time.time()
+        A reservation is refunded only once; further usage reported against it
+        (e.g. the losing copy of a hedged call) is charged in full.
+        """
+        if not reservation.settled:
+            est = self._for(reservation.model)
+            if est.input:
+                est.input.give(reservation.input_tokens)
+            if est.output:
+                est.output.give(reservation.output_tokens)
+            reservation.settled = True
+        actual = self._for(model or reservation.model)
+        if actual.input:
+            actual.input.take(input_tokens)
+        if actual.output:
+            actual.output.take(output_tokens)
+
+    def summary(self) -> str:
+        """One line per model: calls and total time spent waiting on the buckets."""
+        return "\n".join(
+            f"{m}: {b.calls} call(s), waited {b.waited_s:.1f}s"
+            for m, b in sorted(self._buckets.items())
+        )
+
+
+_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter, built from runtime config on first use."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter.from_runtime()
+    return _limiter
+
+
+@contextlib.contextmanager
+def bind_reservation(reservation: Reservation | None) -> Iterator[None]:
+    """Make `reservation` the one `note_usage()` reconciles within this block."""
+    token = _reservation.set(reservation)
+    try:
+        yield
+    finally:
+        _reservation.reset(token)
+
+
+def note_usage(model: str, input_tokens: int, output_tokens: int) -> None:
+    """Reconcile the current call's reservation with the provider's reported usage.
+
+    Called by providers' usage trackers. A no-op outside a rate-limited call
+    (batch mode, benchmarks).
+    """
+    reservation = _reservation.get()
+    if reservation is None or reservation.limiter is None:
+        return
+    reservation.limiter.reconcile(reservation, input_tokens, output_tokens, model=model)
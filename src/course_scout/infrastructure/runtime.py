@@ -40,17 +40,143 @@ class RuntimeConfig(BaseModel):
     max_retries: int = 3
     """Per-model retry attempts before falling back to next model in the chain."""
 
-    rate_limit_retry_sleep: float = 65.0
-    """Sleep duration when a 429 / RATE error is detected (seconds). 65s exceeds
-    the typical 60s window for Anthropic rate-limit windows."""
+    rate_limit_backoff_base: float = 5.0
+    """First retry delay after a rate-limit error with no retry-after hint
+    (seconds); doubles per retry, with jitter."""
+
+    rate_limit_backoff_max: float = 65.0
+    """Cap on the exponential backoff (seconds). 65s exceeds the typical 60s
+    Anthropic rate-limit window."""
+
+    rate_limit_max_wait: float = 300.0
+    """A server retry-after hint longer than this (seconds) isn't waited out;
+    the agent moves on to the next model instead."""
+
+    aimd_max_concurrency: int = 16
+    """Upper bound on in-flight provider calls across the process. Halved on
+    each rate-limit error (AIMD), regrown by one per window of successes."""
+
+    aimd_min_concurrency: int = 1
+    """Floor for the AIMD concurrency limit."""
+
+    aimd_decrease_factor: float = 0.5
+    """Multiplier applied to the concurrency limit on a rate-limit error."""
+
+    aimd_decrease_cooldown: float = 10.0
+    """Min seconds between decreases, so one burst of 429s shrinks the limit once."""
 
     max_turns: int = 5
     """Max turns per `claude_agent_sdk.query()`. With structured output,
     Haiku occasionally needs 3-4 turns; 5 is a generous ceiling."""
 
+    sdk_client_pool_size: int = 0
+    """Persistent Claude SDK clients kept warm and reused across calls instead
+    of spawning a CLI subprocess per `query()`, per distinct (model, settings,
+    system prompt) — i.e. per topic prompt. Set it to the chunk concurrency
+    one topic needs (0 = off; see `sdk_pool.py`)."""
+
     rate_limit_rpm: int = 50
-    """Local rate limiter requests-per-minute. Spaces out the SDK calls so we
-    don't hit Anthropic's per-minute limits ourselves."""
+    """Process-wide requests-per-minute per model (token bucket: up to a
+    minute's worth may burst after idle time), so we don't hit Anthropic's
+    per-minute limits ourselves."""
+
+    rate_limit_input_tpm: int = 800_000
+    """Process-wide input tokens per minute per model (estimated up front,
+    reconciled from reported usage). 0 = unlimited."""
+
+    rate_limit_output_tpm: int = 160_000
+    """Process-wide output tokens per minute per model. 0 = unlimited."""
+
+    rate_limit_output_estimate: int = 2_000
+    """Output tokens reserved per call until its real usage is known."""
+
+    rate_limits: dict[str, dict[str, int]] = {}
+    """Per-model overrides, e.g. `{"claude-opus-4-7": {"rpm": 20, "input_tpm":
+    200000, "output_tpm": 40000}}`. Omitted dimensions are unlimited."""
+
+    hedge_requests: bool = False
+    """Launch a duplicate provider call once the original has run longer than
+    the observed `hedge_quantile` latency for its input size; first result wins."""
+
+    hedge_quantile: float = 0.95
+    """Latency quantile (per input-size bucket) after which a call is hedged."""
+
+    hedge_min_samples: int = 20
+    """Successful calls needed in a size bucket before it can trigger hedges."""
+
+    hedge_min_delay: float = 30.0
+    """Floor on the hedge delay (seconds), so fast buckets don't double every call."""
+
+    hedge_to_fallback: bool = False
+    """Send the duplicate to the next model in the chain instead of the same model."""
+
+    hedge_history_db: str = "data/reports.db"
+    """SQLite file holding the hedge latency history, so thresholds survive
+    across runs ("" keeps it in-process only)."""
+
+    breaker_failure_threshold: int = 3
+    """Consecutive timeouts / 5xx errors that open a model's circuit breaker.
+    Breakers are process-wide, so one topic's failures spare the others."""
+
+    breaker_cooldown: float = 120.0
+    """Seconds an open breaker short-circuits calls before letting one probe through."""
+
+    failover_models: list[str] = []
+    """Alternate chain tried after the task's models fail or are short-circuited,
+    e.g. `["deepseek-chat"]` (needs DEEPSEEK_API_KEY). Empty = no failover."""
+
+    repair_model: str = "claude-haiku-4-5"
+    """Model asked to correct an output that failed schema validation, given
+    only the invalid output and the errors. Empty = no repair call; the
+    failure moves on to the next model, re-sending the whole input."""
+
+    # ── Batch mode (`scan --batch-mode`) ──
+    batch_collect_window: float = 5.0
+    """Seconds without a new parser call before parked calls are submitted
+    as one batch."""
+
+    batch_poll_interval: float = 30.0
+    """Seconds between batch status polls."""
+
+    batch_max_wait: float = 86400.0
+    """Give up on a batch after this many seconds (the API expires them at 24h)."""
+
+    batch_max_tokens: int = 32000
+    """`max_tokens` for batched Messages API calls (the SDK path sets this itself)."""
+
+    anthropic_http_models: list[str] = []
+    """Models served by `AnthropicHTTPProvider` (direct Messages API over a
+    pooled HTTP client, needs ANTHROPIC_API_KEY) instead of the Agent SDK."""
+
+    anthropic_http_max_tokens: int = 16000
+    """`max_tokens` for direct Messages API calls."""
+
+    http_max_connections: int = 20
+    """Connections kept open by each shared HTTP client (Messages API and
+    OpenAI-compatible providers; see `http_clients.py`)."""
+
+    http_keepalive: float = 60.0
+    """Seconds an idle pooled connection stays open."""
+
+    # ── Model routing ──
+    model_router: bool = False
+    """Let `ModelRouter` move topics to a cheaper (model, effort) arm once that
+    arm's bench score and per-topic failure history clear the bars below."""
+
+    router_exploration_rate: float = 0.1
+    """Probability of trying a random cheaper arm instead of the best-known one,
+    so arms without per-topic history still get sampled."""
+
+    router_quality_bar: float = 0.8
+    """Minimum bench strict-match F1 (prompt family, or `*`) for an arm to be
+    routed to."""
+
+    router_max_failure_rate: float = 0.2
+    """Max per-topic failure rate for an arm once it has `router_min_samples`
+    recorded calls on that topic."""
+
+    router_min_samples: int = 3
+    """Per-topic calls required before an arm's failure rate is trusted."""
 
     # ── Telegram fetch layer ──
     topic_fetch_timeout: float = 180.0
@@ -62,11 +188,104 @@ class RuntimeConfig(BaseModel):
     """Max image attachments included in a single LLM call. Above this we drop
     extras to keep the call within the SDK's multipart limits."""
 
+    phash_max_distance: int = 6
+    """Max Hamming distance (of 64 bits) between two images' dHashes for them
+    to share one caption. 0 = exact perceptual match only."""
+
+    image_triage: bool = True
+    """Score attachments locally (size, aspect, entropy, edge density) before
+    the vision pass and skip those unlikely to carry text or covers."""
+
+    image_triage_min_score: float = 0.35
+    """Triage score (0–1) below which an image is not captioned."""
+
+    image_triage_min_side: int = 100
+    """Images whose shorter side is below this many pixels score 0 (avatars,
+    sticker thumbnails)."""
+
+    image_run_budget: int = 150
+    """Max images captioned per scan across all topics, most engaged messages
+    (reactions + replies) first. 0 = no run-wide cap."""
+
+    image_max_edge: int = 1568
+    """Images are downscaled so their long edge is at most this many pixels
+    before upload (the API resizes anything larger anyway)."""
+
+    image_format: str = "jpeg"
+    """Re-encode format for uploaded images: `jpeg` or `webp`."""
+
+    image_quality: int = 85
+    """Encoder quality (1–100) for re-encoded images."""
+
+    caption_batch_size: int = 6
+    """Images captioned per vision call, returned as an indexed list. 1 = one
+    call per image. Malformed batched replies fall back to per-image calls."""
+
+    caption_cache_max_entries: int = 50_000
+    """Caption store size cap; least recently used rows beyond it are evicted.
+    Also caps the prepared-image files under `media_cache/prepared/`."""
+
+    caption_cache_max_age_days: int = 180
+    """Caption store rows (and prepared-image files) unused for this many days
+    are evicted."""
+
+    # ── Dedup ──
+    dedup_preload: bool = True
+    """Load the seen-link/file tables into memory once per scan so keys
+    never seen before are answered without a disk query. New marks are
+    written through. False = query SQLite for every key."""
+
+    dedup_bloom_threshold: int = 500_000
+    """Seen tables with at least this many keys are held in a Bloom filter
+    (~2.4 bytes/key, sized for 2× growth) instead of a hash set (~70 bytes/key,
+    ~10× faster lookups). See benchmark/bench_dedup.py."""
+
+    dedup_bloom_fp_rate: float = 0.01
+    """Bloom filter false-positive rate; false positives cost one disk lookup."""
+
+    # ── Quota ──
+    quota_ledger: bool = True
+    """Debit every LLM call into a cross-run ledger in `data/reports.db` and
+    degrade topics as the Max plan windows fill. False = no ledger."""
+
+    quota_window_output_tokens: int = 1_040_000
+    """Output token budget for the rolling 5-hour window (≈ 5/24 of daily)."""
+
+    quota_daily_output_tokens: int = 5_000_000
+    """Output token budget for the rolling 24-hour window."""
+
+    quota_lower_effort_at: float = 0.7
+    """Window fraction at which topics run one effort step lower."""
+
+    quota_cheaper_model_at: float = 0.85
+    """Window fraction at which topics also switch to `quota_fallback_model`."""
+
+    quota_defer_at: float = 0.95
+    """Window fraction at which low-priority topics are skipped this scan."""
+
+    quota_fallback_model: str = "claude-haiku-4-5"
+    """Summarizer model used once the cheaper-model threshold is reached."""
+
     # ── Logging ──
     log_path: str = "/tmp/course-scout-runtime.log"
     """Append-only JSON-line log of each run (start, end, duration, status, error).
     Lives in /tmp by default — lost on reboot, which is fine for failure visibility."""
 
+    metrics_textfile: str = ""
+    """Where `scan` writes LLM call metrics (Prometheus text) when it finishes,
+    for node_exporter's textfile collector on cron runs. Empty = don't write."""
+
+    capture_sample_rate: float = 0.0
+    """Fraction of agent calls whose input/output payloads are captured for
+    `benchmark/sample.py`. 0 = no capture; raise it while collecting fixtures."""
+
+    capture_dir: str = "data/captures"
+    """Root of the date-partitioned, gzipped capture JSONL and its index."""
+
+    capture_max_age_days: int = 30
+    """Capture days older than this are deleted (files and index rows) when a
+    process starts capturing. 0 = keep everything."""
+
 
 @lru_cache(maxsize=1)
 def get_runtime(config_path: str = "config.yaml") -> RuntimeConfig:
@@ -0,0 +1,102 @@
+"""Per-output-type cache of JSON schemas and prebuilt validators.
+
+Every structured call used to regenerate `output_schema.model_json_schema()`
+(a full walk of the model, its fields and nested `$defs`) and then validate
+through the generic `model_validate` / `model_validate_json` entry points —
+the same work repeated for every chunk of every topic, on every provider.
+
+`schema_for(output_schema)` builds a `SchemaEntry` once per type:
+
+  - `json_schema`: the schema dict, shared — callers must not mutate it
+  - `adapter`: a `TypeAdapter` over the model (runs its model validators,
+    e.g. `SummarizerOutputSchema`'s JSON-string repair)
+  - `item_model` / `item_adapter`: the element type of an `items` list, used
+    by `AIAgent` to validate streamed items
+
+Providers read the schema from here when building requests, and parse
+through `validate_python` / `validate_json`. `validate_json` parses and
+validates in one pass inside pydantic-core, without building an
+intermediate dict.
+
+An output that still fails is raised as `OutputValidationError`, carrying
+the raw output and pydantic's error report, so `AIAgent` can send just those
+to a cheap repair model instead of re-running the whole call.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+from dataclasses import dataclass
+from typing import Any, get_args
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Cap on the validation report carried to the repair call.
+_MAX_ERROR_CHARS = 4000
+
+
+class OutputValidationError(ValueError):
+    """A provider's structured output did not validate against its schema."""
+
+    def __init__(self, raw: Any, error: Exception):
+        """Keep the raw output (as text) and the validation error report."""
+        self.raw = raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=False, default=str)
+        self.errors = str(error)[:_MAX_ERROR_CHARS]
+        super().__init__(f"Output failed schema validation: {self.errors.splitlines()[0]}")
+
+
+@dataclass(frozen=True)
+class SchemaEntry:
+    """Cached schema and validators for one output model."""
+
+    model: type[BaseModel]
+    json_schema: dict
+    adapter: TypeAdapter
+    item_model: type[BaseModel] | None = None
+    item_adapter: TypeAdapter | None = None
+
+    def validate_python(self, data: Any) -> Any:
+        return self.adapter.validate_python(data)
+
+    def validate_json(self, text: str | bytes) -> Any:
+        return self.adapter.validate_json(text)
+
+    def validate_output(self, raw: Any) -> Any:
+        """Validate a final output (JSON text or parsed); raise `OutputValidationError`."""
+        try:
+            if isinstance(raw, str | bytes):
+                return self.validate_json(raw)
+            return self.validate_python(raw)
+        except ValidationError as e:
+            raise OutputValidationError(raw, e) from e
+
+    def validate_item(self, data: Any) -> Any:
+        """Validate one `items` element; raises if the model has no `items` list."""
+        if self.item_adapter is None:
+            raise TypeError(f"{self.model.__name__} has no items list")
+        return self.item_adapter.validate_python(data)
+
+
+def _item_model(output_schema: type[BaseModel]) -> type[BaseModel] | None:
+    """Return the element type of `output_schema.items` (e.g. RawDigestItem), if any."""
+    field_info = getattr(output_schema, "model_fields", {}).get("items")
+    if field_info is None:
+        return None
+    args = get_args(field_info.annotation)
+    if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+        return args[0]
+    return None
+
+
+@functools.lru_cache(maxsize=128)
+def schema_for(output_schema: type[BaseModel]) -> SchemaEntry:
+    """Return the cached `SchemaEntry` for `output_schema`, building it on first use."""
+    item_model = _item_model(output_schema)
+    return SchemaEntry(
+        model=output_schema,
+        json_schema=output_schema.model_json_schema(),
+        adapter=TypeAdapter(output_schema),
+        item_model=item_model,
+        item_adapter=TypeAdapter(item_model) if item_model is not None else None,
+    )
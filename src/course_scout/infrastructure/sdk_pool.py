@@ -0,0 +1,333 @@
+"""Warm pool of persistent Claude SDK client sessions.
+
+Every `claude_agent_sdk.query()` spawns a fresh `claude` CLI subprocess,
+which boots Node, loads settings and performs the initialize handshake
+before the first token is requested — paid again on every chunk, caption
+batch and executive summary. A `ClaudeSDKClient` keeps that subprocess open
+and accepts any number of turns over its stream-json stdin.
+
+`ClaudeClientPool` keeps up to `sdk_client_pool_size` connected clients
+per key:
+
+  - Keyed by options. System prompt, model, output schema, thinking and
+    tools are CLI launch flags, so a client only serves calls whose
+    `ClaudeAgentOptions` match the ones it was started with. The size
+    applies to each (model, settings, system prompt) key separately, so
+    topics with different prompts never evict each other's clients; a
+    scan holds at most `size` clients per distinct topic prompt, and a
+    key's calls beyond `size` wait for one of its clients.
+  - Isolated per call. After each call the client is sent `/clear`, which
+    drops the conversation so the next call starts with an empty history.
+    A call that errors, is cancelled (e.g. the losing copy of a hedged call)
+    or is abandoned mid-stream discards its client instead of returning it.
+  - Owned by one task. The SDK's reader task group must be exited by the
+    task that entered it, so each client is connected and disconnected by a
+    dedicated owner task; callers only write turns and read messages.
+
+`prewarm(options)` connects clients ahead of time — the scan starts it while
+the fetch phase runs. `StartupStats` records the time from call start to the
+first message for both paths, so the overhead saved is visible per run.
+`sdk_messages()` is the single entry point: pooled when the pool is on,
+otherwise the caller's `query` function.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_RESET_TIMEOUT = 30.0  # seconds allowed for `/clear` to complete before discarding a client
+
+
+@dataclass
+class StartupStats:
+    """Time to first message per call, by path.
+
+    "query" spawns a CLI per call, "pooled" reuses a warm client, "http" is
+    the direct Messages API provider (time to first streamed byte).
+    """
+
+    first_message_ms: dict[str, list[float]] = field(default_factory=dict)
+    connect_ms: list[float] = field(default_factory=list)
+    """Connect time of each pooled client (paid once, ideally during prewarm)."""
+    discarded: int = 0
+    """Pooled clients closed after an error, cancellation or failed reset."""
+
+    def record(self, path: str, ms: float) -> None:
+        self.first_message_ms.setdefault(path, []).append(ms)
+
+    def summary(self) -> str:
+        parts = []
+        for path, samples in sorted(self.first_message_ms.items()):
+            ordered = sorted(samples)
+            p50 = ordered[len(ordered) // 2]
+            parts.append(f"{path}: {len(samples)} call(s), p50 {p50:.0f} ms to first message")
+        if self.connect_ms:
+            parts.append(
+                f"{len(self.connect_ms)} client(s) connected "
+                f"(avg {sum(self.connect_ms) / len(self.connect_ms):.0f} ms)"
+            )
+        if self.discarded:
+            parts.append(f"{self.discarded} discarded")
+        return "Call startup: " + "; ".join(parts) if parts else "Call startup: no calls"
+
+
+_stats = StartupStats()
+
+
+def get_startup_stats() -> StartupStats:
+    """Return the process-wide startup counters."""
+    return _stats
+
+
+def options_key(options: Any) -> str:
+    """Fingerprint of every `ClaudeAgentOptions` field; equal keys can share a client."""
+    items = [(f.name, getattr(options, f.name)) for f in dataclasses.fields(options)]
+    return hashlib.sha1(repr(items).encode(), usedforsecurity=False).hexdigest()
+
+
+class _Session:
+    """One connected client plus the owner task that will disconnect it."""
+
+    def __init__(self, client: Any, key: str, stop: asyncio.Event):
+        self.client = client
+        self.key = key
+        self.stop = stop
+
+
+def _default_factory(options: Any) -> Any:
+    from claude_agent_sdk import ClaudeSDKClient
+
+    return ClaudeSDKClient(options=options)
+
+
+class ClaudeClientPool:
+    """Up to `size` persistent SDK clients per options key, checked out one call at a time."""
+
+    def __init__(
+        self,
+        size: int,
+        client_factory: Callable[[Any], Any] = _default_factory,
+        stats: StartupStats | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """`client_factory(options)` returns an unconnected `ClaudeSDKClient`-like object."""
+        self.size = size
+        self.client_factory = client_factory
+        self.stats = stats or get_startup_stats()
+        self.clock = clock
+        self._idle: dict[str, deque[_Session]] = {}
+        self._open: dict[str, int] = {}
+        self._waiters: dict[str, deque[asyncio.Future[None]]] = {}
+        self._owners: set[asyncio.Task[None]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @classmethod
+    def from_runtime(cls) -> ClaudeClientPool:
+        """Build a pool sized by `runtime.sdk_client_pool_size`."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        return cls(size=get_runtime().sdk_client_pool_size)
+
+    @property
+    def open_clients(self) -> int:
+        return sum(self._open.values())
+
+    def _bind_loop(self) -> None:
+        # Clients belong to the loop that connected them; a new asyncio.run()
+        # starts from an empty pool (the old loop already tore them down).
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._idle.clear()
+            self._waiters.clear()
+            self._owners.clear()
+            self._open.clear()
+
+    async def _connect(self, options: Any, key: str) -> _Session:
+        """Start an owner task that connects a client and holds it until stopped."""
+        ready: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+
+        async def _own() -> None:
+            client = self.client_factory(options)
+            started = self.clock()
+            try:
+                await client.connect()
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                return
+            self.stats.connect_ms.append((self.clock() - started) * 1000)
+            if not ready.done():
+                ready.set_result(client)
+            try:
+                await stop.wait()
+            finally:
+                with contextlib.suppress(Exception):
+                    await client.disconnect()
+
+        owner = asyncio.create_task(_own())
+        self._owners.add(owner)
+        owner.add_done_callback(self._owners.discard)
+        try:
+            client = await ready
+        except BaseException:
+            stop.set()
+            raise
+        return _Session(client, key, stop)
+
+    async def _checkout(self, options: Any) -> _Session:
+        self._bind_loop()
+        key = options_key(options)
+        while True:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+            if self._open.get(key, 0) < self.size:
+                self._open[key] = self._open.get(key, 0) + 1
+                try:
+                    return await self._connect(options, key)
+                except BaseException:
+                    self._open[key] -= 1
+                    self._wake(key)
+                    raise
+            waiter = asyncio.get_running_loop().create_future()
+            waiters = self._waiters.setdefault(key, deque())
+            waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with contextlib.suppress(ValueError):
+                    waiters.remove(waiter)
+                raise
+
+    def _checkin(self, session: _Session) -> None:
+        self._idle.setdefault(session.key, deque()).append(session)
+        self._wake(session.key)
+
+    def _close(self, session: _Session) -> None:
+        session.stop.set()
+        self._open[session.key] -= 1
+        self._wake(session.key)
+
+    def _discard(self, session: _Session) -> None:
+        self.stats.discarded += 1
+        self._close(session)
+
+    def _wake(self, key: str) -> None:
+        waiters = self._waiters.get(key)
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _reset(self, session: _Session) -> bool:
+        """Clear the client's conversation; False if it did not complete cleanly."""
+        try:
+            async with asyncio.timeout(_RESET_TIMEOUT):
+                await session.client.query("/clear")
+                async for _ in session.client.receive_response():
+                    pass
+        except Exception as e:
+            logger.warning(f"SDK client reset failed, discarding it: {e}")
+            return False
+        return True
+
+    async def run(self, prompt: Any, options: Any) -> AsyncIterator[Any]:
+        """Send one turn on a pooled client and yield its messages up to the result."""
+        started = self.clock()
+        session = await self._checkout(options)
+        healthy = False
+        try:
+            await session.client.query(prompt)
+            first = True
+            async for message in session.client.receive_response():
+                if first:
+                    self.stats.record("pooled", (self.clock() - started) * 1000)
+                    first = False
+                yield message
+            healthy = await self._reset(session)
+        finally:
+            if healthy:
+                self._checkin(session)
+            else:
+                self._discard(session)
+
+    async def prewarm(self, options: Any, n: int = 1) -> int:
+        """Connect up to `n` idle clients for `options`; return how many were added."""
+        self._bind_loop()
+        key = options_key(options)
+        have = len(self._idle.get(key, ()))
+        want = min(n - have, self.size - self._open.get(key, 0))
+        if want <= 0:
+            return 0
+        self._open[key] = self._open.get(key, 0) + want
+        results = await asyncio.gather(
+            *(self._connect(options, key) for _ in range(want)), return_exceptions=True
+        )
+        added = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                self._open[key] -= 1
+                logger.warning(f"SDK client prewarm failed: {result}")
+            else:
+                self._checkin(result)
+                added += 1
+        return added
+
+    async def close(self) -> None:
+        """Disconnect every idle client and wait for their owner tasks."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        for queue in self._idle.values():
+            while queue:
+                self._close(queue.popleft())
+        if self._owners:
+            await asyncio.gather(*self._owners, return_exceptions=True)
+
+
+_pool: ClaudeClientPool | None = None
+
+
+def get_client_pool() -> ClaudeClientPool | None:
+    """Return the process-wide pool, or None when `sdk_client_pool_size` is 0."""
+    global _pool
+    if _pool is None:
+        from course_scout.infrastructure.runtime import get_runtime
+
+        if get_runtime().sdk_client_pool_size <= 0:
+            return None
+        _pool = ClaudeClientPool.from_runtime()
+    return _pool
+
+
+async def _timed(messages: AsyncIterator[Any], started: float) -> AsyncIterator[Any]:
+    first = True
+    async for message in messages:
+        if first:
+            _stats.record("query", (time.monotonic() - started) * 1000)
+            first = False
+        yield message
+
+
+def sdk_messages(prompt: Any, options: Any, query: Callable[..., Any]) -> AsyncIterator[Any]:
+    """Stream one call's SDK messages: on a pooled client if enabled, else via `query`.
+
+    Callers pass their own `query` so module-level patches keep working.
+    """
+    pool = get_client_pool()
+    if pool is not None:
+        return pool.run(prompt, options)
+    return _timed(query(prompt=prompt, options=options), time.monotonic())
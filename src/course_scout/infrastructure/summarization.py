@@ -1,17 +1,29 @@
 import asyncio
 import datetime
 import logging
-import re
+import time
 from typing import cast
 
 from course_scout.domain.models import ChannelDigest, TelegramMessage
 from course_scout.domain.services import ScraperInterface, SummarizerInterface
 from course_scout.infrastructure.agents import (
     AgentOrchestrator,
+    AgentRunError,
+    RawDigestItem,
     StructuredMessage,
     SummarizerInputSchema,
     SummarizerOutputSchema,
 )
+from course_scout.infrastructure.dedup import normalize_url
+from course_scout.infrastructure.grounding import (
+    GroundingIndex,
+    extract_message_id,
+    parse_tme_link,
+)
+from course_scout.infrastructure.item_merge import merge_chunk_items
+from course_scout.infrastructure.model_router import ModelRouter
+from course_scout.infrastructure.quota_ledger import QuotaLevel, get_quota_ledger
+from course_scout.infrastructure.telemetry import DEFAULT_STAGE, collect_calls, telemetry_labels
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +47,9 @@ _ESCALATION: dict[str, list[str]] = {
     "claude-opus-4-7": ["claude-opus-4-7"],
 }
 
+# Effort ladder for quota degradation: LOWER_EFFORT steps one rung down.
+_EFFORTS = ["low", "medium", "high", "max"]
+
 
 class OrchestratedSummarizer(SummarizerInterface):
     """AISummarizer using Claude with token-aware chunking + model escalation."""
@@ -48,8 +63,18 @@ class OrchestratedSummarizer(SummarizerInterface):
         chunk_size: int = DEFAULT_CHUNK_SIZE,
         scraper: ScraperInterface | None = None,
         include_media: bool = False,
+        topic_name: str | None = None,
+        prompt_family: str | None = None,
+        router: ModelRouter | None = None,
+        priority: str = "normal",
     ):
-        """Initialize with per-topic agent configuration."""
+        """Initialize with per-topic agent configuration.
+
+        With a `router`, each `summarize` call may move the topic to a cheaper
+        (model, effort) arm before token-budget escalation; outcomes are
+        recorded back under `topic_name` / `prompt_family`. `priority` "low"
+        topics are the ones deferred when the quota ledger is nearly spent.
+        """
         self.assigned_model = summarizer_model or "claude-sonnet-4-6"
         self.system_prompt = system_prompt
         self.thinking = thinking
@@ -57,8 +82,14 @@ class OrchestratedSummarizer(SummarizerInterface):
         self.chunk_size = chunk_size
         self.scraper = scraper
         self.include_media = include_media
+        self.topic_name = topic_name
+        self.prompt_family = prompt_family
+        self.router = router
+        self.priority = priority
         # Default orchestrator (assigned model). Escalation creates fresh ones.
         self.orchestrator = self._make_orchestrator(self.assigned_model)
+        # Routing and quota pick this run's arm from the configured one, every run.
+        self._configured = (self.assigned_model, self.effort, self.orchestrator)
 
     def _make_orchestrator(self, model: str) -> AgentOrchestrator:
         return AgentOrchestrator(
@@ -68,6 +99,87 @@ class OrchestratedSummarizer(SummarizerInterface):
             effort=self.effort,
         )
 
+    def _apply_route(self) -> None:
+        """Ask the router for this run's arm, starting from the configured one.
+
+        Swaps the default orchestrator if the arm moved. Escalation then starts
+        from the routed model, so a topic routed to Haiku that turns out too
+        big still climbs to Sonnet.
+        """
+        self.assigned_model, self.effort, self.orchestrator = self._configured
+        if self.router is None or not self.topic_name:
+            return
+        model, effort = self.router.choose(
+            self.topic_name, self.prompt_family, (self.assigned_model, self.effort)
+        )
+        if (model, effort) != (self.assigned_model, self.effort):
+            self.assigned_model, self.effort = model, effort
+            self.orchestrator = self._make_orchestrator(model)
+
+    def _apply_quota(self) -> bool:
+        """Degrade this topic to fit the shared Max plan quota.
+
+        Lowers effort one step, then switches to `runtime.quota_fallback_model`,
+        as the ledger's windows fill. Returns False when the topic should be
+        deferred (low priority, quota nearly spent).
+        """
+        ledger = get_quota_ledger()
+        if ledger is None:
+            return True
+        try:
+            status = ledger.status()
+        except Exception as e:  # a locked/corrupt ledger must never fail a topic
+            logger.warning(f"Quota ledger unavailable: {e}")
+            return True
+        if status.level is QuotaLevel.OK:
+            return True
+        if status.level is QuotaLevel.DEFER and self.priority == "low":
+            logger.warning(
+                f"Quota: deferring low-priority topic {self.topic_name}. {status.summary()}"
+            )
+            return False
+
+        from course_scout.infrastructure.runtime import get_runtime
+
+        model, effort = self.assigned_model, self.effort
+        if effort in _EFFORTS:
+            effort = _EFFORTS[max(_EFFORTS.index(effort) - 1, 0)]
+        if status.level >= QuotaLevel.CHEAPER_MODEL and get_runtime().quota_fallback_model:
+            model = get_runtime().quota_fallback_model
+        if (model, effort) != (self.assigned_model, self.effort):
+            logger.info(
+                f"Quota: {self.topic_name} {self.assigned_model}/{self.effort} → "
+                f"{model}/{effort}. {status.summary()}"
+            )
+            self.assigned_model, self.effort = model, effort
+            self.orchestrator = self._make_orchestrator(model)
+        return True
+
+    def _record_route(self, calls: list[dict], model: str, ok: bool) -> None:
+        """Feed this run's parser calls on `model` (or a failure) back to the router.
+
+        Repair and vision calls, calls on other models (hedges to a fallback)
+        and losing hedge copies are left out: they were not made on this arm.
+        """
+        if self.router is None or not self.topic_name:
+            return
+        arm_calls = [
+            c
+            for c in calls
+            if c.get("stage") == DEFAULT_STAGE
+            and c.get("model") == model
+            and not c.get("hedge_loser")
+        ]
+        try:
+            if ok and arm_calls:
+                self.router.record_calls(
+                    self.topic_name, self.prompt_family, self.effort, arm_calls
+                )
+            elif not ok:
+                self.router.record_failure(self.topic_name, self.prompt_family, model, self.effort)
+        except Exception as e:  # router bookkeeping must never fail a topic
+            logger.warning(f"Router: failed to record outcome: {e}")
+
     def _pick_model(self, total_tokens: int) -> tuple[str, int]:
         """Pick the smallest model in the escalation chain that fits the input.
 
@@ -84,6 +196,10 @@ class OrchestratedSummarizer(SummarizerInterface):
         biggest = chain[-1]
         return biggest, _MODEL_BUDGETS.get(biggest, _DEFAULT_BUDGET)
 
+    async def prewarm(self) -> None:
+        """Warm the provider for this topic's parser calls (assigned model, before routing)."""
+        await self.orchestrator.get_summarizer_agent().prewarm()
+
     async def summarize(
         self, messages: list[TelegramMessage], topic_id: int | None = None
     ) -> ChannelDigest:
@@ -95,13 +211,22 @@ class OrchestratedSummarizer(SummarizerInterface):
         4. Verify merged result
         5. Ground links
         """
+        self._apply_route()
+        # The ledger is SQLite-backed: keep its (cached) status query off the loop.
+        if not await asyncio.to_thread(self._apply_quota):
+            return self._build_deferred_digest(topic_id)
+        # Collect every provider call of this run; `_record_route` keeps the arm's own.
+        with collect_calls() as calls:
+            return await self._summarize_on_arm(messages, topic_id, calls)
+
+    async def _summarize_on_arm(
+        self, messages: list[TelegramMessage], topic_id: int | None, calls: list[dict]
+    ) -> ChannelDigest:
+        """Run the pipeline on the routed arm; report `calls` (or a failure) to the router."""
+        chosen_model = self.assigned_model
         try:
             structured_messages = self._prepare_structured_input(messages)
-            link_map = {m.id: m.link for m in structured_messages if m.link}
-            url_pattern = re.compile(r"https?://\S+")
-            all_raw_urls = {
-                url for m in structured_messages for url in url_pattern.findall(m.content)
-            }
+            index = GroundingIndex.from_messages(structured_messages)
 
             digest_date = datetime.date.today()
             topic_title = f"Topic {topic_id}" if topic_id else "General Channel"
@@ -135,23 +260,24 @@ class OrchestratedSummarizer(SummarizerInterface):
                     chunks[0], topic_title, digest_date, call_orchestrator
                 )  # noqa: E501
             else:
-                chunk_summaries = await asyncio.gather(
+                chunk_results = await asyncio.gather(
                     *[
                         self._summarize_chunk(c, topic_title, digest_date, call_orchestrator)
                         for c in chunks
-                    ]  # noqa: E501
+                    ],  # noqa: E501
+                    return_exceptions=True,
                 )
-                draft = self._merge_summaries(chunk_summaries)
+                draft = self._merge_summaries(self._surviving_chunks(chunk_results, topic_title))
 
             # Convert flat LLM items to discriminated domain types
             domain_items = draft.to_domain_items()
 
             # Programmatic grounding (replaces LLM verifier)
-            grounded_links = await self._ground_links(
-                draft.key_links, link_map, all_raw_urls, messages, topic_id
-            )
-            self._ground_items(domain_items, link_map, all_raw_urls)
-            self._backfill_links(domain_items, link_map)
+            grounded_links = await self._ground_links(draft.key_links, index, messages, topic_id)
+            self._ground_items(domain_items, index=index)
+            self._backfill_links(domain_items, index.link_map)
+            logger.info(f"[{topic_title}] grounding: {index.stats.summary()}")
+            self._record_route(calls, chosen_model, ok=True)
 
             return ChannelDigest(
                 channel_name=topic_title,
@@ -163,6 +289,7 @@ class OrchestratedSummarizer(SummarizerInterface):
 
         except Exception as e:
             logger.error(f"Error during summarization: {e}", exc_info=True)
+            self._record_route(calls, chosen_model, ok=False)
             return self._build_error_digest()
 
     @staticmethod
@@ -208,7 +335,6 @@ class OrchestratedSummarizer(SummarizerInterface):
 
     # Cap on images captioned per chunk (most-recent wins if more).
     # _MAX_IMAGES_PER_CALL moved to runtime config (`runtime.max_images_per_call`).
-    _MAX_IMAGE_BYTES = 5 * 1024 * 1024  # 5 MB per image
 
     async def _summarize_chunk(  # noqa: C901
         self,
@@ -221,31 +347,26 @@ class OrchestratedSummarizer(SummarizerInterface):
 
         Vision pre-pass (when self.include_media is True):
         For each message with a media_path, caption it via cheap Haiku vision
-        (parallel, one call per image). Inject the caption back into the
+        (parallel, `caption_batch_size` images per call). Inject the caption back into the
         message's content as "[Media/File: <caption>]". The main parser call
         is then TEXT-ONLY and sees captions inline — no base64 blobs.
 
         This sidesteps the SDK hang observed with Sonnet + many base64 images
         in a single call, and lets the parser stay fast/reliable.
+
+        Partial-output salvage: the parser call streams its items, and if every
+        model fails, the items streamed so far are returned instead of the
+        error. Streamed items are not grounded or deduplicated on arrival;
+        besides salvage they only drive the time-to-first-item log.
         """
         import os
 
         if self.include_media:
             from course_scout.infrastructure.vision import caption_paths
 
-            # Collect valid, size-capped image paths (newest first)
-            image_msgs = []
-            for m in chunk:
-                if not m.media_path:
-                    continue
-                try:
-                    if (
-                        os.path.exists(m.media_path)
-                        and os.path.getsize(m.media_path) <= self._MAX_IMAGE_BYTES
-                    ):
-                        image_msgs.append(m)
-                except OSError:
-                    pass
+            # Collect existing image paths (newest first). No size cap: oversized
+            # files are downscaled by image_prep before upload.
+            image_msgs = [m for m in chunk if m.media_path and os.path.exists(m.media_path)]
             image_msgs.sort(key=lambda m: m.id, reverse=True)
             from course_scout.infrastructure.runtime import get_runtime
 
@@ -262,7 +383,8 @@ class OrchestratedSummarizer(SummarizerInterface):
             if image_msgs:
                 paths = [m.media_path for m in image_msgs if m.media_path]
                 logger.info(f"[{topic_title}] captioning {len(paths)} image(s)...")
-                captions = await caption_paths(paths)
+                with telemetry_labels(topic=self.topic_name or topic_title):
+                    captions = await caption_paths(paths)
                 for m in image_msgs:
                     cap = captions.get(m.media_path or "", "")
                     if cap:
@@ -291,17 +413,67 @@ class OrchestratedSummarizer(SummarizerInterface):
             ),
         )
         summarizer = (orchestrator or self.orchestrator).get_summarizer_agent()
-        result = await summarizer.run(summarizer_input)
+        started = time.monotonic()
+        first_item_seen = False
+
+        # Grounding and cross-chunk merging need the final item list, so they
+        # run after the call; the agent keeps streamed items for salvage.
+        def _on_item(_item) -> None:
+            nonlocal first_item_seen
+            if not first_item_seen:
+                first_item_seen = True
+                logger.info(f"[{topic_title}] first item after {time.monotonic() - started:.1f}s")
+
+        try:
+            with telemetry_labels(stage="parse", topic=self.topic_name or topic_title):
+                result = await summarizer.run(summarizer_input, on_item=_on_item)
+        except AgentRunError as e:
+            # Salvage whatever the model streamed before the call died — a
+            # partial digest beats the error placeholder for the whole topic.
+            if not e.partial:
+                raise
+            logger.warning(
+                f"[{topic_title}] salvaged {len(e.partial)} streamed item(s) after failure: {e}"
+            )
+            return SummarizerOutputSchema(items=cast(list[RawDigestItem], e.partial))
         return cast(SummarizerOutputSchema, result)
 
+    @staticmethod
+    def _surviving_chunks(
+        results: list[SummarizerOutputSchema | BaseException], topic_title: str
+    ) -> list[SummarizerOutputSchema]:
+        """Keep the chunks that succeeded; raise the first error only if none did.
+
+        One failed chunk no longer discards the rest of the topic — the digest
+        carries the surviving chunks' items.
+        """
+        ok = [r for r in results if isinstance(r, SummarizerOutputSchema)]
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if not ok:
+            raise failed[0]
+        if failed:
+            logger.warning(
+                f"[{topic_title}] {len(failed)}/{len(results)} chunk(s) failed; "
+                f"keeping the other {len(ok)}. First error: {failed[0]}"
+            )
+        return ok
+
     @staticmethod
     def _merge_summaries(summaries: list[SummarizerOutputSchema]) -> SummarizerOutputSchema:
-        """Merge multiple chunk summaries into one."""
-        merged_items = []
+        """Merge multiple chunk summaries into one.
+
+        Items that the same course/request produced in several chunks are
+        collapsed (see `item_merge`); key links are deduped by normalized URL.
+        """
+        merged_items = merge_chunk_items([s.items for s in summaries])
         merged_links = []
+        seen_urls: set[str] = set()
         for s in summaries:
-            merged_items.extend(s.items)
-            merged_links.extend(s.key_links)
+            for link in s.key_links:
+                key = normalize_url(link.url) or link.url
+                if key not in seen_urls:
+                    seen_urls.add(key)
+                    merged_links.append(link)
         return SummarizerOutputSchema(
             items=merged_items,
             key_links=merged_links,
@@ -347,47 +519,68 @@ class OrchestratedSummarizer(SummarizerInterface):
             )
         return structured
 
-    async def _ground_links(self, links, link_map, raw_urls, messages, topic_id):
-        """Verify and repair key links in the digest."""
+    async def _ground_links(self, links, index: GroundingIndex, messages, topic_id):
+        """Verify and repair key links in the digest.
+
+        A link that isn't in the input but names a message in this batch is
+        rebuilt from the batch permalink; only unknown IDs hit the network.
+        """
         grounded = []
         for link in links:
-            msg_id_match = re.search(r"/(\d+)$", link.url)
-            msg_id = int(msg_id_match.group(1)) if msg_id_match else None
-            if link.url in link_map.values() or link.url in raw_urls:
+            if index.contains(link.url):
+                index.stats.hits += 1
+                grounded.append(link)
+                continue
+            msg_id = extract_message_id(link.url)
+            tme = parse_tme_link(link.url)
+            permalink = index.permalink(tme[1]) if tme else None
+            if permalink:
+                link.url = permalink
+                index.stats.rebuilt += 1
                 grounded.append(link)
             elif msg_id and self.scraper:
                 repaired_link = await self._repair_link(msg_id, messages, topic_id)
                 if repaired_link:
                     link.url = repaired_link
+                    index.stats.repaired += 1
                     grounded.append(link)
+                else:
+                    index.stats.misses += 1
+            else:
+                index.stats.misses += 1
         return grounded
 
     @staticmethod
-    def _ground_items(items, link_map, raw_urls):
+    def _ground_items(items, link_map=None, raw_urls=None, index: GroundingIndex | None = None):
         """Filter hallucinated links in items.
 
         Keeps a link if it:
-        - Matches a URL from raw message text
+        - Matches a URL from raw message text (normalized — trailing slash and
+          tracking params don't matter)
         - Matches a message's .link property (from link_map)
         - Is a t.me link whose msg ID exists in this batch or in the item's msg_ids
         - Is an external (non-t.me) URL (trusted from LLM extraction)
+
+        Pass a prebuilt `index`, or `link_map`/`raw_urls` to build one.
         """
-        valid_msg_ids = set(link_map.keys())
+        if index is None:
+            index = GroundingIndex(link_map or {}, raw_urls)
         for item in items:
             item_msg_ids = set(getattr(item, "msg_ids", []))
             grounded = []
             for link in item.links:
-                if link in raw_urls or link in link_map.values():
+                if index.contains(link):
+                    index.stats.hits += 1
                     grounded.append(link)
                 elif "t.me/" in link:
-                    parts = link.rstrip("/").split("/")
-                    try:
-                        msg_id = int(parts[-1])
-                        if msg_id in valid_msg_ids or msg_id in item_msg_ids:
-                            grounded.append(link)
-                    except (ValueError, IndexError):
-                        pass
+                    parsed = parse_tme_link(link)
+                    if parsed and (parsed[1] in index.msg_ids or parsed[1] in item_msg_ids):
+                        index.stats.hits += 1
+                        grounded.append(link)
+                    else:
+                        index.stats.misses += 1
                 else:
+                    index.stats.trusted += 1
                     grounded.append(link)
             item.links = grounded
 
@@ -424,6 +617,20 @@ class OrchestratedSummarizer(SummarizerInterface):
                 return None
         return None
 
+    @staticmethod
+    def _build_deferred_digest(topic_id: int | None) -> ChannelDigest:
+        """Create a placeholder digest for a topic skipped to stay within quota."""
+        return ChannelDigest(
+            channel_name=f"Topic {topic_id}" if topic_id else "General Channel",
+            date=datetime.date.today(),
+            summaries=[
+                "### Deferred",
+                "This low-priority topic was skipped because the Max plan usage "
+                "window is nearly spent. Its messages were not summarized; rescan "
+                "this date once the window has recovered.",
+            ],
+        )
+
     @staticmethod
     def _build_error_digest():
         """Create a placeholder digest for graceful failure handling."""
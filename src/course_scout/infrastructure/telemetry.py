@@ -0,0 +1,422 @@
+"""Process-wide LLM call telemetry, exported as OpenMetrics / Prometheus text.
+
+Each provider used to keep its own near-identical usage dataclass, the CLI
+merged them by hand after a scan, and the vision and executive-summary calls
+(which go straight through the SDK) recorded nothing. Now:
+
+  - `UsageStats` is the one per-provider tally (the model router still reads
+    its `calls`); every `record_call` also lands in the registry.
+  - `TelemetryRegistry` (`get_telemetry()`) keeps, per (stage, topic, model),
+    counters for calls, tokens (input / output / cache read / cache write)
+    and cost, plus a latency histogram.
+  - Stage and topic come from `telemetry_labels(...)`, a context manager over
+    a `ContextVar`, so provider code needn't know who called it. Calls
+    outside any label block count as stage "parse" with no topic.
+  - Sinks (`add_sink`) see each `CallRecord` as it is recorded; the
+    process-wide registry debits the cross-run `QuotaLedger` this way.
+
+Export:
+  - `render()` — OpenMetrics text, served at `/metrics` by the API.
+  - `write_textfile(path)` — Prometheus text format, written atomically, for
+    node_exporter's textfile collector after cron runs (`scan --metrics-file`).
+
+Latency p95 per stage: `histogram_quantile(0.95, sum by (stage, le)
+(rate(course_scout_llm_call_duration_seconds_bucket[1d])))`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from course_scout.infrastructure.rate_limiter import note_usage
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket bounds (seconds): vision calls take ~1-5s, dense
+# parser calls several minutes.
+DURATION_BUCKETS: tuple[float, ...] = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_STAGE = "parse"
+
+_labels: ContextVar[tuple[str, str]] = ContextVar("telemetry_labels", default=(DEFAULT_STAGE, ""))
+
+# Per-task lists that `UsageStats.record_call` also appends to (see `collect_calls`).
+_call_logs: ContextVar[tuple[list[dict], ...]] = ContextVar("telemetry_call_logs", default=())
+
+_TOKEN_KINDS = ("input", "output", "cache_read", "cache_creation")
+
+
+@contextlib.contextmanager
+def telemetry_labels(stage: str | None = None, topic: str | None = None) -> Iterator[None]:
+    """Attribute LLM calls made within this block to `stage` / `topic`.
+
+    Omitted labels are inherited from the enclosing block.
+    """
+    current_stage, current_topic = _labels.get()
+    token = _labels.set((stage or current_stage, current_topic if topic is None else topic))
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+@contextlib.contextmanager
+def collect_calls(calls: list[dict] | None = None) -> Iterator[list[dict]]:
+    """Also append each `UsageStats.calls` entry recorded in this block to `calls`.
+
+    Scoped to the current task and the tasks it starts, so two concurrent
+    copies of one call (a hedge) each see only their own usage, even on a
+    shared provider. Blocks nest: an entry reaches every enclosing list.
+    """
+    calls = [] if calls is None else calls
+    token = _call_logs.set((*_call_logs.get(), calls))
+    try:
+        yield calls
+    finally:
+        _call_logs.reset(token)
+
+
+def current_labels() -> tuple[str, str]:
+    """Return the (stage, topic) that calls made here would be recorded under."""
+    return _labels.get()
+
+
+@dataclass(frozen=True)
+class CallRecord:
+    """One recorded LLM call, as passed to registry sinks."""
+
+    stage: str
+    topic: str
+    model: str
+    input_tokens: int
+    output_tokens: int
+    cache_read: int
+    cache_creation: int
+    duration_ms: int
+    cost_usd: float
+
+
+@dataclass
+class _Series:
+    """Counters and latency histogram for one (stage, topic, model)."""
+
+    calls: int = 0
+    tokens: dict[str, int] = field(default_factory=lambda: dict.fromkeys(_TOKEN_KINDS, 0))
+    cost_usd: float = 0.0
+    duration_sum: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+
+
+class TelemetryRegistry:
+    """Thread-safe store of per-call LLM metrics."""
+
+    def __init__(self) -> None:
+        """Start empty."""
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str, str], _Series] = {}
+        self._sinks: list[Callable[[CallRecord], None]] = []
+
+    def add_sink(self, sink: Callable[[CallRecord], None]) -> None:
+        """Call `sink` with every subsequently recorded call.
+
+        Sink errors are logged, never raised into the provider call.
+        """
+        self._sinks.append(sink)
+
+    def record(
+        self,
+        model: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read: int = 0,
+        cache_creation: int = 0,
+        duration_ms: int = 0,
+        cost_usd: float = 0.0,
+        stage: str | None = None,
+        topic: str | None = None,
+    ) -> None:
+        """Record one call; stage/topic default to the current `telemetry_labels`."""
+        ctx_stage, ctx_topic = _labels.get()
+        key = (stage or ctx_stage, ctx_topic if topic is None else topic, model)
+        seconds = duration_ms / 1000
+        with self._lock:
+            series = self._series.setdefault(key, _Series())
+            series.calls += 1
+            series.tokens["input"] += input_tokens
+            series.tokens["output"] += output_tokens
+            series.tokens["cache_read"] += cache_read
+            series.tokens["cache_creation"] += cache_creation
+            series.cost_usd += cost_usd
+            series.duration_sum += seconds
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    series.buckets[i] += 1
+        if not self._sinks:
+            return
+        call = CallRecord(
+            *key, input_tokens, output_tokens, cache_read, cache_creation, duration_ms, cost_usd
+        )
+        for sink in self._sinks:
+            try:
+                sink(call)
+            except Exception as e:
+                logger.warning(f"Telemetry sink {sink!r} failed: {e}")
+
+    def record_usage(
+        self, model: str, usage: dict, duration_ms: int = 0, cost_usd: float = 0.0, **labels
+    ) -> None:
+        """Record one call from a raw Messages-API usage dict."""
+        self.record(
+            model,
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+            usage.get("cache_read_input_tokens", 0),
+            usage.get("cache_creation_input_tokens", 0),
+            duration_ms,
+            cost_usd,
+            **labels,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def _snapshot(self) -> list[tuple[tuple[str, str, str], _Series]]:
+        with self._lock:
+            return [
+                (
+                    key,
+                    _Series(s.calls, dict(s.tokens), s.cost_usd, s.duration_sum, list(s.buckets)),
+                )
+                for key, s in sorted(self._series.items())
+            ]
+
+    def render(self, openmetrics: bool = True) -> str:
+        """Export every series as OpenMetrics text (or Prometheus 0.0.4 text)."""
+        snapshot = self._snapshot()
+        lines: list[str] = []
+
+        def counter(name: str, help_text: str, samples: list[tuple[str, float]]) -> None:
+            family = name if openmetrics else f"{name}_total"
+            lines.append(f"# TYPE {family} counter")
+            lines.append(f"# HELP {family} {help_text}")
+            lines.extend(f"{name}_total{{{labels}}} {_num(v)}" for labels, v in samples)
+
+        counter(
+            "course_scout_llm_calls",
+            "LLM calls.",
+            [(_labels_text(k), s.calls) for k, s in snapshot],
+        )
+        counter(
+            "course_scout_llm_tokens",
+            "LLM tokens by kind.",
+            [
+                (_labels_text(k, kind=kind), s.tokens[kind])
+                for k, s in snapshot
+                for kind in _TOKEN_KINDS
+            ],
+        )
+        counter(
+            "course_scout_llm_cost_usd",
+            "Estimated LLM cost in USD.",
+            [(_labels_text(k), s.cost_usd) for k, s in snapshot],
+        )
+
+        name = "course_scout_llm_call_duration_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        lines.append(f"# HELP {name} LLM call latency.")
+        if openmetrics:
+            lines.append(f"# UNIT {name} seconds")
+        for key, s in snapshot:
+            for bound, count in zip(DURATION_BUCKETS, s.buckets, strict=True):
+                lines.append(f"{name}_bucket{{{_labels_text(key, le=repr(float(bound)))}}} {count}")
+            lines.append(f"{name}_bucket{{{_labels_text(key, le='+Inf')}}} {s.calls}")
+            lines.append(f"{name}_sum{{{_labels_text(key)}}} {_num(s.duration_sum)}")
+            lines.append(f"{name}_count{{{_labels_text(key)}}} {s.calls}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str | Path) -> Path:
+        """Write Prometheus text atomically (node_exporter textfile collector)."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render(openmetrics=False))
+            os.chmod(tmp, 0o644)  # mkstemp is owner-only; the collector runs as another user
+            os.replace(tmp, target)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        return target
+
+    def quantile(self, stage: str, q: float) -> float | None:
+        """Bucket upper bound holding the `q` quantile of `stage` latency (None if no calls)."""
+        counts = [0] * len(DURATION_BUCKETS)
+        total = 0
+        for (s_stage, _topic, _model), s in self._snapshot():
+            if s_stage != stage:
+                continue
+            total += s.calls
+            counts = [a + b for a, b in zip(counts, s.buckets, strict=True)]
+        if not total:
+            return None
+        for bound, count in zip(DURATION_BUCKETS, counts, strict=True):
+            if count >= q * total:
+                return bound
+        return float("inf")
+
+    def summary(self) -> str:
+        """Process-wide usage totals plus calls, p95 latency and cost per stage."""
+        totals = UsageStats()
+        stages: dict[str, list[float]] = {}
+        for (stage, _topic, _model), s in self._snapshot():
+            totals.call_count += s.calls
+            totals.total_input_tokens += s.tokens["input"]
+            totals.total_output_tokens += s.tokens["output"]
+            totals.total_cache_read_tokens += s.tokens["cache_read"]
+            totals.total_cache_creation_tokens += s.tokens["cache_creation"]
+            totals.total_cost_usd += s.cost_usd
+            totals.total_duration_ms += int(s.duration_sum * 1000)
+            calls_cost = stages.setdefault(stage, [0, 0.0])
+            calls_cost[0] += s.calls
+            calls_cost[1] += s.cost_usd
+        lines = [totals.summary(), "  ── By stage ──"]
+        for stage, (calls, cost) in sorted(stages.items()):
+            p95 = self.quantile(stage, 0.95)
+            p95_text = "> 600s" if p95 == float("inf") else f"≤ {p95:g}s"
+            lines.append(f"  {stage:<14}{int(calls):>5} calls  p95 {p95_text:<8} ${cost:.4f}")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(key: tuple[str, str, str], **extra: str) -> str:
+    stage, topic, model = key
+    pairs = {"stage": stage, "topic": topic, "model": model, **extra}
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items())
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_registry: TelemetryRegistry | None = None
+
+
+def get_telemetry() -> TelemetryRegistry:
+    """Return the process-wide telemetry registry, debiting the quota ledger if enabled."""
+    global _registry
+    if _registry is None:
+        from course_scout.infrastructure.quota_ledger import get_quota_ledger
+
+        _registry = TelemetryRegistry()
+        ledger = get_quota_ledger()
+        if ledger is not None:
+            _registry.add_sink(ledger.debit_call)
+    return _registry
+
+
+@dataclass
+class UsageStats:
+    """Tracks cumulative usage across one provider's calls.
+
+    Every call is also recorded in the process-wide `TelemetryRegistry`, under
+    the current `telemetry_labels`.
+    """
+
+    total_input_tokens: int = 0
+    total_output_tokens: int = 0
+    total_cache_read_tokens: int = 0
+    total_cache_creation_tokens: int = 0
+    total_cost_usd: float = 0.0
+    total_duration_ms: int = 0
+    call_count: int = 0
+    calls: list[dict] = field(default_factory=list)
+
+    def record_call(
+        self,
+        model: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read: int = 0,
+        cache_creation: int = 0,
+        duration_ms: int = 0,
+        cost_usd: float = 0.0,
+    ) -> None:
+        """Record one call's token counts, latency and cost."""
+        self.call_count += 1
+        self.total_duration_ms += duration_ms
+        self.total_cost_usd += cost_usd
+        self.total_input_tokens += input_tokens
+        self.total_output_tokens += output_tokens
+        self.total_cache_read_tokens += cache_read
+        self.total_cache_creation_tokens += cache_creation
+        note_usage(model, input_tokens + cache_creation, output_tokens)
+        get_telemetry().record(
+            model, input_tokens, output_tokens, cache_read, cache_creation, duration_ms, cost_usd
+        )
+        entry = {
+            "stage": _labels.get()[0],
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cache_read": cache_read,
+            "duration_ms": duration_ms,
+            "cost_usd": cost_usd,
+        }
+        self.calls.append(entry)
+        for log in _call_logs.get():
+            log.append(entry)
+
+    def record_usage(self, model: str, usage: dict, duration_ms: int = 0, cost_usd: float = 0.0):
+        """Record one call from a raw Messages-API usage dict."""
+        self.record_call(
+            model,
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+            usage.get("cache_read_input_tokens", 0),
+            usage.get("cache_creation_input_tokens", 0),
+            duration_ms,
+            cost_usd,
+        )
+
+    def summary(self) -> str:
+        """Return a formatted usage summary with this run's share of the Max plan budgets."""
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        daily_budget = rt.quota_daily_output_tokens
+        five_hour_budget = rt.quota_window_output_tokens
+        daily_pct = (self.total_output_tokens / daily_budget * 100) if daily_budget else 0
+        window_pct = (self.total_output_tokens / five_hour_budget * 100) if five_hour_budget else 0
+
+        lines = [
+            f"━━━ Usage Summary ({self.call_count} API calls) ━━━",
+            f"  Input tokens:  {self.total_input_tokens:,}",
+            f"  Output tokens: {self.total_output_tokens:,}",
+            f"  Cache read:    {self.total_cache_read_tokens:,}",
+            f"  Total time:    {self.total_duration_ms / 1000:.1f}s",
+            f"  Est. cost:     ${self.total_cost_usd:.4f}",
+            "  ── Max Plan Budget (this run, approx) ──",
+            f"  5h window:     ~{window_pct:.1f}% used",
+            f"  Daily:         ~{daily_pct:.1f}% used",
+        ]
+        return "\n".join(lines)
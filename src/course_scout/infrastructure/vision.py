@@ -5,31 +5,39 @@ text caption. The main parser stays text-only — it sees
   "[Media/File: <caption>]"
 instead of raw bytes.
 
-Captions are cached to `media_cache/captions.json` keyed by filename. Rescanning
-the same day skips the vision pass entirely on cache hits.
+Captions are cached in `media_cache/captions.db` keyed by the SHA-256 of the
+image bytes (`caption_store.py`). Rescanning the same day skips the vision
+pass entirely on cache hits. Reposts under a new filename are caught by the
+perceptual-hash index (`image_hash.py`): one vision call per cluster of
+near-duplicate images, across runs.
 
-This decouples image understanding (one cheap call per image, parallelizable)
-from item extraction (one text call per topic, fast). Also sidesteps the
-SDK hang observed with Sonnet + 10 base64 images in a single call.
+This decouples image understanding (cheap calls of `caption_batch_size`
+images each, parallelizable) from item extraction (one text call per topic,
+fast). Also sidesteps the SDK hang observed with Sonnet + 10 base64 images
+in a single call.
 """
 
 from __future__ import annotations
 
 import asyncio
-import base64
-import json
 import logging
-import os
+import re
 from collections.abc import AsyncIterator
-from pathlib import Path
 
 from claude_agent_sdk import (
     AssistantMessage,
     ClaudeAgentOptions,
+    ResultMessage,
     TextBlock,
     query,
 )
 
+from course_scout.infrastructure.caption_store import CaptionStore, content_hash
+from course_scout.infrastructure.image_hash import ImageHashIndex
+from course_scout.infrastructure.image_prep import prepare_image, prepare_many
+from course_scout.infrastructure.sdk_pool import sdk_messages
+from course_scout.infrastructure.telemetry import get_telemetry
+
 
 async def _stream_user_turn(content: list[dict]) -> AsyncIterator[dict]:
     """Wrap content blocks in the stream-json user-turn envelope required by
@@ -47,35 +55,23 @@ async def _stream_user_turn(content: list[dict]) -> AsyncIterator[dict]:
 
 logger = logging.getLogger(__name__)
 
-# Persistent caption cache — avoids re-captioning on repeated scans of the
-# same day. Key: basename (e.g. "media_566744.jpg"), value: caption string.
-_CACHE_PATH = Path("media_cache/captions.json")
-_cache: dict[str, str] | None = None
-_cache_lock = asyncio.Lock()
-
-
-def _load_cache() -> dict[str, str]:
-    global _cache
-    if _cache is not None:
-        return _cache
-    if _CACHE_PATH.exists():
-        try:
-            _cache = json.loads(_CACHE_PATH.read_text())
-        except (json.JSONDecodeError, OSError):
-            _cache = {}
-    else:
-        _cache = {}
-    assert _cache is not None
-    return _cache
-
-
-async def _save_cache() -> None:
-    """Atomically persist cache to disk. Call under lock."""
-    assert _cache is not None
-    _CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    tmp = _CACHE_PATH.with_suffix(".json.tmp")
-    tmp.write_text(json.dumps(_cache, ensure_ascii=False, indent=2))
-    tmp.replace(_CACHE_PATH)
+# Persistent caption store (SQLite, keyed by image content hash) plus the
+# perceptual-hash index for near-duplicates. Both are opened lazily.
+_store: CaptionStore | None = None
+_hash_index: ImageHashIndex | None = None
+
+
+def _load_store() -> CaptionStore:
+    global _store
+    if _store is None:
+        from course_scout.infrastructure.runtime import get_runtime
+
+        rt = get_runtime()
+        _store = CaptionStore(
+            max_entries=rt.caption_cache_max_entries,
+            max_age_days=rt.caption_cache_max_age_days,
+        )
+    return _store
 
 
 _VISION_SYSTEM_PROMPT = (
@@ -87,85 +83,218 @@ _VISION_SYSTEM_PROMPT = (
     "Never more than 2 lines. Never add commentary."
 )
 
-_MAX_IMAGE_BYTES = 5 * 1024 * 1024
-_SUPPORTED = {
-    ".jpg": "image/jpeg",
-    ".jpeg": "image/jpeg",
-    ".png": "image/png",
-    ".webp": "image/webp",
-    ".gif": "image/gif",
-}
-
-
-async def caption_image(path: str, model: str = "claude-haiku-4-5") -> str:  # noqa: C901
-    """Return a short text caption for one image. Empty string on any failure.
-
-    Cached in media_cache/captions.json — filename key, cache survives across
-    scans so re-running a day doesn't re-caption the same images.
-    """
-    if not path or not os.path.exists(path):
-        return ""
-    ext = os.path.splitext(path)[1].lower()
-    media_type = _SUPPORTED.get(ext)
-    if media_type is None:
-        return ""
-
-    cache = _load_cache()
-    key = os.path.basename(path)
-    cached = cache.get(key)
-    if cached is not None:
-        return cached
-
-    try:
-        if os.path.getsize(path) > _MAX_IMAGE_BYTES:
-            return ""
-        with open(path, "rb") as f:
-            data = base64.standard_b64encode(f.read()).decode("ascii")
-    except OSError:
-        return ""
 
-    content = [
-        {"type": "text", "text": "Caption this image."},
-        {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": data}},
-    ]
+async def _ask(content: list[dict], model: str, system_prompt: str) -> str:
+    """Run one single-turn vision query and return its concatenated text."""
     options = ClaudeAgentOptions(
         model=model,
-        system_prompt=_VISION_SYSTEM_PROMPT,
+        system_prompt=system_prompt,
         max_turns=1,
         setting_sources=[],
         allowed_tools=[],
         thinking={"type": "disabled"},
     )
+    parts: list[str] = []
+    async for msg in sdk_messages(_stream_user_turn(content), options, query):
+        if isinstance(msg, AssistantMessage):
+            for block in msg.content:
+                if isinstance(block, TextBlock):
+                    parts.append(block.text)
+        elif isinstance(msg, ResultMessage):
+            get_telemetry().record_usage(
+                model,
+                msg.usage or {},
+                msg.duration_ms or 0,
+                msg.total_cost_usd or 0.0,
+                stage="vision",
+            )
+    return "\n".join(parts)
+
 
-    caption_parts: list[str] = []
+async def caption_image(path: str, model: str = "claude-haiku-4-5") -> str:
+    """Return a short text caption for one image. Empty string on any failure.
+
+    Uncached — one vision call per invocation. `caption_paths` does the
+    caching and near-duplicate fan-out.
+    """
+    prepared = await asyncio.to_thread(prepare_image, path)
+    if prepared is None:
+        return ""
+    content = [{"type": "text", "text": "Caption this image."}, prepared.content_block()]
     try:
-        async for msg in query(prompt=_stream_user_turn(content), options=options):
-            if isinstance(msg, AssistantMessage):
-                for block in msg.content:
-                    if isinstance(block, TextBlock):
-                        caption_parts.append(block.text)
+        text = await _ask(content, model, _VISION_SYSTEM_PROMPT)
     except Exception as e:
         logger.warning(f"Vision caption failed for {path}: {e}")
         return ""
+    return " ".join(text.split("\n")).strip()
+
+
+_BATCH_SYSTEM_PROMPT = (
+    _VISION_SYSTEM_PROMPT
+    + " You will receive several images, each preceded by its label [1], [2], … "
+    "Reply with exactly one line per image, in order, formatted `[n] caption`, "
+    "and nothing else."
+)
+_INDEXED_LINE = re.compile(r"^\s*\[(\d+)\]\s*(.+?)\s*$")
+
+
+def parse_indexed_captions(text: str, n: int) -> list[str] | None:
+    """Parse `[n] caption` lines into a list of `n` captions.
+
+    Returns None when the response is malformed: an index is missing,
+    duplicated, out of range, or has an empty caption. Unlabelled lines
+    (preamble, blank lines) are ignored.
+    """
+    captions: dict[int, str] = {}
+    for line in text.splitlines():
+        m = _INDEXED_LINE.match(line)
+        if not m:
+            continue
+        idx = int(m.group(1))
+        if not 1 <= idx <= n or idx in captions:
+            return None
+        captions[idx] = m.group(2)
+    if len(captions) != n:
+        return None
+    return [captions[i] for i in range(1, n + 1)]
 
-    caption = " ".join(caption_parts).strip().replace("\n", " ")
-    if caption:
-        async with _cache_lock:
-            cache[key] = caption
-            await _save_cache()
-    return caption
+
+async def caption_images(
+    paths: list[str], model: str = "claude-haiku-4-5"
+) -> tuple[list[str], int]:
+    """Caption several images in one vision call; return (captions aligned to `paths`, calls).
+
+    Unusable images (missing or undecodable) get "". If the call
+    fails or its reply can't be parsed into one caption per image, each
+    image falls back to its own `caption_image` call, and `calls` counts
+    those too.
+    """
+    prepared = await asyncio.to_thread(prepare_many, paths)
+    blocks = {p: img.content_block() for p, img in zip(paths, prepared, strict=True) if img}
+    usable = list(blocks)
+    if len(usable) <= 1:
+        return [await caption_image(p, model) if p in blocks else "" for p in paths], len(usable)
+
+    content: list[dict] = [
+        {"type": "text", "text": f"Caption these {len(usable)} images."},
+    ]
+    for i, p in enumerate(usable, 1):
+        content.append({"type": "text", "text": f"[{i}]"})
+        content.append(blocks[p])
+    try:
+        parsed = parse_indexed_captions(
+            await _ask(content, model, _BATCH_SYSTEM_PROMPT), len(usable)
+        )
+    except Exception as e:
+        logger.warning(f"Batched vision call for {len(usable)} image(s) failed: {e}")
+        parsed = None
+    calls = 1
+    if parsed is None:
+        logger.info(f"Vision: batched reply unusable, captioning {len(usable)} image(s) singly")
+        parsed = list(await asyncio.gather(*(caption_image(p, model) for p in usable)))
+        calls += len(usable)
+    by_path = dict(zip(usable, parsed, strict=True))
+    return [by_path.get(p, "") for p in paths], calls
+
+
+def _load_hash_index() -> ImageHashIndex:
+    global _hash_index
+    if _hash_index is None:
+        from course_scout.infrastructure.runtime import get_runtime
+
+        _hash_index = ImageHashIndex(_load_store(), max_distance=get_runtime().phash_max_distance)
+    return _hash_index
 
 
 async def caption_paths(paths: list[str], concurrency: int = 5) -> dict[str, str]:
-    """Caption multiple images in parallel. Returns {path → caption}."""
+    """Caption multiple images in parallel. Returns {path → caption}.
+
+    Images are grouped by perceptual hash first (see `image_hash.py`): a
+    near-duplicate of anything captioned in this or an earlier run reuses that
+    caption, and each remaining cluster of near-duplicates gets one caption
+    that fans out to every member. Cluster representatives are captioned
+    `runtime.caption_batch_size` per vision call (see `caption_images`).
+    """
     if not paths:
         return {}
+    store = _load_store()
+    index = _load_hash_index()
+    unique = list(dict.fromkeys(paths))
+    digests = await asyncio.gather(*(asyncio.to_thread(content_hash, p) for p in unique))
+    digest_of = {p: d for p, d in zip(unique, digests, strict=True) if d}
+    stored = await asyncio.to_thread(store.get_many, list(set(digest_of.values())))
+
+    result: dict[str, str] = {}
+    pending: list[str] = []
+    for p in unique:
+        cached = stored.get(digest_of.get(p, ""))
+        if cached:
+            result[p] = cached
+        else:
+            pending.append(p)
+    cache_hits = len(result)
+
+    hashes = await asyncio.gather(*(asyncio.to_thread(index.hash_for, p) for p in pending))
+    unhashed, hashed = _reuse_near_duplicates(index, pending, hashes, result)
+    near_dup_hits = len(result) - cache_hits
+
+    clusters = unhashed + index.cluster(hashed)
+    captions, calls = await _caption_representatives([c[0] for c in clusters], concurrency)
+    for members, caption in zip(clusters, captions, strict=True):
+        if not caption:
+            continue
+        if members[0] in hashed:
+            index.add_caption(hashed[members[0]], caption)
+        for m in members:
+            result[m] = caption
+
+    # One batched upsert for everything resolved without a store hit.
+    new_rows = {digest_of[p]: result[p] for p in pending if p in result and p in digest_of}
+    await asyncio.to_thread(store.put_many, new_rows)
+    await asyncio.to_thread(index.save)
+    logger.info(
+        f"Vision: {len(result)}/{len(unique)} captioned — {cache_hits} cached, "
+        f"{near_dup_hits} near-duplicate, {len(clusters)} new in {calls} vision call(s)"
+    )
+    return result
+
+
+def _reuse_near_duplicates(
+    index: ImageHashIndex,
+    paths: list[str],
+    hashes: list[int | None],
+    result: dict[str, str],
+) -> tuple[list[list[str]], dict[str, int]]:
+    """Fill `result` with captions of indexed near-duplicates.
+
+    Returns the paths still to caption: unhashable ones as singleton
+    clusters, and the rest with their hashes for clustering.
+    """
+    unhashed: list[list[str]] = []
+    hashed: dict[str, int] = {}
+    for p, h in zip(paths, hashes, strict=True):
+        if h is None:
+            unhashed.append([p])
+        elif known := index.find_caption(h):
+            result[p] = known
+        else:
+            hashed[p] = h
+    return unhashed, hashed
+
+
+async def _caption_representatives(reps: list[str], concurrency: int) -> tuple[list[str], int]:
+    """Caption `reps` in `runtime.caption_batch_size` batches; return (captions, calls)."""
+    from course_scout.infrastructure.runtime import get_runtime
+
+    batch_size = max(1, get_runtime().caption_batch_size)
+    batches = [reps[i : i + batch_size] for i in range(0, len(reps), batch_size)]
     sem = asyncio.Semaphore(concurrency)
 
-    async def one(p: str) -> tuple[str, str]:
+    async def one(batch: list[str]) -> tuple[list[str], int]:
         async with sem:
-            c = await caption_image(p)
-            return p, c
+            if len(batch) == 1:
+                return [await caption_image(batch[0])], 1
+            return await caption_images(batch)
 
-    results = await asyncio.gather(*[one(p) for p in paths])
-    return {p: c for p, c in results if c}
+    done = await asyncio.gather(*map(one, batches))
+    return [c for batch_caps, _ in done for c in batch_caps], sum(calls for _, calls in done)
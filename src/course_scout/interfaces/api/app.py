@@ -1,10 +1,15 @@
-from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
 from pydantic_settings import BaseSettings
 
 from course_scout.application.digest import GenerateDigestUseCase
 from course_scout.domain.models import ChannelDigest
 from course_scout.infrastructure.summarization import OrchestratedSummarizer
 from course_scout.infrastructure.telegram import TelethonScraper
+from course_scout.infrastructure.telemetry import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    get_telemetry,
+)
 
 
 class Settings(BaseSettings):
@@ -34,6 +39,15 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics(accept: str | None = Header(None)):
+    """LLM call telemetry: OpenMetrics if the scraper asks for it, else Prometheus text."""
+    registry = get_telemetry()
+    if accept and "application/openmetrics-text" in accept:
+        return Response(registry.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+    return Response(registry.render(openmetrics=False), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/digest/{channel}", response_model=ChannelDigest)
 async def get_digest(channel: str, topic: int | None = None, _token: str = Depends(verify_token)):
     # Handle numeric IDs
@@ -86,7 +86,14 @@ def _setup_run_logs() -> str:
 
 
 def _make_summarizer_factory(scraper: TelethonScraper):
-    """Return a factory closure that builds OrchestratedSummarizer per task."""
+    """Return a factory closure that builds OrchestratedSummarizer per task.
+
+    One `ModelRouter` is shared across tasks when `runtime.model_router` is on.
+    """
+    from course_scout.infrastructure.model_router import ModelRouter
+    from course_scout.infrastructure.runtime import get_runtime
+
+    router = ModelRouter.from_runtime() if get_runtime().model_router else None
 
     def _factory(task: ResolvedTaskConfig) -> OrchestratedSummarizer:
         return OrchestratedSummarizer(
@@ -97,11 +104,53 @@ def _make_summarizer_factory(scraper: TelethonScraper):
             chunk_size=task.chunk_size,
             scraper=scraper,
             include_media=task.include_media,
+            topic_name=task.name,
+            prompt_family=task.system_prompt_name,
+            router=router,
+            priority=task.priority,
         )
 
     return _factory
 
 
+def _make_warmup(summarizer_factory):
+    """Return a warmup that pre-connects pooled SDK clients, or None when pooling is off.
+
+    One client per distinct (model, prompt, thinking, effort) — the pool keys
+    clients by call options, so tasks sharing all four share a client.
+    """
+    from course_scout.infrastructure.sdk_pool import get_client_pool
+
+    if get_client_pool() is None:
+        return None
+
+    async def _warmup(tasks: list[ResolvedTaskConfig]) -> None:
+        seen: set[tuple] = set()
+        jobs = []
+        for task in tasks:
+            key = (task.summarizer_model, task.system_prompt, task.thinking, task.effort)
+            if key not in seen:
+                seen.add(key)
+                jobs.append(summarizer_factory(task).prewarm())
+        await asyncio.gather(*jobs)
+
+    return _warmup
+
+
+async def _closing_clients(coro):
+    """Await `coro`, then close pooled SDK clients and the shared HTTP clients."""
+    from course_scout.infrastructure.http_clients import close_shared_clients
+    from course_scout.infrastructure.sdk_pool import get_client_pool
+
+    try:
+        return await coro
+    finally:
+        pool = get_client_pool()
+        if pool is not None:
+            await pool.close()
+        await close_shared_clients()
+
+
 def _filter_tasks_by_topic(
     tasks: list[ResolvedTaskConfig], topic: str | None, scraper: TelethonScraper
 ) -> list[ResolvedTaskConfig]:
@@ -253,6 +302,18 @@ def scan(
         "or when the vault directory is unavailable. Use --no-publish-task to "
         "disable explicitly (e.g. NAS Docker runs).",
     ),
+    batch_mode: bool = typer.Option(
+        False,
+        "--batch-mode",
+        help="Submit all parser calls as asynchronous message batches (half price, "
+        "no RPM throttling, results may take hours). Needs ANTHROPIC_API_KEY.",
+    ),
+    metrics_file: str = typer.Option(
+        None,
+        "--metrics-file",
+        help="Write LLM call metrics (Prometheus text) here after the scan, e.g. for "
+        "node_exporter's textfile collector. Defaults to runtime.metrics_textfile.",
+    ),
 ):
     """Generate a digest across configured topics (all by default; one with --topic)."""
     setup_logging()
@@ -279,18 +340,31 @@ def scan(
     run_dir = _setup_run_logs()
     typer.echo(f"📁 Run logs: {run_dir}/")
 
+    batch_collector = None
+    if batch_mode:
+        from course_scout.infrastructure.batching import BatchCollector
+
+        batch_collector = BatchCollector.from_runtime()
+        typer.echo("📦 Batch mode: parser calls will be submitted as message batches")
+
+    summarizer_factory = _make_summarizer_factory(scraper)
     use_case = BatchScanUseCase(
         scraper=scraper,
-        summarizer_factory=_make_summarizer_factory(scraper),
+        summarizer_factory=summarizer_factory,
+        batch_collector=batch_collector,
+        # Batch mode parks parser calls in batches; there is nothing to warm.
+        warmup=None if batch_mode else _make_warmup(summarizer_factory),
     )
     all_results = asyncio.run(
-        use_case.execute(
-            tasks=selected_tasks,
-            timezone=settings.timezone,
-            days=days,
-            include_today=today,
-            dedup=dedup,
-            run_dir=run_dir,
+        _closing_clients(
+            use_case.execute(
+                tasks=selected_tasks,
+                timezone=settings.timezone,
+                days=days,
+                include_today=today,
+                dedup=dedup,
+                run_dir=run_dir,
+            )
         )
     )
 
@@ -309,23 +383,39 @@ def scan(
     if publish_task and topic is None:
         _maybe_publish_task(md_path, pdf)
 
-    # Aggregate usage across providers.
-    from course_scout.infrastructure.providers.claude_provider import UsageStats
-
-    merged = UsageStats()
-    for _name, _digest, provider in all_results:
-        if hasattr(provider, "usage"):
-            u = provider.usage
-            merged.total_input_tokens += u.total_input_tokens
-            merged.total_output_tokens += u.total_output_tokens
-            merged.total_cache_read_tokens += u.total_cache_read_tokens
-            merged.total_cache_creation_tokens += u.total_cache_creation_tokens
-            merged.total_cost_usd += u.total_cost_usd
-            merged.total_duration_ms += u.total_duration_ms
-            merged.call_count += u.call_count
-            merged.calls.extend(u.calls)
-
-    typer.echo(f"\n{merged.summary()}")
+    # Usage across every provider, vision and the executive summary.
+    from course_scout.infrastructure.runtime import get_runtime
+    from course_scout.infrastructure.telemetry import get_telemetry
+
+    telemetry = get_telemetry()
+    typer.echo(f"\n{telemetry.summary()}")
+    metrics_path = metrics_file or get_runtime().metrics_textfile
+    if metrics_path:
+        typer.echo(f"  Metrics: {telemetry.write_textfile(metrics_path)}")
+
+    from course_scout.infrastructure.quota_ledger import get_quota_ledger
+
+    ledger = get_quota_ledger()
+    if ledger is not None:
+        ledger.flush()
+        typer.echo(f"  {ledger.status().summary()}")
+
+    from course_scout.infrastructure.hedging import get_hedge_stats
+
+    hedge_stats = get_hedge_stats()
+    if hedge_stats.calls:
+        typer.echo(f"  {hedge_stats.summary()}")
+
+    from course_scout.infrastructure.sdk_pool import get_startup_stats
+
+    startup_stats = get_startup_stats()
+    if startup_stats.first_message_ms:
+        typer.echo(f"  {startup_stats.summary()}")
+    if batch_collector is not None:
+        typer.echo(
+            f"  Batches: {batch_collector.batches_submitted} submitted, "
+            f"{batch_collector.requests_submitted} request(s)"
+        )
 
 
 @app.command(name="post-task")
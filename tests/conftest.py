@@ -18,3 +18,33 @@ def mock_env():
         },
     ):
         yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_quota_ledger(tmp_path, monkeypatch):
+    """Debit LLM calls made in tests into a throwaway ledger, not data/reports.db."""
+    from course_scout.infrastructure import quota_ledger
+
+    monkeypatch.setattr(
+        quota_ledger, "_ledger", quota_ledger.QuotaLedger(db_path=str(tmp_path / "quota.db"))
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolated_payload_capture(tmp_path, monkeypatch):
+    """Capture agent payloads made in tests under tmp_path, not data/captures."""
+    from course_scout.infrastructure import payload_capture
+
+    monkeypatch.setattr(
+        payload_capture, "_capture", payload_capture.PayloadCapture(tmp_path / "captures")
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolated_latency_tracker(tmp_path, monkeypatch):
+    """Keep hedge latency history made in tests under tmp_path, not data/reports.db."""
+    from course_scout.infrastructure import hedging
+
+    monkeypatch.setattr(
+        hedging, "_tracker", hedging.LatencyTracker(db_path=str(tmp_path / "latency.db"))
+    )
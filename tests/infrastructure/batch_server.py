@@ -0,0 +1,173 @@
+"""Local stand-in for the Anthropic Messages and Message Batches APIs (tests only).
+
+Implements just enough of `/v1/messages/batches` for `AnthropicBatchClient`:
+create, retrieve (reports `in_progress` for `polls_before_end` polls, then
+`ended` with a `results_url`), and a JSONL results endpoint. Each request's
+StructuredOutput payload comes from `responder(params) -> dict`; return
+None from the responder to make that request `errored`.
+
+`POST /v1/messages` streams the same payload as SSE events for
+`AnthropicHTTPProvider`, or answers `messages_status` (e.g. 429 with a
+`retry-after` header) when that is set. Connections are HTTP/1.1 keep-alive;
+`client_ports` records each distinct client connection.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_JSON = "application/json"
+
+
+class StandInBatchServer:
+    """Threaded HTTP server; use as a context manager, read `.base_url`."""
+
+    def __init__(self, responder: Callable[[dict], dict | None], polls_before_end: int = 1):
+        """Bind to an ephemeral localhost port; `responder` builds each payload."""
+        self.responder = responder
+        self.polls_before_end = polls_before_end
+        self.batches: dict[str, dict] = {}
+        self.received_headers: list[dict] = []
+        self.messages_requests: list[dict] = []
+        self.messages_status = 200
+        self.client_ports: set[int] = set()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> StandInBatchServer:
+        """Start serving in a daemon thread."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop the server and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _result_line(self, req: dict) -> dict:
+        payload = self.responder(req["params"])
+        if payload is None:
+            return {
+                "custom_id": req["custom_id"],
+                "result": {
+                    "type": "errored",
+                    "error": {
+                        "type": "error",
+                        "error": {"type": "invalid_request_error", "message": "stand-in error"},
+                    },
+                },
+            }
+        return {
+            "custom_id": req["custom_id"],
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "model": req["params"]["model"],
+                    "content": [{"type": "tool_use", "name": "StructuredOutput", "input": payload}],
+                    "usage": {"input_tokens": 100, "output_tokens": 20},
+                },
+            },
+        }
+
+    def _sse(self, params: dict) -> str:
+        """SSE body for one streamed message whose tool input arrives in small deltas."""
+        payload = json.dumps(self.responder(params) or {})
+        events = [
+            {
+                "type": "message_start",
+                "message": {"model": params["model"], "usage": {"input_tokens": 100}},
+            },
+            {
+                "type": "content_block_start",
+                "index": 0,
+                "content_block": {"type": "tool_use", "name": "StructuredOutput", "input": {}},
+            },
+            *(
+                {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "input_json_delta", "partial_json": payload[i : i + 16]},
+                }
+                for i in range(0, len(payload), 16)
+            ),
+            {"type": "content_block_stop", "index": 0},
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "tool_use"},
+                "usage": {"output_tokens": 20},
+            },
+            {"type": "message_stop"},
+        ]
+        return "".join(f"event: {e['type']}\ndata: {json.dumps(e)}\n\n" for e in events)
+
+    def _post(self, path: str, body: dict) -> tuple[int, str, str, dict]:
+        """Answer a POST as (status, body, content type, extra headers)."""
+        if path == "/v1/messages":
+            self.messages_requests.append(body)
+            if self.messages_status != 200:
+                error = {"type": "error", "error": {"type": "rate_limit_error"}}
+                return self.messages_status, json.dumps(error), _JSON, {"retry-after": "7"}
+            return 200, self._sse(body), "text/event-stream", {}
+        if path != "/v1/messages/batches":
+            return 404, "{}", _JSON, {}
+        batch_id = f"msgbatch_{len(self.batches) + 1}"
+        self.batches[batch_id] = {"requests": body["requests"], "polls": 0}
+        return 200, json.dumps({"id": batch_id, "processing_status": "in_progress"}), _JSON, {}
+
+    def _get(self, path: str) -> tuple[int, str, str, dict]:
+        """Answer a batch retrieve or results GET like `_post`."""
+        parts = path.strip("/").split("/")
+        if len(parts) < 4 or parts[3] not in self.batches:
+            return 404, "{}", _JSON, {}
+        batch = self.batches[parts[3]]
+        if len(parts) == 5 and parts[4] == "results":
+            lines = [json.dumps(self._result_line(r)) for r in batch["requests"]]
+            return 200, "\n".join(lines), "application/x-jsonl", {}
+        batch["polls"] += 1
+        ended = batch["polls"] > self.polls_before_end
+        info = {
+            "id": parts[3],
+            "processing_status": "ended" if ended else "in_progress",
+            "results_url": f"{self.base_url}/v1/messages/batches/{parts[3]}/results"
+            if ended
+            else None,
+        }
+        return 200, json.dumps(info), _JSON, {}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code: int, body: str, ctype: str, headers: dict):
+                data = body.encode()
+                self.send_response(code)
+                self.send_header("content-type", ctype)
+                self.send_header("content-length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                server.received_headers.append(dict(self.headers))
+                server.client_ports.add(self.client_address[1])
+                body = json.loads(self.rfile.read(int(self.headers["content-length"])) or b"{}")
+                self._send(*server._post(self.path, body))
+
+            def do_GET(self):
+                self._send(*server._get(self.path))
+
+        return Handler
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from course_scout.infrastructure.agents import (
     AgentOrchestrator,
+    AgentRunError,
     AIAgent,
     ClaudeModel,
     RateLimiter,
@@ -25,6 +26,11 @@ class TestAgentOrchestrator(unittest.TestCase):
     def test_rate_limiter_rpm(self):
         self.assertEqual(self.orch.rate_limiter.rpm, 50)
 
+    def test_rate_limiter_is_shared_across_orchestrators(self):
+        with patch("course_scout.infrastructure.agents.ClaudeProvider"):
+            other = AgentOrchestrator()
+        self.assertIs(other.rate_limiter, self.orch.rate_limiter)
+
 
 class TestAIAgent(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -68,4 +74,269 @@ class TestAIAgent(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(result, mock_output)
         self.assertEqual(self.mock_provider.generate_structured.call_count, 2)
-        mock_sleep.assert_called_with(65.0)
+        # No retry-after hint: first backoff step is base/2 .. base (5s), jittered.
+        (delay,), _ = mock_sleep.call_args
+        self.assertTrue(2.5 <= delay <= 5.0)
+
+    @patch("course_scout.infrastructure.agents.asyncio.sleep", new_callable=AsyncMock)
+    async def test_run_rate_limit_honours_retry_after_and_throttles(self, mock_sleep):
+        from course_scout.infrastructure.backoff import ConcurrencyController
+
+        class Throttled(Exception):
+            status_code = 429
+            response = MagicMock(headers={"retry-after": "12"})
+
+        mock_output = SummarizerOutputSchema(items=[], key_links=[])
+        self.mock_provider.generate_structured.side_effect = [Throttled("slow down"), mock_output]
+        self.mock_provider.classify_rate_limit.return_value = None
+        controller = ConcurrencyController(max_limit=8)
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+
+        with patch(
+            "course_scout.infrastructure.agents.get_concurrency_controller",
+            return_value=controller,
+        ):
+            await self.agent.run(input_data)
+
+        (delay,), _ = mock_sleep.call_args
+        self.assertTrue(12.0 <= delay <= 14.4)
+        self.assertEqual(controller.throttles, 1)
+        self.assertEqual(int(controller.limit), 4)  # halved, then +1/4 on success
+        self.assertEqual(controller.in_flight, 0)
+
+    @patch("course_scout.infrastructure.agents.asyncio.sleep", new_callable=AsyncMock)
+    async def test_unhinted_backoff_over_max_wait_fails_over(self, mock_sleep):
+        from course_scout.infrastructure.runtime import RuntimeConfig
+
+        self.mock_provider.generate_structured.side_effect = Exception("429 rate limit")
+        self.mock_provider.classify_rate_limit.return_value = None
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+        rt = RuntimeConfig(rate_limit_backoff_base=60.0, rate_limit_max_wait=10.0)
+        with (
+            patch("course_scout.infrastructure.runtime.get_runtime", return_value=rt),
+            self.assertRaisesRegex(AgentRunError, "429"),
+        ):
+            await self.agent.run(input_data)
+        mock_sleep.assert_not_called()
+
+    async def test_generate_in_error_text_is_not_a_rate_limit(self):
+        self.mock_provider.generate_structured.side_effect = Exception("failed to GENERATE output")
+        self.mock_provider.classify_rate_limit.return_value = None
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+        with self.assertRaises(AgentRunError):
+            await self.agent.run(input_data)
+        self.assertEqual(self.mock_provider.generate_structured.call_count, 1)
+
+
+class TestAIAgentStreaming(unittest.IsolatedAsyncioTestCase):
+    async def test_streamed_items_forwarded_and_salvaged_on_failure(self):
+        from course_scout.infrastructure.agents import AgentRunError, RawDigestItem
+
+        async def fake_generate(**kwargs):
+            kwargs["on_item"]({"title": "A", "description": "d", "category": "course"})
+            kwargs["on_item"]({"bogus": True})  # fails validation → dropped
+            raise TimeoutError
+
+        provider = MagicMock()
+        provider.generate_structured = fake_generate
+        agent = AIAgent(
+            provider, ["m1"], "prompt", SummarizerOutputSchema, MagicMock(acquire=AsyncMock())
+        )
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+        seen: list = []
+
+        with self.assertRaises(AgentRunError) as ctx:
+            await agent.run(input_data, on_item=seen.append)
+
+        self.assertEqual([i.title for i in seen], ["A"])
+        self.assertEqual(len(ctx.exception.partial), 1)
+        self.assertIsInstance(ctx.exception.partial[0], RawDigestItem)
+
+
+class TestAIAgentOutputRepair(unittest.IsolatedAsyncioTestCase):
+    def _agent(self, provider, models=("m1", "m2")):
+        return AIAgent(
+            provider, list(models), "prompt", SummarizerOutputSchema, MagicMock(acquire=AsyncMock())
+        )
+
+    async def test_invalid_output_sent_to_repair_model(self):
+        from course_scout.infrastructure.agents import REPAIR_PROMPT
+        from course_scout.infrastructure.runtime import RuntimeConfig
+        from course_scout.infrastructure.schema_cache import OutputValidationError, schema_for
+
+        fixed = SummarizerOutputSchema(items=[], key_links=[])
+        bad = '{"items": [{"title": "x"}]}'
+
+        async def fake_generate(**kwargs):
+            if kwargs["model_id"] == "cheap":
+                return fixed
+            return schema_for(SummarizerOutputSchema).validate_output(bad)
+
+        provider = MagicMock()
+        provider.generate_structured = AsyncMock(side_effect=fake_generate)
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+        with patch(
+            "course_scout.infrastructure.runtime.get_runtime",
+            return_value=RuntimeConfig(repair_model="cheap"),
+        ):
+            result = await self._agent(provider).run(input_data)
+
+        self.assertIs(result, fixed)
+        models = [c.kwargs["model_id"] for c in provider.generate_structured.call_args_list]
+        self.assertEqual(models, ["m1", "cheap"])
+        repair = provider.generate_structured.call_args_list[1].kwargs
+        self.assertEqual(repair["system_prompt"], REPAIR_PROMPT)
+        self.assertIn('\\"title\\": \\"x\\"', repair["input_data"])
+        self.assertIn("description", repair["input_data"])  # the missing-field error
+        with self.assertRaises(OutputValidationError):
+            schema_for(SummarizerOutputSchema).validate_output(bad)
+
+    async def test_repair_disabled_falls_through_to_next_model(self):
+        from course_scout.infrastructure.runtime import RuntimeConfig
+        from course_scout.infrastructure.schema_cache import schema_for
+
+        good = SummarizerOutputSchema(items=[], key_links=[])
+
+        async def fake_generate(**kwargs):
+            if kwargs["model_id"] == "m2":
+                return good
+            return schema_for(SummarizerOutputSchema).validate_output('{"items": 3}')
+
+        provider = MagicMock()
+        provider.generate_structured = AsyncMock(side_effect=fake_generate)
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+        with patch(
+            "course_scout.infrastructure.runtime.get_runtime",
+            return_value=RuntimeConfig(repair_model=""),
+        ):
+            result = await self._agent(provider).run(input_data)
+
+        self.assertIs(result, good)
+        self.assertEqual(provider.generate_structured.call_count, 2)
+
+
+class TestAIAgentHedging(unittest.IsolatedAsyncioTestCase):
+    async def test_hung_call_hedged_to_fallback_model(self):
+        import asyncio
+
+        from course_scout.infrastructure.hedging import LatencyTracker
+        from course_scout.infrastructure.runtime import RuntimeConfig
+
+        async def fake_generate(**kwargs):
+            if kwargs["model_id"] == "m1":
+                await asyncio.sleep(60)
+            self.assertIsNone(kwargs["on_item"])  # only the primary streams
+            return SummarizerOutputSchema(items=[], key_links=[])
+
+        provider = MagicMock()
+        provider.generate_structured = fake_generate
+        limiter = MagicMock(acquire=AsyncMock())
+        agent = AIAgent(provider, ["m1", "m2"], "prompt", SummarizerOutputSchema, limiter)
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+        tracker = LatencyTracker(min_samples=1)
+        tracker.record(2, 0.01)
+        rt = RuntimeConfig(hedge_requests=True, hedge_min_delay=0.0, hedge_to_fallback=True)
+
+        with (
+            patch("course_scout.infrastructure.runtime.get_runtime", return_value=rt),
+            patch("course_scout.infrastructure.hedging.get_latency_tracker", return_value=tracker),
+        ):
+            result = await asyncio.wait_for(agent.run(input_data, on_item=lambda _: None), 5)
+
+        self.assertEqual(result.items, [])
+        # The duplicate reserved its own rate-limiter tokens.
+        self.assertEqual([c.args[0] for c in limiter.acquire.call_args_list], ["m1", "m2"])
+        # The winner's capped latency is not a sample; the primary never finished.
+        self.assertEqual(sorted(tracker._samples[2]), [0.01])
+
+
+class TestAIAgentCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+    async def test_open_breaker_fails_over_to_alternate_provider(self):
+        from course_scout.infrastructure.circuit_breaker import CircuitBreaker
+
+        claude, deepseek = MagicMock(), MagicMock()
+        claude.generate_structured = AsyncMock(side_effect=AssertionError("short-circuited"))
+        out = SummarizerOutputSchema(items=[], key_links=[])
+        deepseek.generate_structured = AsyncMock(return_value=out)
+        breakers = {"claude-sonnet-4-6": CircuitBreaker("claude-sonnet-4-6", failure_threshold=1)}
+        breakers["claude-sonnet-4-6"].record_failure()
+        breakers["deepseek-chat"] = CircuitBreaker("deepseek-chat")
+
+        agent = AIAgent(
+            claude,
+            ["claude-sonnet-4-6"],
+            "prompt",
+            SummarizerOutputSchema,
+            MagicMock(acquire=AsyncMock()),
+            provider_for={"claude-sonnet-4-6": claude, "deepseek-chat": deepseek}.__getitem__,
+            breaker_for=breakers.__getitem__,
+            failover_models=["deepseek-chat"],
+        )
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+
+        self.assertIs(await agent.run(input_data), out)
+        claude.generate_structured.assert_not_called()
+        self.assertEqual(deepseek.generate_structured.call_args.kwargs["model_id"], "deepseek-chat")
+
+    async def test_server_errors_trip_breaker(self):
+        from course_scout.infrastructure.agents import AgentRunError
+        from course_scout.infrastructure.circuit_breaker import BreakerState, CircuitBreaker
+
+        provider = MagicMock()
+        provider.generate_structured = AsyncMock(side_effect=Exception("529 overloaded"))
+        breaker = CircuitBreaker("m1", failure_threshold=2)
+        agent = AIAgent(
+            provider,
+            ["m1"],
+            "prompt",
+            SummarizerOutputSchema,
+            MagicMock(acquire=AsyncMock()),
+            breaker_for=lambda _m: breaker,
+        )
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+
+        for _ in range(3):
+            with self.assertRaises(AgentRunError):
+                await agent.run(input_data)
+
+        self.assertEqual(breaker.state, BreakerState.OPEN)
+        self.assertEqual(provider.generate_structured.call_count, 2)
+
+    @patch("course_scout.infrastructure.agents.asyncio.sleep", new_callable=AsyncMock)
+    async def test_breaker_opened_during_backoff_moves_to_next_model(self, _sleep):
+        from course_scout.infrastructure.circuit_breaker import CircuitBreaker
+
+        breakers = {"m1": CircuitBreaker("m1", failure_threshold=1), "m2": CircuitBreaker("m2")}
+        out = SummarizerOutputSchema(items=[], key_links=[])
+
+        async def generate(**kwargs):
+            if kwargs["model_id"] == "m2":
+                return out
+            breakers["m1"].record_failure()  # another topic trips m1 meanwhile
+            raise Exception("429 RATE limit exceeded")
+
+        provider = MagicMock()
+        provider.generate_structured = AsyncMock(side_effect=generate)
+        agent = AIAgent(
+            provider,
+            ["m1", "m2"],
+            "prompt",
+            SummarizerOutputSchema,
+            MagicMock(acquire=AsyncMock()),
+            breaker_for=breakers.__getitem__,
+        )
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "{}"
+
+        self.assertIs(await agent.run(input_data), out)
+        models = [c.kwargs["model_id"] for c in provider.generate_structured.call_args_list]
+        self.assertEqual(models, ["m1", "m2"])
@@ -0,0 +1,88 @@
+"""Tests for the direct Messages API provider against a local stand-in server."""
+
+from __future__ import annotations
+
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from course_scout.infrastructure.agents import AgentOrchestrator, SummarizerOutputSchema
+from course_scout.infrastructure.http_clients import close_shared_clients
+from course_scout.infrastructure.providers import anthropic_http
+from course_scout.infrastructure.providers.anthropic_http import AnthropicHTTPProvider
+from course_scout.infrastructure.runtime import RuntimeConfig
+from tests.infrastructure.batch_server import StandInBatchServer
+
+
+def _two_items(params: dict) -> dict:
+    text = params["messages"][0]["content"]
+    return {
+        "items": [
+            {"title": f"{text}-1", "description": "d", "category": "course"},
+            {"title": f"{text}-2", "description": "d", "category": "file"},
+        ],
+        "key_links": [],
+    }
+
+
+class TestAnthropicHTTPProvider(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInBatchServer(_two_items).__enter__()
+        env = {"ANTHROPIC_BASE_URL": self.server.base_url, "ANTHROPIC_API_KEY": "test-key"}
+        self.env = patch.dict(os.environ, env)
+        self.env.start()
+
+    async def asyncTearDown(self):
+        await close_shared_clients()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.__exit__(None, None, None)
+
+    async def test_streams_structured_output_and_records_usage(self):
+        provider = AnthropicHTTPProvider()
+        streamed: list[dict] = []
+        result = await provider.generate_structured(
+            "claude-haiku-4-5", "sys", "topic", SummarizerOutputSchema, on_item=streamed.append
+        )
+
+        self.assertEqual([i.title for i in result.items], ["topic-1", "topic-2"])
+        self.assertEqual([i["title"] for i in streamed], ["topic-1", "topic-2"])
+        params = self.server.messages_requests[0]
+        self.assertTrue(params["stream"])
+        self.assertEqual(params["system"], "sys")
+        self.assertEqual(params["tool_choice"], {"type": "tool", "name": "StructuredOutput"})
+        self.assertEqual(self.server.received_headers[0]["x-api-key"], "test-key")
+        self.assertEqual(provider.usage.call_count, 1)
+        self.assertEqual(provider.usage.total_input_tokens, 100)
+        self.assertEqual(provider.usage.total_output_tokens, 20)
+        self.assertAlmostEqual(provider.usage.total_cost_usd, (100 * 1.0 + 20 * 5.0) / 1e6)
+
+    async def test_calls_share_one_kept_alive_connection(self):
+        provider = AnthropicHTTPProvider()
+        for text in ("a", "b", "c"):
+            await provider.generate_structured("m", "sys", text, SummarizerOutputSchema)
+        self.assertEqual(len(self.server.messages_requests), 3)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    async def test_rate_limit_surfaces_retry_after(self):
+        self.server.messages_status = 429
+        provider = AnthropicHTTPProvider()
+        with self.assertRaises(httpx.HTTPStatusError) as ctx:
+            await provider.generate_structured("m", "sys", "x", SummarizerOutputSchema)
+        signal = provider.classify_rate_limit(ctx.exception)
+        self.assertIsNotNone(signal)
+        self.assertEqual(signal.retry_after, 7.0)
+        self.assertEqual(provider.usage.call_count, 0)
+
+
+def test_orchestrator_selects_http_provider_per_model():
+    rt = RuntimeConfig(anthropic_http_models=["claude-haiku-4-5"])
+    with patch("course_scout.infrastructure.runtime.get_runtime", return_value=rt):
+        orch = AgentOrchestrator(summarizer_model="claude-haiku-4-5")
+        http = orch._get_provider("claude-haiku-4-5")
+        sdk = orch._get_provider("claude-sonnet-4-6")
+    assert isinstance(http, anthropic_http.AnthropicHTTPProvider)
+    assert not isinstance(sdk, anthropic_http.AnthropicHTTPProvider)
@@ -0,0 +1,127 @@
+import asyncio
+import random
+import time
+import unittest
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from course_scout.domain.models import RateLimitSignal
+from course_scout.infrastructure.backoff import (
+    ConcurrencyController,
+    backoff_delay,
+    classify_rate_limit,
+    parse_retry_after,
+)
+from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = MagicMock(status_code=status, headers=headers or {})
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"Retry-After": "7"}, 7.0),
+        ({"retry-after-ms": "1500", "retry-after": "9"}, 1.5),
+        ({"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "6m0s"}, 360.0),
+        ({"x-ratelimit-reset-tokens": "250ms"}, 0.25),
+        ({"content-type": "application/json"}, None),
+        (None, None),
+    ],
+)
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+def test_parse_retry_after_timestamps():
+    later = datetime.now(UTC) + timedelta(seconds=30)
+    assert 28 <= parse_retry_after({"retry-after": format_datetime(later)}) <= 30
+    anthropic = {"anthropic-ratelimit-requests-reset": later.isoformat()}
+    assert 28 <= parse_retry_after(anthropic) <= 30
+
+
+def test_classify_structured_and_textual_errors():
+    signal = classify_rate_limit(_HTTPError(429, {"retry-after": "4"}))
+    assert signal == RateLimitSignal(retry_after=4.0, source="status")
+    assert classify_rate_limit(_HTTPError(500)) is None
+
+    text = classify_rate_limit(RuntimeError("API Error: rate_limit_error, retry after 3s"))
+    assert text == RateLimitSignal(retry_after=3.0, source="text")
+
+    assert classify_rate_limit(RuntimeError("could not GENERATE an ACCURATE answer")) is None
+    assert classify_rate_limit(RuntimeError("model output 4290 tokens")) is None
+
+
+def test_claude_usage_limit_becomes_retry_hint():
+    reset = int(time.time()) + 3600
+    signal = ClaudeProvider().classify_rate_limit(
+        RuntimeError(f"Claude SDK error (error): Claude AI usage limit reached|{reset}")
+    )
+    assert signal.source == "usage_limit"
+    assert 3590 <= signal.retry_after <= 3600
+    assert ClaudeProvider().classify_rate_limit(RuntimeError("boom")) is None
+
+
+def test_backoff_delay_jitter():
+    rng = random.Random(0)
+    delays = [backoff_delay(2, None, base=5.0, cap=65.0, rng=rng) for _ in range(200)]
+    assert all(10.0 <= d <= 20.0 for d in delays)
+    assert len({round(d, 3) for d in delays}) > 100  # spread, not one stampede time
+    assert 32.5 <= backoff_delay(10, None, base=5.0, cap=65.0, rng=rng) <= 65.0
+    hinted = backoff_delay(0, RateLimitSignal(retry_after=10.0), base=5.0, cap=65.0, rng=rng)
+    assert 10.0 <= hinted <= 12.0
+
+
+class TestConcurrencyController(unittest.IsolatedAsyncioTestCase):
+    async def test_limit_gates_in_flight_calls(self):
+        controller = ConcurrencyController(max_limit=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with controller.slot():
+                peak = max(peak, controller.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(controller.in_flight, 0)
+
+    async def test_aimd(self):
+        now = [0.0]
+        controller = ConcurrencyController(
+            max_limit=16, min_limit=2, decrease_cooldown=10.0, clock=lambda: now[0]
+        )
+        controller.on_throttle()
+        controller.on_throttle()  # same burst: ignored
+        self.assertEqual(controller.limit, 8.0)
+        now[0] = 11.0
+        for _ in range(3):
+            controller.on_throttle()
+            now[0] += 11.0
+        self.assertEqual(controller.limit, 2.0)  # floor
+
+        for _ in range(2 + 3):  # one window at 2, then 3 successes at ~3
+            controller.on_success()
+        self.assertEqual(int(controller.limit), 3)
+        for _ in range(500):
+            controller.on_success()
+        self.assertEqual(controller.limit, 16.0)
+
+    async def test_growth_wakes_waiters(self):
+        controller = ConcurrencyController(max_limit=4, min_limit=1)
+        controller.limit = 1.0
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+        controller.on_success()  # limit 1 → 2
+        await asyncio.wait_for(waiter, 1.0)
+        self.assertEqual(controller.in_flight, 2)
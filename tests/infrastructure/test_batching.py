@@ -0,0 +1,121 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from course_scout.infrastructure.agents import AIAgent, SummarizerOutputSchema
+from course_scout.infrastructure.batching import BatchCollector, get_active_collector
+from course_scout.infrastructure.providers.anthropic_batch import parse_result_line
+from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
+from tests.infrastructure.batch_server import StandInBatchServer
+
+
+def _echo_topic(params: dict) -> dict | None:
+    """Respond with one item titled after the request's input text."""
+    text = params["messages"][0]["content"]
+    if "FAIL" in text:
+        return None
+    return {"items": [{"title": text, "description": "d", "category": "course"}], "key_links": []}
+
+
+class TestBatchCollector(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StandInBatchServer(_echo_topic, polls_before_end=2).__enter__()
+        env = {"ANTHROPIC_BASE_URL": self.server.base_url, "ANTHROPIC_API_KEY": "test-key"}
+        self.env = patch.dict(os.environ, env)
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.__exit__(None, None, None)
+
+    async def test_calls_from_many_topics_share_one_batch(self):
+        collector = BatchCollector(collect_window=0.05, poll_interval=0.01)
+        providers = [ClaudeProvider(), ClaudeProvider(), ClaudeProvider()]
+
+        async with collector.activate():
+            self.assertIs(get_active_collector(), collector)
+            results = await asyncio.gather(
+                *(
+                    collector.generate(
+                        p, "claude-haiku-4-5", "sys", f"topic-{i}", SummarizerOutputSchema
+                    )
+                    for i, p in enumerate(providers)
+                )
+            )
+        self.assertIsNone(get_active_collector())
+
+        self.assertEqual(len(self.server.batches), 1)
+        self.assertEqual(collector.requests_submitted, 3)
+        self.assertEqual([r.items[0].title for r in results], ["topic-0", "topic-1", "topic-2"])
+        # Usage lands on each topic's own provider, at the batch discount.
+        for p in providers:
+            self.assertEqual(p.usage.call_count, 1)
+            self.assertAlmostEqual(p.usage.total_cost_usd, (100 * 1.0 + 20 * 5.0) / 1e6 * 0.5)
+        self.assertEqual(self.server.received_headers[0]["x-api-key"], "test-key")
+
+    async def test_call_parked_mid_flush_forms_the_next_batch(self):
+        collector = BatchCollector(collect_window=0.05, poll_interval=0.05)
+        first = asyncio.create_task(
+            collector.generate(ClaudeProvider(), "m", "sys", "early", SummarizerOutputSchema)
+        )
+        while not self.server.batches:  # first batch submitted and being polled
+            await asyncio.sleep(0.01)
+        late = await asyncio.wait_for(
+            collector.generate(ClaudeProvider(), "m", "sys", "late", SummarizerOutputSchema),
+            timeout=5,
+        )
+
+        self.assertEqual((await first).items[0].title, "early")
+        self.assertEqual(late.items[0].title, "late")
+        self.assertEqual(collector.batches_submitted, 2)
+
+    async def test_errored_request_raises_only_for_its_caller(self):
+        collector = BatchCollector(collect_window=0.05, poll_interval=0.01)
+        ok, bad = await asyncio.gather(
+            collector.generate(ClaudeProvider(), "m", "sys", "fine", SummarizerOutputSchema),
+            collector.generate(ClaudeProvider(), "m", "sys", "FAIL", SummarizerOutputSchema),
+            return_exceptions=True,
+        )
+        self.assertEqual(ok.items[0].title, "fine")
+        self.assertIsInstance(bad, RuntimeError)
+        self.assertIn("stand-in error", str(bad))
+
+    async def test_agent_run_skips_rate_limiter_in_batch_mode(self):
+        rate_limiter = MagicMock(acquire=AsyncMock())
+        agent = AIAgent(
+            ClaudeProvider(), ["claude-haiku-4-5"], "sys", SummarizerOutputSchema, rate_limiter
+        )
+        input_data = MagicMock()
+        input_data.model_dump_json.return_value = "agent-topic"
+
+        async with BatchCollector(collect_window=0.01, poll_interval=0.01).activate():
+            result = await agent.run(input_data)
+
+        self.assertEqual(result.items[0].title, "agent-topic")
+        rate_limiter.acquire.assert_not_called()
+
+
+def test_parse_result_line_prefers_tool_output():
+    res = parse_result_line(
+        {
+            "custom_id": "req-1",
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "content": [
+                        {"type": "text", "text": "thinking aloud"},
+                        {"type": "tool_use", "name": "StructuredOutput", "input": {"items": []}},
+                    ],
+                    "usage": {"input_tokens": 5},
+                },
+            },
+        }
+    )
+    assert res.ok and res.output == {"items": []} and res.usage == {"input_tokens": 5}
+
+
+def test_parse_result_line_expired():
+    res = parse_result_line({"custom_id": "req-2", "result": {"type": "expired"}})
+    assert not res.ok
+    assert res.error.startswith("expired")
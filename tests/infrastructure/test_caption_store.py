@@ -0,0 +1,90 @@
+import json
+import shutil
+import sqlite3
+import unittest
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from course_scout.infrastructure import vision
+from course_scout.infrastructure.caption_store import CaptionStore, content_hash
+from course_scout.infrastructure.image_hash import ImageHashIndex
+
+
+def _age(store: CaptionStore, digest: str, days: int) -> None:
+    stamp = (datetime.now(UTC) - timedelta(days=days)).isoformat()
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute("UPDATE captions SET last_used_at = ? WHERE content_hash = ?", (stamp, digest))
+
+
+def test_content_hash_ignores_filename(tmp_path):
+    a = tmp_path / "media_1.jpg"
+    a.write_bytes(b"same bytes")
+    b = tmp_path / "media_2.jpg"
+    shutil.copy(a, b)
+    assert content_hash(str(a)) == content_hash(str(b))
+    assert content_hash(str(tmp_path / "missing.jpg")) is None
+
+
+def test_put_and_get_many(tmp_path):
+    store = CaptionStore(tmp_path / "captions.db")
+    store.put_many({"h1": "cover one", "h2": "cover two"})
+    store.put_many({"h2": "cover two, recaptioned"})
+    assert store.get_many(["h1", "h2", "h3"]) == {"h1": "cover one", "h2": "cover two, recaptioned"}
+    assert store.get_many([]) == {}
+    assert len(store) == 2
+
+
+def test_evicts_stale_then_least_recently_used(tmp_path):
+    store = CaptionStore(tmp_path / "captions.db", max_entries=2, max_age_days=30)
+    store.put_many({"old": "a", "mid": "b"})
+    _age(store, "old", 31)
+    _age(store, "mid", 5)
+    assert store.evict() == 1  # "old" is past max_age_days
+    assert store.get_many(["old"]) == {}
+
+    store.put_many({"new1": "c", "new2": "d"})  # three rows > max_entries
+    assert len(store) == 2
+    assert set(store.get_many(["mid", "new1", "new2"])) == {"new1", "new2"}
+
+
+def test_imports_legacy_json_once(tmp_path):
+    (tmp_path / "media_1.jpg").write_bytes(b"image bytes")
+    legacy = {"media_1.jpg": "legacy caption", "gone.jpg": "file deleted since"}
+    (tmp_path / "captions.json").write_text(json.dumps(legacy))
+
+    store = CaptionStore(tmp_path / "captions.db")
+    digest = content_hash(str(tmp_path / "media_1.jpg"))
+    assert store.get_many([digest]) == {digest: "legacy caption"}
+    assert len(store) == 1
+    assert not (tmp_path / "captions.json").exists()
+    assert (tmp_path / "captions.json.migrated").exists()
+
+
+class TestCaptionPathsStore(unittest.IsolatedAsyncioTestCase):
+    @pytest.fixture(autouse=True)
+    def _tmp(self, tmp_path):
+        self.tmp = tmp_path
+
+    def setUp(self):
+        vision._store = CaptionStore(self.tmp / "captions.db")
+        vision._hash_index = ImageHashIndex(vision._store)
+
+    def tearDown(self):
+        vision._store = None
+        vision._hash_index = None
+
+    async def test_byte_identical_repost_hits_store(self):
+        # Not decodable as an image, so only the content-hash store can match it.
+        first = self.tmp / "media_1.jpg"
+        first.write_bytes(b"\xff\xd8 opaque bytes")
+        repost = self.tmp / "media_99.jpg"
+        shutil.copy(first, repost)
+
+        with patch.object(vision, "caption_image", AsyncMock(return_value="cover")) as mock:
+            await vision.caption_paths([str(first)])
+            result = await vision.caption_paths([str(repost)])
+
+        self.assertEqual(mock.await_count, 1)
+        self.assertEqual(result, {str(repost): "cover"})
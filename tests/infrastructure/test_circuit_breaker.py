@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import pytest
+
+from course_scout.infrastructure.circuit_breaker import (
+    BreakerState,
+    CircuitBreaker,
+    is_breaker_failure,
+)
+
+
+class _Status(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.status_code = code
+
+
+@pytest.mark.parametrize(
+    ("exc", "expected"),
+    [
+        (TimeoutError(), True),
+        (Exception("Error code: 529 overloaded_error"), True),
+        (Exception("503 Service Unavailable"), True),
+        (_Status(502), True),
+        (_Status(400), False),
+        (Exception("429 RATE limit exceeded"), False),
+        (ValueError("validation failed"), False),
+        (Exception("prompt is 1500 tokens over the limit"), False),
+        (Exception("request req_5031 failed to generate"), False),
+        (Exception("upstream returned 500."), True),
+        (Exception("rate_limit_error"), False),
+    ],
+)
+def test_is_breaker_failure(exc, expected):
+    assert is_breaker_failure(exc) is expected
+
+
+def test_trips_after_consecutive_failures():
+    b = CircuitBreaker("m", failure_threshold=3, cooldown=60)
+    b.record_failure()
+    b.record_failure()
+    assert b.allow()
+    b.record_failure()
+    assert b.state == BreakerState.OPEN
+    assert not b.allow()
+
+
+def test_success_resets_consecutive_count():
+    b = CircuitBreaker("m", failure_threshold=2, cooldown=60)
+    b.record_failure()
+    b.record_success()
+    b.record_failure()
+    assert b.state == BreakerState.CLOSED
+
+
+def test_half_open_allows_single_probe():
+    b = CircuitBreaker("m", failure_threshold=1, cooldown=10)
+    with patch("course_scout.infrastructure.circuit_breaker.time.monotonic", return_value=100):
+        b.record_failure()
+    with patch("course_scout.infrastructure.circuit_breaker.time.monotonic", return_value=111):
+        assert b.allow()
+        assert b.state == BreakerState.HALF_OPEN
+        assert not b.allow()  # probe already in flight
+        b.record_success()
+    assert b.state == BreakerState.CLOSED
+    assert b.allow()
+
+
+def test_failed_probe_reopens():
+    b = CircuitBreaker("m", failure_threshold=5, cooldown=10)
+    b.state = BreakerState.OPEN
+    with patch("course_scout.infrastructure.circuit_breaker.time.monotonic", return_value=1e9):
+        assert b.allow()
+        b.record_failure()
+        assert b.state == BreakerState.OPEN
+        assert not b.allow()
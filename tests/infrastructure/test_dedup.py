@@ -9,10 +9,13 @@ from course_scout.domain.models import (
     RequestItem,
 )
 from course_scout.infrastructure.dedup import (
+    BloomFilter,
     DigestDeduper,
     SeenItemRepository,
+    SeenKeyCache,
     normalize_filename,
     normalize_url,
+    reset_seen_caches,
 )
 
 # ── normalize_url ──
@@ -86,6 +89,19 @@ def test_mark_seen_is_idempotent(repo):
     assert repo.stats() == {"links": 1, "files": 0}
 
 
+def test_bulk_lookup_and_mark(repo):
+    urls = [f"https://x.com/{i}" for i in range(1200)]  # spans several IN batches
+    repo.mark_many(
+        links=[(u, "ch", "t") for u in urls[::2]],
+        files=[("file_one", "ch", "t")],
+    )
+    assert repo.seen_links_many(urls + urls[:10]) == set(urls[::2])
+    assert repo.seen_files_many(["file_one", "file_two"]) == {"file_one"}
+    assert repo.seen_links_many([]) == set()
+    repo.mark_many(links=[(urls[0], "ch2", "other")])  # first sighting wins, no dup row
+    assert repo.stats() == {"links": 600, "files": 1}
+
+
 def test_stats(repo):
     repo.mark_link_seen("https://x.com/a", "ch", "t")
     repo.mark_link_seen("https://x.com/b", "ch", "t")
@@ -211,3 +227,105 @@ def test_file_dedup_by_filename_alone(repo):
     second = _digest([FileItem(title="krenz course vol1.RAR", description="d", links=[])])
     dropped = deduper.filter(second)
     assert dropped == 1
+
+
+def test_filter_queries_once_per_table_and_dedups_within_the_digest(repo, monkeypatch):
+    deduper = DigestDeduper(channel_name="test", repo=repo)
+    calls = []
+    for name in ("is_link_seen", "is_file_seen", "mark_link_seen", "mark_file_seen"):
+        monkeypatch.setattr(repo, name, lambda *a, _n=name: calls.append(_n))
+    items = [
+        CourseItem(title=f"C{i}", description="d", links=[f"https://coloso.us/{i}"])
+        for i in range(200)
+    ]
+    items.append(CourseItem(title="C0 again", description="d", links=["https://coloso.us/0"]))
+    digest = _digest(items)
+
+    assert deduper.filter(digest) == 1
+    assert calls == []
+    assert repo.stats() == {"links": 200, "files": 0}
+
+
+# ── SeenKeyCache ──
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(1000, fp_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"k{i}")
+    assert all(f"k{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+    assert len(bloom) == 1000 and bloom.nbytes < 1300
+
+
+@pytest.mark.parametrize("bloom_threshold", [1, 1_000_000])
+def test_preloaded_cache_answers_negatives_without_io(repo, monkeypatch, bloom_threshold):
+    repo.mark_many(links=[("https://coloso.us/a", "ch", "t")], files=[("file_a", "ch", "t")])
+    cache = SeenKeyCache.preload(repo, bloom_threshold=bloom_threshold)
+    deduper = DigestDeduper(channel_name="test", repo=repo, seen_cache=cache)
+    queried = []
+    for name in ("seen_links_many", "seen_files_many"):
+        real = getattr(repo, name)
+        monkeypatch.setattr(
+            repo, name, lambda keys, _real=real: queried.append(list(keys)) or _real(keys)
+        )
+
+    new = _digest([CourseItem(title="B", description="d", links=["https://coloso.us/b"])])
+    assert deduper.filter(new) == 0
+    assert queried == []  # never-seen key: no disk lookup
+
+    again = _digest(
+        [
+            CourseItem(title="A", description="d", links=["https://coloso.us/a"]),
+            CourseItem(
+                title="B", description="d", links=["https://coloso.us/b"]
+            ),  # written through
+            FileItem(title="File A.zip", description="d", links=[]),
+        ]
+    )
+    assert deduper.filter(again) == 3
+    assert sorted(k for batch in queried for k in batch) == [
+        "file_a",
+        "https://coloso.us/a",
+        "https://coloso.us/b",
+    ]
+
+
+def test_preload_is_shared_per_database(repo):
+    from unittest.mock import patch
+
+    from course_scout.infrastructure.runtime import RuntimeConfig
+
+    with patch(
+        "course_scout.infrastructure.runtime.get_runtime",
+        return_value=RuntimeConfig(dedup_preload=True),
+    ):
+        first = DigestDeduper(channel_name="a", repo=repo)
+        second = DigestDeduper(channel_name="b", repo=SeenItemRepository(repo.db_path))
+    assert first.seen_cache is second.seen_cache is not None
+    with patch(
+        "course_scout.infrastructure.runtime.get_runtime",
+        return_value=RuntimeConfig(dedup_preload=False),
+    ):
+        assert DigestDeduper(channel_name="c", repo=repo).seen_cache is None
+
+
+def test_reset_reloads_keys_marked_elsewhere(repo):
+    from unittest.mock import patch
+
+    from course_scout.infrastructure.runtime import RuntimeConfig
+
+    link = "https://coloso.us/a"
+    with patch(
+        "course_scout.infrastructure.runtime.get_runtime",
+        return_value=RuntimeConfig(dedup_preload=True),
+    ):
+        stale = DigestDeduper(channel_name="a", repo=repo).seen_cache
+        SeenItemRepository(repo.db_path).mark_many(links=[(link, "other", "t")])
+        assert stale is not None and stale.maybe_seen("links", [link]) == []
+
+        reset_seen_caches()
+        fresh = DigestDeduper(channel_name="a", repo=repo).seen_cache
+    assert fresh is not stale
+    assert fresh is not None and fresh.maybe_seen("links", [link]) == [link]
@@ -0,0 +1,56 @@
+import pytest
+
+from course_scout.infrastructure.grounding import (
+    GroundingIndex,
+    extract_message_id,
+    parse_tme_link,
+)
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://t.me/c/1603660516/166550/567832", ("1603660516", 567832)),
+        ("https://t.me/c/1603660516/567832/", ("1603660516", 567832)),
+        ("https://t.me/somechannel/42?single", ("somechannel", 42)),
+        ("t.me/somechannel/42", ("somechannel", 42)),
+        ("https://t.me/c/1603660516", None),
+        ("https://t.me/somechannel", None),
+        ("https://nott.me/x/1", None),
+        (None, None),
+    ],
+)
+def test_parse_tme_link(url, expected):
+    assert parse_tme_link(url) == expected
+
+
+def test_extract_message_id_falls_back_to_trailing_digits():
+    assert extract_message_id("https://example.com/post/77") == 77
+    assert extract_message_id("https://example.com/post") is None
+
+
+def test_index_tolerates_trailing_slash_and_tracking_params():
+    index = GroundingIndex({1: "https://t.me/c/1/2/1"}, {"https://coloso.us/courses/abc"})
+    assert index.contains("https://coloso.us/courses/abc/")
+    assert index.contains("https://www.coloso.us/courses/abc?utm_source=tg")
+    assert index.contains("https://t.me/c/1/2/1/")
+    assert not index.contains("https://coloso.us/courses/xyz")
+
+
+def test_index_keeps_fragments_distinct():
+    index = GroundingIndex({}, {"https://mega.nz/folder/abc#key1"})
+    assert index.contains("https://mega.nz/folder/abc#key1")
+    assert not index.contains("https://mega.nz/folder/abc#other")
+
+
+def test_from_messages_collects_links_and_text_urls():
+    class Msg:
+        def __init__(self, id, link, content):
+            self.id, self.link, self.content = id, link, content
+
+    index = GroundingIndex.from_messages(
+        [Msg(5, "https://t.me/c/1/5", "see https://drive.google.com/x"), Msg(6, None, "hi")]
+    )
+    assert index.msg_ids == {5}
+    assert index.permalink(5) == "https://t.me/c/1/5"
+    assert index.contains("https://drive.google.com/x")
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from course_scout.infrastructure.hedging import HedgeStats, LatencyTracker, hedged_call
+from course_scout.infrastructure.telemetry import UsageStats
+
+
+def test_threshold_needs_min_samples():
+    t = LatencyTracker(min_samples=3)
+    t.record(1000, 1.0)
+    t.record(1000, 2.0)
+    assert t.threshold(1000) is None
+    t.record(1000, 3.0)
+    assert t.threshold(1000) == 3.0
+
+
+def test_threshold_is_per_size_bucket():
+    t = LatencyTracker(min_samples=1)
+    t.record(1_000, 1.0)
+    t.record(100_000, 50.0)
+    assert t.threshold(900) == 1.0
+    assert t.threshold(120_000) == 50.0
+    assert t.threshold(10) is None
+
+
+def test_threshold_quantile():
+    t = LatencyTracker(min_samples=1)
+    for i in range(1, 101):
+        t.record(500, float(i))
+    assert t.threshold(500, 0.95) == 96.0
+    assert t.threshold(500, 0.5) == 51.0
+
+
+def test_history_persists_across_trackers(tmp_path):
+    db = str(tmp_path / "reports.db")
+    first = LatencyTracker(window=3, min_samples=3, db_path=db)
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        first.record(1000, seconds)
+
+    second = LatencyTracker(window=3, min_samples=3, db_path=db)  # e.g. the next night's scan
+    assert second.threshold(1000, 0.0) == 2.0  # only the last `window` rows were kept
+    assert second.threshold(1000) == 4.0
+
+
+@pytest.mark.asyncio
+async def test_overhead_uses_the_winners_own_usage():
+    """Another call finishing on the shared provider mid-hedge must not skew the estimate."""
+    stats = HedgeStats()
+    shared = UsageStats()
+
+    async def make(model, primary):
+        if primary:
+            await asyncio.sleep(60)
+        shared.record_call(model, cost_usd=0.02)
+        return "ok"
+
+    async def unrelated():
+        await asyncio.sleep(0.015)
+        shared.record_call("big", cost_usd=5.0)
+
+    _, (result, _winner) = await asyncio.gather(
+        unrelated(), hedged_call(make, "a", "b", delay=0.01, stats=stats)
+    )
+    assert result == "ok"
+    assert 0 < stats.overhead_cost_usd <= 0.02
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_never_hedges():
+    stats = HedgeStats()
+    calls = []
+
+    async def make(model, primary):
+        calls.append((model, primary))
+        return "ok"
+
+    result, winner = await hedged_call(make, "a", "b", delay=1.0, stats=stats)
+    assert (result, winner) == ("ok", "a")
+    assert calls == [("a", True)]
+    assert stats.hedged == 0
+    assert stats.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hung_primary_is_hedged_and_cancelled():
+    stats = HedgeStats()
+    cancelled = asyncio.Event()
+    usage = UsageStats()
+
+    async def make(model, primary):
+        if primary:
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        usage.record_call(model, cost_usd=0.10)
+        return f"from-{model}"
+
+    result, winner = await hedged_call(make, "a", "b", delay=0.01, stats=stats)
+    await asyncio.sleep(0)
+    assert (result, winner) == ("from-b", "b")
+    assert cancelled.is_set()
+    assert stats.hedged == 1
+    assert stats.hedge_wins == 1
+    assert stats.hedge_rate == 1.0
+    assert 0 < stats.overhead_cost_usd <= 0.10
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_waits_for_primary():
+    stats = HedgeStats()
+
+    async def make(model, primary):
+        if primary:
+            await asyncio.sleep(0.05)
+            return "primary"
+        raise RuntimeError("hedge boom")
+
+    result, winner = await hedged_call(make, "a", "a", delay=0.01, stats=stats)
+    assert (result, winner) == ("primary", "a")
+    assert stats.hedge_wins == 0
+
+
+@pytest.mark.asyncio
+async def test_losing_copy_usage_is_flagged():
+    from course_scout.infrastructure.telemetry import collect_calls
+
+    usage = UsageStats()
+
+    async def make(model, primary):
+        if primary:
+            await asyncio.sleep(0.05)
+            usage.record_call(model, cost_usd=0.1)
+            return "primary"
+        usage.record_call(model, cost_usd=0.1)
+        raise RuntimeError("hedge boom")
+
+    with collect_calls() as calls:
+        await hedged_call(make, "a", "a", delay=0.01, stats=HedgeStats())
+    assert [c.get("hedge_loser", False) for c in calls] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_both_failing_raises_primary_error():
+    async def make(model, primary):
+        await asyncio.sleep(0.02 if primary else 0)
+        raise RuntimeError("primary boom" if primary else "hedge boom")
+
+    with pytest.raises(RuntimeError, match="primary boom"):
+        await hedged_call(make, "a", "a", delay=0.01, stats=HedgeStats())
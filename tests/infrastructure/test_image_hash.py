@@ -0,0 +1,160 @@
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from PIL import Image, ImageDraw
+
+from course_scout.infrastructure import vision
+from course_scout.infrastructure.caption_store import CaptionStore
+from course_scout.infrastructure.image_hash import ImageHashIndex, ahash, dhash, hamming
+from course_scout.infrastructure.runtime import RuntimeConfig
+
+
+def _cover(path, size=(320, 480), variant=0, fmt="JPEG"):
+    """Draw a synthetic 'course cover': gradient + shapes that depend on `variant`."""
+    img = Image.new("RGB", size)
+    draw = ImageDraw.Draw(img)
+    for y in range(size[1]):
+        shade = int(255 * y / size[1])
+        draw.line([(0, y), (size[0], y)], fill=(shade, 80, 255 - shade))
+    if variant == 0:
+        draw.ellipse([size[0] // 4, size[1] // 4, size[0] * 3 // 4, size[1] // 2], fill="white")
+    else:
+        draw.rectangle([0, size[1] // 2, size[0] // 2, size[1]], fill="black")
+        draw.rectangle([size[0] // 2, 0, size[0], size[1] // 3], fill="yellow")
+    img.save(path, fmt, quality=85)
+    return str(path)
+
+
+def test_dhash_stable_under_resize_and_reencode(tmp_path):
+    a = dhash(_cover(tmp_path / "a.jpg"))
+    b = dhash(_cover(tmp_path / "b.png", size=(160, 240), fmt="PNG"))
+    c = dhash(_cover(tmp_path / "c.jpg", variant=1))
+    assert a is not None and b is not None and c is not None
+    assert hamming(a, b) <= 6
+    assert hamming(a, c) > 12
+
+
+def test_ahash_and_unreadable(tmp_path):
+    assert ahash(_cover(tmp_path / "a.jpg")) is not None
+    junk = tmp_path / "junk.jpg"
+    junk.write_bytes(b"not an image")
+    assert dhash(str(junk)) is None
+    assert ahash(str(junk)) is None
+
+
+def test_index_persists_memo_and_captions(tmp_path):
+    store = CaptionStore(tmp_path / "captions.db")
+    img = _cover(tmp_path / "media_1.jpg")
+    index = ImageHashIndex(store)
+    h = index.hash_for(img)
+    index.add_caption(h, "Krenz color course cover")
+    index.save()
+
+    reloaded = ImageHashIndex(store)
+    assert "media_1.jpg" in reloaded.files
+    with patch("course_scout.infrastructure.image_hash.dhash") as mock_dhash:
+        assert reloaded.hash_for(img) == h  # memo hit: no re-decode
+        mock_dhash.assert_not_called()
+    assert reloaded.find_caption(h ^ 0b11) == "Krenz color course cover"
+    assert reloaded.find_caption(h ^ (2**40 - 1)) is None
+
+
+def test_save_writes_only_new_rows_and_store_evicts(tmp_path):
+    store = CaptionStore(tmp_path / "captions.db", max_entries=2)
+    index = ImageHashIndex(store)
+    index.add_caption(1, "one")
+    index.save()
+    with patch.object(store, "put_phash", wraps=store.put_phash) as put:
+        index.add_caption(2, "two")
+        index.save()
+    assert put.call_args.args[1] == {2: "two"}
+
+    index.add_caption(3, "three")
+    index.save()
+    assert len(ImageHashIndex(store).captions) == 2  # LRU cap shared with the caption table
+
+
+def test_save_snapshots_while_threads_hash(tmp_path):
+    store = CaptionStore(tmp_path / "captions.db")
+    index = ImageHashIndex(store)
+    paths = [str(tmp_path / f"media_{i}.jpg") for i in range(40)]
+    for p in paths:
+        (tmp_path / p).write_bytes(b"x")
+
+    def hash_all():
+        for i, p in enumerate(paths):
+            index.add_caption(i, p)
+            index.hash_for(p)
+
+    with (
+        patch("course_scout.infrastructure.image_hash.dhash", side_effect=lambda p: hash(p)),
+        ThreadPoolExecutor(4) as pool,
+    ):
+        futures = [pool.submit(hash_all) for _ in range(4)]
+        while not all(f.done() for f in futures):
+            index.save()
+        for f in futures:
+            f.result()
+    index.save()
+    reloaded = ImageHashIndex(store)
+    assert len(reloaded.files) == len(reloaded.captions) == len(paths)
+
+
+def test_imports_legacy_json_index_once(tmp_path):
+    legacy = {"files": {"media_1.jpg": {"hash": "ff", "size": 1, "mtime": 2.0}}}
+    legacy["captions"] = {"00000000000000ff": "cover"}
+    (tmp_path / "phash_index.json").write_text(json.dumps(legacy))
+
+    store = CaptionStore(tmp_path / "captions.db")
+    ImageHashIndex(store)
+    assert not (tmp_path / "phash_index.json").exists()
+    assert ImageHashIndex(store).find_caption(0xFF) == "cover"
+
+
+def test_cluster_groups_near_duplicates(tmp_path):
+    index = ImageHashIndex(CaptionStore(tmp_path / "captions.db"), max_distance=2)
+    clusters = index.cluster({"a": 0b0000, "b": 0b0011, "c": 0xFF00, "d": 0b0111})
+    assert clusters == [["a", "b"], ["c"], ["d"]]
+
+
+class TestCaptionPathsDedup(unittest.IsolatedAsyncioTestCase):
+    @pytest.fixture(autouse=True)
+    def _tmp(self, tmp_path):
+        self.tmp = tmp_path
+
+    def setUp(self):
+        vision._store = CaptionStore(self.tmp / "captions.db")
+        vision._hash_index = ImageHashIndex(vision._store)
+        self.rt_patch = patch(
+            "course_scout.infrastructure.runtime.get_runtime",
+            return_value=RuntimeConfig(caption_batch_size=1),
+        )
+        self.rt_patch.start()
+
+    def tearDown(self):
+        self.rt_patch.stop()
+        vision._store = None
+        vision._hash_index = None
+
+    async def test_one_call_per_cluster_and_fan_out_across_runs(self):
+        a = _cover(self.tmp / "media_1.jpg")
+        b = _cover(self.tmp / "media_2.png", size=(160, 240), fmt="PNG")
+        c = _cover(self.tmp / "media_3.jpg", variant=1)
+
+        with patch.object(
+            vision, "caption_image", AsyncMock(side_effect=lambda p: f"cap:{p[-11:]}")
+        ) as mock_caption:
+            first = await vision.caption_paths([a, b, c])
+            self.assertEqual(mock_caption.await_count, 2)
+            self.assertEqual(first[a], first[b])
+            self.assertNotEqual(first[a], first[c])
+
+            # A later repost under a new filename reuses the stored caption.
+            vision._hash_index = ImageHashIndex(vision._store)
+            d = _cover(self.tmp / "media_4.jpg", size=(300, 450))
+            second = await vision.caption_paths([d])
+            self.assertEqual(mock_caption.await_count, 2)
+            self.assertEqual(second[d], first[a])
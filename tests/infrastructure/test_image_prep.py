@@ -0,0 +1,120 @@
+import io
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from course_scout.infrastructure import image_prep
+from course_scout.infrastructure.image_prep import prepare_image, prepare_many
+from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
+from course_scout.infrastructure.runtime import RuntimeConfig
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path):
+    with (
+        patch.object(image_prep, "_CACHE_DIR", tmp_path / "prepared"),
+        patch(
+            "course_scout.infrastructure.runtime.get_runtime",
+            return_value=RuntimeConfig(image_max_edge=512, image_quality=80),
+        ),
+    ):
+        yield
+
+
+def _decode(data: bytes) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+def test_oversized_png_screenshot_becomes_uploadable(tmp_path):
+    path = tmp_path / "screenshot.png"
+    Image.frombytes("RGB", (1400, 1400), os.urandom(1400 * 1400 * 3)).save(path)
+    assert path.stat().st_size > image_prep.MAX_UPLOAD_BYTES
+
+    prepared = prepare_image(str(path))
+    assert prepared is not None
+    assert prepared.media_type == "image/jpeg"
+    assert max(prepared.width, prepared.height) == 512
+    assert len(prepared.data) < image_prep.MAX_UPLOAD_BYTES
+    assert _decode(prepared.data).size == (512, 512)
+
+
+def test_strips_metadata_and_flattens_alpha(tmp_path):
+    path = tmp_path / "sticker.png"
+    img = Image.new("RGBA", (64, 32), (255, 0, 0, 0))
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    img.save(path, exif=exif)
+
+    out = _decode(prepare_image(str(path)).data)
+    assert out.mode == "RGB"
+    assert out.getpixel((0, 0)) == pytest.approx((255, 255, 255), abs=2)  # transparent → white
+    assert not out.getexif()
+    assert out.size == (64, 32)  # never upscaled
+
+
+def test_webp_output(tmp_path):
+    path = tmp_path / "cover.jpg"
+    Image.new("RGB", (800, 400), "blue").save(path)
+    with patch(
+        "course_scout.infrastructure.runtime.get_runtime",
+        return_value=RuntimeConfig(image_max_edge=400, image_format="webp"),
+    ):
+        prepared = prepare_image(str(path))
+    assert prepared.media_type == "image/webp"
+    assert (prepared.width, prepared.height) == (400, 200)
+
+
+def test_prepared_bytes_are_cached(tmp_path):
+    path = tmp_path / "cover.jpg"
+    Image.new("RGB", (900, 600), "green").save(path)
+    first = prepare_image(str(path))
+    with patch.object(image_prep, "_encode") as encode:
+        second = prepare_image(str(path))
+        encode.assert_not_called()
+    assert second == first
+
+
+def test_unusable_inputs(tmp_path):
+    junk = tmp_path / "junk.jpg"
+    junk.write_bytes(b"not an image")
+    good = tmp_path / "ok.jpg"
+    Image.new("RGB", (10, 10)).save(good)
+    results = prepare_many([str(junk), str(tmp_path / "missing.png"), "notes.pdf", str(good)])
+    assert [r is not None for r in results] == [False, False, False, True]
+
+
+def test_provider_blocks_use_prepared_bytes(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (2000, 1000), "red").save(path, quality=100)
+    (block,) = ClaudeProvider._build_image_blocks([str(path), str(tmp_path / "missing.jpg")])
+    assert block["source"]["media_type"] == "image/jpeg"
+    assert block["source"]["data"] == prepare_image(str(path)).content_block()["source"]["data"]
+
+
+def test_cache_hit_refreshes_mtime(tmp_path):
+    path = tmp_path / "cover.jpg"
+    Image.new("RGB", (300, 200), "green").save(path)
+    prepare_image(str(path))
+    (cached,) = (tmp_path / "prepared").iterdir()
+    os.utime(cached, (0, 0))
+    prepare_image(str(path))
+    assert cached.stat().st_mtime > 0
+
+
+def test_prune_cache_drops_stale_then_least_recently_used(tmp_path):
+    cache = tmp_path / "prepared"
+    cache.mkdir()
+    now = time.time()
+    for name, age_days in [("old", 40), ("a", 3), ("b", 2), ("c", 1)]:
+        f = cache / f"{name}.jpeg"
+        f.write_bytes(b"x")
+        os.utime(f, (now - age_days * 86400,) * 2)
+
+    assert image_prep.prune_cache(max_entries=2, max_age_days=30) == 2
+    assert sorted(p.name for p in cache.iterdir()) == ["b.jpeg", "c.jpeg"]
+    assert image_prep.prune_cache(max_entries=2, max_age_days=30) == 0
@@ -0,0 +1,98 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+from PIL import Image, ImageDraw, ImageFont
+
+from course_scout.application.batch_scan import BatchScanUseCase
+from course_scout.domain.models import TelegramMessage
+from course_scout.infrastructure.image_triage import engagement, plan_image_budget, score_image
+from course_scout.infrastructure.runtime import RuntimeConfig
+
+
+def _text_page(path, size=(600, 900)):
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=22)
+    for y in range(20, size[1] - 20, 32):
+        draw.text((20, y), f"Coloso ChonNam Lighting Vol.2 — lesson {y}", fill="black", font=font)
+    img.save(path)
+    return str(path)
+
+
+def _gradient(path, size=(640, 480)):
+    img = Image.new("RGB", size)
+    draw = ImageDraw.Draw(img)
+    for y in range(size[1]):
+        draw.line([(0, y), (size[0], y)], fill=(y // 2, 100, 200 - y // 3))
+    img.save(path)
+    return str(path)
+
+
+def _msg(msg_id, path, reactions=0, replies=0):
+    return TelegramMessage(
+        id=msg_id,
+        text=None,
+        date=datetime.datetime(2026, 10, 1, tzinfo=datetime.UTC),
+        link=f"https://t.me/c/1/{msg_id}",
+        local_media_path=path,
+        reaction_count=reactions,
+        reply_count=replies,
+    )
+
+
+def test_text_scores_high_and_uninformative_images_low(tmp_path):
+    assert score_image(_text_page(tmp_path / "page.png")).score > 0.8
+    assert score_image(_gradient(tmp_path / "photo.jpg")).score < 0.35
+
+    blank = tmp_path / "blank.png"
+    Image.new("RGB", (500, 500), (250, 250, 250)).save(blank)
+    assert score_image(str(blank)).reason == "blank"
+
+    avatar = tmp_path / "avatar.png"
+    Image.new("RGB", (64, 64), "red").save(avatar)
+    assert score_image(str(avatar)).reason == "tiny"
+
+    strip = tmp_path / "strip.png"
+    Image.open(_text_page(tmp_path / "p2.png")).resize((1200, 100)).save(strip)
+    assert score_image(str(strip)).reason == "aspect"
+
+    junk = tmp_path / "junk.jpg"
+    junk.write_bytes(b"nope")
+    assert score_image(str(junk)) is None
+
+
+def test_budget_goes_to_most_engaged_informative_images(tmp_path):
+    pages = [_text_page(tmp_path / f"page_{i}.png") for i in range(3)]
+    photo = _gradient(tmp_path / "photo.jpg")
+    messages = [
+        _msg(1, pages[0], reactions=1),
+        _msg(2, pages[1], replies=4),  # engagement 8
+        _msg(3, pages[2], reactions=5),
+        _msg(4, photo, reactions=50),  # popular, but no text
+    ]
+    plan = plan_image_budget(messages, budget=2, min_score=0.35)
+    assert plan.keep == {pages[1], pages[2]}
+    assert (plan.low_score, plan.over_budget, plan.unreadable) == (1, 1, 0)
+    assert engagement(messages[1]) == 8
+
+    assert plan_image_budget(messages, budget=0, min_score=0.35).keep == set(pages)
+
+
+def test_batch_scan_clears_paths_outside_plan(tmp_path):
+    page = _text_page(tmp_path / "page.png")
+    photo = _gradient(tmp_path / "photo.jpg")
+    kept, skipped = _msg(1, page), _msg(2, photo)
+    no_media_task = MagicMock(include_media=False)
+    untouched = _msg(3, photo)
+    fetched = {
+        "art": (MagicMock(include_media=True), [kept, skipped]),
+        "requests": (no_media_task, [untouched]),
+    }
+    with patch(
+        "course_scout.infrastructure.runtime.get_runtime",
+        return_value=RuntimeConfig(image_run_budget=10),
+    ):
+        BatchScanUseCase._plan_images(fetched)
+    assert kept.local_media_path == page
+    assert skipped.local_media_path is None
+    assert untouched.local_media_path == photo
@@ -0,0 +1,57 @@
+from course_scout.infrastructure.agents import RawDigestItem
+from course_scout.infrastructure.item_merge import merge_chunk_items
+
+
+def _item(title, category="request", **kw):
+    return RawDigestItem(
+        title=title, description=kw.pop("description", title), category=category, **kw
+    )
+
+
+def test_same_course_in_two_chunks_is_merged():
+    ask = _item("Krenz Color Course", status="UNFULFILLED", msg_ids=[1], instructor="Krenz")
+    reply = _item(
+        "Krenz Color course",
+        status="FULFILLED",
+        msg_ids=[40],
+        links=["https://mega.nz/folder/abc#k"],
+        password="krenz2026",
+        description="Mega link shared.",
+    )
+    merged = merge_chunk_items([[ask], [reply]])
+    assert len(merged) == 1
+    m = merged[0]
+    assert m.status == "FULFILLED"
+    assert m.msg_ids == [1, 40]
+    assert m.instructor == "Krenz"
+    assert m.password == "krenz2026"
+    assert m.links == ["https://mega.nz/folder/abc#k"]
+    assert "Mega link shared." in m.description
+
+
+def test_merge_on_shared_external_link_and_msg_id():
+    a = _item("WLOP tutorials", "file", links=["https://www.mega.nz/folder/x/"])
+    b = _item("Painting pack", "file", links=["https://mega.nz/folder/x?utm_source=tg"])
+    c = _item("Something else", "discussion", msg_ids=[7])
+    d = _item("Unrelated title", "discussion", msg_ids=[7, 8])
+    merged = merge_chunk_items([[a, c], [b, d]])
+    assert len(merged) == 2
+    assert merged[1].msg_ids == [7, 8]
+
+
+def test_items_within_one_chunk_are_not_merged():
+    a = _item("Krenz Color Course", msg_ids=[1])
+    b = _item("Krenz Color Course", msg_ids=[1])
+    assert len(merge_chunk_items([[a, b]])) == 2
+
+
+def test_distinct_items_and_categories_kept():
+    a = _item("Krenz Color Course", "request")
+    b = _item("Krenz Color Course", "discussion")
+    c = _item("Sangsoo Jeong Character Course", "request")
+    merged = merge_chunk_items([[a], [b, c]])
+    assert [m.title for m in merged] == [
+        "Krenz Color Course",
+        "Krenz Color Course",
+        "Sangsoo Jeong Character Course",
+    ]
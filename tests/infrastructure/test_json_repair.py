@@ -0,0 +1,102 @@
+"""Tests for linear-time JSON repair and its use in Claude output parsing."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from course_scout.infrastructure.agents import SummarizerOutputSchema
+from course_scout.infrastructure.json_repair import (
+    closable_prefix,
+    repair_json,
+    repair_string_json_fields,
+)
+from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
+
+
+def _item(i: int) -> dict:
+    return {"title": f"t{i}", "description": 'has "quotes" and [brackets]', "category": "course"}
+
+
+def test_trailing_junk_is_ignored():
+    assert repair_json('[{"a": 1}]\n  ``` done') == [{"a": 1}]
+
+
+def test_truncated_items_keep_only_complete_ones():
+    text = json.dumps([_item(0), _item(1), _item(2)])
+    cut = text[: text.index('"t2"') + 10]
+    assert repair_json(cut) == [_item(0), _item(1)]
+
+
+def test_truncated_object_closes_open_containers():
+    text = json.dumps({"items": [_item(0), _item(1)], "key_links": [{"url": "u"}]})
+    cut = text[: text.index('"key_links"') + 20]
+    assert repair_json(cut) == {"items": [_item(0), _item(1)], "key_links": []}
+
+
+def test_unrepairable_input_returns_none():
+    assert repair_json('{"a": "never closed') == {}
+    assert repair_json("[}") is None
+    assert repair_json("not json") is None
+    assert closable_prefix('"just a string') is None
+
+
+def test_repair_is_linear_on_large_truncated_output():
+    text = json.dumps([_item(i) for i in range(5000)])[:-40]
+    started = time.perf_counter()
+    items = repair_json(text)
+    assert time.perf_counter() - started < 1.0
+    assert len(items) == 4999
+
+
+def test_string_fields_are_repaired():
+    data = {"items": json.dumps([_item(0), _item(1)])[:-30], "key_links": [], "n": "plain"}
+    repaired = repair_string_json_fields(data)
+    assert repaired["items"] == [_item(0)]
+    assert repaired["n"] == "plain"
+
+
+def test_parse_output_salvages_truncated_text():
+    text = json.dumps({"items": [_item(0), _item(1)], "key_links": []})[:-25]
+    result = ClaudeProvider._parse_output(SummarizerOutputSchema, None, None, text)
+    assert [i.title for i in result.items] == ["t0"]
+
+
+def test_parse_output_off_loop_repairs_string_fields():
+    provider = ClaudeProvider()
+    candidate = {"items": json.dumps([_item(0), _item(1)])[:-30], "key_links": []}
+    result = asyncio.run(
+        provider._parse_output_off_loop(SummarizerOutputSchema, candidate, None, None)
+    )
+    assert [i.title for i in result.items] == ["t0"]
+
+
+def test_parse_output_raises_validation_error_with_raw_output():
+    from course_scout.infrastructure.schema_cache import OutputValidationError
+
+    with pytest.raises(OutputValidationError) as info:
+        ClaudeProvider._parse_output(
+            SummarizerOutputSchema, {"items": [{"title": "x"}]}, None, None
+        )
+    assert json.loads(info.value.raw) == {"items": [{"title": "x"}]}
+    assert "description" in info.value.errors
+
+
+def test_item_cut_inside_its_nested_list_is_dropped_whole():
+    assert repair_json('[{"a":[1,2]},{"a":[3') == [{"a": [1, 2]}]
+    assert repair_json('[{"a":{"x":1},"b":2},{"a":{"x":1},"b"') == [{"a": {"x": 1}, "b": 2}]
+    item = {"title": "a", "description": "d", "category": "course", "msg_ids": [1, 2]}
+    text = json.dumps({"items": [item, {**item, "title": "b", "msg_ids": [3, 4]}]})
+    cut = text[: text.rindex("[3") + 3]
+    assert repair_json(cut) == {"items": [item]}
+    result = ClaudeProvider._parse_output(SummarizerOutputSchema, None, None, cut)
+    assert [i.title for i in result.items] == ["a"]
+
+
+def test_truncated_scalar_arrays_keep_complete_scalars():
+    assert repair_json("[1,2,3") == [1, 2]
+    assert repair_json('{"ids": [1, 2, 3') == {"ids": [1, 2]}
+    assert repair_json('{"a": 1, "b": "x", "c": tr') == {"a": 1, "b": "x"}
@@ -0,0 +1,131 @@
+import json
+import random
+
+import pytest
+
+from course_scout.infrastructure.model_router import ALL_FAMILIES, ModelRouter
+
+SONNET = ("claude-sonnet-4-6", "medium")
+HAIKU = ("claude-haiku-4-5", "low")
+
+
+@pytest.fixture
+def router(tmp_path):
+    return ModelRouter(
+        db_path=str(tmp_path / "router.db"),
+        exploration_rate=0.0,
+        quality_bar=0.8,
+        max_failure_rate=0.2,
+        min_samples=3,
+    )
+
+
+def test_defaults_without_bench_scores(router):
+    assert router.choose("Lounge", "discussion", SONNET) == SONNET
+
+
+def test_routes_to_cheapest_arm_clearing_quality_bar(router):
+    router.record_bench_score("discussion", "claude-haiku-4-5", "low", 0.7)
+    router.record_bench_score("discussion", "claude-haiku-4-5", "medium", 0.85)
+    assert router.choose("Lounge", "discussion", SONNET) == ("claude-haiku-4-5", "medium")
+
+
+def test_family_score_overrides_wildcard(router):
+    router.record_bench_score(ALL_FAMILIES, "claude-haiku-4-5", "low", 0.9)
+    assert router.choose("Lounge", "discussion", SONNET) == HAIKU
+    router.record_bench_score("course_requests", "claude-haiku-4-5", "low", 0.5)
+    assert router.choose("Requests", "course_requests", SONNET) != HAIKU
+
+
+def test_per_topic_failures_disqualify_arm(router):
+    router.record_bench_score(ALL_FAMILIES, "claude-haiku-4-5", "low", 0.9)
+    router.record_calls("Busy", "discussion", "low", [{"model": "claude-haiku-4-5"}])
+    for _ in range(2):
+        router.record_failure("Busy", "discussion", "claude-haiku-4-5", "low")
+    assert router.choose("Busy", "discussion", SONNET) != HAIKU
+    # A different topic is unaffected.
+    assert router.choose("Quiet", "discussion", SONNET) == HAIKU
+
+
+def test_never_routes_up(router):
+    router.record_bench_score(ALL_FAMILIES, "claude-opus-4-7", "high", 1.0)
+    assert router.choose("Lounge", None, HAIKU) == HAIKU
+
+
+def test_exploration_picks_cheaper_arm(tmp_path):
+    r = ModelRouter(db_path=str(tmp_path / "r.db"), exploration_rate=1.0, rng=random.Random(0))
+    arm = r.choose("Lounge", None, SONNET)
+    assert arm != SONNET
+    assert arm[0] == "claude-haiku-4-5" or arm[1] == "low"
+
+
+def test_exploration_skips_failing_and_below_bar_arms(tmp_path):
+    r = ModelRouter(db_path=str(tmp_path / "r.db"), exploration_rate=1.0, rng=random.Random(0))
+    sonnet_low = ("claude-sonnet-4-6", "low")
+    r.record_bench_score(ALL_FAMILIES, "claude-haiku-4-5", "low", 0.5)
+    r.record_bench_score(ALL_FAMILIES, "claude-haiku-4-5", "medium", 0.9)
+    for _ in range(3):
+        r.record_failure("Lounge", None, "claude-haiku-4-5", "medium")
+    assert {r.choose("Lounge", None, sonnet_low) for _ in range(20)} == {sonnet_low}
+    assert r.choose("Other", None, sonnet_low) == ("claude-haiku-4-5", "medium")
+
+
+def test_arm_stats_aggregate_usage_calls(router):
+    calls = [
+        {"model": "claude-haiku-4-5", "duration_ms": 1000, "cost_usd": 0.01},
+        {"model": "claude-haiku-4-5", "duration_ms": 3000, "cost_usd": 0.03},
+    ]
+    router.record_calls("Lounge", "discussion", "low", calls)
+    stats = router.arm_stats("Lounge")[HAIKU]
+    assert stats.calls == 2
+    assert stats.failure_rate == 0.0
+    assert stats.avg_latency_ms == 2000
+    assert stats.avg_cost_usd == pytest.approx(0.02)
+
+
+def test_ingest_bench_report(router, tmp_path):
+    report = tmp_path / "fx_claude-haiku-4-5_low.json"
+    report.write_text(
+        json.dumps(
+            {"strict_match": {"f1": 0.91}, "meta": {"model": "claude-haiku-4-5", "effort": "low"}}
+        )
+    )
+    assert router.ingest_bench_report(report, prompt_family="discussion")
+    assert router.bench_score("discussion", *HAIKU) == pytest.approx(0.91)
+
+    bad = tmp_path / "bad.json"
+    bad.write_text("{}")
+    assert not router.ingest_bench_report(bad)
+
+
+def _measure(router, topic, arm, cost, latency_ms=1000, n=3):
+    calls = [{"model": arm[0], "duration_ms": latency_ms, "cost_usd": cost}] * n
+    router.record_calls(topic, "discussion", arm[1], calls)
+
+
+def test_measured_cost_ranks_qualifying_arms(router):
+    for arm in (HAIKU, ("claude-haiku-4-5", "medium"), ("claude-sonnet-4-6", "low")):
+        router.record_bench_score(ALL_FAMILIES, *arm, 0.9)
+    # Unmeasured arms are tried first, in ARMS order.
+    assert router.choose("Lounge", "discussion", SONNET) == HAIKU
+    _measure(router, "Lounge", HAIKU, cost=0.05)
+    assert router.choose("Lounge", "discussion", SONNET) == ("claude-haiku-4-5", "medium")
+    _measure(router, "Lounge", ("claude-haiku-4-5", "medium"), cost=0.02)
+    _measure(router, "Lounge", ("claude-sonnet-4-6", "low"), cost=0.02, latency_ms=500)
+    # Cheapest measured cost wins; latency breaks the tie.
+    assert router.choose("Lounge", "discussion", SONNET) == ("claude-sonnet-4-6", "low")
+
+
+def test_keeps_default_when_it_measured_cheaper(router):
+    router.record_bench_score(ALL_FAMILIES, *HAIKU, 0.9)
+    _measure(router, "Lounge", HAIKU, cost=0.05)
+    _measure(router, "Lounge", SONNET, cost=0.03)
+    assert router.choose("Lounge", "discussion", SONNET) == SONNET
+
+
+def test_failures_do_not_dilute_measured_cost(router):
+    _measure(router, "Lounge", HAIKU, cost=0.04)
+    router.record_failure("Lounge", "discussion", *HAIKU)
+    stats = router.arm_stats("Lounge")[HAIKU]
+    assert (stats.calls, stats.successes) == (4, 3)
+    assert stats.avg_cost_usd == pytest.approx(0.04)
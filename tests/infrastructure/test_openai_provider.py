@@ -0,0 +1,123 @@
+"""Tests for the OpenAI-compatible provider: shared clients and response formats."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from course_scout.infrastructure.agents import SummarizerOutputSchema
+from course_scout.infrastructure.http_clients import close_shared_clients
+from course_scout.infrastructure.providers import openai_provider
+from course_scout.infrastructure.providers.openai_provider import OpenAIProvider, _schema_spec
+
+_PAYLOAD = {"items": [{"title": "t", "description": "d", "category": "course"}], "key_links": []}
+
+
+class TestOpenAIProvider(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.requests: list[dict] = []
+        self.reject_json_schema = False
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            self.requests.append(body)
+            if self.reject_json_schema and body["response_format"]["type"] == "json_schema":
+                error = {"error": {"message": "response_format json_schema is not supported"}}
+                return httpx.Response(400, json=error)
+            return httpx.Response(
+                200,
+                json={
+                    "id": "c1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": json.dumps(_PAYLOAD)},
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 50, "completion_tokens": 10, "total_tokens": 60},
+                },
+            )
+
+        self.client_patch = patch.object(
+            openai_provider,
+            "pooled_httpx_client",
+            side_effect=lambda proxy=None: httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            ),
+        )
+        self.builds = self.client_patch.start()
+        openai_provider._json_schema_rejected.clear()
+
+    async def asyncTearDown(self):
+        await close_shared_clients()
+
+    def tearDown(self):
+        self.client_patch.stop()
+        openai_provider._json_schema_rejected.clear()
+
+    async def test_native_json_schema_keeps_schema_out_of_prompt(self):
+        provider = OpenAIProvider("k", base_url="https://api.openai.com/v1", default_model="gpt-x")
+        result = await provider.generate_structured("gpt-x", "sys", "in", SummarizerOutputSchema)
+
+        self.assertEqual(result.items[0].title, "t")
+        sent = self.requests[0]
+        self.assertEqual(sent["response_format"]["type"], "json_schema")
+        self.assertEqual(sent["response_format"]["json_schema"]["name"], "SummarizerOutputSchema")
+        self.assertEqual(sent["messages"][0]["content"], "sys")
+        self.assertEqual(provider.usage.total_input_tokens, 50)
+
+    async def test_json_mode_endpoint_gets_schema_in_prompt(self):
+        provider = OpenAIProvider("k", base_url="https://api.deepseek.com")
+        await provider.generate_structured("deepseek-chat", "sys", "in", SummarizerOutputSchema)
+
+        sent = self.requests[0]
+        self.assertEqual(sent["response_format"], {"type": "json_object"})
+        self.assertIn("RESPOND WITH VALID JSON", sent["messages"][0]["content"])
+
+    async def test_rejected_json_schema_downgrades_endpoint(self):
+        self.reject_json_schema = True
+        provider = OpenAIProvider("k", base_url="https://api.openai.com/v1", default_model="gpt-x")
+        await provider.generate_structured("gpt-x", "sys", "a", SummarizerOutputSchema)
+        await provider.generate_structured("gpt-x", "sys", "b", SummarizerOutputSchema)
+
+        kinds = [r["response_format"]["type"] for r in self.requests]
+        self.assertEqual(kinds, ["json_schema", "json_object", "json_object"])
+
+    async def test_generate_structured_reconciles_rate_limit_reservation(self):
+        """Drives the whole call path: request, usage record, limiter reconcile, parse."""
+        from course_scout.infrastructure.rate_limiter import RateLimiter, bind_reservation
+
+        limiter = RateLimiter(rpm=1000, input_tpm=10_000, output_tpm=1000)
+        reservation = await limiter.acquire("deepseek-chat", input_tokens=4000, output_tokens=500)
+        provider = OpenAIProvider("k", base_url="https://api.deepseek.com")
+        with bind_reservation(reservation):
+            result = await provider.generate_structured(
+                "deepseek-chat", "sys", "in", SummarizerOutputSchema
+            )
+
+        self.assertEqual(result.items[0].title, "t")
+        self.assertTrue(reservation.settled)
+        buckets = limiter._buckets["deepseek-chat"]
+        self.assertAlmostEqual(buckets.input.tokens, 10_000 - 50, delta=1)
+        self.assertAlmostEqual(buckets.output.tokens, 1000 - 10, delta=1)
+        self.assertEqual(provider.usage.calls[-1]["output_tokens"], 10)
+
+    async def test_providers_share_one_client_per_endpoint(self):
+        a = OpenAIProvider("k", base_url="https://api.deepseek.com")
+        b = OpenAIProvider("k", base_url="https://api.deepseek.com")
+        c = OpenAIProvider("k", base_url="https://api.openai.com/v1")
+
+        self.assertIs(a.client, b.client)
+        self.assertIsNot(a.client, c.client)
+        self.assertEqual(self.builds.call_count, 2)
+
+
+def test_schema_spec_is_built_once_per_type():
+    assert _schema_spec(SummarizerOutputSchema) is _schema_spec(SummarizerOutputSchema)
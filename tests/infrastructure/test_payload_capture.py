@@ -0,0 +1,134 @@
+"""Tests for sampled agent payload capture and its index."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import unittest
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from course_scout.infrastructure.agents import (
+    AIAgent,
+    StructuredMessage,
+    SummarizerInputSchema,
+    SummarizerOutputSchema,
+)
+from course_scout.infrastructure.payload_capture import PayloadCapture
+from course_scout.infrastructure.telemetry import telemetry_labels
+
+
+def _input(topic: str, day: str) -> SummarizerInputSchema:
+    return SummarizerInputSchema(
+        messages=[StructuredMessage(id=1, content="hi", timestamp=f"{day}T10:00:00+00:00")],
+        topic_context=topic,
+    )
+
+
+def _write(capture: PayloadCapture, topic: str, day: str) -> None:
+    data = _input(topic, day)
+    capture.write("m", data, data.model_dump_json(), SummarizerOutputSchema(items=[]), 12)
+
+
+def test_records_round_trip_through_the_index(tmp_path):
+    root = tmp_path / "store"
+    capture = PayloadCapture(root)
+    with telemetry_labels(stage="parse", topic="Lounge"):
+        _write(capture, "Lounge", "2026-05-01")
+        _write(capture, "Files", "2026-05-03")
+    with telemetry_labels(stage="vision"):
+        _write(capture, "Files", "2026-05-03")
+
+    records = list(capture.iter_records(stage="parse"))
+    assert [r["input"]["topic_context"] for r in records] == ["Lounge", "Files"]
+    assert records[0]["topic"] == "Lounge" and records[0]["duration_ms"] == 12
+    assert records[0]["output"] == {"items": [], "key_links": []}
+    assert [r["input"]["topic_context"] for r in capture.iter_records(since="2026-05-02")] == [
+        "Files",
+        "Files",
+    ]
+
+    (day_dir,) = [p for p in root.iterdir() if p.is_dir()]
+    (path,) = day_dir.glob("captures-*.jsonl.gz")
+    lines = gzip.decompress(path.read_bytes()).splitlines()  # multi-member gzip reads whole
+    assert len(lines) == 3 and json.loads(lines[2])["stage"] == "vision"
+
+
+def test_sample_rate_gates_capture(tmp_path):
+    rolls = iter([0.1, 0.7])
+    capture = PayloadCapture(tmp_path, sample_rate=0.5, rng=lambda: next(rolls))
+    assert capture.should_sample()
+    assert not capture.should_sample()
+    assert not PayloadCapture(tmp_path).should_sample()  # off by default
+
+
+def test_submit_keeps_caller_labels_and_writes_in_background(tmp_path):
+    capture = PayloadCapture(tmp_path / "store", max_age_days=0)
+    data = _input("Lounge", "2026-05-01")
+    with telemetry_labels(stage="parse", topic="Lounge"):
+        capture.submit("m", data, data.model_dump_json(), SummarizerOutputSchema(items=[]), 5)
+    capture.flush()
+    (record,) = capture.iter_records(stage="parse")
+    assert record["topic"] == "Lounge"
+
+
+def test_prune_drops_old_days_and_their_index_rows(tmp_path):
+    root = tmp_path / "store"
+    capture = PayloadCapture(root)
+    old_ts = (datetime.now(UTC) - timedelta(days=40)).timestamp()
+    with patch("course_scout.infrastructure.payload_capture.time.time", return_value=old_ts):
+        _write(capture, "Old", "2026-01-01")
+    _write(capture, "New", "2026-05-01")
+    assert len([p for p in root.iterdir() if p.is_dir()]) == 2
+
+    assert capture.prune(30) == 1
+    assert [r["input"]["topic_context"] for r in capture.iter_records()] == ["New"]
+    assert len([p for p in root.iterdir() if p.is_dir()]) == 1
+
+
+def test_failed_prune_leaves_the_writer_running(tmp_path):
+    capture = PayloadCapture(tmp_path / "store", max_age_days=30)
+    data = _input("Lounge", "2026-05-01")
+    with patch.object(capture, "prune", side_effect=OSError("index.db is locked")):
+        capture.submit("m", data, data.model_dump_json(), SummarizerOutputSchema(items=[]), 5)
+        flushed = threading.Thread(target=capture.flush, daemon=True)
+        flushed.start()
+        flushed.join(timeout=5)
+    assert not flushed.is_alive()
+    assert len(list(capture.iter_records())) == 1
+
+
+def test_write_failures_are_swallowed(tmp_path):
+    capture = PayloadCapture(tmp_path)
+    output = MagicMock()
+    output.model_dump_json.side_effect = RuntimeError("boom")
+    capture.write("m", _input("t", "2026-05-01"), "{}", output, 1)
+    assert list(capture.iter_records()) == []
+
+
+class TestAgentCapture(unittest.IsolatedAsyncioTestCase):
+    async def test_successful_run_is_captured_once(self):
+        from course_scout.infrastructure.payload_capture import get_payload_capture
+
+        result = SummarizerOutputSchema(items=[], key_links=[])
+        provider = MagicMock()
+        provider.generate_structured = AsyncMock(return_value=result)
+        agent = AIAgent(
+            provider, ["m1"], "prompt", SummarizerOutputSchema, MagicMock(acquire=AsyncMock())
+        )
+        capture = get_payload_capture()
+        capture.sample_rate = 1.0
+        with (
+            patch.object(capture, "submit", wraps=capture.submit) as submit,
+            patch.object(capture, "_append", wraps=capture._append) as append,
+        ):
+            await agent.run(_input("Lounge", "2026-05-01"))
+            capture.flush()
+
+        submit.assert_called_once()
+        append.assert_called_once()
+        self.assertNotEqual(capture._writer.name, threading.current_thread().name)
+        (record,) = capture.iter_records()
+        assert record["model"] == "m1"
+        assert record["input"]["messages"][0]["content"] == "hi"
@@ -0,0 +1,151 @@
+"""Tests for the cross-run quota ledger and quota-driven topic degradation."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from course_scout.infrastructure.quota_ledger import (
+    DAY_SECONDS,
+    WINDOW_SECONDS,
+    QuotaLedger,
+    QuotaLevel,
+)
+from course_scout.infrastructure.runtime import RuntimeConfig
+from course_scout.infrastructure.summarization import OrchestratedSummarizer
+from course_scout.infrastructure.telemetry import TelemetryRegistry
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _ledger(tmp_path, clock=None) -> QuotaLedger:
+    return QuotaLedger(
+        db_path=str(tmp_path / "reports.db"),
+        window_output_tokens=1000,
+        daily_output_tokens=4000,
+        clock=clock or _Clock(),
+    )
+
+
+def test_rolling_windows_and_pruning(tmp_path):
+    clock = _Clock()
+    ledger = _ledger(tmp_path, clock)
+    ledger.debit("m", 10, 300)
+    clock.now += WINDOW_SECONDS + 1
+    ledger.debit("m", 10, 200)
+
+    status = ledger.status()
+    assert (status.window_tokens, status.daily_tokens) == (200, 500)
+
+    clock.now += DAY_SECONDS + 1
+    ledger.debit("m", 10, 50)
+    assert ledger.output_tokens(10 * DAY_SECONDS) == 50  # older rows were pruned
+
+
+def test_ledger_is_shared_across_instances(tmp_path):
+    _ledger(tmp_path).debit("m", 10, 700)
+    status = _ledger(tmp_path).status()
+    assert status.level is QuotaLevel.LOWER_EFFORT
+    assert "5h 700 out" in status.summary()
+
+
+def test_levels_follow_the_fuller_window(tmp_path):
+    clock = _Clock()
+    ledger = _ledger(tmp_path, clock)
+    assert ledger.status().level is QuotaLevel.OK
+    ledger.debit("m", 0, 860)
+    assert ledger.status().level is QuotaLevel.CHEAPER_MODEL
+    ledger.debit("m", 0, 100)
+    assert ledger.status().level is QuotaLevel.DEFER
+
+    clock.now += WINDOW_SECONDS + 1  # 5h window empties; 960/4000 of the day is fine
+    assert ledger.status().level is QuotaLevel.OK
+    ledger.debit("m", 0, 2900)
+    assert ledger.status().level is QuotaLevel.DEFER  # daily 3860/4000, even though 5h is 2900/1000
+
+
+def test_sink_queues_for_the_writer_thread(tmp_path):
+    ledger = _ledger(tmp_path)
+    with patch.object(ledger, "_insert", wraps=ledger._insert) as insert:
+        registry = TelemetryRegistry()
+        registry.add_sink(ledger.debit_call)
+        for _ in range(20):
+            registry.record("m", 10, 5)
+        ledger.flush()
+    assert ledger.output_tokens(60) == 100
+    assert insert.call_count <= 20
+    assert all(call.args[0] for call in insert.call_args_list)
+    assert ledger._writer is not None and ledger._writer.name == "quota-ledger"
+
+
+def test_status_is_cached_until_ttl_or_local_debit(tmp_path):
+    clock = _Clock()
+    ledger = _ledger(tmp_path, clock)
+    ledger.status()
+    other = _ledger(tmp_path, clock)  # another process debiting the shared table
+    other.debit("m", 0, 800)
+    assert ledger.status().window_tokens == 0  # cached
+    clock.now += ledger.status_ttl
+    assert ledger.status().window_tokens == 800
+    ledger.debit("m", 0, 10)
+    assert ledger.status().window_tokens == 810  # own debit invalidates the cache
+
+
+def test_telemetry_sink_debits_every_call(tmp_path):
+    ledger = _ledger(tmp_path)
+    registry = TelemetryRegistry()
+    registry.add_sink(ledger.debit_call)
+    registry.add_sink(lambda call: 1 / 0)  # a failing sink doesn't break recording
+    registry.record("m", 100, 40, cache_creation=5, stage="vision")
+    ledger.flush()
+    assert ledger.output_tokens(60) == 40
+    assert "course_scout_llm_calls_total" in registry.render()
+
+
+def _summarizer(priority: str = "normal") -> OrchestratedSummarizer:
+    return OrchestratedSummarizer(
+        summarizer_model="claude-sonnet-4-6", effort="high", topic_name="t", priority=priority
+    )
+
+
+def _at_level(tmp_path, output_tokens: int):
+    ledger = _ledger(tmp_path)
+    ledger.debit("m", 0, output_tokens)
+    return patch("course_scout.infrastructure.summarization.get_quota_ledger", return_value=ledger)
+
+
+def test_quota_lowers_effort_then_switches_model(tmp_path):
+    with _at_level(tmp_path, 700):
+        s = _summarizer()
+        assert s._apply_quota()
+        assert (s.assigned_model, s.effort) == ("claude-sonnet-4-6", "medium")
+
+    with (
+        _at_level(tmp_path, 200),  # 900 total
+        patch(
+            "course_scout.infrastructure.runtime.get_runtime",
+            return_value=RuntimeConfig(quota_fallback_model="claude-haiku-4-5"),
+        ),
+    ):
+        s = _summarizer()
+        assert s._apply_quota()
+        assert (s.assigned_model, s.effort) == ("claude-haiku-4-5", "medium")
+        assert s.orchestrator.summarizer_models == ["claude-haiku-4-5"]
+
+
+def test_quota_defers_only_low_priority_topics(tmp_path):
+    with _at_level(tmp_path, 990):
+        assert _summarizer("normal")._apply_quota()
+        low = _summarizer("low")
+        low._summarize_chunk = AsyncMock()
+        digest = asyncio.run(low.summarize([], topic_id=7))
+    low._summarize_chunk.assert_not_called()
+    assert digest.summaries[0] == "### Deferred"
+    assert "not summarized" in digest.summaries[1]
+    assert digest.items == []
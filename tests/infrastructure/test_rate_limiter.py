@@ -1,29 +1,130 @@
-"""Tests for the async RateLimiter."""
+"""Tests for the process-wide token-bucket RateLimiter."""
 
 from __future__ import annotations
 
-import time
+import asyncio
 import unittest
 from unittest.mock import AsyncMock, patch
 
-from course_scout.infrastructure.rate_limiter import RateLimiter
+from course_scout.infrastructure import rate_limiter
+from course_scout.infrastructure.rate_limiter import (
+    ModelLimits,
+    RateLimiter,
+    TokenBucket,
+    bind_reservation,
+    estimate_tokens,
+    get_rate_limiter,
+    note_usage,
+)
+from course_scout.infrastructure.runtime import RuntimeConfig
+
+
+class FakeClock:
+    def __init__(self):
+        """Start at an arbitrary non-zero time."""
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
 
 
 class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
-    @patch("course_scout.infrastructure.rate_limiter.asyncio.sleep", new_callable=AsyncMock)
-    async def test_rate_limiter_waits(self, mock_sleep):
-        """If the previous call was very recent, acquire() awaits asyncio.sleep."""
-        limiter = RateLimiter(rpm=60000)  # interval = 0.001s
-        # Force a future last_request_time so wait_time is huge.
-        limiter.last_request_time = time.time() + 10.0
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sleep = patch(
+            "course_scout.infrastructure.rate_limiter.asyncio.sleep",
+            new=AsyncMock(side_effect=self.clock.sleep),
+        )
+        self.mock_sleep = self.sleep.start()
+
+    def tearDown(self):
+        self.sleep.stop()
 
-        await limiter.acquire()
+    async def test_rate_limiter_waits(self):
+        """Once the burst is spent, acquire() awaits asyncio.sleep for the refill."""
+        limiter = RateLimiter(rpm=6, clock=self.clock)  # one request per 10s
+        for _ in range(6):
+            await limiter.acquire("m")
+        self.mock_sleep.assert_not_called()
 
-        self.assertTrue(mock_sleep.called)
-        args, _ = mock_sleep.call_args
-        self.assertGreater(args[0], 9.0)
+        await limiter.acquire("m")
+
+        self.assertTrue(self.mock_sleep.called)
+        args, _ = self.mock_sleep.call_args
+        self.assertAlmostEqual(args[0], 10.0)
 
     async def test_rpm_attribute(self):
         """RateLimiter exposes its configured rpm."""
         limiter = RateLimiter(rpm=42)
         self.assertEqual(limiter.rpm, 42)
+
+    async def test_models_have_independent_buckets(self):
+        limiter = RateLimiter(rpm=1, clock=self.clock)
+        await limiter.acquire("haiku")
+        await limiter.acquire("sonnet")
+        self.mock_sleep.assert_not_called()
+
+    async def test_input_tpm_and_oversized_call(self):
+        limiter = RateLimiter(rpm=1000, input_tpm=6000, clock=self.clock)
+        await limiter.acquire("m", input_tokens=5000)
+        await limiter.acquire("m", input_tokens=2000)  # 1000 left → wait for 1000 more
+        self.assertAlmostEqual(self.clock.now - 1000.0, 10.0)
+        # Bigger than the whole bucket: waits for a full bucket, then proceeds.
+        await limiter.acquire("m", input_tokens=50_000)
+        self.assertAlmostEqual(self.clock.now - 1000.0, 70.0)
+
+    async def test_usage_reconciles_estimate(self):
+        limiter = RateLimiter(rpm=1000, input_tpm=10_000, output_tpm=1000, clock=self.clock)
+        res = await limiter.acquire("m", input_tokens=8000, output_tokens=900)
+        with bind_reservation(res):
+            note_usage("m", 1000, 100)  # far less than estimated → refund
+            note_usage("m", 500, 0)  # second report (e.g. hedge loser) charged in full
+        note_usage("m", 10**6, 10**6)  # outside the block: ignored
+
+        buckets = limiter._buckets["m"]
+        self.assertAlmostEqual(buckets.input.tokens, 10_000 - 1500)
+        self.assertAlmostEqual(buckets.output.tokens, 1000 - 100)
+        self.assertTrue(res.settled)
+        await limiter.acquire("m", input_tokens=8000, output_tokens=800)
+        self.mock_sleep.assert_not_called()
+
+    async def test_concurrent_callers_share_the_budget(self):
+        limiter = RateLimiter(rpm=60, clock=self.clock)  # burst 60, then 1/s
+        await asyncio.gather(*(limiter.acquire("m") for _ in range(63)))
+        self.assertAlmostEqual(self.clock.now - 1000.0, 3.0, places=5)
+
+
+def test_bucket_banks_at_most_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)
+    bucket.take(60)
+    clock.now += 3600
+    assert bucket.wait_time(60) == 0.0
+    assert bucket.wait_time(61) == 0.0  # oversized: only needs a full bucket
+    bucket.take(61)
+    assert bucket.tokens == -1
+    assert bucket.wait_time(1) == 2.0
+
+
+def test_singleton_from_runtime_with_overrides():
+    rt = RuntimeConfig(
+        rate_limit_rpm=7,
+        rate_limit_input_tpm=0,
+        rate_limits={"claude-opus-4-7": {"rpm": 2, "output_tpm": 5000}},
+    )
+    with (
+        patch("course_scout.infrastructure.runtime.get_runtime", return_value=rt),
+        patch.object(rate_limiter, "_limiter", None),
+    ):
+        limiter = get_rate_limiter()
+        assert get_rate_limiter() is limiter
+    assert limiter.limits_for("claude-haiku-4-5") == ModelLimits(7, 0, rt.rate_limit_output_tpm)
+    assert limiter.limits_for("claude-opus-4-7") == ModelLimits(2, 0, 5000)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("a" * 300, "b" * 300) == 200
+    assert estimate_tokens("", images=2) == 2 * rate_limiter.IMAGE_TOKEN_ESTIMATE
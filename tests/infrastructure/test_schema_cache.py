@@ -0,0 +1,39 @@
+"""Tests for the per-output-type schema and validator cache."""
+
+from __future__ import annotations
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from course_scout.infrastructure.agents import RawDigestItem, SummarizerOutputSchema
+from course_scout.infrastructure.schema_cache import schema_for
+
+
+def test_entry_is_built_once_per_type():
+    entry = schema_for(SummarizerOutputSchema)
+    assert entry is schema_for(SummarizerOutputSchema)
+    assert entry.json_schema == SummarizerOutputSchema.model_json_schema()
+    assert entry.item_model is RawDigestItem
+
+
+def test_validators_run_model_validators():
+    entry = schema_for(SummarizerOutputSchema)
+    # items as a JSON string is repaired by SummarizerOutputSchema's before-validator.
+    data = {"items": '[{"title": "t", "description": "d", "category": "course"}]'}
+    assert entry.validate_python(data).items[0].title == "t"
+    text = '{"items": [{"title": "u", "description": "d", "category": "file"}]}'
+    parsed = entry.validate_json(text)
+    assert isinstance(parsed, SummarizerOutputSchema)
+    assert parsed.items[0].title == "u"
+
+
+def test_validate_item_requires_items_list():
+    class Plain(BaseModel):
+        name: str
+
+    entry = schema_for(Plain)
+    assert entry.item_model is None
+    with pytest.raises(TypeError):
+        entry.validate_item({"name": "x"})
+    with pytest.raises(ValidationError):
+        schema_for(SummarizerOutputSchema).validate_item({"title": "missing fields"})
@@ -0,0 +1,150 @@
+"""Tests for the persistent Claude SDK client pool."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from claude_agent_sdk import ClaudeAgentOptions
+
+from course_scout.infrastructure import sdk_pool
+from course_scout.infrastructure.runtime import RuntimeConfig
+from course_scout.infrastructure.sdk_pool import ClaudeClientPool, StartupStats, sdk_messages
+
+
+class FakeClient:
+    """Stands in for ClaudeSDKClient: echoes each prompt, then a result."""
+
+    def __init__(self, options):
+        """Record the launch options; connect() is counted, not performed."""
+        self.options = options
+        self.prompts: list = []
+        self.connects = 0
+        self.disconnected = False
+        self.gate: asyncio.Event | None = None
+
+    async def connect(self):
+        self.connects += 1
+
+    async def disconnect(self):
+        self.disconnected = True
+
+    async def query(self, prompt):
+        self.prompts.append(prompt)
+
+    async def receive_response(self):
+        prompt = self.prompts[-1]
+        if prompt == "boom":
+            raise RuntimeError("stream broke")
+        if self.gate is not None and prompt != "/clear":
+            await self.gate.wait()
+        yield f"reply:{prompt}"
+        yield "result"
+
+
+def _options(system_prompt: str = "sys", model: str = "claude-haiku-4-5") -> ClaudeAgentOptions:
+    return ClaudeAgentOptions(model=model, system_prompt=system_prompt, max_turns=1)
+
+
+class TestClientPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clients: list[FakeClient] = []
+
+        def factory(options):
+            client = FakeClient(options)
+            self.clients.append(client)
+            return client
+
+        self.factory = factory
+
+    async def _collect(self, pool: ClaudeClientPool, prompt, options) -> list:
+        return [m async for m in pool.run(prompt, options)]
+
+    async def test_reuses_client_and_clears_between_calls(self):
+        pool = ClaudeClientPool(2, client_factory=self.factory, stats=StartupStats())
+        self.assertEqual(await self._collect(pool, "a", _options()), ["reply:a", "result"])
+        self.assertEqual(await self._collect(pool, "b", _options()), ["reply:b", "result"])
+
+        self.assertEqual(len(self.clients), 1)
+        self.assertEqual(self.clients[0].prompts, ["a", "/clear", "b", "/clear"])
+        self.assertEqual(len(pool.stats.first_message_ms["pooled"]), 2)
+        await pool.close()
+        self.assertTrue(self.clients[0].disconnected)
+
+    async def test_size_applies_per_options_key(self):
+        pool = ClaudeClientPool(1, client_factory=self.factory, stats=StartupStats())
+        for prompt in ("a", "b", "c"):
+            await self._collect(pool, prompt, _options("one"))
+            await self._collect(pool, prompt, _options("two"))  # doesn't evict "one"
+
+        self.assertEqual([c.options.system_prompt for c in self.clients], ["one", "two"])
+        self.assertFalse(any(c.disconnected for c in self.clients))
+        self.assertEqual(pool.open_clients, 2)
+        await pool.close()
+
+    async def test_failed_call_discards_client(self):
+        pool = ClaudeClientPool(1, client_factory=self.factory, stats=StartupStats())
+        with self.assertRaises(RuntimeError):
+            await self._collect(pool, "boom", _options())
+        await self._collect(pool, "ok", _options())
+
+        self.assertEqual(len(self.clients), 2)
+        await asyncio.sleep(0)
+        self.assertTrue(self.clients[0].disconnected)
+        self.assertEqual(pool.stats.discarded, 1)
+        await pool.close()
+
+    async def test_callers_wait_when_pool_is_full(self):
+        pool = ClaudeClientPool(1, client_factory=self.factory, stats=StartupStats())
+        await pool.prewarm(_options())
+        gate = asyncio.Event()
+        self.clients[0].gate = gate
+
+        first = asyncio.create_task(self._collect(pool, "a", _options()))
+        second = asyncio.create_task(self._collect(pool, "b", _options()))
+        await asyncio.sleep(0.01)
+        self.assertFalse(first.done() or second.done())
+        gate.set()
+
+        self.assertEqual(await first, ["reply:a", "result"])
+        self.assertEqual(await second, ["reply:b", "result"])
+        self.assertEqual(len(self.clients), 1)
+        await pool.close()
+
+    async def test_prewarm_connects_ahead_of_calls(self):
+        stats = StartupStats()
+        pool = ClaudeClientPool(3, client_factory=self.factory, stats=stats)
+        self.assertEqual(await pool.prewarm(_options(), n=2), 2)
+        self.assertEqual(await pool.prewarm(_options(), n=2), 0)  # already warm
+        await self._collect(pool, "a", _options())
+
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual(len(stats.connect_ms), 2)
+        self.assertIn("pooled: 1 call(s)", stats.summary())
+        await pool.close()
+
+    async def test_sdk_messages_falls_back_to_query_when_pool_off(self):
+        async def fake_query(prompt, options):
+            yield f"q:{prompt}"
+
+        stats = StartupStats()
+        with (
+            patch(
+                "course_scout.infrastructure.runtime.get_runtime",
+                return_value=RuntimeConfig(sdk_client_pool_size=0),
+            ),
+            patch.object(sdk_pool, "_pool", None),
+            patch.object(sdk_pool, "_stats", stats),
+        ):
+            out = [m async for m in sdk_messages("hi", _options(), fake_query)]
+
+        self.assertEqual(out, ["q:hi"])
+        self.assertEqual(len(stats.first_message_ms["query"]), 1)
+
+
+def test_options_key_covers_every_field():
+    base = sdk_pool.options_key(_options())
+    assert sdk_pool.options_key(_options()) == base
+    assert sdk_pool.options_key(_options(system_prompt="other")) != base
+    assert sdk_pool.options_key(_options(model="claude-sonnet-4-6")) != base
@@ -0,0 +1,63 @@
+"""Tests for the incremental streamed-items parser."""
+
+import json
+
+from course_scout.infrastructure.providers.claude_provider import ClaudeProvider
+from course_scout.infrastructure.streaming import IncrementalItemParser
+
+_DOC = {
+    "items": [
+        {"title": "Krenz {Color}", "description": 'said "hi" \\ ok', "category": "course"},
+        {"title": "WLOP", "description": "[nested] {braces}", "category": "file", "msg_ids": [1]},
+    ],
+    "key_links": [{"title": "x", "url": "https://x.com"}],
+}
+
+
+def _feed_all(parser: IncrementalItemParser, text: str, step: int) -> list[dict]:
+    out = []
+    for i in range(0, len(text), step):
+        out.extend(parser.feed(text[i : i + step]))
+    return out
+
+
+def test_emits_items_across_arbitrary_delta_boundaries():
+    text = json.dumps(_DOC)
+    for step in (1, 3, 7, len(text)):
+        items = _feed_all(IncrementalItemParser(), text, step)
+        assert items == _DOC["items"]
+
+
+def test_item_emitted_as_soon_as_it_closes():
+    parser = IncrementalItemParser()
+    first = json.dumps(_DOC["items"][0])
+    assert parser.feed('{"items": [' + first[:-1]) == []
+    assert parser.feed("}, {") == [_DOC["items"][0]]
+    assert parser.emitted == 1
+
+
+def test_ignores_objects_outside_items_array():
+    parser = IncrementalItemParser()
+    text = '{"key_links": [{"title": "a", "url": "b"}], "note": "items", "items": []}'
+    assert parser.feed(text) == []
+
+
+def test_truncated_stream_keeps_completed_items():
+    text = json.dumps(_DOC)
+    cut = text.index('"WLOP"')
+    assert IncrementalItemParser().feed(text[:cut]) == [_DOC["items"][0]]
+
+
+def test_provider_routes_stream_events_per_content_block():
+    got: list[dict] = []
+    parser = IncrementalItemParser()
+    events = [
+        {"type": "content_block_start", "index": 0},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": '{"items": [{"a"'}},
+        {"type": "content_block_start", "index": 1},
+        {"type": "content_block_delta", "delta": {"partial_json": '{"items": [{"t": 1}'}},
+        {"type": "content_block_delta", "delta": {"partial_json": "]}"}},
+    ]
+    for ev in events:
+        parser = ClaudeProvider._feed_stream_event(ev, parser, got.append)
+    assert got == [{"t": 1}]
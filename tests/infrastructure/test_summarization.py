@@ -160,6 +160,73 @@ class TestSummarizer(unittest.IsolatedAsyncioTestCase):
         self.assertIn("https://t.me/c/123/456/100", disc_item.links)
         self.assertIn("https://t.me/c/123/456/101", disc_item.links)
 
+    @patch("course_scout.infrastructure.summarization.AgentOrchestrator")
+    async def test_streamed_items_salvaged_on_agent_failure(self, MockOrch):
+        """A timed-out call still yields the items streamed before it died."""
+        from course_scout.infrastructure.agents import AgentRunError
+
+        mock_agent = MagicMock()
+        MockOrch.return_value.get_summarizer_agent.return_value = mock_agent
+        partial = [RawDigestItem(title="Early", description="d", category="course", msg_ids=[1])]
+        mock_agent.run = AsyncMock(side_effect=AgentRunError("timeout", partial=partial))
+
+        messages = [TelegramMessage(id=1, text="m", date=datetime.datetime.now(), link="http://x")]
+        digest = await Summarizer().summarize(messages, topic_id=7)
+
+        self.assertEqual(digest.channel_name, "Topic 7")
+        self.assertEqual([i.title for i in digest.items], ["Early"])
+
+    @patch("course_scout.infrastructure.summarization.AgentOrchestrator")
+    async def test_failed_chunk_keeps_other_chunks(self, MockOrch):
+        """One chunk failing outright doesn't turn the whole topic into an error digest."""
+        from course_scout.infrastructure.agents import AgentRunError
+
+        mock_agent = MagicMock()
+        MockOrch.return_value.get_summarizer_agent.return_value = mock_agent
+        ok = SummarizerOutputSchema(
+            items=[RawDigestItem(title="Kept", description="d", category="course", msg_ids=[1])]
+        )
+        mock_agent.run = AsyncMock(side_effect=[ok, AgentRunError("boom")])
+
+        now = datetime.datetime.now()
+        messages = [
+            TelegramMessage(id=1, text="a", date=now, link="http://x/1"),
+            TelegramMessage(id=2, text="b", date=now, link="http://x/2"),
+        ]
+        digest = await Summarizer(chunk_size=1).summarize(messages, topic_id=7)
+
+        self.assertEqual(digest.channel_name, "Topic 7")
+        self.assertEqual([i.title for i in digest.items], ["Kept"])
+
+    @patch("course_scout.infrastructure.summarization.AgentOrchestrator")
+    async def test_all_chunks_failing_yields_error_digest(self, MockOrch):
+        from course_scout.infrastructure.agents import AgentRunError
+
+        mock_agent = MagicMock()
+        MockOrch.return_value.get_summarizer_agent.return_value = mock_agent
+        mock_agent.run = AsyncMock(side_effect=AgentRunError("boom"))
+
+        now = datetime.datetime.now()
+        messages = [TelegramMessage(id=i, text="a", date=now, link=f"http://x/{i}") for i in (1, 2)]
+        digest = await Summarizer(chunk_size=1).summarize(messages, topic_id=7)
+
+        self.assertEqual(digest.channel_name, "Error Notice")
+
+    async def test_ground_links_rebuilds_known_ids_without_network(self):
+        from course_scout.infrastructure.grounding import GroundingIndex
+
+        scraper = MagicMock()
+        scraper.get_message_by_id = AsyncMock()
+        summarizer = Summarizer(scraper=scraper)
+        index = GroundingIndex({100: "https://t.me/c/123/456/100"})
+        links = [LinkItem(title="t", url="https://t.me/c/123/100")]
+
+        grounded = await summarizer._ground_links(links, index, [], topic_id=456)
+
+        self.assertEqual(grounded[0].url, "https://t.me/c/123/456/100")
+        scraper.get_message_by_id.assert_not_called()
+        self.assertEqual(index.stats.rebuilt, 1)
+
     def test_no_link_duplication_in_content(self):
         """Verify message links are NOT appended to content."""
         summarizer = Summarizer()
@@ -207,6 +274,19 @@ class TestGrounding(unittest.TestCase):
         )  # noqa: E501
         self.assertEqual(len(item.links), 0)
 
+    def test_ground_items_normalizes_before_matching(self):
+        from course_scout.infrastructure.grounding import GroundingIndex
+
+        item = FileItem(
+            title="Test",
+            description="x",
+            links=["https://t.me/c/123/456/100/", "https://t.me/c/123/456/555"],
+        )
+        index = GroundingIndex({100: "https://t.me/c/123/456/100"})
+        Summarizer._ground_items([item], index=index)
+        self.assertEqual(item.links, ["https://t.me/c/123/456/100/"])
+        self.assertEqual((index.stats.hits, index.stats.misses), (1, 1))
+
     def test_backfill_links_adds_missing_tme(self):
         item = DiscussionItem(
             title="Test",
@@ -231,3 +311,103 @@ class TestGrounding(unittest.TestCase):
         link_map = {100: "https://t.me/c/123/456/100"}
         Summarizer._backfill_links([item], link_map)
         self.assertEqual(len(item.links), 1)  # Not duplicated
+
+
+class TestSummarizerRouting(unittest.IsolatedAsyncioTestCase):
+    @patch("course_scout.infrastructure.summarization.AgentOrchestrator")
+    async def test_router_moves_topic_and_records_usage(self, MockOrch):
+        from course_scout.infrastructure.telemetry import UsageStats
+
+        router = MagicMock()
+        router.choose.return_value = ("claude-haiku-4-5", "low")
+        usage = UsageStats()
+
+        async def run(*_args, **_kwargs):
+            usage.record_call("claude-haiku-4-5", duration_ms=10)
+            return SummarizerOutputSchema(items=[], key_links=[])
+
+        agent = MagicMock()
+        agent.run = AsyncMock(side_effect=run)
+        MockOrch.return_value.get_summarizer_agent.return_value = agent
+
+        summarizer = Summarizer(topic_name="Lounge", prompt_family="discussion", router=router)
+        msgs = [
+            TelegramMessage(
+                id=1, text="hi", date=datetime.datetime.now(), link="https://t.me/c/1/1"
+            )
+        ]
+        await summarizer.summarize(msgs)
+
+        router.choose.assert_called_once_with(
+            "Lounge", "discussion", ("claude-sonnet-4-6", "medium")
+        )
+        self.assertEqual(summarizer.assigned_model, "claude-haiku-4-5")
+        self.assertEqual(MockOrch.call_args.kwargs["effort"], "low")
+        router.record_calls.assert_called_once_with("Lounge", "discussion", "low", usage.calls)
+
+        # The next run routes from the configured arm again, not the routed one.
+        router.choose.return_value = ("claude-sonnet-4-6", "low")
+        await summarizer.summarize(msgs)
+        self.assertEqual(
+            router.choose.call_args.args, ("Lounge", "discussion", ("claude-sonnet-4-6", "medium"))
+        )
+        self.assertEqual(router.record_calls.call_args.args[3], usage.calls[1:])
+
+    @patch("course_scout.infrastructure.summarization.AgentOrchestrator")
+    async def test_only_the_arms_own_parser_calls_are_recorded(self, MockOrch):
+        from course_scout.infrastructure.telemetry import UsageStats, telemetry_labels
+
+        router = MagicMock()
+        router.choose.return_value = ("claude-sonnet-4-6", "medium")
+        usage = UsageStats()
+
+        async def run(*_args, **_kwargs):
+            usage.record_call("claude-sonnet-4-6", cost_usd=0.2)
+            usage.record_call("claude-sonnet-4-6", cost_usd=0.2)
+            usage.calls[-1]["hedge_loser"] = True
+            with telemetry_labels(stage="repair"):
+                usage.record_call("claude-haiku-4-5", cost_usd=0.001)
+            return SummarizerOutputSchema(items=[], key_links=[])
+
+        MockOrch.return_value.get_summarizer_agent.return_value.run = AsyncMock(side_effect=run)
+        summarizer = Summarizer(topic_name="Lounge", prompt_family="discussion", router=router)
+        msgs = [
+            TelegramMessage(
+                id=1, text="hi", date=datetime.datetime.now(), link="https://t.me/c/1/1"
+            )
+        ]
+        await summarizer.summarize(msgs)
+
+        recorded = router.record_calls.call_args.args[3]
+        self.assertEqual([c["model"] for c in recorded], ["claude-sonnet-4-6"])
+
+    @patch("course_scout.infrastructure.summarization.AgentOrchestrator")
+    async def test_escalated_calls_are_recorded(self, MockOrch):
+        from course_scout.infrastructure.telemetry import UsageStats
+
+        router = MagicMock()
+        router.choose.return_value = ("claude-haiku-4-5", "low")
+        default_usage, escalated_usage = UsageStats(), UsageStats()
+
+        def orchestrator(summarizer_model, **_kwargs):
+            usage = escalated_usage if summarizer_model == "claude-sonnet-4-6" else default_usage
+
+            async def run(*_args, **_kwargs):
+                usage.record_call(summarizer_model, cost_usd=0.2)
+                return SummarizerOutputSchema(items=[], key_links=[])
+
+            orch = MagicMock()
+            orch.get_summarizer_agent.return_value.run = AsyncMock(side_effect=run)
+            return orch
+
+        MockOrch.side_effect = orchestrator
+        summarizer = Summarizer(topic_name="Lounge", prompt_family="discussion", router=router)
+        msgs = [
+            TelegramMessage(
+                id=1, text="x" * 600_000, date=datetime.datetime.now(), link="https://t.me/c/1/1"
+            )
+        ]
+        await summarizer.summarize(msgs)  # too big for Haiku: escalates to Sonnet
+
+        recorded = router.record_calls.call_args.args[3]
+        self.assertEqual([c["model"] for c in recorded], ["claude-sonnet-4-6"])
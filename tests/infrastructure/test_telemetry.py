@@ -0,0 +1,84 @@
+"""Tests for the LLM call telemetry registry and its exports."""
+
+from __future__ import annotations
+
+import asyncio
+
+from course_scout.infrastructure.telemetry import (
+    TelemetryRegistry,
+    UsageStats,
+    get_telemetry,
+    telemetry_labels,
+)
+
+
+def test_labels_come_from_context_and_nest():
+    registry = TelemetryRegistry()
+    registry.record("m", 10, 2, duration_ms=1500)
+    with telemetry_labels(stage="vision", topic="Lounge"):
+        registry.record("m", 5, 1)
+        with telemetry_labels(stage="repair"):
+            registry.record("m", 1, 1)
+
+    text = registry.render()
+    assert 'course_scout_llm_calls_total{stage="parse",topic="",model="m"} 1' in text
+    assert 'course_scout_llm_calls_total{stage="vision",topic="Lounge",model="m"} 1' in text
+    assert 'course_scout_llm_calls_total{stage="repair",topic="Lounge",model="m"} 1' in text
+
+
+def test_labels_follow_tasks():
+    registry = TelemetryRegistry()
+
+    async def call(topic: str) -> None:
+        with telemetry_labels(topic=topic):
+            await asyncio.sleep(0)
+            registry.record("m")
+
+    async def main() -> None:
+        await asyncio.gather(call("a"), call("b"))
+
+    asyncio.run(main())
+    text = registry.render()
+    assert 'topic="a"' in text and 'topic="b"' in text
+
+
+def test_openmetrics_histogram_and_prometheus_textfile(tmp_path):
+    registry = TelemetryRegistry()
+    registry.record("m", 100, 20, cache_read=50, duration_ms=3000, cost_usd=0.25)
+
+    text = registry.render()
+    assert "# TYPE course_scout_llm_calls counter" in text
+    assert 'kind="cache_read"} 50' in text
+    assert 'course_scout_llm_cost_usd_total{stage="parse",topic="",model="m"} 0.25' in text
+    assert 'le="2.5"} 0' in text and 'le="5.0"} 1' in text and 'le="+Inf"} 1' in text
+    assert text.endswith("# EOF\n")
+
+    path = registry.write_textfile(tmp_path / "metrics" / "course_scout.prom")
+    prom = path.read_text()
+    assert "# TYPE course_scout_llm_calls_total counter" in prom
+    assert "# EOF" not in prom
+    assert not list(path.parent.glob(".*"))  # temp file renamed into place
+
+
+def test_label_values_are_escaped():
+    registry = TelemetryRegistry()
+    registry.record("m", topic='say "hi"\\')
+    assert 'topic="say \\"hi\\"\\\\"' in registry.render()
+
+
+def test_usage_stats_feed_the_registry_and_summary():
+    registry = get_telemetry()
+    registry.reset()
+    stats = UsageStats()
+    with telemetry_labels(stage="parse", topic="t"):
+        stats.record_usage("m", {"input_tokens": 7, "output_tokens": 3}, 2000, 0.5)
+    registry.record("v", 1, 1, duration_ms=800, stage="vision")
+
+    assert stats.call_count == 1
+    assert stats.calls[0]["input_tokens"] == 7
+    summary = registry.summary()
+    assert "Usage Summary (2 API calls)" in summary
+    assert "parse" in summary and "vision" in summary
+    assert registry.quantile("parse", 0.95) == 2.5
+    assert registry.quantile("vision", 0.95) == 1
+    registry.reset()
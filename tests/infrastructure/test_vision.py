@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from PIL import Image
+
+from course_scout.infrastructure import image_prep, vision
+from course_scout.infrastructure.caption_store import CaptionStore
+from course_scout.infrastructure.image_hash import ImageHashIndex
+from course_scout.infrastructure.runtime import RuntimeConfig
+from course_scout.infrastructure.vision import parse_indexed_captions
+
+
+def test_parse_indexed_captions_tolerates_preamble():
+    text = "Here you go:\n[2] Coloso figure course\n\n[1] sketchbook page\n[3]  Krenz cover "
+    assert parse_indexed_captions(text, 3) == [
+        "sketchbook page",
+        "Coloso figure course",
+        "Krenz cover",
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[1] a\n[2] b",  # missing [3]
+        "[1] a\n[1] b\n[2] c",  # duplicate
+        "[1] a\n[2] b\n[4] c",  # out of range
+        "one caption for everything",
+    ],
+)
+def test_parse_indexed_captions_rejects_malformed(text):
+    assert parse_indexed_captions(text, 3) is None
+
+
+class TestCaptionImages(unittest.IsolatedAsyncioTestCase):
+    @pytest.fixture(autouse=True)
+    def _tmp(self, tmp_path):
+        self.tmp = tmp_path
+
+    def setUp(self):
+        self.prep_patch = patch.object(image_prep, "_CACHE_DIR", self.tmp / "prepared")
+        self.prep_patch.start()
+
+    def tearDown(self):
+        self.prep_patch.stop()
+
+    def _images(self, n: int, decodable: bool = True) -> list[str]:
+        paths = []
+        for i in range(n):
+            p = self.tmp / f"media_{i}.jpg"
+            if decodable:
+                Image.new("RGB", (40 + i, 30), (i * 40, 90, 200)).save(p, "JPEG")
+            else:
+                p.write_bytes(f"image {i}".encode())
+            paths.append(str(p))
+        return paths
+
+    async def test_one_call_for_the_batch(self):
+        a, b, c = self._images(3)
+        missing = str(self.tmp / "gone.jpg")
+        ask = AsyncMock(return_value="[1] first\n[2] second\n[3] third")
+        with patch.object(vision, "_ask", ask):
+            result, calls = await vision.caption_images([a, missing, b, c])
+        self.assertEqual(result, ["first", "", "second", "third"])
+        self.assertEqual(calls, 1)
+        ask.assert_awaited_once()
+        content = ask.await_args.args[0]
+        self.assertEqual(sum(block["type"] == "image" for block in content), 3)
+
+    async def test_malformed_reply_falls_back_per_image(self):
+        paths = self._images(3)
+        per_image = AsyncMock(side_effect=lambda p, model: f"single:{p[-5:]}")
+        with (
+            patch.object(vision, "_ask", AsyncMock(return_value="[1] only one")),
+            patch.object(vision, "caption_image", per_image),
+        ):
+            result, calls = await vision.caption_images(paths)
+        self.assertEqual(result, [f"single:{p[-5:]}" for p in paths])
+        self.assertEqual(per_image.await_count, 3)
+        self.assertEqual(calls, 4)  # the failed batch call, then one per image
+
+    async def test_caption_paths_groups_clusters_by_batch_size(self):
+        vision._store = CaptionStore(self.tmp / "captions.db")
+        vision._hash_index = ImageHashIndex(vision._store)
+        paths = self._images(5, decodable=False)  # no dHash → each its own cluster
+
+        async def fake_batch(batch):
+            return [f"cap:{p[-5:]}" for p in batch], 1 + len(batch)  # as after a fallback
+
+        try:
+            with (
+                patch(
+                    "course_scout.infrastructure.runtime.get_runtime",
+                    return_value=RuntimeConfig(caption_batch_size=2),
+                ),
+                patch.object(vision, "caption_images", AsyncMock(side_effect=fake_batch)) as multi,
+                patch.object(vision, "caption_image", AsyncMock(return_value="solo")) as single,
+            ):
+                with self.assertLogs(vision.logger, "INFO") as logs:
+                    result = await vision.caption_paths(paths)
+        finally:
+            vision._store = None
+            vision._hash_index = None
+
+        self.assertEqual(multi.await_count, 2)  # [0,1] [2,3]
+        self.assertEqual(single.await_count, 1)  # [4]
+        self.assertEqual(result[paths[0]], "cap:0.jpg")
+        self.assertEqual(result[paths[4]], "solo")
+        self.assertIn("5 new in 7 vision call(s)", logs.output[-1])
@@ -161,6 +161,77 @@ class TestBatchScanCoverage(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0][0], "Working Topic")
 
+    async def test_batch_mode_summarizes_inside_active_collector(self):
+        """With a batch collector, every topic summarizes while it is active."""
+        from course_scout.infrastructure.batching import BatchCollector, get_active_collector
+
+        scraper = AsyncMock()
+        scraper.get_messages.return_value = [_make_message(1)]
+        collector = BatchCollector()
+        seen: list = []
+
+        class _BatchAwareSummarizer(_FakeSummarizer):
+            async def summarize(self, messages, topic_id=None):
+                seen.append(get_active_collector())
+                return await super().summarize(messages, topic_id)
+
+        use_case = BatchScanUseCase(
+            scraper=scraper,
+            summarizer_factory=lambda task: _BatchAwareSummarizer(task.name),
+            batch_collector=collector,
+        )
+        tasks = [_make_task("A", 1), _make_task("B", 2)]
+        results = await use_case.execute(tasks=tasks, dedup=False)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(seen, [collector, collector])
+        self.assertIsNone(get_active_collector())
+
+    async def test_warmup_runs_during_fetch_and_failures_are_ignored(self):
+        """The warmup runs alongside the fetch phase; a failing warmup never aborts the scan."""
+        events: list[str] = []
+
+        async def get_messages(*args, **kwargs):
+            events.append("fetch")
+            return [_make_message(1)]
+
+        async def warmup(tasks):
+            events.append(f"warmup:{len(tasks)}")
+            raise RuntimeError("cannot connect")
+
+        scraper = AsyncMock()
+        scraper.get_messages.side_effect = get_messages
+        use_case = BatchScanUseCase(
+            scraper=scraper,
+            summarizer_factory=lambda task: _FakeSummarizer(task.name),
+            warmup=warmup,
+        )
+        results = await use_case.execute(tasks=[_make_task("A", 1)], dedup=False)
+
+        self.assertEqual(len(results), 1)
+        self.assertCountEqual(events, ["fetch", "warmup:1"])
+
+    async def test_dedup_scan_drops_the_previous_scans_seen_cache(self):
+        """A long-lived process reloads seen keys for every deduped scan."""
+        from unittest.mock import patch
+
+        scraper = AsyncMock()
+        scraper.get_messages.return_value = [_make_message(1)]
+        use_case = BatchScanUseCase(
+            scraper=scraper,
+            summarizer_factory=lambda task: _FakeSummarizer(task.name),
+        )
+        with (
+            patch("course_scout.infrastructure.dedup.reset_seen_caches") as reset,
+            patch("course_scout.infrastructure.dedup.DigestDeduper") as deduper,
+        ):
+            deduper.return_value.filter.return_value = 0
+            await use_case.execute(tasks=[_make_task("A", 1)])
+            await use_case.execute(tasks=[_make_task("A", 1)], dedup=False)
+
+        reset.assert_called_once_with()
+        deduper.assert_called_once()
+
 
 class TestPinDiffGating(unittest.IsolatedAsyncioTestCase):
     """Pin diffs only run for non-request channels.
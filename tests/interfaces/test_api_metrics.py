@@ -0,0 +1,36 @@
+"""Tests for the API's /metrics endpoint."""
+
+from __future__ import annotations
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from course_scout.infrastructure.telemetry import get_telemetry
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("TG_API_ID", "1")
+    monkeypatch.setenv("TG_API_HASH", "x")
+    app_module = importlib.import_module("course_scout.interfaces.api.app")
+    get_telemetry().reset()
+    yield TestClient(app_module.app)
+    get_telemetry().reset()
+
+
+def test_metrics_serves_prometheus_text_by_default(client):
+    get_telemetry().record("claude-haiku-4-5", 10, 2, duration_ms=700, stage="vision")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'course_scout_llm_calls_total{stage="vision",topic="",model="claude-haiku-4-5"} 1' in (
+        resp.text
+    )
+
+
+def test_metrics_negotiates_openmetrics(client):
+    resp = client.get("/metrics", headers={"accept": "application/openmetrics-text"})
+    assert resp.headers["content-type"].startswith("application/openmetrics-text")
+    assert resp.text.endswith("# EOF\n")
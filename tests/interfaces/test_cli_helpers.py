@@ -33,6 +33,7 @@ def _task(name: str, topic_id: int) -> SimpleNamespace:
         chunk_size=10000,
         max_messages=100,
         include_media=True,
+        priority="normal",
     )
 
 